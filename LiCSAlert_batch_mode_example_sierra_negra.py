@@ -18,7 +18,7 @@ from pathlib import Path
 import copy
 
 sys.path.append("./lib")
-from LiCSAlert_functions import LiCSAlert_batch_mode
+from licsalert.LiCSAlert_functions import LiCSAlert_batch_mode
 
 #%% Load Sentinel-1 data for Sierra Negra
 
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Timed benchmarks of the main LiCSAlert functions on synthetic time series of a range of sizes.  Results (run times and peak memory)
+are saved as a .json file so that they can be compared between versions of LiCSAlert.
+
+e.g.:
+    python benchmarks/LiCSAlert_benchmarks.py --grid small --out_file benchmark_results.json
+
+@author: Matthew Gaddes
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent))                         # synthetic_time_series
+sys.path.append(str(Path(__file__).resolve().parent.parent / "lib"))          # LiCSAlert functions
+
+# The sizes of the synthetic time series that the functions are timed with.
+size_grids = {'small'  : [{'ny' : 100, 'nx' : 100, 'n_epochs' : 40,  'n_sources' : 3},
+                          {'ny' : 200, 'nx' : 200, 'n_epochs' : 40,  'n_sources' : 3},
+                          {'ny' : 200, 'nx' : 200, 'n_epochs' : 80,  'n_sources' : 6}],
+              'medium' : [{'ny' : 200, 'nx' : 200, 'n_epochs' : 80,  'n_sources' : 6},
+                          {'ny' : 400, 'nx' : 400, 'n_epochs' : 80,  'n_sources' : 6},
+                          {'ny' : 400, 'nx' : 400, 'n_epochs' : 160, 'n_sources' : 6},
+                          {'ny' : 800, 'nx' : 800, 'n_epochs' : 80,  'n_sources' : 6}],
+              'large'  : [{'ny' : 800,  'nx' : 800,  'n_epochs' : 160, 'n_sources' : 6},
+                          {'ny' : 1600, 'nx' : 1600, 'n_epochs' : 160, 'n_sources' : 6},
+                          {'ny' : 1600, 'nx' : 1600, 'n_epochs' : 320, 'n_sources' : 10}]}
+
+benchmarked_functions = ['bss_components_inversion', 'tcs_baseline', 'tcs_monitoring', 'residual_for_pixels', 'downsample_ifgs',
+                         'update_mask_sources_ifgs', 'LiCSAlert', 'LiCSAlert_blocked', 'LiCSAlert_figure', 'LiCSAlert_sweep']
+
+
+#%%
+
+def time_function(function, setup, n_repeats = 3):
+    """ Time a function, and record the peak memory that it allocates.
+    Inputs:
+        function | function | the function to be timed.
+        setup | function | returns (args, kwargs) for function.  Called before each repeat (and not timed), as some functions modify their inputs.
+        n_repeats | int | number of times to time the function.
+    Returns:
+        timing | dict | times (s) for each repeat, the minimum and median of these, and the peak memory (MB) allocated by the function.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import time
+    import tracemalloc
+    import numpy as np
+
+    times = []
+    peak_memories = []
+    for repeat_n in range(n_repeats):
+        args, kwargs = setup()
+        tracemalloc.start()                                                         # numpy reports its allocations to tracemalloc
+        t_start = time.perf_counter()
+        function(*args, **kwargs)
+        times.append(time.perf_counter() - t_start)
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_memories.append(peak_memory / 1e6)
+
+    timing = {'times'          : times,
+              'time_min'       : float(np.min(times)),
+              'time_median'    : float(np.median(times)),
+              'peak_memory_MB' : float(np.max(peak_memories))}
+    return timing
+
+
+#%%
+
+def benchmark_setups(synthetic_data, out_folder, t_recalculate = 10, downsample_plot = 0.5):
+    """ Create the setup functions (which return the arguments) for each of the benchmarked functions, given a synthetic time series.
+    Inputs:
+        synthetic_data | dict | from synthetic_time_series
+        out_folder | Path | folder that figures can be saved to.
+        t_recalculate | int | as per LiCSAlert
+        downsample_plot | float | as per LiCSAlert_preprocessing
+    Returns:
+        setups | dict | keys are the function names, values are (function, setup function) tuples.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import copy
+    import numpy as np
+    from licsalert.LiCSAlert_functions import (bss_components_inversion, tcs_baseline, tcs_monitoring, residual_for_pixels, LiCSAlert,
+                                     LiCSAlert_figure, LiCSAlert_preprocessing)
+    from licsalert.LiCSAlert_monitoring_functions import update_mask_sources_ifgs
+    from licsalert.downsample_ifgs import downsample_ifgs
+    from licsalert.parameter_sweep import LiCSAlert_sweep
+
+    sources = synthetic_data['sources']
+    ifgs = synthetic_data['displacement_r2']['incremental']
+    mask = synthetic_data['displacement_r2']['mask']
+    time_values = synthetic_data['cumulative_baselines']
+    n_baseline_end = synthetic_data['n_baseline_end']
+
+    # some of the functions need the results of the earlier parts of LiCSAlert, so these are made once (and not timed)
+    tcs_c_baseline, _ = bss_components_inversion(sources, ifgs[:n_baseline_end], cumulative = True)
+    tcs_c_monitoring, _ = bss_components_inversion(sources, ifgs[n_baseline_end:], cumulative = True)
+    sources_tcs = tcs_baseline(tcs_c_baseline, time_values[:n_baseline_end], t_recalculate)
+    sources_tcs_monitor = tcs_monitoring(np.copy(tcs_c_monitoring), sources_tcs, time_values)
+    mask_ifgs = np.copy(mask)
+    mask_ifgs[:, :int(mask.shape[1] / 10)] = True                                                    # LiCSBAS masks a few more pixels, as per monitoring mode
+    ifgs_mask_ifgs = np.array([ifg_r2[~mask_ifgs] for ifg_r2 in _rows_to_r2(ifgs, mask)])
+    displacement_r2_figure = LiCSAlert_preprocessing(copy.deepcopy(synthetic_data['displacement_r2']), 1.0, downsample_plot, verbose = False)
+    sources_downsampled, _ = downsample_ifgs(sources, mask, downsample_plot, verbose = False)
+    sources_tcs_figure, residual_tcs_figure = LiCSAlert(sources, time_values, ifgs[:n_baseline_end], ifgs[n_baseline_end:], t_recalculate = t_recalculate)
+
+    setups = {'bss_components_inversion' : (bss_components_inversion, lambda : ((sources, ifgs), {'cumulative' : True})),
+              'tcs_baseline'             : (tcs_baseline,             lambda : ((tcs_c_baseline, time_values[:n_baseline_end], t_recalculate), {})),
+              'tcs_monitoring'           : (tcs_monitoring,           lambda : ((np.copy(tcs_c_monitoring), sources_tcs, time_values), {})),
+              'residual_for_pixels'      : (residual_for_pixels,      lambda : ((sources, sources_tcs_monitor, ifgs), {})),
+              'downsample_ifgs'          : (downsample_ifgs,          lambda : ((ifgs, mask, downsample_plot), {'verbose' : False})),
+              'update_mask_sources_ifgs' : (update_mask_sources_ifgs, lambda : ((mask, sources, mask_ifgs, ifgs_mask_ifgs), {})),
+              'LiCSAlert'                : (LiCSAlert,                lambda : ((sources, time_values, ifgs[:n_baseline_end], ifgs[n_baseline_end:]),
+                                                                                {'t_recalculate' : t_recalculate})),
+              'LiCSAlert_blocked'        : (LiCSAlert,                lambda : ((sources, time_values, ifgs[:n_baseline_end], ifgs[n_baseline_end:]),
+                                                                                {'t_recalculate' : t_recalculate, 'memory_budget' : 100., 'n_threads' : 4})),
+              'LiCSAlert_figure'         : (LiCSAlert_figure,         lambda : ((sources_tcs_figure, residual_tcs_figure, sources_downsampled, displacement_r2_figure,
+                                                                                 n_baseline_end, time_values),
+                                                                                {'day0_date' : synthetic_data['acq_dates'][0], 'out_folder' : out_folder,
+                                                                                 'sources_downsampled' : True})),
+              'LiCSAlert_sweep'          : (LiCSAlert_sweep,          lambda : ((sources, time_values, ifgs, [n_baseline_end - 4, n_baseline_end - 2, n_baseline_end,    # 100 variants, to compare with one run of LiCSAlert
+                                                                                  n_baseline_end + 2, n_baseline_end + 4], [5, 8, 10, 12], [2., 2.5, 3., 3.5, 4.]), {}))}
+    return setups
+
+
+def _rows_to_r2(ifgs, mask):
+    """ Yield each interferogram (a row vector) as a rank 2 array (masked pixels are 0).
+    """
+    import numpy as np
+    for ifg in ifgs:
+        ifg_r2 = np.zeros(mask.shape)
+        ifg_r2[~mask] = ifg
+        yield ifg_r2
+
+
+#%%
+
+def run_benchmarks(size_grid, out_file, functions = None, n_repeats = 3, mask_fraction = 0.2, seed = 0):
+    """ Time the LiCSAlert functions for synthetic time series of each size in size_grid, and save the results to a .json file.
+    Inputs:
+        size_grid | list of dicts | each dict contains ny, nx, n_epochs, and n_sources.  See size_grids for examples.
+        out_file | string or Path | .json file the results are saved to.
+        functions | list of strings or None | names of the functions to benchmark.  If None, all in benchmarked_functions are used.
+        n_repeats | int | number of times each function is timed.
+        mask_fraction | float | fraction of pixels that are masked in the synthetic time series.
+        seed | int | seed used to make the synthetic time series.
+    Returns:
+        benchmark_results | dict | metadata (versions, platform, date) and results (a list with a dict for each function and size).  Also saved to out_file.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import json
+    import platform
+    import datetime
+    import tempfile
+    import subprocess
+    import numpy as np
+    import matplotlib
+    matplotlib.use('Agg')                                                                   # no windows when timing figures
+    from synthetic_time_series import synthetic_time_series
+
+    if functions is None:
+        functions = benchmarked_functions
+
+    try:
+        git_commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd = Path(__file__).resolve().parent,
+                                    capture_output = True, text = True).stdout.strip()
+    except Exception:
+        git_commit = None
+
+    benchmark_results = {'metadata' : {'date'       : datetime.datetime.now().strftime('%Y/%m/%d %H:%M:%S'),
+                                       'git_commit' : git_commit,
+                                       'python'     : platform.python_version(),
+                                       'numpy'      : np.__version__,
+                                       'platform'   : platform.platform(),
+                                       'n_repeats'  : n_repeats},
+                         'results'  : []}
+
+    with tempfile.TemporaryDirectory() as out_folder:
+        for size in size_grid:
+            print(f"Benchmarking with a synthetic time series of size {size}... ")
+            synthetic_data = synthetic_time_series(**size, mask_fraction = mask_fraction, unrest_epoch = int(0.8 * size['n_epochs']), seed = seed)
+            setups = benchmark_setups(synthetic_data, out_folder)
+            for function_name in functions:
+                function, setup = setups[function_name]
+                timing = time_function(function, setup, n_repeats)
+                result = {'function' : function_name,
+                          'size'     : size,
+                          'n_pixels' : int(synthetic_data['sources'].shape[1])}
+                result.update(timing)
+                benchmark_results['results'].append(result)
+                print(f"    {function_name}: {timing['time_min']:.4f} s, peak memory {timing['peak_memory_MB']:.1f} MB")
+
+    with open(out_file, 'w') as f:
+        json.dump(benchmark_results, f, indent = 2)
+    print(f"Saved the benchmark results to {out_file}")
+    return benchmark_results
+
+
+#%%
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description = 'Time the main LiCSAlert functions on synthetic data.  ')
+    parser.add_argument('--grid', default = 'small', choices = list(size_grids.keys()), help = 'sizes of the synthetic time series')
+    parser.add_argument('--out_file', default = 'LiCSAlert_benchmark_results.json', help = '.json file the results are saved to')
+    parser.add_argument('--functions', nargs = '+', default = None, choices = benchmarked_functions, help = 'functions to benchmark (default: all)')
+    parser.add_argument('--n_repeats', type = int, default = 3)
+    parser.add_argument('--cost_model_file', default = None, help = '.json file the cost model calibrated with the results is saved to (see preflight.py)')
+    args = parser.parse_args()
+
+    run_benchmarks(size_grids[args.grid], args.out_file, args.functions, args.n_repeats)
+    if args.cost_model_file is not None:
+        from licsalert.preflight import calibrate_cost_model, save_cost_model
+        save_cost_model(calibrate_cost_model(args.out_file), args.cost_model_file)
+        print(f"Saved the cost model calibrated with these results to {args.cost_model_file}")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Time how long the licsalert command takes to start, and check which of the slow modules (numpy, matplotlib, skimage, h5py, ICASAR) each part of it
+imports.  Each command is run in a new python process (as it would be from cron), on a synthetic tree of volcanoes and LiCSAR frames.
+
+e.g.:
+    python benchmarks/import_time_benchmark.py --n_volcanoes 50 --out_file import_time_results.json
+
+@author: Matthew Gaddes
+"""
+
+import sys
+from pathlib import Path
+
+lib_dir = str(Path(__file__).resolve().parent.parent / "lib")
+
+slow_modules = ['numpy', 'matplotlib', 'skimage', 'h5py', 'ICASAR_functions']
+
+# code run in a new process for each test, which prints the slow modules that were imported.
+import_tests = {'import LiCSAlert_cli'                  : "import licsalert.LiCSAlert_cli",
+                'import LiCSAlert_functions'            : "import licsalert.LiCSAlert_functions",
+                'import LiCSAlert_monitoring_functions' : "import licsalert.LiCSAlert_monitoring_functions",
+                'licsalert status'                      : "from licsalert import LiCSAlert_cli; LiCSAlert_cli.main(['status', '--LiCSAlert_volcs_dir', '{volcs_dir}', "
+                                                          "'--LiCSAR_frames_dir', '{frames_dir}'])"}
+
+
+#%%
+
+def make_volcano_tree(out_dir, n_volcanoes = 50, n_acqs = 100):
+    """ Make a tree of volcanoes (each with a config file and a folder for some of its dates) and LiCSAR frames (with a GEOC folder for each ifg),
+    in the layout used by monitoring mode.
+    Returns:
+        volcs_dir | string | the LiCSAlert_volcs_dir (with trailing /)
+        frames_dir | string | the LiCSAR_frames_dir (with trailing /)
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import os
+    import datetime
+    import json
+
+    volcs_dir = f"{out_dir}/volcanoes/"
+    frames_dir = f"{out_dir}/frames/"
+    dates = [(datetime.date(2020, 1, 1) + datetime.timedelta(days = 12 * acq_n)).strftime('%Y%m%d') for acq_n in range(n_acqs)]
+    for volcano_n in range(n_volcanoes):
+        frame = f"{volcano_n:03d}A_00000_000000"
+        for date_n in range(n_acqs - 1):
+            os.makedirs(f"{frames_dir}{frame}/GEOC/{dates[date_n]}_{dates[date_n + 1]}", exist_ok = True)
+        volcano_dir = f"{volcs_dir}volcano_{volcano_n:03d}/"
+        os.makedirs(volcano_dir, exist_ok = True)
+        with open(f"{volcano_dir}LiCSAlert_settings.txt", 'w') as f:
+            f.write(f"[LiCSAR]\nframe = {frame}\n\n"
+                    f"[LiCSBAS]\nwest = 0\neast = 1\nsouth = 0\nnorth = 1\n\n"
+                    f"[LiCSAlert]\ndownsample_run = 0.5\ndownsample_plot = 0.5\nbaseline_end = {dates[n_acqs // 2]}\n\n"
+                    f"[ICASAR]\nn_comp = 5\nn_bootstrapped = 200\nn_not_bootstrapped = 0\nHDBSCAN_min_cluster_size = 100\nHDBSCAN_min_samples = 10\n"
+                    f"tsne_perplexity = 30\ntsne_early_exaggeration = 12\nica_tolerance = 0.01\nica_max_iterations = 150\n")
+        for date in dates[n_acqs // 2 : -2]:                                                           # LiCSAlert is a few dates behind
+            os.makedirs(f"{volcano_dir}{date}", exist_ok = True)
+            with open(f"{volcano_dir}{date}/LiCSAlert_results.json", 'w') as f:
+                json.dump({'alert' : False}, f)
+    return volcs_dir, frames_dir
+
+
+def time_import_test(code, n_repeats = 5):
+    """ Run some code in a new python process n_repeats times, and return the fastest wall time and the slow modules that it imported.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import subprocess
+    import time
+
+    check = f"\nimport sys\nprint('SLOW_MODULES=' + ','.join([m for m in {slow_modules!r} if m in sys.modules]))"
+    times = []
+    for repeat_n in range(n_repeats):
+        t_start = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', f"import sys; sys.path.insert(0, {lib_dir!r})\n{code}{check}"],
+                                capture_output = True, text = True, check = True).stdout
+        times.append(time.perf_counter() - t_start)
+    imported = [line for line in output.splitlines() if line.startswith('SLOW_MODULES=')][0][len('SLOW_MODULES='):]
+    return min(times), [module for module in imported.split(',') if module != '']
+
+
+def run_import_benchmarks(n_volcanoes = 50, n_repeats = 5, out_file = 'import_time_results.json'):
+    """ Time each of import_tests, and save the results as .json.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import json
+    import tempfile
+    import subprocess
+    import time
+
+    t_start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'], check = True)
+    python_startup = time.perf_counter() - t_start                                                         # roughly, so it can be compared with the times below
+
+    results = {'python' : sys.version, 'n_volcanoes' : n_volcanoes, 'python_startup_s' : python_startup, 'tests' : {}}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        volcs_dir, frames_dir = make_volcano_tree(tmp_dir, n_volcanoes)
+        for test_name, code in import_tests.items():
+            wall_time, imported = time_import_test(code.format(volcs_dir = volcs_dir, frames_dir = frames_dir), n_repeats)
+            results['tests'][test_name] = {'wall_time_s' : wall_time, 'slow_modules_imported' : imported}
+            print(f"{test_name:<40}{wall_time:>8.3f}s   slow modules imported: {imported if len(imported) > 0 else 'none'}")
+
+    with open(out_file, 'w') as f:
+        json.dump(results, f, indent = 2)
+    print(f"Saved the import time results to {out_file}")
+    return results
+
+
+#%%
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description = 'Time how long the licsalert command takes to start, and which slow modules it imports.  ')
+    parser.add_argument('--n_volcanoes', type = int, default = 50, help = 'number of volcanoes in the synthetic tree used by licsalert status')
+    parser.add_argument('--n_repeats', type = int, default = 5)
+    parser.add_argument('--out_file', default = 'import_time_results.json')
+    args = parser.parse_args()
+
+    run_import_benchmarks(args.n_volcanoes, args.n_repeats, args.out_file)
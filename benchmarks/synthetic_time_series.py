@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Functions to create synthetic time series of interferograms (deformation and atmosphere) for benchmarking LiCSAlert.
+
+@author: Matthew Gaddes
+"""
+
+#%%
+
+def synthetic_time_series(ny = 200, nx = 200, mask_fraction = 0.2, n_epochs = 80, n_sources = 4, n_baseline_end = None,
+                          unrest_epoch = None, unrest_strength = 3., atmosphere_strength = 1., temporal_baseline = 12, seed = 0):
+    """ Create a synthetic time series of incremental interferograms that contains deformation (from a set of spatial sources with
+    linear rates of change) and atmospheric signals (spatially correlated noise that is different for each interferogram), in the
+    format used by LiCSAlert_batch_mode (i.e. interferograms as row vectors and a mask).  An unrest event can also be injected, in which the first
+    source accelerates and a new deformation signal that is not one of the sources appears (so should be seen in the residual).
+
+    Inputs:
+        ny | int | number of pixels in the y direction.
+        nx | int | number of pixels in the x direction.
+        mask_fraction | float | in range [0 1), fraction of the pixels that are masked (e.g. water or incoherence).
+        n_epochs | int | number of incremental interferograms.
+        n_sources | int | number of spatial sources.
+        n_baseline_end | int or None | number of interferograms in the baseline stage.  If None, the first third are used.
+        unrest_epoch | int or None | interferogram number that the unrest event starts at.  If None, there is no unrest event.
+        unrest_strength | float | how much the first source accelerates by during the unrest event (and the strength of the new signal).
+        atmosphere_strength | float | standard deviation of the atmospheric signals (rad)
+        temporal_baseline | int | number of days between acquisitions.
+        seed | int | seed for the random number generator, so that the time series can be recreated.
+
+    Returns:
+        synthetic_data | dict | displacement_r2 | dict | incremental interferograms as row vectors ("incremental") and a boolean mask ("mask")
+                                sources | r2 array | the spatial sources as row vectors, mean centered
+                                tcs | r2 array | incremental time courses of the sources, as column vectors
+                                cumulative_baselines | r1 array | e.g. 12, 24, 36 etc.
+                                acq_dates | list of strings | dates of the acquisitions in form YYYYMMDD (one longer than the number of interferograms)
+                                n_baseline_end | int | number of interferograms in the baseline stage
+                                unrest_epoch | int or None | as per the input
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import numpy as np
+    import datetime as dt
+
+    def gaussian_source(ny, nx, rng):
+        """ A 2D Gaussian (e.g. uplift or subsidence) at a random location and of a random width.
+        """
+        yy, xx = np.meshgrid(np.arange(ny), np.arange(nx), indexing = 'ij')
+        y0 = rng.uniform(0.2, 0.8) * ny
+        x0 = rng.uniform(0.2, 0.8) * nx
+        width = rng.uniform(0.05, 0.2) * min(ny, nx)
+        return np.exp(-((yy - y0)**2 + (xx - x0)**2) / (2 * width**2))
+
+    def correlated_noise(ny, nx, length_scale, rng):
+        """ Spatially correlated noise (similar to a turbulent atmosphere) made by filtering white noise in the frequency domain.
+        """
+        ky = np.fft.fftfreq(ny)[:, np.newaxis]
+        kx = np.fft.fftfreq(nx)[np.newaxis, :]
+        k = np.sqrt(ky**2 + kx**2)
+        k[0,0] = 1. / length_scale                                                              # avoid dividing by 0
+        spectrum = (k * length_scale) ** (-8./6)                                                # approximately the power law of turbulent delays
+        noise = np.real(np.fft.ifft2(np.fft.fft2(rng.standard_normal((ny, nx))) * spectrum))
+        return (noise - np.mean(noise)) / np.std(noise)
+
+    rng = np.random.default_rng(seed)
+    if n_baseline_end is None:
+        n_baseline_end = int(n_epochs / 3)
+
+    # 1: the mask, made by thresholding some correlated noise so that masked areas are contiguous (like water or incoherent regions)
+    if mask_fraction > 0:
+        mask_noise = correlated_noise(ny, nx, 0.2 * min(ny, nx), rng)
+        mask = mask_noise > np.quantile(mask_noise, 1 - mask_fraction)
+    else:
+        mask = np.zeros((ny, nx), dtype = bool)
+    n_pixs = np.count_nonzero(~mask)
+
+    # 2: the spatial sources (deformation), as row vectors of the unmasked pixels
+    sources = np.zeros((n_sources, n_pixs))
+    for source_n in range(n_sources):
+        source_r2 = gaussian_source(ny, nx, rng) - gaussian_source(ny, nx, rng)                  # one positive and one negative lobe, so not just uplift
+        sources[source_n, :] = source_r2[~mask]
+    sources -= np.mean(sources, axis = 1)[:, np.newaxis]                                         # mean centre, as per ICASAR
+    sources /= np.max(np.abs(sources), axis = 1)[:, np.newaxis]
+
+    # 3: the time courses of the sources, which are a linear rate plus some noise
+    rates = rng.uniform(-0.5, 0.5, n_sources)                                                    # rad per interferogram
+    tcs = rates[np.newaxis, :] + 0.1 * rng.standard_normal((n_epochs, n_sources))
+
+    # 4: combine the deformation and the atmosphere
+    ifgs = tcs @ sources
+    for ifg_n in range(n_epochs):
+        ifgs[ifg_n, :] += atmosphere_strength * correlated_noise(ny, nx, 0.1 * min(ny, nx), rng)[~mask]
+
+    # 5: possibly inject an unrest event
+    if unrest_epoch is not None:
+        new_signal = gaussian_source(ny, nx, rng)[~mask]                                         # a signal not in the sources, so should be seen in the residual
+        for ifg_n in range(unrest_epoch, n_epochs):
+            ifgs[ifg_n, :] += unrest_strength * 0.1 * (sources[0, :] + new_signal)
+            tcs[ifg_n, 0] += unrest_strength * 0.1
+    ifgs -= np.mean(ifgs, axis = 1)[:, np.newaxis]                                              # mean centre, as per LiCSAlert_preprocessing
+
+    # 6: times and dates
+    cumulative_baselines = temporal_baseline * np.arange(1, n_epochs + 1)
+    day0 = dt.datetime(2016, 1, 1)
+    acq_dates = [dt.datetime.strftime(day0 + dt.timedelta(int(day_n)), '%Y%m%d') for day_n in np.concatenate(([0], cumulative_baselines))]
+
+    synthetic_data = {'displacement_r2'      : {'incremental' : ifgs,
+                                                'mask'        : mask},
+                      'sources'              : sources,
+                      'tcs'                  : tcs,
+                      'cumulative_baselines' : cumulative_baselines,
+                      'acq_dates'            : acq_dates,
+                      'n_baseline_end'       : n_baseline_end,
+                      'unrest_epoch'         : unrest_epoch}
+    return synthetic_data
@@ -36,20 +36,6 @@ def get_baseline_end_ifg_n(LiCSBAS_imdates, baseline_end):
 
 #%%
 
-# Python version of Tee used to output print functions to the terminal and a log file.  Taken from stack exchange.  
-class Tee(object):
-    def __init__(self, *files):
-        self.files = files
-    def write(self, obj):
-        for f in self.files:
-            f.write(obj)
-            f.flush() # If you want the output to be visible immediately
-    def flush(self) :
-        for f in self.files:
-            f.flush()
-
-#%%
-
 def LiCSAR_ifgs_to_s1_acquisitions(LiCSAR_ifgs):
     """ Given a list of LiCSAR ifgs, determine the Sentinel-1 acquisition dates.  
     Inputs:
@@ -94,6 +80,78 @@ def compare_two_dates(date1, date2, fmt ='%Y%m%d'):
 
 #%%
 
+def file_lock(lock_file, shared = False):
+    """ A context manager that holds a lock on a file (using fcntl, so only on unix), e.g. so that only one volcano runs LiCSBAS on a frame at once, 
+    and so that other volcanoes don't read its time series whilst it's being updated.  Blocks until the lock is available.  
+    Inputs:
+        lock_file | string | path to the lock file (created if it doesn't exist).  
+        shared | boolean | if True, a shared lock (e.g. for reading), which can be held by many processes at once, but not at the same time as an exclusive lock.  
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import contextlib
+    import fcntl
+    
+    @contextlib.contextmanager
+    def _lock():
+        with open(lock_file, 'a') as f_lock:
+            fcntl.flock(f_lock, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f_lock, fcntl.LOCK_UN)
+    return _lock()
+
+#%%
+
+def resident_load(resident, path, loader):
+    """ Return loader(path), but if resident is a dict (e.g. kept between runs by the LiCSAlert worker), only call loader again if the file has changed
+    since it was last loaded (i.e. its size or modification time are different).  
+    Inputs:
+        resident | dict or None | results that are kept in memory between runs.  If None, loader is always called.  
+        path | string | the file to be loaded.  
+        loader | function | called with path, returns the contents of the file.  
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import os
+    if resident is None:
+        return loader(path)
+    file_stat = os.stat(path)
+    file_id = (file_stat.st_size, file_stat.st_mtime_ns)
+    key = ('resident_load', os.path.abspath(path))
+    if (key in resident) and (resident[key][0] == file_id):
+        return resident[key][1]
+    contents = loader(path)
+    resident[key] = (file_id, contents)
+    return contents
+
+
+def resident_value(resident, key, inputs, function):
+    """ Return function(), but if resident is a dict (e.g. kept between runs by the LiCSAlert worker), only call function again if the contents of 
+    inputs have changed since it was last called with this key (e.g. the state of a volcano that only changes when its sources or mask change).  
+    Only the latest value of each key is kept.  
+    Inputs:
+        resident | dict or None | results that are kept in memory between runs.  If None, function is always called.  
+        key | hashable | e.g. ('volcano_state', volcano_dir)
+        inputs | list | everything that the value depends on, which are hashed (see content_hash in stage_cache.py).  
+        function | function | called with no arguments to make the value.  
+    History:
+        2026/10/18 | MEG | Written
+    """
+    from licsalert.stage_cache import content_hash
+    if resident is None:
+        return function()
+    inputs_hash = content_hash(*inputs)
+    key = ('resident_value', key)
+    if (key in resident) and (resident[key][0] == inputs_hash):
+        return resident[key][1]
+    value = function()
+    resident[key] = (inputs_hash, value)
+    return value
+
+#%%
+
 def create_folder(folder):
     """ Try to create a folder to save function outputs.  If folder already exists,
     funtion will try to delete it and its contents.  
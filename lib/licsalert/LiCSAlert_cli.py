@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The licsalert command, with seven subcommands:
+    licsalert batch data.pkl --n_baseline_end 35 --out_folder 01_Sierra_Negra ...      # batch mode, on a pickle in the format of the Sierra Negra example
+    licsalert monitor volcano_1 volcano_2 --LiCSBAS_bin ... --LiCSAR_frames_dir ...     # monitoring mode (or sent to a LiCSAlert worker with --socket)
+    licsalert status --LiCSAlert_volcs_dir ... --LiCSAR_frames_dir ...                  # a table of the state of each volcano
+    licsalert replay volcano_1 volcano_2 --LiCSAlert_volcs_dir ... --out_dir ...         # what monitoring mode would have reported on each past date
+    licsalert archive data.pkl data.zip                                                 # a quantised, compressed copy of a time series (which batch can read)
+    licsalert replot volcano_1 20230105 --LiCSAlert_volcs_dir ...                       # re-make the figure of a date from the volcano's results store
+    licsalert query --LiCSAlert_volcs_dir ... --min_sigma 3 --last_days 30              # search the results stores of all the volcanoes
+
+Only the standard library is imported when the command starts, and each subcommand imports what it needs when it runs (e.g. status never imports
+numpy, matplotlib, skimage, h5py, or ICASAR).  See benchmarks/import_time_benchmark.py.
+
+@author: Matthew Gaddes
+"""
+
+#%%
+
+def read_time_series(data_file):
+    """ Read a time series from a pickle in the format used by the Sierra Negra example (the names of the ifgs, the incremental ifgs as row vectors, 
+    the mask, the cumulative baselines, the acquisition dates, and the lons and lats), or from an archive made by licsalert archive (.zip).
+    Returns:
+        displacement_r2 | dict | 
+        cumulative_baselines | r1 array | 
+        acq_dates | list of strings | 
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import pickle
+    if str(data_file).endswith('.zip'):
+        from licsalert.ifg_archive import load_ifg_archive
+        displacement_r2, acq_dates, extras = load_ifg_archive(data_file)                       # the ifgs are only read when they are needed
+        return displacement_r2, extras['cumulative_baselines'], acq_dates
+    displacement_r2 = {}
+    with open(data_file, 'rb') as f:
+        _ = pickle.load(f)                                                                  # the names of the interferograms (not needed)
+        displacement_r2["incremental"] = pickle.load(f)
+        displacement_r2["mask"] = pickle.load(f)
+        cumulative_baselines = pickle.load(f)
+        acq_dates = pickle.load(f)
+        displacement_r2['lons'] = pickle.load(f)
+        displacement_r2['lats'] = pickle.load(f)
+    return displacement_r2, cumulative_baselines, acq_dates
+
+
+def licsalert_batch(args):
+    """ Run LiCSAlert_batch_mode on a pickle of the time series, in the format used by the Sierra Negra example (the names of the ifgs, the incremental ifgs
+    as row vectors, the mask, the cumulative baselines, the acquisition dates, and the lons and lats), or on an archive made by licsalert archive.
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Also read archives (.zip)
+    """
+    import json
+    from licsalert.LiCSAlert_functions import LiCSAlert_batch_mode
+
+    displacement_r2, cumulative_baselines, acq_dates = read_time_series(args.data_file)
+
+    if args.ICASAR_settings is not None:
+        with open(args.ICASAR_settings, 'r') as f:
+            ICASAR_settings = json.load(f)
+        for key, value in ICASAR_settings.items():                                          # json has no tuples, but ICASAR expects them
+            if isinstance(value, list):
+                ICASAR_settings[key] = tuple(value)
+    else:
+        ICASAR_settings = {}
+
+    LiCSAlert_batch_mode(displacement_r2, cumulative_baselines, acq_dates, args.n_baseline_end, args.out_folder, ICASAR_settings,
+                         run_ICASAR = args.run_ICASAR, ICASAR_path = args.ICASAR_path, intermediate_figures = args.intermediate_figures,
+                         downsample_run = args.downsample_run, downsample_plot = args.downsample_plot, dtype = args.dtype,
+                         figures = not args.no_figures, alert_sigma = args.alert_sigma, cache_dir = args.cache_dir,
+                         n_processes = args.n_processes, residual_maps = args.residual_maps, max_memory_MB = args.max_memory_MB, 
+                         max_time_s = args.max_time_s, cost_model = args.cost_model)
+
+
+def licsalert_monitor(args):
+    """ Run monitoring mode for some volcanoes, either in this process, or by sending them to a LiCSAlert worker (if --socket is set).
+    Returns:
+        exit code | int | 1 if any of the volcanoes failed.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import json
+
+    if args.socket is not None:
+        from licsalert.LiCSAlert_worker import LiCSAlert_worker_request
+        failed = False
+        for volcano in args.volcanoes:
+            reply = LiCSAlert_worker_request(args.socket, {'command' : 'run', 'volcano' : volcano, 'figures' : not args.no_figures,
+                                                           'alert_sigma' : args.alert_sigma})
+            print(json.dumps(reply))
+            failed = failed or (reply['status'] != 'ok')
+        return 1 if failed else 0
+    else:
+        from licsalert.LiCSAlert_monitoring_functions import LiCSAlert_monitoring_mode, LiCSBAS_for_frames, read_config_file
+        frames = []
+        for volcano in args.volcanoes:                                                       # the frames of the volcanoes that use frame level LiCSBAS
+            LiCSAR_settings, LiCSBAS_settings, _, _ = read_config_file(f"{args.LiCSAlert_volcs_dir}{volcano}/LiCSAlert_settings.txt")
+            if LiCSBAS_settings['frame_level']:
+                frames.append(LiCSAR_settings['frame'])
+        if len(set(frames)) > 1:                                                             # LiCSBAS is run for them all at once, so each volcano then finds it up to date
+            LiCSBAS_for_frames(frames, args.LiCSAR_frames_dir, args.LiCSAlert_volcs_dir, args.LiCSBAS_bin, n_para = args.n_para, 
+                               max_concurrent = args.max_concurrent_frames)
+        for volcano in args.volcanoes:
+            LiCSAlert_monitoring_mode(volcano, args.LiCSBAS_bin, args.LiCSAlert_bin, args.ICASAR_bin, args.LiCSAR_frames_dir, args.LiCSAlert_volcs_dir,
+                                      n_para = args.n_para, prometheus_dir = args.prometheus_dir, figures = not args.no_figures, alert_sigma = args.alert_sigma)
+        return 0
+
+
+def licsalert_status(args):
+    """ Print a table of the state of each volcano (see LiCSAlert_volcano_summary), or the same as json.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import os
+    import json
+    from licsalert.LiCSAlert_monitoring_functions import LiCSAlert_volcano_summary
+
+    if len(args.volcanoes) > 0:
+        volcanoes = args.volcanoes
+    else:
+        volcanoes = sorted([f.name for f in os.scandir(args.LiCSAlert_volcs_dir)
+                            if f.is_dir() and os.path.exists(f"{f.path}/LiCSAlert_settings.txt")])
+
+    summaries = {}
+    for volcano in volcanoes:
+        try:
+            summaries[volcano] = LiCSAlert_volcano_summary(f"{args.LiCSAlert_volcs_dir}{volcano}/", args.LiCSAR_frames_dir)
+        except Exception as e:
+            summaries[volcano] = {'error' : f"{type(e).__name__}: {e}"}
+
+    if args.json:
+        print(json.dumps(summaries, indent = 1))
+        return 0
+
+    print(f"{'volcano':<25}{'frame':<20}{'LiCSAR last':<13}{'LiCSAlert last':<16}{'pending':<9}{'ICASAR':<8}{'alert':<6}")
+    for volcano, summary in summaries.items():
+        if 'error' in summary:
+            print(f"{volcano:<25}{summary['error']}")
+        else:
+            print(f"{volcano:<25}{summary['frame']:<20}{str(summary['LiCSAR_last_acq']):<13}{str(summary['LiCSAlert_last_date']):<16}"
+                  f"{summary['n_pending']:<9}{str(summary['ICASAR']):<8}{str(summary['alert']):<6}")
+    return 0
+
+
+def licsalert_replay(args):
+    """ Replay monitoring mode over the existing time series of some volcanoes (see LiCSAlert_replay.py).
+    Returns:
+        exit code | int | 1 if any of the volcanoes failed.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    from licsalert.LiCSAlert_replay import replay_volcanoes
+    summaries = replay_volcanoes(args.volcanoes, args.LiCSAlert_volcs_dir, args.out_dir, n_processes = args.n_processes, alert_sigma = args.alert_sigma,
+                                 end_date = args.end_date, save_dates = not args.summary_only, mask_per_date = args.mask_per_date)
+    return 1 if any([isinstance(summary, dict) for summary in summaries.values()]) else 0
+
+
+def licsalert_archive(args):
+    """ Save a time series (a pickle in the format of the Sierra Negra example) as a quantised, compressed archive (see ifg_archive.py).
+    History:
+        2026/10/18 | MEG | Written
+    """
+    from licsalert.ifg_archive import save_ifg_archive
+    displacement_r2, cumulative_baselines, acq_dates = read_time_series(args.data_file)
+    save_ifg_archive(args.archive_file, displacement_r2, acq_dates, extras = {'cumulative_baselines' : cumulative_baselines}, codec = args.codec)
+    return 0
+
+
+def licsalert_replot(args):
+    """ Re-make the LiCSAlert figures of some dates of a volcano from its results store (see results_store.py), without processing the ifgs again.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import matplotlib
+    matplotlib.use('Agg')                                                                  # the figures are only saved
+    from licsalert.results_store import replot_date, store_dates
+    store_dir = f"{args.LiCSAlert_volcs_dir}{args.volcano}/LiCSAlert_results"
+    dates = store_dates(store_dir) if args.dates == ['all'] else args.dates
+    for date in dates:
+        out_folder = args.out_folder if args.out_folder is not None else f"{args.LiCSAlert_volcs_dir}{args.volcano}/{date}"
+        replot_date(store_dir, date, out_folder = out_folder)
+        print(f"Re-made the figure of {date} in {out_folder}")
+    return 0
+
+
+def licsalert_query(args):
+    """ Print the dates of all the volcanoes that match a query of their results stores (e.g. more than 3 sigma in the last 30 days).
+    Returns:
+        exit code | int | 1 if the results store of any volcano couldn't be read, otherwise 0 (whether or not any dates matched).
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import json
+    from licsalert.results_store import query_results
+    rows = query_results(args.LiCSAlert_volcs_dir, min_sigma = args.min_sigma, last_days = args.last_days, end_date = args.end_date,
+                         latest_only = args.latest)
+    if args.json:
+        print(json.dumps(rows, indent = 1))
+    else:
+        print(f"{'volcano':<25}{'date':<10}{'alert':<7}{'max_sigma':<11}{'tc':<10}{'resolution':<10}")
+        for row in rows:
+            if 'error' in row:
+                print(f"{row['volcano']:<25}{row['error']}")
+            else:
+                print(f"{row['volcano']:<25}{row['date']:<10}{str(row['alert']):<7}{row['max_distance']:<11.2f}{row['max_distance_tc']:<10}{row['resolution']:<10}")
+    return 1 if any(['error' in row for row in rows]) else 0
+
+
+#%%
+
+monitor_path_args = ['LiCSBAS_bin', 'LiCSAlert_bin', 'ICASAR_bin', 'LiCSAR_frames_dir', 'LiCSAlert_volcs_dir']
+
+
+def downsample_factor(value):
+    """ The type of --downsample_run and --downsample_plot, which are either a float or 'auto'.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import argparse
+    if value == 'auto':
+        return value
+    try:
+        return float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"must be a float or auto, but is {value}")
+
+
+def build_parser():
+    """ The parser of the licsalert command, with a subparser for each subcommand.
+    History:
+        2026/10/18 | MEG | Written, from main
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(prog = 'licsalert', description = 'LiCSAlert: detect new deformation in time series of interferograms.  ')
+    subparsers = parser.add_subparsers(dest = 'subcommand', required = True)
+
+    batch = subparsers.add_parser('batch', help = 'run batch mode on a pickle of a time series')
+    batch.add_argument('data_file', help = '.pkl file, in the format of the Sierra Negra example, or an archive (.zip) made by licsalert archive')
+    batch.add_argument('--n_baseline_end', type = int, required = True, help = 'number of ifgs in the baseline stage')
+    batch.add_argument('--out_folder', required = True, help = 'outputs are saved in LiCSAlert_<out_folder>')
+    batch.add_argument('--run_ICASAR', action = 'store_true', help = 'run ICASAR (otherwise the results of a previous run are loaded)')
+    batch.add_argument('--ICASAR_path', default = None, help = 'location of ICASAR, if it is not installed')
+    batch.add_argument('--ICASAR_settings', default = None, help = '.json file of the ICASAR settings')
+    batch.add_argument('--intermediate_figures', action = 'store_true')
+    batch.add_argument('--downsample_run', type = downsample_factor, default = 1.0, help = "a float, or auto to choose it from --max_memory_MB and --max_time_s")
+    batch.add_argument('--downsample_plot', type = downsample_factor, default = 0.5, help = "a float, or auto")
+    batch.add_argument('--max_memory_MB', type = float, default = None, help = 'budget that the pre-flight check chooses any auto settings to fit')
+    batch.add_argument('--max_time_s', type = float, default = None, help = 'budget that the pre-flight check chooses any auto settings to fit')
+    batch.add_argument('--cost_model', default = None, help = '.json of the benchmark results (or a calibrated cost model) that the pre-flight check uses')
+    batch.add_argument('--dtype', default = 'float64', choices = ['float64', 'float32'])
+    batch.add_argument('--cache_dir', default = None, help = 'cache the results of each stage in this folder')
+    batch.add_argument('--n_processes', type = int, default = 1, help = 'number of processes the intermediate figures are made on')
+    batch.add_argument('--residual_maps', action = 'store_true', help = 'make and save the maps of the residual (of the last date)')
+
+    monitor = subparsers.add_parser('monitor', help = 'run monitoring mode for some volcanoes')
+    monitor.add_argument('volcanoes', nargs = '+')
+    monitor.add_argument('--socket', default = None, help = 'send the volcanoes to a LiCSAlert worker listening on this socket (see LiCSAlert_worker.py)')
+    for path_arg in monitor_path_args:                                                      # only needed if there's no --socket (the worker has its own)
+        monitor.add_argument(f'--{path_arg}', default = None, help = 'required unless --socket is used')
+    monitor.add_argument('--n_para', type = int, default = 1)
+    monitor.add_argument('--max_concurrent_frames', type = int, default = 2, help = 'number of LiCSAR frames that frame level LiCSBAS is run on at once')
+    monitor.add_argument('--prometheus_dir', default = None)
+
+    for subparser in [batch, monitor]:
+        subparser.add_argument('--no_figures', action = 'store_true', help = 'run headless, and only save the results')
+        subparser.add_argument('--alert_sigma', type = float, default = 3.)
+
+    status = subparsers.add_parser('status', help = 'print the state of each volcano')
+    status.add_argument('--volcanoes', nargs = '+', default = [], help = 'default: all the volcanoes in LiCSAlert_volcs_dir')
+    status.add_argument('--LiCSAlert_volcs_dir', required = True)
+    status.add_argument('--LiCSAR_frames_dir', required = True)
+    status.add_argument('--json', action = 'store_true')
+
+    replay = subparsers.add_parser('replay', help = 'replay monitoring mode over the existing time series of some volcanoes')
+    replay.add_argument('volcanoes', nargs = '+')
+    replay.add_argument('--LiCSAlert_volcs_dir', required = True)
+    replay.add_argument('--out_dir', required = True)
+    replay.add_argument('--n_processes', type = int, default = 1, help = 'number of volcanoes replayed at once')
+    replay.add_argument('--alert_sigma', type = float, default = 3.)
+    replay.add_argument('--end_date', default = None, help = 'YYYYMMDD')
+    replay.add_argument('--summary_only', action = 'store_true', help = "don't save the results of each date")
+    replay.add_argument('--mask_per_date', action = 'store_true', help = 'mask each date with only the pixels that were nan up to it')
+
+    archive = subparsers.add_parser('archive', help = 'save a time series as a quantised, compressed archive')
+    archive.add_argument('data_file', help = '.pkl file, in the format of the Sierra Negra example')
+    archive.add_argument('archive_file', help = '.zip file to make')
+    archive.add_argument('--codec', default = 'auto', choices = ['auto', 'blosc', 'deflate'], help = 'blosc needs numcodecs (auto uses it if it is installed)')
+
+    replot = subparsers.add_parser('replot', help = "re-make a volcano's figures from its results store")
+    replot.add_argument('volcano')
+    replot.add_argument('dates', nargs = '+', help = "YYYYMMDD, or all")
+    replot.add_argument('--LiCSAlert_volcs_dir', required = True)
+    replot.add_argument('--out_folder', default = None, help = "default: the folder of each date")
+
+    query = subparsers.add_parser('query', help = "search the results stores of all the volcanoes")
+    query.add_argument('--LiCSAlert_volcs_dir', required = True)
+    query.add_argument('--min_sigma', type = float, default = None, help = 'only dates with a time course at least this many sigmas from its line')
+    query.add_argument('--last_days', type = int, default = None)
+    query.add_argument('--end_date', default = None, help = 'YYYYMMDD (default today)')
+    query.add_argument('--latest', action = 'store_true', help = 'only the latest date of each volcano')
+    query.add_argument('--json', action = 'store_true')
+    return parser
+
+
+def parse_args(argv = None):
+    """ Parse the arguments of the licsalert command, check that monitor has the paths it needs, and add trailing / to the folders.
+    History:
+        2026/10/18 | MEG | Written, from main
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if (args.subcommand == 'monitor') and (args.socket is None):
+        missing = [f'--{path_arg}' for path_arg in monitor_path_args if getattr(args, path_arg) is None]
+        if len(missing) > 0:
+            parser.error(f"monitor needs {', '.join(missing)} when --socket isn't used")
+    for path_arg in ['LiCSAlert_volcs_dir', 'LiCSAR_frames_dir']:                           # the functions expect trailing /
+        path = getattr(args, path_arg, None)
+        if (path is not None) and (not path.endswith('/')):
+            setattr(args, path_arg, f"{path}/")
+    return args
+
+
+def main(argv = None):
+    """ Entry point of the licsalert command.
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Split the parser into build_parser and parse_args.  
+    """
+    args = parse_args(argv)
+    if args.subcommand == 'batch':
+        return licsalert_batch(args)
+    elif args.subcommand == 'monitor':
+        return licsalert_monitor(args)
+    elif args.subcommand == 'status':
+        return licsalert_status(args)
+    elif args.subcommand == 'replay':
+        return licsalert_replay(args)
+    elif args.subcommand == 'archive':
+        return licsalert_archive(args)
+    elif args.subcommand == 'replot':
+        return licsalert_replot(args)
+    elif args.subcommand == 'query':
+        return licsalert_query(args)
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
@@ -0,0 +1,1468 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Jun 29 14:09:28 2020
+
+@author: matthew
+"""
+
+
+
+#%%
+
+
+
+def LiCSAlert_monitoring_mode(volcano, LiCSBAS_bin, LiCSAlert_bin, ICASAR_bin, LiCSAR_frames_dir, LiCSAlert_volcs_dir, n_para=1, prometheus_dir=None, figures=True, alert_sigma=3.,
+                              resident=None):
+    """
+       
+    Inputs:
+        LiCSBAS_bin | string | Path to folder containing LiCSBAS functions.  
+        LiCSAlert_bin | string | Path to the folder containing the licsalert package (i.e. lib/).  
+        ICASAR_bin | string | Path to folder containing ICASAR functions.  
+        LiCSAR_frames_dir | string | path to the folder containing LiCSAR frames.  Needs trailing /
+        LiCSAlert_volcs_dir | string | path to the folder containing each volcano.  Needs trailing /
+        n_para | int | Sets number of parallel processes used by LiCSBAS.  
+        prometheus_dir | string or None | If not None, the time taken by each stage is also saved to this folder in the Prometheus text format (e.g. for a node exporter).  
+        figures | boolean | If False, LiCSAlert runs headless: no figures are made (other than by ICASAR when it is first run), and only the results (LiCSAlert_results.json and .csv) are saved for each date.  
+        alert_sigma | float | the number of sigmas from the lines of best fit that a time course (or the residual) has to be to set the alert flag in the results.  
+        resident | dict or None | If a dict, the config file and the ICASAR results are kept in it (and only re-read if the files change), and so is the state 
+                                  that only depends on them and the mask of the ifgs (see volcano_state), so that a long running process (see LiCSAlert_worker.py)
+                                  doesn't load or make them for every run.  
+    Returns:
+        Directory stucture.  The time and memory used by each stage are saved to run_profile.json in the folder of the run, and of each date.  
+        
+    History:
+        2020/06/29 | MEG | Written as a script
+        2020/07/03 | MEG | Convert to a funtcion
+        2020/11/11 | RR | Add n_para argument
+        2020/11/16 | MEG | Pass day0_data info to LiCSAlert figure so that x axis is not in terms of days and is instead in terms of dates.  
+        2026/10/18 | MEG | Record masks in a single per-volcano mask history store (mask_history/)
+        2026/10/18 | MEG | Import the masks from the mask_history.pkl files of dates processed before the mask history store was used.  
+        2026/10/18 | MEG | Add the (optional) dtype setting to the LiCSAlert section of the config file.  
+        2026/10/18 | MEG | Record the time and memory used by each stage (run_profile.json)
+        2026/10/18 | MEG | Save the results as .json and .csv for each date, and add a headless mode (figures = False)
+        2026/10/18 | MEG | Add the (optional) cascade_fraction setting, and use the interferograms with the combined mask for each date.  
+        2026/10/18 | MEG | Use the (downsampled) geotransform of the ifgs for the lons and lats given to ICASAR, rather than meshgrids.  
+        2026/10/18 | MEG | Skip LiCSBAS if the LiCSAR ifgs haven't changed, and always open the LiCSBAS time series (even if LiCSBAS wasn't run).  
+        2026/10/18 | MEG | Add the (optional) frame_level setting, to share one LiCSBAS run between the volcanoes in a frame.  
+        2026/10/18 | MEG | Hold one shared lock on a frame's time series from finding the volcano's region in it until it has been read.  
+        2026/10/18 | MEG | Add the (optional) cache_size setting, to cache the results of each stage in the volcano's stage_cache folder.  
+        2026/10/18 | MEG | Add the resident argument, used by the LiCSAlert worker to keep the config and the ICASAR results in memory between runs.  
+        2026/10/18 | MEG | Keep the sources with the combined mask (and the sketch, projector etc.) in resident between runs.  
+        2026/10/18 | MEG | Only import ICASAR if it is run.  
+        2026/10/18 | MEG | Log with a RunLogger (run_logging.py) rather than replacing sys.stdout with a Tee, so that volcanoes can be run at the same time in one process.  
+        2026/10/18 | MEG | Check the settings before LiCSBAS is run, and add the (optional) max_memory_MB and max_time_s settings (see preflight.py).  
+        2026/10/18 | MEG | Also save the results of each date in the volcano's results store (the LiCSAlert_results folder), so the figures can be re-made.  
+        2026/10/18 | MEG | Add the (optional) residual_maps setting, and save the maps of the residual of the latest date (in the volcano's LiCSAlert_residual_maps folder).  
+                
+     """
+    # 0 Imports etc.:        
+
+    import sys
+    import os
+    import pickle
+    import shutil
+    import copy
+    
+    from licsalert.LiCSAlert_functions import LiCSBAS_for_LiCSAlert, LiCSBAS_to_LiCSAlert, LiCSAlert_preprocessing_run, LiCSAlert_preprocessing_plot, LiCSAlert, LiCSAlert_figure, shorten_LiCSAlert_data, save_LiCSAlert_results
+    from licsalert.LiCSAlert_functions import LiCSAlert_cascade
+    from licsalert.LiCSAlert_aux_functions import get_baseline_end_ifg_n, resident_load, resident_value
+    from licsalert.run_logging import log_run
+    from licsalert.downsample_ifgs import downsample_ifgs
+    from licsalert.LiCSAlert_profiling import RunProfile
+    from licsalert.stage_cache import StageCache, cached_stage, cached_files_stage, row_hashes
+    from licsalert.lazy_ifgs import is_lazy
+    from licsalert.preflight import validate_settings, autotune_settings, print_cost_estimate, cum_h5_size, load_cost_model
+    from licsalert.results_store import add_plot_data, add_date
+    from licsalert.residual_maps import save_latest_residual_maps
+        
+    # 0: begin
+    volcano_dir = f"{LiCSAlert_volcs_dir}{volcano}/"
+    LiCSBAS_dir = f"{volcano_dir}LiCSBAS/"
+    profile = RunProfile(volcano, labels = {'volcano' : volcano})                                                                                          # records the time and memory used by each stage
+    LiCSAR_settings, LiCSBAS_settings, LiCSAlert_settings, ICASAR_settings = copy.deepcopy(resident_load(resident, f"{volcano_dir}LiCSAlert_settings.txt",   # read various settings from the volcanoes config file
+                                                                                                         read_config_file))                                   # (copied, as LiCSAlert_settings is changed during the run)
+    if LiCSAlert_settings['cache_size'] is not None:
+        cache = StageCache(f"{volcano_dir}stage_cache/", LiCSAlert_settings['cache_size'])                                                                   # results of stages whose inputs haven't changed are loaded from here
+    else:
+        cache = None
+                                                                                                                                                           # LiCSAR_settings: frame | LiCSBAS_settings: lon_lat | ICSAR_settings: n_comp, bootstrapping_param, hdbscan_param, tsne_param, ica_param
+    # 1: Determine the status of LiCSAlert, and update the user.      
+    with profile.span('LiCSAlert_status'):
+        LiCSAlert_status = run_LiCSAlert_status(f"{LiCSAR_frames_dir}{LiCSAR_settings['frame']}/GEOC/", volcano_dir, LiCSAlert_settings['baseline_end'],       # Determine the status for LiCSAlert for this volcano
+                                                f"{volcano_dir}LiCSAlert_history.txt", lon_lat = LiCSBAS_settings['lon_lat'], figures = figures)             # note that this logs by appending to a file in the volcano's directory.  
+    
+        
+    if (len(LiCSAlert_status['pending']) == 0) and (len(LiCSAlert_status['processed_with_errors']) == 0):                                                  # work through the four possible outcomes of LiCSAlert status
+        print(f"There are no new LiCSAR dates and no LiCSAlert dates with errors (missing products), so nothing will be done.  ")
+    elif (len(LiCSAlert_status['pending']) == 0) and (len(LiCSAlert_status['processed_with_errors']) != 0):
+        print(f"There are no new LiCSAR dates and there are some LiCSAlert dates with errors (missing products), so LiCSBAS and LiCSAlert will be run.  ")
+    elif (len(LiCSAlert_status['pending']) != 0) and (len(LiCSAlert_status['processed_with_errors']) == 0):
+        print(f"There are new LiCSAR dates and no LiCSAlert dates with errors (missing products), so LiCSBAS and LiCSAlert will be run.  ")
+    elif (len(LiCSAlert_status['pending']) != 0) and (len(LiCSAlert_status['processed_with_errors']) != 0):
+        print(f"There are new LiCSAR dates and LiCSAlert dates with errors (missing products), so LiCSBAS and LiCSAlert will be run.  ")
+    else:
+        print(f"'LiCSAlert_status' has not returned the expected information about the 'pending' and 'processed_with_errors' dates, but continuing anyway. ")
+    
+    if LiCSAlert_status['run_LiCSAlert']:
+        if not os.path.exists(f"{volcano_dir}{LiCSAlert_status['LiCSAR_last_acq']}"):
+            os.mkdir(f"{volcano_dir}{LiCSAlert_status['LiCSAR_last_acq']}")                                                                       
+        with log_run(f"{volcano_dir}{LiCSAlert_status['LiCSAR_last_acq']}/LiCSAlert_log.txt", mode = 'w', labels = {'volcano' : volcano}):                       # anything printed in this context also goes to the log file (even if other volcanoes are being run at the same time)
+            validate_settings(acq_dates = LiCSAlert_status['LiCSAR_dates'], baseline_end = LiCSAlert_settings['baseline_end'],                                    # fail before LiCSBAS is run if the settings are invalid
+                              downsample_run = LiCSAlert_settings['downsample_run'], downsample_plot = LiCSAlert_settings['downsample_plot'], 
+                              dtype = LiCSAlert_settings['dtype'], alert_sigma = alert_sigma, cascade_fraction = LiCSAlert_settings['cascade_fraction'], 
+                              sketch_size = LiCSAlert_settings['sketch_size'], sketch_method = LiCSAlert_settings['sketch_method'], 
+                              memory_budget = LiCSAlert_settings['memory_budget'], n_threads = LiCSAlert_settings['n_threads'])
+        
+            # 2: if required, run LiCSBAS
+            if LiCSBAS_settings['frame_level']:                                                                                                            # LiCSBAS is shared by the volcanoes in the frame
+                with profile.span('LiCSBAS'):
+                    cum_file, cum_lock_file = LiCSBAS_for_frame(LiCSAR_settings['frame'], LiCSAR_frames_dir, LiCSAlert_volcs_dir,                                # only run if the frame's ifgs have changed
+                                                                f"{volcano_dir}{LiCSAlert_status['LiCSAR_last_acq']}/", LiCSBAS_bin, n_para=n_para, profile=profile)
+            else:
+                if LiCSAlert_status['run_LiCSBAS']:
+                    try:
+                        os.mkdir(LiCSBAS_dir)                                                                                                                  # if it's the first run, a folder will be needed for LiCSBAS
+                    except:
+                        pass                                                                                                                                   # assume if we can't make it, the folder already exists from a previous run.  
+                    print(f"Running LiCSBAS.  See 'LiCSBAS_log.txt' for the status of this.  ")
+                    with profile.span('LiCSBAS'):
+                        LiCSBAS_for_LiCSAlert(LiCSAR_settings['frame'], LiCSAR_frames_dir, LiCSBAS_dir, f"{volcano_dir}{LiCSAlert_status['LiCSAR_last_acq']}/",                        # run LiCSBAS to either create or extend the time series data.  
+                                              LiCSBAS_bin, LiCSBAS_settings['lon_lat'], n_para=n_para, profile=profile)                                        # Logfile is sent to the directory for the current date
+                    GEOC_manifest_write(LiCSAlert_status['GEOC_manifest'], LiCSBAS_dir)                                                                              # so LiCSBAS isn't rerun until the LiCSAR ifgs change
+                cum_file = f"{LiCSBAS_dir}TS_GEOCmldir/cum.h5"
+                cum_lock_file = None
+        
+            # 2a: Hold a shared lock on the frame's time series (if there is one) until it has been read, so that the volcano's region in it and what is read are
+            #     from the same run of LiCSBAS (another volcano in the frame can't update it in between).  
+            with frame_time_series_lock(cum_file, cum_lock_file, LiCSBAS_settings['lon_lat']) as crop_pixels:
+                # 2b: If there's a budget, choose the settings that fit it from the size of the time series (without reading it all).  
+                if ((LiCSAlert_settings['max_memory_MB'] is not None) or (LiCSAlert_settings['max_time_s'] is not None) or 
+                    ('auto' in [LiCSAlert_settings['downsample_run'], LiCSAlert_settings['downsample_plot']])):
+                    n_pixels, n_ifgs, imdates = cum_h5_size(cum_file, crop_pixels)
+                    n_runs = len(LiCSAlert_status['pending']) + len(LiCSAlert_status['processed_with_errors'])                                             # LiCSAlert is run (and a figure made) for each of these dates
+                    settings = autotune_settings(n_pixels, n_ifgs, get_baseline_end_ifg_n(imdates, LiCSAlert_settings['baseline_end']) + 1, 
+                                                 LiCSAlert_settings['max_memory_MB'], LiCSAlert_settings['max_time_s'], LiCSAlert_settings['downsample_run'], 
+                                                 LiCSAlert_settings['downsample_plot'], figures = figures, dtype = LiCSAlert_settings['dtype'], 
+                                                 memory_budget = LiCSAlert_settings['memory_budget'], n_runs = max(n_runs, 1), 
+                                                 model = load_cost_model(LiCSAlert_settings['cost_model']))
+                    for setting in ['downsample_run', 'downsample_plot', 'memory_budget']:
+                        LiCSAlert_settings[setting] = settings[setting]
+                    print(f"Pre-flight: downsample_run = {settings['downsample_run']}, downsample_plot = {settings['downsample_plot']}, "
+                          f"memory_budget = {settings['memory_budget']}, which are estimated to need: ")
+                    print_cost_estimate(settings['estimate'])
+        
+                # 2c: Open the LiCSBAS time series (either just made, or from the last run if the LiCSAR ifgs haven't changed)
+                with profile.span('LiCSBAS_to_LiCSAlert'):
+                    displacement_r2, temporal_baselines, geocode_info = LiCSBAS_to_LiCSAlert(cum_file, figures=False, crop_pixels = crop_pixels,                        # open the h5 file produced by LiCSBAS
+                                                                                             dtype = LiCSAlert_settings['dtype'])
+                    displacement_r2['geotransform'] = geocode_info                                                                                              # so that it's downsampled with the ifgs
+                    profile.record_arrays(incremental = displacement_r2['incremental'], mask = displacement_r2['mask'])
+        
+            with profile.span('preprocessing'):
+                cache_preprocessing = None if is_lazy(displacement_r2['incremental']) else cache                                                              # as per LiCSAlert_batch_mode, ifgs that aren't in memory are only cached by the later stages
+                displacement_r2 = cached_stage(cache_preprocessing, 'preprocessing_run',                                                                       # mean centre, and crate downsampled versions (either for general use to make things faster), 
+                                               lambda: LiCSAlert_preprocessing_run(dict(displacement_r2), LiCSAlert_settings['downsample_run'], LiCSAlert_settings['dtype']),
+                                               [displacement_r2, LiCSAlert_settings['downsample_run'], LiCSAlert_settings['dtype']])
+                displacement_r2 = cached_stage(cache_preprocessing, 'preprocessing_plot',                                                                      # or just for plotting (to make LiCSAlert figures faster)                         
+                                               lambda: LiCSAlert_preprocessing_plot(dict(displacement_r2), LiCSAlert_settings['downsample_plot'], LiCSAlert_settings['dtype']),
+                                               [displacement_r2['incremental'], displacement_r2['mask'], LiCSAlert_settings['downsample_plot'], LiCSAlert_settings['dtype']])
+                profile.record_arrays(incremental = displacement_r2['incremental'], incremental_downsampled = displacement_r2['incremental_downsampled'])
+            # Check that the baseline_end date is not before the first image date:
+            if int(LiCSAlert_settings['baseline_end']) < int(temporal_baselines['imdates'][0]):
+                raise Exception(f"baseline_end date ({LiCSAlert_settings['baseline_end']}) is before first image data ({temporal_baselines['imdates'][0]}) ... Exiting")
+
+    
+            # 3: If required, run ICASAR
+            if LiCSAlert_status['run_ICASAR']:
+                print(f"Running ICASAR... ", end = '')                                       # or if not, run it
+                with profile.span('ICASAR'):
+                    LiCSAlert_settings['baseline_end_ifg_n'] = get_baseline_end_ifg_n(temporal_baselines['imdates'], LiCSAlert_settings['baseline_end'])            # if this is e.g. 14, the 14th ifg would not be in the baseline stage
+                    def run_ICASAR_baseline():
+                        if ICASAR_bin not in sys.path:                                               # check if already on path
+                            sys.path.append(ICASAR_bin)                                              # and if not, add
+                        from ICASAR_functions import ICASAR                                          # only imported when it's needed (and not if the results are in the cache), as it's slow
+                        spatial_ICASAR_data = {'mixtures_r2' : displacement_r2['incremental'][:(LiCSAlert_settings['baseline_end_ifg_n']+1),],                              # only take up to the last 
+                                               'mask'        : displacement_r2['mask']}
+                        sources, tcs, residual, Iq, n_clusters, S_all_info, r2_ifg_means  = ICASAR(spatial_data = spatial_ICASAR_data, 
+                                                                                                   out_folder = f"{volcano_dir}ICASAR_results/", **ICASAR_settings,
+                                                                                                   ica_verbose = 'short', figures = 'png',
+                                                                                                   lons = displacement_r2['geotransform'].lons, lats = displacement_r2['geotransform'].lats[::-1])            # ICASAR wants rank 1 arrays for lon and lats of each pixels, and not meshgrids.  ALso, it wants it from the bottom left, and I think LiCSBAS wants it from the top left.  Hence, reverse the order of the lats.  
+                        return sources, tcs, residual, Iq, n_clusters
+                
+                    ICASAR_inputs = None if cache is None else [displacement_r2['incremental'][:(LiCSAlert_settings['baseline_end_ifg_n']+1),], displacement_r2['mask'], 
+                                                                displacement_r2['geotransform'], ICASAR_settings]
+                    sources, tcs, residual, Iq, n_clusters = cached_stage(cache, 'ICASAR', run_ICASAR_baseline, ICASAR_inputs)
+                    mask_sources = displacement_r2['mask']                                                                                                          # rename a copy of the mask
+                    if cache is not None:                                                                                                                           # if loaded from the cache, ICASAR didn't make ICASAR_results.pkl, so make it for the next run
+                        os.makedirs(f"{volcano_dir}ICASAR_results", exist_ok = True)
+                        with open(f"{volcano_dir}ICASAR_results/ICASAR_results.pkl", 'wb') as f:
+                            for ICASAR_product in [sources, mask_sources, tcs, residual, Iq, n_clusters]:                                                            # as read by load_ICASAR_results
+                                pickle.dump(ICASAR_product, f)
+                    profile.record_arrays(sources = sources)
+                print('Done! ')
+            else:
+                with profile.span('ICASAR_load'):
+                    sources, mask_sources, tcs, source_residuals, Iq_sorted, n_clusters = resident_load(resident, f"{volcano_dir}ICASAR_results/ICASAR_results.pkl", 
+                                                                                                        load_ICASAR_results)
+                LiCSAlert_settings['baseline_end_ifg_n'] = get_baseline_end_ifg_n(temporal_baselines['imdates'], LiCSAlert_settings['baseline_end'])            # if this is e.g. 14, the 14th ifg would not be in the baseline stage
+    
+            # 5: Deal with changes to the mask of pixels.  What only depends on the sources and the masks (the sources with the combined mask, the sketch, etc.) 
+            #    is kept by the LiCSAlert worker between runs, and is only made again if the sources or the mask of the ifgs change.  
+            with profile.span('update_mask_sources_ifgs'):
+                state = resident_value(resident, ('volcano_state', volcano_dir), [sources, mask_sources, displacement_r2['mask'], 
+                                                                                  {key : LiCSAlert_settings[key] for key in ['downsample_plot', 'dtype', 'sketch_size', 
+                                                                                                                             'sketch_method', 'cascade_fraction', 'residual_maps']}],
+                                       lambda: volcano_state(sources, mask_sources, displacement_r2['mask'], LiCSAlert_settings))
+                mask_combined, sources_mask_combined = state['mask_combined'], state['sources_mask_combined']
+                sketch, sources_downsampled_combined, map_pixels = state['sketch'], state['sources_downsampled_combined'], state['map_pixels']
+                def combine_masks():
+                    displacement_r2_combined = {'incremental' : apply_combined_mask(displacement_r2['incremental'], displacement_r2['mask'], mask_combined),                # a new dictionary to save the interferograms sampled to the combined mask in 
+                                                'mask'        : mask_combined}
+                    displacement_r2_combined["incremental_downsampled"], displacement_r2_combined["mask_downsampled"] = downsample_ifgs(displacement_r2_combined["incremental"], displacement_r2_combined["mask"],
+                                                                                                                                        LiCSAlert_settings['downsample_plot'], verbose = False, dtype = LiCSAlert_settings['dtype'])
+                    return displacement_r2_combined
+                displacement_r2_combined = cached_stage(cache, 'update_mask_sources_ifgs', combine_masks, 
+                                                        [mask_combined, displacement_r2['mask'], displacement_r2['incremental'], LiCSAlert_settings['downsample_plot'], 
+                                                         LiCSAlert_settings['dtype']])
+                ifg_hashes = None if cache is None else row_hashes(displacement_r2_combined['incremental'])                                                                                # so the inputs of LiCSAlert for each date can be hashed quickly
+                profile.record_arrays(incremental_combined = displacement_r2_combined['incremental'], sources_mask_combined = sources_mask_combined)
+        
+            # note - what will happen to existing products in the processed_with_errors folders?
+        
+            # 6: Main loop to run LiCSAlert for each date that is required
+            processing_dates = copy.deepcopy(LiCSAlert_status['pending'])
+            for processed_with_error in LiCSAlert_status['processed_with_errors']:
+                if processed_with_error not in processing_dates:
+                    processing_dates.append(processed_with_error)
+            processing_dates = sorted(processing_dates)
+            mask_history_import_pkl(volcano_dir, f"{volcano_dir}mask_history/")                                   # the masks of the dates that were processed before the mask history store was used (only done once)
+            print(f"LiCSAlert will be run for the following dates: {processing_dates}")
+            for processing_date in processing_dates:
+                print(f"Running LiCSAlert for {processing_date}")
+                # Check for this date in LiCSBAS data:
+                try:
+                    ifg_n = temporal_baselines['imdates'].index(processing_date)
+                except ValueError:
+                    # If no data for this date, it was probably discarded by LiCSBAS, so move on:
+                    print(f"No LiCSBAS data for {processing_date}, was probably discarded")
+                    continue
+            
+                # 6a: Create a folder (YYYYMMDD) for the outputs.  
+                if not os.path.exists(f"{volcano_dir}{processing_date}"):                                   # True if folder exists, so enter if statement if doesn't exist (due to not)
+                    os.mkdir(f"{volcano_dir}{processing_date}")                                            # if doesn't exist, make it                           
+                else:                                                                                       # if the folder does already exist
+                    if processing_date == LiCSAlert_status['LiCSAR_last_acq']:                              # if the folder exists and was used for the log file:
+                        pass              
+                    else:
+                        print(f"The folder {processing_date} appears to exists already.  This is usually due to the date not having all the required LiCSAlert products, and LiCSAlert"
+                              f" is now trying to fill this date again.  ")
+                        shutil.rmtree(f"{volcano_dir}{processing_date}")                                        # delete the folder and all its contents
+                        os.mkdir(f"{volcano_dir}{processing_date}")                                             # and remake the folder
+                date_profile = RunProfile(f"{volcano} {processing_date}", labels = {'volcano' : volcano, 'date' : processing_date})     # the stages for just this date, saved in its folder
+                
+                # 6b: Update the mask.  
+                with date_profile.span('record_mask_changes'):
+                    record_mask_changes(mask_sources, displacement_r2['mask'], mask_combined, processing_date, f"{volcano_dir}{processing_date}/", f"{volcano_dir}mask_history/",      # record any changes in the mask (ie pixels that are now masked due to being incoherent).  
+                                        figures = figures)
+            
+            
+                # 6c: LiCSAlert stuff
+                displacement_r2_current = shorten_LiCSAlert_data(displacement_r2_combined, n_end=ifg_n+1)               # get the ifgs (with the combined mask) available for this loop (ie one more is added each time the loop progresses),  +1 as indexing and want to include this data
+                cumulative_baselines_current = temporal_baselines['baselines_cumulative'][:ifg_n+1]                     # also get current time values.  +1 as indexing and want to include this data
+            
+                with date_profile.span('LiCSAlert'):
+                    def run_LiCSAlert():
+                        if LiCSAlert_settings['cascade_fraction'] is None:
+                            return LiCSAlert(sources_mask_combined, cumulative_baselines_current,                                                                                # the LiCSAlert algoirthm, using the sources with the combined mask (sources_mask_combined)
+                                             displacement_r2_current['incremental'][:(LiCSAlert_settings['baseline_end_ifg_n']+1),],                                             # baseline ifgs
+                                             displacement_r2_current['incremental'][(LiCSAlert_settings['baseline_end_ifg_n']+1):,],                                             # monitoring ifgs
+                                             t_recalculate=10, verbose=False, dtype = LiCSAlert_settings['dtype'],                                                               # recalculate lines of best fit every 10 acquisitions
+                                             memory_budget = LiCSAlert_settings['memory_budget'], n_threads = LiCSAlert_settings['n_threads'],                                   # if a memory budget is set, work on blocks of pixels
+                                             sketch = sketch, alert_sigma = alert_sigma, residual_map_pixels = map_pixels, projector = state['projector'])
+                        else:
+                            return LiCSAlert_cascade(sources_mask_combined, sources_downsampled_combined, cumulative_baselines_current,                                          # or first at the resolution of the figures, and only at full resolution if needed
+                                                     displacement_r2_current, LiCSAlert_settings['baseline_end_ifg_n']+1, t_recalculate = 10, 
+                                                     cascade_fraction = LiCSAlert_settings['cascade_fraction'], alert_sigma = alert_sigma, n_new = 1,
+                                                     diagnostics_file = f"{volcano_dir}{processing_date}/LiCSAlert_cascade.csv", diagnostics_label = processing_date,
+                                                     verbose = False, dtype = LiCSAlert_settings['dtype'], memory_budget = LiCSAlert_settings['memory_budget'], 
+                                                     n_threads = LiCSAlert_settings['n_threads'], sketch = sketch, residual_map_pixels = map_pixels, 
+                                                     projector = state['projector'])[:2]
+                    LiCSAlert_inputs = None if cache is None else [sources_mask_combined, cumulative_baselines_current, ifg_hashes[:ifg_n+1], LiCSAlert_settings['baseline_end_ifg_n'],
+                                                                   LiCSAlert_settings['dtype'], LiCSAlert_settings['sketch_size'], LiCSAlert_settings['sketch_method'], alert_sigma,
+                                                                   LiCSAlert_settings['cascade_fraction'], LiCSAlert_settings['downsample_plot'], map_pixels]
+                    sources_tcs_baseline, residual_tcs_baseline = cached_stage(cache, 'LiCSAlert', run_LiCSAlert, LiCSAlert_inputs)
+                    date_profile.record_arrays(incremental = displacement_r2_current['incremental'])
+        
+                save_LiCSAlert_results(sources_tcs_baseline, residual_tcs_baseline, LiCSAlert_settings['baseline_end_ifg_n']+1, cumulative_baselines_current,           # the results as .json and .csv (which doesn't need matplotlib)
+                                       f"{volcano_dir}{processing_date}/LiCSAlert_results", temporal_baselines['imdates'], alert_sigma)
+                if map_pixels is not None:
+                    save_latest_residual_maps(f"{volcano_dir}LiCSAlert_residual_maps", processing_date, residual_tcs_baseline[0]['residual_maps'],        # where the residual is, for each ifg (pixel-major, see residual_maps.py).  Only the latest date's are kept.  
+                                              displacement_r2_current['mask_downsampled'])
+                with date_profile.span('results_store'):                                                                                                       # and in the volcano's store, with what's needed to re-make the figure
+                    plot_key = add_plot_data(f"{volcano_dir}LiCSAlert_results", mask_combined, displacement_r2_current['mask_downsampled'], sources_mask_combined, 
+                                             displacement_r2_current['incremental_downsampled'])
+                    add_date(f"{volcano_dir}LiCSAlert_results", processing_date, sources_tcs_baseline, residual_tcs_baseline, LiCSAlert_settings['baseline_end_ifg_n']+1, 
+                             cumulative_baselines_current, temporal_baselines['imdates'], alert_sigma, plot_key, 
+                             {'n_baseline_end' : int(LiCSAlert_settings['baseline_end_ifg_n']), 'day0_date' : temporal_baselines['imdates'][0]})
+            
+                if figures:
+                    with date_profile.span('LiCSAlert_figure'):
+                        cached_files_stage(cache, 'LiCSAlert_figure', 
+                                           lambda: LiCSAlert_figure(sources_tcs_baseline, residual_tcs_baseline, sources_mask_combined, displacement_r2_current, LiCSAlert_settings['baseline_end_ifg_n'],  # creat the LiCSAlert figure
+                                                                    cumulative_baselines_current, out_folder = f"{volcano_dir}{processing_date}", day0_date = temporal_baselines['imdates'][0]),
+                                           None if cache is None else [sources_tcs_baseline, residual_tcs_baseline, sources_mask_combined, displacement_r2_current['incremental_downsampled'], 
+                                                                       displacement_r2_current['mask_downsampled'], LiCSAlert_settings['baseline_end_ifg_n'], cumulative_baselines_current, 
+                                                                       temporal_baselines['imdates'][0]], f"{volcano_dir}{processing_date}")
+                date_profile.write_json(f"{volcano_dir}{processing_date}/run_profile.json")
+                profile.extend(date_profile, date = processing_date)
+            
+            # 7: Save the timings of each stage for the whole run.  
+            profile.write_json(f"{volcano_dir}{LiCSAlert_status['LiCSAR_last_acq']}/run_profile.json")
+            if prometheus_dir is not None:
+                profile.write_prometheus(f"{prometheus_dir}/licsalert_{volcano}.prom")
+            
+
+#%%
+
+
+      
+    # ###################################################                                                                                                                                                
+    # # Determine if new ifgs are present
+    # new_ifg_flag, LiCSAR_last_acq, s1_acquisitions = detect_new_ifgs(f"{LiCSAR_frames_dir}{LiCSAR_settings['frame']}/GEOC/", volcano_dir)       # determine the date that LiCSAR is up to date to.  
+    # if 1 == 1:
+    #     pass
+
+    # else:
+    #     if new_ifg_flag:                                                                                                                # if new interferograms have been detected, the LiCSAlert outputs can be updated
+    #         # -0: determine if this is the first run:
+    #         previous_LiCSAlert_dates = sorted([f.name for f in os.scandir(volcano_dir) if f.is_dir()])                   # get names of folders produced by LiCSAlert , and keep chronological.  
+    #         unused_folders = ['LiCSBAS', 'ICASAR_results']                                                      # these folders also exist, but aren't dates so we need to delete them.  
+    #         for unused_folder in unused_folders:
+    #             try:
+    #                 previous_LiCSAlert_dates.remove(unused_folder)                                                       # loop through trying to delete
+    #             except:
+    #                 pass                                                                                    
+    #         if len(previous_LiCSAlert_dates) == 0:                                                                       # if there are no dates, it must be the first time it's been run
+    #             initialise = True
+    #             print(f"This is the first time that LiCSAlert has been run for {volcano}.  ")
+    #         else:
+    #             initialise = False
+        
+    #         # 1: Create a folder (YYYYMMDD) for the outputs.  
+    #         try:
+    #             print(f'A new LiCSAR acquisition has been detected.  Creating a folder to contain the new LiCSAlert results ({LiCSAR_last_acq})... ', end = '')
+    #             if not os.path.exists(f"{volcano_dir}{LiCSAR_last_acq}"):
+    #                 os.mkdir(f"{volcano_dir}{LiCSAR_last_acq}")                                                                       
+    #             print('Done!')
+    #         except:
+    #             print('Failed!')
+    #             raise Exception('Unable to create folder {LiCSAR_last_acq} - perhaps it already exists?  Exiting...  ')
+              
+               
+    #         # 2: Create a log file.  
+
+            
+            
+    #         # 4: Possibly run ICASAR
+    #         if 'ICASAR_results' in [f.name for f in os.scandir(volcano_dir) if f.is_dir()]:                                                         # if an ICASAR folder already exists, simply open the saved file rather than rerunning.  
+    #             with open(f"{volcano_dir}ICASAR_results/ICASAR_results.pkl", 'rb') as f:
+    #                 sources = pickle.load(f)   
+    #                 mask_sources = pickle.load(f)
+    #                 tcs  = pickle.load(f)    
+    #                 source_residuals = pickle.load(f)    
+    #                 Iq_sorted = pickle.load(f)    
+    #                 n_clusters = pickle.load(f)    
+    #             f.close()                                                                                                                           
+    #         else:
+    #             print(f"A folder of ICASAR results has not been found so running this now... ", end = '')                                       # or if not, run it
+    #             spatial_ICASAR_data = {'mixtures_r2' : displacement_r2['incremental'],
+    #                                    'mask'        : displacement_r2['mask']}
+                
+    #             sources, tcs, residual, Iq, n_clusters, S_all_info, r2_ifg_means  = ICASAR(spatial_data = spatial_ICASAR_data, 
+    #                                                                                        out_folder = f"{volcano_dir}ICASAR_results/", **ICASAR_settings,
+    #                                                                                        ica_verbose = 'short', figures = 'png')
+    #             mask_sources = displacement_r2['mask']                                                                                                          # rename a copy of the mask
+    #             print('Done! ')
+    #         n_baseline_ifgs = tcs.shape[0]                                                                                                                                              # LiCSAlert needs to know how long the baseline stage from ICSASAR was.  
+            
+    #         # 5: Deal with changes to the mask of pixels 
+    #         displacement_r2_combined = {}                                                                                                                                               # a new dictionary to save the interferograms sampled to the combined mask in 
+    #         displacement_r2_combined['incremental'], sources_mask_combined, mask_combined = update_mask_sources_ifgs(mask_sources, sources, 
+    #                                                                                                                  displacement_r2['mask'], displacement_r2['incremental'])           # the new mask overwrites the mask in displacement_r2
+    #         displacement_r2_combined['mask'] = mask_combined                                                                                                                            # also put the combined mask in the dictionary
+    #         displacement_r2_combined["incremental_downsampled"], displacement_r2_combined["mask_downsampled"] = downsample_ifgs(displacement_r2_combined["incremental"], displacement_r2_combined["mask"],
+    #                                                                                                                             LiCSAlert_settings['downsample_plot'], verbose = False)
+    #         if initialise:
+    #             previous_output_dir = None                                                                                                                                  # there is no previous output directory
+    #         else:
+    #             previous_output_dir = f"{volcano_dir}{previous_LiCSAlert_dates[-1]}"
+    #         record_mask_changes(mask_sources, displacement_r2['mask'], mask_combined, LiCSAR_last_acq, f"{volcano_dir}{LiCSAR_last_acq}/", previous_output_dir)             # record any changes in the mask (ie pixels that are now masked due to being incoherent).  
+            
+    #         # 6: Run LiCSAlert
+    #         #def LiCSAlert(sources, time_values, ifgs_baseline, ifgs_monitoring = None, t_recalculate = 10, verbose=False):
+            
+    #         sources_tcs_baseline, residual_tcs_baseline = LiCSAlert(sources_mask_combined, baseline_info["baselines_cumulative"],                                                               # the LiCSAlert algoirthm, using the sources with the combined mask (sources_mask_combined)
+    #                                                                 displacement_r2_combined['incremental'][:n_baseline_ifgs,], displacement_r2_combined['incremental'][n_baseline_ifgs:,],     # baseline ifgs and monitoring ifgs
+    #                                                                 t_recalculate=10, verbose=False)                                                                                            # recalculate lines of best fit every 10 acquisitions
+            
+    #         LiCSAlert_figure(sources_tcs_baseline, residual_tcs_baseline, sources_mask_combined, displacement_r2_combined, n_baseline_ifgs,                                 # creat the LiCSAlert figure
+    #                          baseline_info["baselines_cumulative"], out_folder = f"{volcano_dir}{LiCSAR_last_acq}", day0_date = baseline_info['imdates'][0])                #
+            
+    #         sys.stdout = original                                                                                                                       # return stdout to be normal.  
+    #         f.close()                                                                                                                                   # and close the log file.  
+    #     else:
+    #         print(f'No new LiCSAR acquisitions have been detected for {volcano}, and the LiCSAlert outputs are thought to be up to date.  ')
+        
+    
+    
+            # def check_LiCSAlert_products(dates):
+            # """ Given a list of dates in which LiCSAlert has been run, check that the required outputs are present in each folder.  
+            # Inputs:
+            #     dates | list of strings | dates that LiCSAlert was run until.  In form YYYYMMDD
+            # Returns:
+            #     dates_incomplete | list of strings | dates that a LiCSAlert folder exisits, but it doesn't have all the ouptuts.  
+            # History:
+            #     2020/11/13 | MEG | Written
+            # """
+            # from pathlib import Path
+            # import os
+            # import fnmatch                                                                      # used to compare lists and strings using wildcards
+            
+            
+            # constant_outputs = ['mask_changes_graph.png',                                      # The output files that are expected to exist and never change name
+            #                     'mask_changes.png',
+            #                     'mask_history.pkl']
+            # variable_outputs = ['LiCSAlert_figure_with_*_monitoring_interferograms.png']        # The output files that are expected to exist and change name.  
+    
+            # dates_incomplete = []
+            # for date in dates:
+            #     date_folder = Path(folder_LiCSAlert + date)                                     # join to make a path to the current date folder
+            #     date_files = sorted([f.name for f in os.scandir(date_folder)])                  # get names of the files in this folder (no paths)
+                
+            #     # 1: look for the products that don't change name (ie all but the first)
+            #     all_products_complete = True                                                                            # initiate as True
+            #     for constant_output in constant_outputs:                                                                # loop through the outputs that can't change name
+            #         all_products_complete = (all_products_complete) and (constant_output in date_files)                 # update boolean 
+            #     # 2: look for the product that does change name (the main figure)
+            #     for variable_output in variable_outputs:                                                                # loop through the outputs that can change name
+            #         output = fnmatch.filter(date_files, "LiCSAlert_figure_with_*_monitoring_interferograms.png")        # check for file with wildcard for changing name
+            #         all_products_complete = (all_products_complete) and (len(output) > 0)                               # empty list if file doesn't exit, use to update boolean
+                    
+            #     if all_products_complete is False:
+            #         dates_incomplete.append(date)                                                                       # create a list of dates for which otputs are missing
+            # return dates_incomplete
+#%%
+
+def load_ICASAR_results(ICASAR_results_file):
+    """ Open the ICASAR_results.pkl file made by ICASAR in monitoring mode.  
+    Returns:
+        sources, mask_sources, tcs, source_residuals, Iq_sorted, n_clusters
+    History:
+        2026/10/18 | MEG | Written, from LiCSAlert_monitoring_mode
+    """
+    import pickle
+    with open(ICASAR_results_file, 'rb') as f_icasar:
+        sources = pickle.load(f_icasar)   
+        mask_sources = pickle.load(f_icasar)
+        tcs  = pickle.load(f_icasar)    
+        source_residuals = pickle.load(f_icasar)    
+        Iq_sorted = pickle.load(f_icasar)    
+        n_clusters = pickle.load(f_icasar)    
+    return sources, mask_sources, tcs, source_residuals, Iq_sorted, n_clusters
+
+#%%
+def LiCSAlert_dates_status(LiCSAlert_required_dates, LiCSAlert_dates, folder_LiCSAlert, figures = True):
+    """ Given a list of dates in which LiCSAlert has been run, check that the required outputs are present in each folder.  
+    Inputs:
+        dates | list of strings | dates that LiCSAlert was run until.  In form YYYYMMDD
+        figures | boolean | if True, the figures are also required outputs.  If False (headless), the date must instead be in the results store (LiCSAlert_results/dates), 
+                            so that its figure can be made later with the replot command.  
+    Returns:
+        dates_incomplete | list of strings | dates that a LiCSAlert folder exisits, but it doesn't have all the ouptuts.  
+    History:
+        2020/11/13 | MEG | Written
+        2020_11_17 | MEG | Overhauled ready for version 2
+        2026/10/18 | MEG | Add figures argument for headless runs.  
+        2026/10/18 | MEG | The results are required in both modes (as a date with the figures but without its results can't be replotted or queried).  
+        2026/10/18 | MEG | Headless dates must be in the results store.  
+    """
+    from pathlib import Path
+    import os
+    import fnmatch                                                                      # used to compare lists and strings using wildcards
+    from licsalert.results_store import store_dates
+    
+    constant_outputs = ['LiCSAlert_results.json']                                          # The output files that are expected to exist and never change name, made with or without the figures
+    variable_outputs = []                                                                  # The output files that are expected to exist and change name.  
+    if figures:
+        constant_outputs.extend(['mask_changes_graph.png',  
+                                 'mask_changes.png'])
+        variable_outputs.append('LiCSAlert_figure_with_*_monitoring_interferograms.png')
+    else:
+        dates_stored = store_dates(f"{folder_LiCSAlert}LiCSAlert_results")                   # headless, so the figures can only be made later from the results store
+
+    # 0: The dates that still need to be processed
+    pending  = []
+    for LiCSAlert_required_date in LiCSAlert_required_dates:
+        if LiCSAlert_required_date not in LiCSAlert_dates:
+            pending.append(LiCSAlert_required_date)
+        
+    # 1: All the dates that haven been processed are either processed, or processed with errors.  Loop through and decide which.  
+    processed = []
+    processed_with_errors = []
+    for LiCSAlert_date in LiCSAlert_dates:
+        LiCSAlert_date_folder = Path(folder_LiCSAlert + LiCSAlert_date)                                     # join to make a path to the current LiCSAlert_date folder
+        LiCSAlert_date_files = sorted([f.name for f in os.scandir(LiCSAlert_date_folder)])                  # get names of the files in this folder (no paths)
+        
+        # 1: look for the products that don't change name (ie all but the first)
+        all_products_complete = True                                                                                 # initiate as True
+        for constant_output in constant_outputs:                                                                     # loop through the outputs that can't change name
+            all_products_complete = (all_products_complete) and (constant_output in LiCSAlert_date_files)            # update boolean 
+        # 2: look for the product that does change name (the main figure)
+        for variable_output in variable_outputs:                                                                     # loop through the outputs that can change name
+            output = fnmatch.filter(LiCSAlert_date_files, variable_output)                                          # check for file with wildcard for changing name
+            all_products_complete = (all_products_complete) and (len(output) > 0)                                    # empty list if file doesn't exit, use to update boolean
+        # 3: if headless, look for the date in the results store
+        if not figures:
+            all_products_complete = (all_products_complete) and (LiCSAlert_date in dates_stored)
+        
+        if all_products_complete:
+            processed.append(LiCSAlert_date)
+        else:
+            processed_with_errors.append(LiCSAlert_date)
+            
+    return processed, processed_with_errors, pending
+
+
+
+
+def run_LiCSAlert_status(folder_ifgs, folder_LiCSAlert, date_baseline_end, LiCSAlert_history_file, lon_lat = None, figures = True):
+    """ 
+    Inputs:
+        folder_ifgs | path | path to LiCSAR ifgs.  
+        folder_LiCSAlert | path | path to where LiCSAlert_monitoring_mode is being run.  
+        lon_lat | list | west east south north that LiCSBAS is clipped to.  LiCSBAS is run again if it changes.  
+        figures | boolean | passed to LiCSAlert_dates_status, as the outputs that are expected for each date depend on whether figures are being made.  
+    Rerturns:
+        LiCSAlert_status | dict | contains: run_LiCSBAS | Boolean | True if LiCSBAS will be required
+                                            run_ICASAR | Boolean | True if ICASAR will be required.  
+                                            run_LiCSAlert | Boolean | True if required.  
+
+    History:
+        2020/02/18 | MEG |  Written        
+        2020/06/29 | MEG | Major rewrite to use a folder based structure    
+        2020/11/17 | MEG | Write the docs and add compare_two_dates function.  
+        2020/11/24 | MEG | Major update to provide more information on status of volcano being processed.  
+        2026/10/18 | MEG | Add figures argument.  
+        2026/10/18 | MEG | Only run LiCSBAS if the GEOC folder has changed since LiCSBAS was last run (see GEOC_manifest).  
+        2026/10/18 | MEG | Log to the history file with a RunLogger (run_logging.py), rather than replacing sys.stdout with a Tee.  
+        2026/10/18 | MEG | Add lon_lat argument, so that LiCSBAS is run again if the region of the volcano changes.  
+        2026/10/18 | MEG | Also return the LiCSAR dates.  
+
+    """
+    import os 
+    import datetime
+    import sys
+    from licsalert.LiCSAlert_aux_functions import compare_two_dates, LiCSAR_ifgs_to_s1_acquisitions
+    from licsalert.run_logging import log_run
+    
+    def get_LiCSAlert_required_dates(LiCSAR_dates, date_baseline_end):
+        """ Given a list of LICSAR_dates, determine which ones are after the baseline stage ended.  
+        Inputs:
+            LiCSAR_dates | list | Dates of Sentinel-1 acquisitions used to make LiCSAR ifgs in form YYYYMMDD
+            baseline_end | string | Date that LiCSAlert baseline stage ended at, in form YYYYMMDD
+        Returns:
+            LiCSAlert_required_dates | list | Dates for which there should be LiCSAlert outputs, given the current LiCSAR time series.  
+        History:
+            2020_11_18 | MEG | Written
+        """
+        from licsalert.LiCSAlert_aux_functions import compare_two_dates
+        LiCSAlert_required_dates = []
+        for LiCSAR_date in LiCSAR_dates:
+            after_baseline_end = compare_two_dates(date_baseline_end, LiCSAR_date)               # check if the date was after the end of the baseline stage.  
+            if after_baseline_end:
+                LiCSAlert_required_dates.append(LiCSAR_date)
+        return LiCSAlert_required_dates
+    
+
+    with log_run(LiCSAlert_history_file, mode = 'a'):                                            # anything printed in this context is also appended to the history file
+        now = datetime.datetime.now()                                                                # get the current time, ready for recording
+        print(f"\nLiCSAlert is being run for this volcano at {now.strftime('%d/%m/%Y %H:%M:%S')}")   # record the current time in the LiCSAlert history file
+
+    
+        # 0: Get the LiCSAR dates.  
+        LiCSAR_ifgs = sorted([f.name for f in os.scandir(folder_ifgs) if f.is_dir()])                # get names of folders produced by LiCSAR (ie the ifgs), and keep chronological.  
+        if not LiCSAR_ifgs:                                                                          # RR addition.  To check that the list isn't empty
+            print(f"No files found in {folder_ifgs} ... ")
+            return False, False, False                                                               # return back to parent function (new_ifg_flag, LiCSAR_last_acq)
+        LiCSAR_dates = LiCSAR_ifgs_to_s1_acquisitions(LiCSAR_ifgs)                                   # a list of the unique dates that LiCSAR ifgs span.  
+        LiCSAR_last_acq = LiCSAR_dates[-1]                                                           # get the date of the last Sentinel-1 acquisition used by LiCSAR
+    
+        # 1: Determine if we can run LiCSAlert yet (ie past the baseline stage)
+        LiCSAR_past_baseline = compare_two_dates(date_baseline_end, LiCSAR_last_acq)                                    # determine if the last LiCSAR date is after the baseline stage has ended.  
+        if not LiCSAR_past_baseline:                                                                                                         #
+            print(f"LiCSAR is up to date until {LiCSAR_last_acq}, but the baseline stage is set to end on {date_baseline_end} "
+                  f" and, as this hasn't been reached yet, LiCSAlert cannot be run yet.")
+            run_LiCSBAS = run_ICASAR = run_LiCSAlert = False
+            return run_LiCSBAS, run_ICASAR, run_LiCSAlert
+    
+        # 3: Determine what dates LiCSAlert has been run for/which need to be run/ which have errors etc.    
+        LiCSAlert_required_dates = get_LiCSAlert_required_dates(LiCSAR_dates, date_baseline_end)                # Determine which dates LiCSAlert should have an output for (regardless of if we actually have them)
+        LiCSAlert_dates = sorted([f.name for f in os.scandir(folder_LiCSAlert) if f.is_dir()])                  # get names of folders produced by LiCSAR (ie the ifgs), and keep chronological.  
+        if 'ICASAR_results' in LiCSAlert_dates:                                                                 # the line above will also catch the ICASAR_results folder, and can be used to check if it exists.  
+            run_ICASAR = False                                                                                  # if it exists, it will not need to be run
+        else:
+            run_ICASAR = True                                                                                   # if it doesn't exist, it will need to be run.  
+        for unneeded_folder in ['LiCSBAS', 'ICASAR_results', 'mask_history', 'stage_cache', 'LiCSAlert_results', 'LiCSAlert_residual_maps']:                                                   # these folders get caught in the dates list, but aren't dates so need to be deleted.  
+            try:
+                LiCSAlert_dates.remove(unneeded_folder)                                                         # note that the LiCSBAS folder also gets caught by this, and needs removing as it's not a date.  
+            except:
+                pass                                                                                            # however, on the first ever run these don't exist.  
+    
+        processed, processed_with_errors, pending = LiCSAlert_dates_status(LiCSAlert_required_dates, LiCSAlert_dates, folder_LiCSAlert, figures)     # do the determing.  
+
+        if (len(processed_with_errors) > 0) or (len(pending) > 0):                                              # set boolean flags based on results of which dates exist
+            run_LiCSBAS = run_LiCSAlert = True
+        else:
+            run_LiCSBAS = run_LiCSAlert = False
+
+        # 4: LiCSBAS only needs to be run if the LiCSAR ifgs (or the region, or the downsampling) have changed since it was last run (e.g. not if only some figures are missing)
+        manifest = dict(GEOC_manifest(folder_ifgs), lon_lat = lon_lat, downsampling = 1)                         # LiCSBAS_for_LiCSAlert is run with the default downsampling
+        if run_LiCSBAS and GEOC_manifest_unchanged(manifest, f"{folder_LiCSAlert}LiCSBAS/"):
+            print(f"The LiCSAR interferograms (and the region) haven't changed since LiCSBAS was last run, so LiCSBAS won't be run again and its existing time series (cum.h5) will be used.  ")
+            run_LiCSBAS = False
+
+
+        LiCSAlert_status = {'run_LiCSBAS'             : run_LiCSBAS,
+                            'run_ICASAR'              : run_ICASAR,
+                            'run_LiCSAlert'           : run_LiCSAlert,
+                            'processed_with_errors'   : processed_with_errors,
+                            'pending'                 : pending,
+                            'LiCSAR_last_acq'         : LiCSAR_last_acq,
+                            'LiCSAR_dates'            : LiCSAR_dates,
+                            'GEOC_manifest'           : manifest}
+
+    return LiCSAlert_status
+    
+
+#%%
+
+def LiCSAlert_volcano_summary(volcano_dir, LiCSAR_frames_dir):
+    """ A quick summary of the state of a volcano for the status command of the CLI.  Unlike run_LiCSAlert_status, nothing is written, LiCSBAS isn't
+    checked, and only the standard library is used, so that the status of all the volcanoes can be found in well under a second.  
+    Inputs:
+        volcano_dir | string | the folder of the volcano.  Needs trailing /
+        LiCSAR_frames_dir | string | path to the folder containing LiCSAR frames.  Needs trailing /
+    Returns:
+        summary | dict | frame, LiCSAR_last_acq, LiCSAlert_last_date, n_pending (dates that LiCSAlert still needs to be run for), 
+                         alert (from the results of the last date, or None if there aren't any), ICASAR (True if it has been run)
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import os
+    import json
+    from licsalert.LiCSAlert_aux_functions import LiCSAR_ifgs_to_s1_acquisitions, compare_two_dates
+
+    LiCSAR_settings, _, LiCSAlert_settings, _ = read_config_file(f"{volcano_dir}LiCSAlert_settings.txt")
+    folder_ifgs = f"{LiCSAR_frames_dir}{LiCSAR_settings['frame']}/GEOC/"
+    if os.path.isdir(folder_ifgs):
+        LiCSAR_dates = LiCSAR_ifgs_to_s1_acquisitions(sorted([f.name for f in os.scandir(folder_ifgs) if f.is_dir()]))
+    else:
+        LiCSAR_dates = []
+    LiCSAlert_dates = sorted([f.name for f in os.scandir(volcano_dir) if f.is_dir() and f.name.isdigit() and len(f.name) == 8])                 # only the YYYYMMDD folders
+    required_dates = [LiCSAR_date for LiCSAR_date in LiCSAR_dates if compare_two_dates(LiCSAlert_settings['baseline_end'], LiCSAR_date)]
+
+    alert = None
+    for LiCSAlert_date in LiCSAlert_dates[::-1]:                                                        # the most recent date with results
+        results_file = f"{volcano_dir}{LiCSAlert_date}/LiCSAlert_results.json"
+        if os.path.exists(results_file):
+            with open(results_file, 'r') as f:
+                alert = json.load(f)['alert']
+            break
+
+    summary = {'frame'               : LiCSAR_settings['frame'],
+               'LiCSAR_last_acq'     : LiCSAR_dates[-1] if len(LiCSAR_dates) > 0 else None,
+               'LiCSAlert_last_date' : LiCSAlert_dates[-1] if len(LiCSAlert_dates) > 0 else None,
+               'n_pending'           : len([date for date in required_dates if date not in LiCSAlert_dates]),
+               'alert'               : alert,
+               'ICASAR'              : os.path.exists(f"{volcano_dir}ICASAR_results/ICASAR_results.pkl")}
+    return summary
+
+#%%
+
+def GEOC_manifest(folder_ifgs):
+    """ Make a manifest of the LiCSAR ifgs (the name, size, and modification time of each file in each ifg folder in GEOC), 
+    which changes if LiCSAR adds, removes, or reprocesses an ifg.  
+    Inputs:
+        folder_ifgs | string | path to the LiCSAR ifgs (i.e. the GEOC folder).  Needs trailing /
+    Returns:
+        manifest | dict | hash (sha1 of the files), n_ifgs, n_files, and ifgs (the names of the ifg folders)
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import os
+    import hashlib
+    
+    ifg_folders = sorted([f for f in os.scandir(folder_ifgs) if f.is_dir()], key = lambda f: f.name)
+    manifest_hash = hashlib.sha1()
+    n_files = 0
+    for ifg_folder in ifg_folders:
+        for ifg_file in sorted(os.scandir(ifg_folder.path), key = lambda f: f.name):
+            if ifg_file.is_file():
+                file_stat = ifg_file.stat()                                                                        # no need to read the files, as LiCSAR writes new files when it changes them
+                manifest_hash.update(f"{ifg_folder.name}/{ifg_file.name}|{file_stat.st_size}|{file_stat.st_mtime_ns}\n".encode())
+                n_files += 1
+    return {'hash'    : manifest_hash.hexdigest(),
+            'n_ifgs'  : len(ifg_folders),
+            'n_files' : n_files,
+            'ifgs'    : [ifg_folder.name for ifg_folder in ifg_folders]}
+
+
+def GEOC_manifest_unchanged(manifest, LiCSBAS_dir):
+    """ Return True if the manifest is the same as the one saved when LiCSBAS was last run (and the time series from that run still exists).  
+    Inputs:
+        manifest | dict | from GEOC_manifest, with the region (lon_lat) and downsampling that LiCSBAS is run with.  
+        LiCSBAS_dir | string | the LiCSBAS folder for the volcano.  Needs trailing /
+    Returns:
+        unchanged | boolean |
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import os
+    import json
+    
+    manifest_file = f"{LiCSBAS_dir}GEOC_manifest.json"
+    if not (os.path.exists(manifest_file) and os.path.exists(f"{LiCSBAS_dir}TS_GEOCmldir/cum.h5")):
+        return False
+    try:
+        with open(manifest_file, 'r') as f:
+            manifest_last = json.load(f)
+    except (OSError, ValueError):                                                                                  # e.g. if the file was only partly written
+        return False
+    return all([manifest_last.get(key, None) == manifest.get(key, None) for key in ['hash', 'lon_lat', 'downsampling']])      # so a new region (or downsampling) isn't cropped from the old time series
+
+
+def GEOC_manifest_write(manifest, LiCSBAS_dir):
+    """ Save the manifest of the ifgs that LiCSBAS has just been run with.  Only call this once LiCSBAS has finished without errors.  
+    Inputs:
+        manifest | dict | from GEOC_manifest
+        LiCSBAS_dir | string | the LiCSBAS folder for the volcano.  Needs trailing /
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import os
+    import json
+    import datetime
+    
+    manifest = dict(manifest, LiCSBAS_run = datetime.datetime.now().strftime('%Y/%m/%d %H:%M:%S'))
+    with open(f"{LiCSBAS_dir}GEOC_manifest.json.tmp", 'w') as f:
+        json.dump(manifest, f, indent = 2)
+    os.replace(f"{LiCSBAS_dir}GEOC_manifest.json.tmp", f"{LiCSBAS_dir}GEOC_manifest.json")                         # so a partly written manifest is never used
+
+
+#%%
+
+def frame_volcanoes(LiCSAlert_volcs_dir, frame):
+    """ Find the volcanoes that are in a LiCSAR frame and use frame level LiCSBAS (frame_level in the LiCSBAS section of their config file).  
+    Inputs:
+        LiCSAlert_volcs_dir | string | path to the folder containing each volcano.  Needs trailing /
+        frame | string | the LiCSAR frame.  
+    Returns:
+        volcanoes | dict | the region (lon_lat, west east south north) of each volcano, with the volcano as the key.  
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import os
+    
+    volcanoes = {}
+    for volcano_folder in sorted(os.scandir(LiCSAlert_volcs_dir), key = lambda f: f.name):
+        config_file = f"{volcano_folder.path}/LiCSAlert_settings.txt"
+        if volcano_folder.is_dir() and os.path.exists(config_file):
+            LiCSAR_settings, LiCSBAS_settings, _, _ = read_config_file(config_file)
+            if (LiCSAR_settings['frame'] == frame) and LiCSBAS_settings['frame_level']:
+                volcanoes[volcano_folder.name] = LiCSBAS_settings['lon_lat']
+    return volcanoes
+
+
+def frame_LiCSBAS_dir(LiCSAlert_volcs_dir, frame):
+    """ The folder of the LiCSBAS products that are shared by all the volcanoes in a frame (frame level LiCSBAS).  Has trailing /
+    """
+    return f"{LiCSAlert_volcs_dir}LiCSBAS_frames/{frame}/"
+
+
+def LiCSBAS_for_frame(frame, LiCSAR_frames_dir, LiCSAlert_volcs_dir, logfile_dir, LiCSBAS_bin, n_para = 1, profile = None):
+    """ Run LiCSBAS once for a LiCSAR frame, clipped to the union of the regions of all the volcanoes in the frame that use frame level LiCSBAS, 
+    so that the expensive steps (02, 11, 12, and 13) aren't repeated for each volcano.  Only one volcano can run LiCSBAS on a frame at once (the others wait 
+    for it to finish), and LiCSBAS is only run if the LiCSAR ifgs (or the union of the regions) have changed since it was last run for the frame.  
+    
+    Inputs:
+        frame | string | the LiCSAR frame.  
+        LiCSAR_frames_dir | string | The path to the LiCSAR frames.  Needs trailing /
+        LiCSAlert_volcs_dir | string | path to the folder containing each volcano.  Needs trailing /
+        logfile_dir | string | path to directory where the LiCSBAS logfile will be appended to.  Needs trailing /
+        LiCSBAS_bin | string | as per LiCSBAS_for_LiCSAlert
+        n_para | int | number of parallel processes used by LiCSBAS.  
+        profile | RunProfile or None | as per LiCSBAS_for_LiCSAlert
+    Returns:
+        cum_file | string | path to the cum.h5 file for the frame.  Read it whilst holding a shared lock on lock_file (see file_lock)
+        lock_file | string | 
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import os
+    import numpy as np
+    from licsalert.LiCSAlert_functions import LiCSBAS_for_LiCSAlert
+    from licsalert.LiCSAlert_aux_functions import file_lock
+    
+    frame_dir = frame_LiCSBAS_dir(LiCSAlert_volcs_dir, frame)
+    os.makedirs(frame_dir, exist_ok = True)
+    lock_file = f"{frame_dir}LiCSBAS.lock"
+    
+    volcanoes = frame_volcanoes(LiCSAlert_volcs_dir, frame)
+    if len(volcanoes) == 0:
+        raise Exception(f"No volcanoes in {LiCSAlert_volcs_dir} use frame level LiCSBAS for frame {frame}.  Exiting...")
+    lon_lats = np.array(list(volcanoes.values()))
+    lon_lat = [float(np.min(lon_lats[:,0])), float(np.max(lon_lats[:,1])), float(np.min(lon_lats[:,2])), float(np.max(lon_lats[:,3]))]      # union of the regions (west east south north)
+    
+    with file_lock(lock_file):                                                                                          # wait for any other volcano that is running LiCSBAS on this frame
+        manifest = dict(GEOC_manifest(f"{LiCSAR_frames_dir}{frame}/GEOC/"), lon_lat = lon_lat)                          # made whilst locked, as LiCSBAS might have just been run by another volcano
+        if GEOC_manifest_unchanged(manifest, frame_dir):
+            print(f"LiCSBAS is up to date for frame {frame} (for the region of volcanoes {list(volcanoes.keys())}), so won't be run again.  ")
+        else:
+            print(f"Running LiCSBAS for frame {frame}, clipped to the region of volcanoes {list(volcanoes.keys())} ({lon_lat}).  ")
+            LiCSBAS_for_LiCSAlert(frame, LiCSAR_frames_dir, frame_dir, logfile_dir, LiCSBAS_bin, lon_lat, n_para = n_para, profile = profile)
+            GEOC_manifest_write(manifest, frame_dir)
+    return f"{frame_dir}TS_GEOCmldir/cum.h5", lock_file
+
+
+def LiCSBAS_for_frames(frames, LiCSAR_frames_dir, LiCSAlert_volcs_dir, LiCSBAS_bin, n_para = 1, max_concurrent = 2):
+    """ Run frame level LiCSBAS (see LiCSBAS_for_frame) for several LiCSAR frames at the same time, so that when monitoring mode is then run for
+    the volcanoes in them, LiCSBAS is already up to date.  Only the frames whose LiCSAR ifgs (or union of regions) have changed are run, and each frame
+    is locked whilst it runs (so a volcano that is already running can't read a partly made time series).  
+    
+    Inputs:
+        frames | list of strings | the LiCSAR frames.  
+        LiCSAR_frames_dir | string | The path to the LiCSAR frames.  Needs trailing /
+        LiCSAlert_volcs_dir | string | path to the folder containing each volcano.  Needs trailing /
+        LiCSBAS_bin | string | as per LiCSBAS_for_LiCSAlert
+        n_para | int | total number of parallel processes used by LiCSBAS, which is split between the frames that run at once.  
+        max_concurrent | int | maximum number of frames that LiCSBAS is run on at once.  
+    Returns:
+        step_records | dict | the steps that were run for each frame (see LiCSBAS_runner.py), with the frame as the key.  
+        LiCSBAS_log.txt in the folder of each frame.  
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import os
+    import contextlib
+    import numpy as np
+    from licsalert.LiCSBAS_runner import run_LiCSBAS_frames, check_LiCSBAS_steps, check_LiCSBAS_path
+    from licsalert.LiCSAlert_aux_functions import file_lock
+    
+    check_LiCSBAS_path(LiCSBAS_bin)
+    with contextlib.ExitStack() as locks:
+        jobs, manifests = [], []
+        for frame in sorted(set(frames)):                                                                               # always locked in the same order, so two runs can't deadlock
+            volcanoes = frame_volcanoes(LiCSAlert_volcs_dir, frame)
+            if len(volcanoes) == 0:
+                print(f"No volcanoes use frame level LiCSBAS for frame {frame}, so it will be skipped.  ")
+                continue
+            frame_dir = frame_LiCSBAS_dir(LiCSAlert_volcs_dir, frame)
+            os.makedirs(frame_dir, exist_ok = True)
+            locks.enter_context(file_lock(f"{frame_dir}LiCSBAS.lock"))
+            lon_lats = np.array(list(volcanoes.values()))
+            lon_lat = [float(np.min(lon_lats[:,0])), float(np.max(lon_lats[:,1])), float(np.min(lon_lats[:,2])), float(np.max(lon_lats[:,3]))]      # as per LiCSBAS_for_frame
+            manifest = dict(GEOC_manifest(f"{LiCSAR_frames_dir}{frame}/GEOC/"), lon_lat = lon_lat)
+            if GEOC_manifest_unchanged(manifest, frame_dir):
+                print(f"LiCSBAS is up to date for frame {frame}, so won't be run again.  ")
+                continue
+            jobs.append({'label'           : frame,
+                         'GEOCdir'         : f"{LiCSAR_frames_dir}{frame}/GEOC",
+                         'LiCSBAS_out_dir' : frame_dir,
+                         'log_file'        : f"{frame_dir}LiCSBAS_log.txt",
+                         'lon_lat'         : lon_lat})
+            manifests.append(manifest)
+        
+        if len(jobs) > 0:
+            print(f"Running LiCSBAS for frames {[job['label'] for job in jobs]} (up to {max_concurrent} at once).  ")
+        step_records = run_LiCSBAS_frames(jobs, n_para = n_para, max_concurrent = max_concurrent) if len(jobs) > 0 else []
+        for job, manifest, job_records in zip(jobs, manifests, step_records):
+            if all([step_record['returncode'] == 0 for step_record in job_records]):
+                GEOC_manifest_write(manifest, job['LiCSBAS_out_dir'])                                                   # so it isn't run again until the ifgs change
+        for job, job_records in zip(jobs, step_records):
+            check_LiCSBAS_steps(job_records, job['log_file'])                                                           # only once all the frames that worked are recorded
+    return {job['label'] : job_records for job, job_records in zip(jobs, step_records)}
+
+
+def frame_crop_pixels(cum_file, lon_lat):
+    """ Return the pixels of the region of a volcano in the cum.h5 file of a frame, in the form used by crop_pixels in LiCSBAS_to_LiCSAlert.  
+    Inputs:
+        cum_file | string | path to the cum.h5 file made by LiCSBAS_for_frame.  
+        lon_lat | list | west east south north of the volcano.  
+    Returns:
+        crop_pixels | tuple | x_start, x_stop, y_start, y_stop
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import h5py as h5
+    from licsalert.geotransform import Geotransform
+    
+    with h5.File(cum_file, 'r') as cumh5:
+        geotransform = Geotransform(cumh5['corner_lon'][()], cumh5['corner_lat'][()], cumh5['post_lon'][()], cumh5['post_lat'][()], 
+                                    cumh5['cum'].shape[1], cumh5['cum'].shape[2])
+    return geotransform.lon_lat_to_pixels(lon_lat)
+
+
+
+def frame_time_series_lock(cum_file, lock_file, lon_lat):
+    """ A context manager that holds a shared lock on the time series of a frame (from LiCSBAS_for_frame), and gives the pixels of a volcano's region in it
+    (see frame_crop_pixels).  Anything read from the time series whilst it is held is from the same run of LiCSBAS as the pixels, as another volcano 
+    can't update the time series until it is released.  
+    e.g.:
+        with frame_time_series_lock(cum_file, lock_file, lon_lat) as crop_pixels:
+            displacement_r2, temporal_baselines, geocode_info = LiCSBAS_to_LiCSAlert(cum_file, crop_pixels = crop_pixels)
+    Inputs:
+        cum_file | string | path to the cum.h5 file.  
+        lock_file | string or None | from LiCSBAS_for_frame.  If None (i.e. the volcano has its own time series), nothing is locked and the pixels are None.  
+        lon_lat | list | west east south north of the volcano.  
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import contextlib
+    from licsalert.LiCSAlert_aux_functions import file_lock
+    
+    @contextlib.contextmanager
+    def _lock():
+        if lock_file is None:
+            yield None
+        else:
+            with file_lock(lock_file, shared = True):
+                yield frame_crop_pixels(cum_file, lon_lat)
+    return _lock()
+
+#%%
+
+
+def record_mask_changes(mask_sources, mask_ifgs, mask_combined, current_date, current_output_dir, mask_history_dir, figures = True):
+    """ Record changes to the masks used in LiCSAlert, as this is dependent on the mask provided by LiCSBAS.  Creates a variety of .png images showing the mask,
+    and how many pixels remain for LiCSAlert to use.  The masks are appended to the volcano's mask history store so that they can be compared to the next time it is run.  
+    
+    Inputs:
+        mask_sources | r2 array | the mask used by ICASAR
+        mask_ifgs | r2 array | the mask produced by the last run of LiCSBAS
+        mask_combined | r2 array | the mask that removes any pixels that aren't in bothh the sources and the ifgs
+        current_date | string | the date that LiCSAlert is being run to.  
+        current_output_dir | string | the folder that LiCSALert is currently outputting to
+        mask_history_dir | string | the folder of the volcano's mask history store (see mask_history_append).  Needs trailing /
+        figures | boolean | if False, the masks are only added to the store and no figures are made (so matplotlib is not needed).  
+    Returns:
+        2 x png figures
+        masks, dates and pixel counts appended to the mask history store.  
+    History:
+        2020/06/25 | MEG | Written
+        2020/07/01 | MEG | Major rewrite to suit directory based structure.  
+        2020/07/03 | MEG | continue major rewrite, and write docs.  
+        2026/10/18 | MEG | Use the per-volcano mask history store, rather than a copy of the whole history in each date folder.  
+        2026/10/18 | MEG | Add figures argument.  
+    """
+    import numpy as np
+    import numpy.ma as ma
+    
+    # 0: append the current masks to the store, and get the index of all the dates stored so far
+    mask_history_append(mask_history_dir, current_date, mask_combined, mask_ifgs)
+    if not figures:
+        return
+    import matplotlib.pyplot as plt
+    history_index = [entry for entry in mask_history_index(mask_history_dir) if entry['date'] <= current_date]    # only the dates up to this one (which can matter if an earlier date is being reprocessed)
+    if len(history_index) > 1:
+        initialising = False
+        mask_combined_previous, _ = mask_history_masks(mask_history_dir, history_index[-2])                       # only the previous masks need to be read from the store
+    else:
+        initialising = True                                                             # this flag used to control plotting as it's different for the first one.  
+    
+    # 1: Figure showing the masks
+    f1,axes = plt.subplots(1,4, figsize = (12,6))
+    axes[0].imshow(mask_sources)
+    axes[0].set_title('(ICASAR) sources mask')
+    axes[1].imshow(mask_ifgs)
+    axes[1].set_title('Current LiCSBAS mask')
+    axes[2].imshow(mask_combined)
+    axes[2].set_title('Current combined mask')
+    if initialising:                                                                                        # first run, so won't be a difference between this and past mask
+        axes[3].imshow(np.full(mask_combined.shape, np.nan))                                                # just nans so it's blank
+        axes[3].set_title("First mask so no change")
+    else:
+        axes[3].imshow(ma.masked_where(mask_combined_previous == mask_combined , np.ones(mask_combined.shape)))           # create an array of ones that is maksed everywhere that the two masks are the same, and then plot this.  
+        axes[3].set_title(f"{history_index[-2]['date']} - {history_index[-1]['date']} ")                                  # and differnce inthe dates
+        
+    f1.canvas.set_window_title(current_date)
+    f1.savefig(f"{current_output_dir}mask_changes.png", bbox_inches='tight')
+    plt.close(f1)
+
+    # 2 Figure showing how the number of pixels has changes with time, using the pixel counts cached in the index of the store
+    dates = [entry['date'] for entry in history_index]
+    n_updates = len(dates)
+    x_vals = np.arange(n_updates)
+    n_pixs = np.zeros((n_updates, 2))                                     # 1st column will be number of non-masked and 2nd number of masked
+    for ifg_n, entry in enumerate(history_index):
+        n_pixs[ifg_n,0] = entry['n_pixs_combined']
+        n_pixs[ifg_n,1] = entry['n_masked_combined']
+    
+    f2,ax = plt.subplots(1)
+    ax.plot(x_vals, n_pixs[:,0], label = 'Non-masked pixels')
+    ax.plot(x_vals, n_pixs[:,1], label = 'Masked pixels')
+    ax.scatter(x_vals, n_pixs[:,0])
+    ax.scatter(x_vals, n_pixs[:,1])
+    ax.set_title(current_date)
+    f2.canvas.set_window_title(current_date)
+    leg = ax.legend()
+    ax.set_ylabel('# pixels')
+    ax.set_xlabel('Time series end (yyyymmdd)')
+    ax.set_xticks(x_vals)
+    ax.set_xticklabels(dates)
+    #ax.set_ylim(bottom = 0)
+    #plt.grid()
+    f2.savefig(f"{current_output_dir}mask_changes_graph.png", bbox_inches='tight')
+    plt.close(f2)
+        
+
+#%%
+
+def mask_history_append(mask_history_dir, date, mask_combined, mask_ifgs):
+    """ Append the masks for one date to a volcano's mask history store.  The store is a single binary file that the masks are appended to 
+    after being bit packed (np.packbits, so 1 bit per pixel), and an index text file with a line for each date recording where its masks are 
+    in the binary file, the shape of the masks, and the number of pixels in the combined mask.  Appending a date therefore takes the same time
+    regardless of how many dates are already in the store.  If a date is appended again (e.g. when it is reprocessed), the newest entry is used.  
+    
+    Inputs:
+        mask_history_dir | string | folder of the store, which is created if it doesn't exist.  Needs trailing /
+        date | string | date the masks are for, in form YYYYMMDD
+        mask_combined | boolean r2 array | the mask of pixels in both the sources and the ifgs.  
+        mask_ifgs | boolean r2 array | the mask of the ifgs (i.e. from LiCSBAS)
+    Returns:
+        mask_history_masks.bin and mask_history_index.txt in mask_history_dir
+    History:
+        2026/10/18 | MEG | Written, to replace saving the whole mask history in each date folder.  
+    """
+    import os
+    import numpy as np
+    
+    if not os.path.exists(mask_history_dir):
+        os.mkdir(mask_history_dir)
+    
+    ny, nx = mask_combined.shape
+    mask_combined_packed = np.packbits(mask_combined.astype(bool), axis = None)                    # 1 bit per pixel, and flattened
+    mask_ifgs_packed = np.packbits(mask_ifgs.astype(bool), axis = None)
+    n_pixs_combined = int(np.count_nonzero(~mask_combined.astype(bool)))                         # non-masked pixels are False, so invert to count them
+    n_masked_combined = int(mask_combined.size - n_pixs_combined)
+    
+    with open(f"{mask_history_dir}mask_history_masks.bin", 'ab') as f_masks:                     # append mode, so the file is never rewritten
+        f_masks.seek(0, os.SEEK_END)
+        offset = f_masks.tell()                                                                   # position in the file that this date's masks start at
+        f_masks.write(mask_combined_packed.tobytes())
+        f_masks.write(mask_ifgs_packed.tobytes())
+    
+    with open(f"{mask_history_dir}mask_history_index.txt", 'a') as f_index:
+        f_index.write(f"{date} {offset} {ny} {nx} {n_pixs_combined} {n_masked_combined}\n")
+        
+
+def mask_history_index(mask_history_dir):
+    """ Read the index of a volcano's mask history store (see mask_history_append), without reading any of the masks.  
+    
+    Inputs:
+        mask_history_dir | string | folder of the store.  Needs trailing /
+    Returns:
+        history_index | list of dicts | one for each date, in date order.  Keys are date, offset, shape, n_pixs_combined, and n_masked_combined.  
+                                        Empty if the store doesn't exist yet.  
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import os
+    
+    if not os.path.exists(f"{mask_history_dir}mask_history_index.txt"):
+        return []
+    
+    history_dict = {}                                                                      # keyed by date, so that the newest entry for a date replaces any older ones
+    with open(f"{mask_history_dir}mask_history_index.txt", 'r') as f_index:
+        for line in f_index:
+            items = line.split()
+            if len(items) != 6:                                                            # e.g. a blank line, or a line that was only partially written
+                continue
+            history_dict[items[0]] = {'date'              : items[0],
+                                      'offset'            : int(items[1]),
+                                      'shape'             : (int(items[2]), int(items[3])),
+                                      'n_pixs_combined'   : int(items[4]),
+                                      'n_masked_combined' : int(items[5])}
+    return [history_dict[date] for date in sorted(history_dict)]
+
+
+def mask_history_masks(mask_history_dir, entry):
+    """ Read the masks for one date from a volcano's mask history store.  
+    
+    Inputs:
+        mask_history_dir | string | folder of the store.  Needs trailing /
+        entry | dict | the item from mask_history_index for the date required.  
+    Returns:
+        mask_combined | boolean r2 array | 
+        mask_ifgs | boolean r2 array | 
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import numpy as np
+    
+    n_pixels = entry['shape'][0] * entry['shape'][1]
+    n_bytes = int(np.ceil(n_pixels / 8))                                                               # packbits pads the last byte with zeros
+    with open(f"{mask_history_dir}mask_history_masks.bin", 'rb') as f_masks:
+        f_masks.seek(entry['offset'])
+        masks_packed = np.frombuffer(f_masks.read(2 * n_bytes), dtype = np.uint8)                      # combined mask then ifgs mask
+    mask_combined = np.unpackbits(masks_packed[:n_bytes], count = n_pixels).astype(bool).reshape(entry['shape'])
+    mask_ifgs = np.unpackbits(masks_packed[n_bytes:], count = n_pixels).astype(bool).reshape(entry['shape'])
+    return mask_combined, mask_ifgs
+
+
+def mask_history_import_pkl(volcano_dir, mask_history_dir):
+    """ Import the masks from the mask_history.pkl files that were saved in each date folder (by record_mask_changes) before the mask history store 
+    was used, so that the store also has the dates that were processed before it.  Each .pkl contains the masks of all the dates up to its own, 
+    so only the latest one that can be read is used.  Dates that are already in the store aren't imported again, and this is only done once for 
+    each volcano (mask_history_pkl_imported.txt is then written in the store).  
+    
+    Inputs:
+        volcano_dir | string | folder of the volcano, which contains the date folders.  Needs trailing /
+        mask_history_dir | string | folder of the volcano's mask history store (see mask_history_append).  Needs trailing /
+    Returns:
+        n_imported | int | the number of dates that were imported.  
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import os
+    import glob
+    import pickle
+    import numpy as np
+    
+    if os.path.exists(f"{mask_history_dir}mask_history_pkl_imported.txt"):
+        return 0
+    
+    pkl_files = sorted(glob.glob(f"{volcano_dir}*/mask_history.pkl"))
+    pkl_files = [pkl_file for pkl_file in pkl_files if len(os.path.basename(os.path.dirname(pkl_file))) == 8 and os.path.basename(os.path.dirname(pkl_file)).isdigit()]    # only in the date folders (YYYYMMDD)
+    n_imported = 0
+    pkl_imported = None
+    for pkl_file in pkl_files[::-1]:                                                                          # latest first
+        try:
+            with open(pkl_file, 'rb') as f:
+                dates = pickle.load(f)
+                masks_combined = pickle.load(f)
+                masks_ifgs = pickle.load(f)
+        except Exception:
+            print(f"Unable to read {pkl_file}, so trying the mask history of the previous date.  ")
+            continue
+        dates_stored = [entry['date'] for entry in mask_history_index(mask_history_dir)]
+        for date, mask_combined, mask_ifgs in zip(dates, masks_combined, masks_ifgs):
+            if date not in dates_stored:
+                mask_history_append(mask_history_dir, date, np.asarray(mask_combined), np.asarray(mask_ifgs))
+                n_imported += 1
+        pkl_imported = pkl_file
+        break
+    
+    os.makedirs(mask_history_dir, exist_ok = True)
+    with open(f"{mask_history_dir}mask_history_pkl_imported.txt", 'w') as f:                                  # so that the .pkl files aren't read again
+        f.write(f"{pkl_imported} {n_imported}\n")
+    if n_imported > 0:
+        print(f"Imported the masks of {n_imported} date(s) from {pkl_imported} into the mask history store.  ")
+    return n_imported
+
+
+#%%
+
+def update_mask_sources_ifgs(mask_sources, sources, mask_ifgs, ifgs):
+    """ Given two masks of pixels, create a mask of pixels that are valid for both.  
+    Inputs:
+        mask_sources | boolean rank 2| original mask
+        sources  | r2 array | sources as row vectors
+        mask_ifgs | boolean rank 2| new mask
+    Returns (in initiate mode):
+        mask_combnied | boolean rank 2| original mask
+    History:
+        2020/02/19 | MEG |  Written      
+        2020/06/26 | MEG | Major rewrite.  
+    """
+    import numpy as np
+    import numpy.ma as ma
+    from licsalert.LiCSAlert_aux_functions import col_to_ma
+    
+    
+    def apply_new_mask(ifgs, mask_old, mask_new):
+        """Apply a new mask to a collection of ifgs (or sources) that are stored as row vectors with an accompanying mask.  
+        Inputs:
+            ifgs | r2 array | ifgs as row vectors
+            mask_old | r2 array | mask to convert a row of ifg into a rank 2 masked array
+            mask_new | r2 array | the new mask to be applied.  Note that it must not unmask any pixels that are already masked.  
+        Returns:
+            ifgs_new_mask | r2 array | as per ifgs, but with a new mask.  
+        History:
+            2020/06/26 | MEG | Written
+        """
+        n_pixs_new = np.count_nonzero(~mask_new)                                        
+        ifgs_new_mask = np.zeros((ifgs.shape[0], n_pixs_new), dtype = ifgs.dtype)    # initiate an array to store the modified sources as row vectors, at the same precision    
+        for ifg_n, ifg in enumerate(ifgs):                                 # Loop through each source
+            ifg_r2 = col_to_ma(ifg, mask_old)                             # turn it from a row vector into a rank 2 masked array        
+            ifg_r2_new_mask = ma.array(ifg_r2, mask = mask_new)              # apply the new mask   
+            ifgs_new_mask[ifg_n, :] = ma.compressed(ifg_r2_new_mask)       # convert to row vector and places in rank 2 array of modified sources
+        return ifgs_new_mask
+    
+    
+    mask_both = ~np.logical_and(~mask_sources, ~mask_ifgs)                                       # make a new mask for pixels that are in the sources AND in the current time series
+    n_pixs_sources = np.count_nonzero(~mask_sources)                                          # masked pixels are True, so invert so that non-masked are True, then count them to get number of pixels
+    n_pixs_new = np.count_nonzero(~mask_ifgs)                                                  # ditto for new mask
+    n_pixs_both = np.count_nonzero(~mask_both)                                                # ditto for the mutual mask
+    print(f"Updating masks and ICA sources.  Of the {n_pixs_sources} in the sources and {n_pixs_new} in the current LiCSBAS time series, "
+          f"{n_pixs_both} are in both and can be used in this iteration of LiCSAlert.  ")
+    
+    ifgs_new_mask = apply_new_mask(ifgs, mask_ifgs, mask_both)
+    sources_new_mask = apply_new_mask(sources, mask_sources, mask_both)
+    
+    return ifgs_new_mask, sources_new_mask, mask_both
+    
+
+
+#%%
+
+def volcano_state(sources, mask_sources, mask_ifgs, LiCSAlert_settings):
+    """ What monitoring mode uses for every date of a volcano that only depends on its sources and the masks (so is kept between runs by the 
+    LiCSAlert worker, see resident_value).  
+    Inputs:
+        sources | r2 array | sources (from ICASAR) as row vectors.  
+        mask_sources | r2 boolean | mask of the sources.  
+        mask_ifgs | r2 boolean | mask of the ifgs (from LiCSBAS_to_LiCSAlert).  
+        LiCSAlert_settings | dict | from read_config_file (downsample_plot, dtype, sketch_size, sketch_method, cascade_fraction and residual_maps are used).  
+    Returns:
+        state | dict | mask_combined, sources_mask_combined, projector (see components_projector), sketch (or None), sources_downsampled_combined 
+                       (or None, only used with cascade_fraction), and map_pixels (or None, only used with residual_maps).  
+    History:
+        2026/10/18 | MEG | Written, from LiCSAlert_monitoring_mode
+    """
+    from licsalert.LiCSAlert_functions import components_projector
+    from licsalert.downsample_ifgs import downsample_ifgs
+    from licsalert.sketched_inversion import pixel_sketch
+    from licsalert.residual_maps import residual_map_pixels
+    
+    _, sources_mask_combined, mask_combined = update_mask_sources_ifgs(mask_sources, sources, mask_ifgs, sources[:0])                       # no ifgs, as these change with each run (see apply_combined_mask)
+    state = {'mask_combined'         : mask_combined,
+             'sources_mask_combined' : sources_mask_combined,
+             'projector'             : components_projector(sources_mask_combined, LiCSAlert_settings['dtype'])}
+    if LiCSAlert_settings['sketch_size'] is not None:                                                                                          # reused for each date (as they all use the combined mask)
+        state['sketch'] = pixel_sketch(mask_combined, LiCSAlert_settings['sketch_size'], LiCSAlert_settings['sketch_method'])
+    else:
+        state['sketch'] = None
+    if (LiCSAlert_settings['cascade_fraction'] is not None) or LiCSAlert_settings['residual_maps']:
+        sources_downsampled_combined, mask_downsampled = downsample_ifgs(sources_mask_combined, mask_combined, LiCSAlert_settings['downsample_plot'],     # the same mask as the ifgs at the resolution of the figures
+                                                                         verbose = False, dtype = LiCSAlert_settings['dtype'])
+    state['sources_downsampled_combined'] = sources_downsampled_combined if LiCSAlert_settings['cascade_fraction'] is not None else None      # so each date can first be checked at the resolution of the figures
+    state['map_pixels'] = residual_map_pixels(mask_combined, mask_downsampled) if LiCSAlert_settings['residual_maps'] else None                # which pixel of the ifgs each pixel of the residual maps comes from
+    return state
+
+
+def apply_combined_mask(ifgs, mask_ifgs, mask_combined):
+    """ The ifgs (as row vectors) with the combined mask (from update_mask_sources_ifgs), which must not unmask any pixels that are masked in mask_ifgs.  
+    The same as the ifgs returned by update_mask_sources_ifgs, but without making each ifg a masked array.  
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import numpy as np
+    keep = ~np.asarray(mask_combined)[~np.asarray(mask_ifgs)]                                   # for each pixel of the ifgs as row vectors, True if it isn't masked in the combined mask
+    return np.asarray(ifgs)[:, keep]
+
+
+#%%
+ 
+def detect_new_ifgs(folder_ifgs, folder_LiCSAlert):
+    """ Determine the number of LiCSAR ifgs in a folder, and detect if this changes.  Note that it has different returns, depending on if 
+    it is in the simple "initate" mode or not (if not, also returns a flag of if new interferograms have been detected).  
+    Inputs:
+        folder_ifgs | path | path to LiCSAR ifgs.  
+        folder_LiCSAlert | path | path to where LiCSAlert_monitoring_mode is being run.  
+    Rerturns:
+        new_ifgs_flag | Boolean | True if there are LiCSAR ifgs after the last LiCSAlert product.  
+        LiCSAR_last_acq | string | date as string in format YYYYMMDD for the last LiCSAR acquisition.  
+
+    History:
+        2020/02/18 | MEG |  Written        
+        2020/06/29 | MEG | Major rewrite to use a folder based structure    
+        2020/11/17 | MEG | Write the docs and add compare_two_dates function.  
+
+    """
+    import os 
+    import datetime
+    from licsalert.LiCSAlert_aux_functions import compare_two_dates, LiCSAR_ifgs_to_s1_acquisitions
+    
+    
+    def check_LiCSAlert_products(dates):
+        """ Given a list of dates in which LiCSAlert has been run, check that the required outputs are present in each folder.  
+        Inputs:
+            dates | list of strings | dates that LiCSAlert was run until.  In form YYYYMMDD
+        Returns:
+            dates_incomplete | list of strings | dates that a LiCSAlert folder exisits, but it doesn't have all the ouptuts.  
+        History:
+            2020/11/13 | MEG | Written
+        """
+        from pathlib import Path
+        import os
+        import fnmatch                                                                      # used to compare lists and strings using wildcards
+        
+        constant_outputs = ['mask_changes_graph.png',                                      # The output files that are expected to exist and never change name
+                            'mask_changes.png']
+        variable_outputs = ['LiCSAlert_figure_with_*_monitoring_interferograms.png']        # The output files that are expected to exist and change name.  
+
+        dates_incomplete = []
+        for date in dates:
+            date_folder = Path(folder_LiCSAlert + date)                                     # join to make a path to the current date folder
+            date_files = sorted([f.name for f in os.scandir(date_folder)])                  # get names of the files in this folder (no paths)
+            
+            # 1: look for the products that don't change name (ie all but the first)
+            all_products_complete = True                                                                            # initiate as True
+            for constant_output in constant_outputs:                                                                # loop through the outputs that can't change name
+                all_products_complete = (all_products_complete) and (constant_output in date_files)                 # update boolean 
+            # 2: look for the product that does change name (the main figure)
+            for variable_output in variable_outputs:                                                                # loop through the outputs that can change name
+                output = fnmatch.filter(date_files, "LiCSAlert_figure_with_*_monitoring_interferograms.png")        # check for file with wildcard for changing name
+                all_products_complete = (all_products_complete) and (len(output) > 0)                               # empty list if file doesn't exit, use to update boolean
+                
+            if all_products_complete is False:
+                dates_incomplete.append(date)                                                                       # create a list of dates for which otputs are missing
+        return dates_incomplete
+        
+    
+   
+    # 0: Get the last acquisition that LiCSAR has been run until.  
+    LiCSAR_ifgs = sorted([f.name for f in os.scandir(folder_ifgs) if f.is_dir()])                # get names of folders produced by LiCSAR (ie the ifgs), and keep chronological.  
+    # check for empty directory:
+    if not LiCSAR_ifgs:                                                                          # RR addition?  To check that the list isn't empty
+        print(f"No files found in {folder_ifgs} ... ")
+        return False, False                                                                     # return back to parent function (new_ifg_flag, LiCSAR_last_acq)
+    
+    s1_acquisitions = LiCSAR_ifgs_to_s1_acquisitions(LiCSAR_ifgs)                               # a list of the unique dates that LiCSAR ifgs span.  
+    LiCSAR_last_acq = LiCSAR_ifgs[-1][-8:]                                                      # this is the last date that LiCSAR has processed up to, in the form YYYYMMDD
+    
+    # 1: Get the last date that LiCAlert has been run until
+    LiCSAlert_dates = sorted([f.name for f in os.scandir(folder_LiCSAlert) if f.is_dir()])      # get names of folders produced by LiCSAR (ie the ifgs), and keep chronological.  
+    for unneeded_folder in ['LiCSBAS', 'ICASAR_results', 'mask_history', 'stage_cache', 'LiCSAlert_results', 'LiCSAlert_residual_maps']:                                       # these folders get caught in the dates list, but aren't dates so need to be deleted.  
+        try:
+            LiCSAlert_dates.remove(unneeded_folder)                                             # note that the LiCSBAS folder also gets caught by this, and needs removing as it's not a date.  
+        except:
+            pass                                                                                # however, on the first ever run these don't exist.  
+    if len(LiCSAlert_dates) == 0:                                                               # if the list is of length 0, LiCSAlert has not been run yet.  
+        new_ifgs_flag = True                                                                    # if LiCSAlert hasn't been run yet but the LiCSAR_ifgs is not empty, there must be new interferograms.  
+        return new_ifgs_flag, LiCSAR_last_acq, s1_acquisitions                                  # return to parent function.  
+    else:
+        LiCSAlert_last_run = LiCSAlert_dates[-1]                                                # folder are YYYYMMDD so last one is last time it was run until.  
+
+    # If there are any LiCSAlert_dates:
+    if LiCSAlert_dates:
+        # Check that LiCSAlert has run succesfully before in each folder
+        dates_incomplete = check_LiCSAlert_products(LiCSAlert_dates)
+        if len(dates_incomplete) > 0:
+            print(f"LiCSBAS products have not be found for {dates_incomplete}")
+        # Remove incomplete dates from LiCSAlert_dates:
+        LiCSAlert_dates = [i for i in LiCSAlert_dates
+                           if i not in dates_incomplete]    
+        # If there are any dates left:
+        if LiCSAlert_dates:
+            LiCSAlert_last_run = LiCSAlert_dates[-1]                                            # folder are YYYYMMDD so last one is last time it was run until.  
+
+
+    # 2: Compare 0 (the last LiCSAR acquisition) and 1 (the last date LiCSAlert has been run until)
+    if len(LiCSAlert_dates) == 0:                                                                       # if there are no LiCSAlert dates, it hasn't been run for this volcano.  
+        #print("It appears that LiCSAlert hasn't been run for this volcano yet.  Setting the 'new_ifgs_flag' to True.  ")
+        new_ifgs_flag = True
+    else:
+        new_ifgs_flag = compare_two_dates(LiCSAlert_last_run, LiCSAR_last_acq)              # check if the last LiCSAR acquisition is after the last date LiCSAlert was run until.  
+       
+    return new_ifgs_flag, LiCSAR_last_acq, s1_acquisitions
+    
+
+
+#%%
+
+def read_config_file(config_file):
+    """Given a .txt file of arguments, read it into dictionaries
+    Inputs:
+        config_file | string | .txt file to open
+    Returns:
+        LiCSAR_settings | dict | 
+        LiCSBAS_settings | dict | as per used by map_profile_wrapper
+        ICASAR_settings | dict | as per used by map_profile_wrapper
+       
+    History:
+        2020/05/29 | MEG | Written
+        2020/06/29 | MEG | Modified for use with LiCSAlert
+        2020/06/30 | MEG | Add LiCSAlert settings
+        2020/11/17 | MEG | Add the argument baseline_end to LiCSAlert_settings
+        2026/10/18 | MEG | Add the optional argument dtype to LiCSAlert_settings (float64 if not set)
+        2026/10/18 | MEG | Add the optional arguments memory_budget (MB) and n_threads to LiCSAlert_settings
+        2026/10/18 | MEG | Add the optional arguments sketch_size and sketch_method to LiCSAlert_settings
+        2026/10/18 | MEG | Add the optional argument cascade_fraction to LiCSAlert_settings
+        2026/10/18 | MEG | Add the optional argument cache_size to LiCSAlert_settings
+        2026/10/18 | MEG | Add the optional argument frame_level to LiCSBAS_settings
+        2026/10/18 | MEG | Allow downsample_run and downsample_plot to be 'auto', and add the optional arguments max_memory_MB and max_time_s to LiCSAlert_settings
+        2026/10/18 | MEG | Add the optional argument cost_model to LiCSAlert_settings
+        2026/10/18 | MEG | Add the optional argument residual_maps to LiCSAlert_settings
+    """
+    import configparser    
+   
+   
+    LiCSAR_settings = {}                                                                       # initiate
+    LiCSBAS_settings = {}
+    LiCSAlert_settings = {}
+    ICASAR_settings = {}
+   
+    config = configparser.ConfigParser()                                                       # read the config file
+    config.read_file(open(config_file))
+   
+    LiCSAR_settings['frame'] = config.get('LiCSAR', 'frame')                                    # 1:  LiCSAR settings
+    
+    west = float(config.get('LiCSBAS', 'west'))                                                 # 2: LiCSBAS
+    east = float(config.get('LiCSBAS', 'east'))                                                 # Some need to be extracted individually...
+    south = float(config.get('LiCSBAS', 'south'))
+    north = float(config.get('LiCSBAS', 'north'))
+    LiCSBAS_settings['lon_lat'] = [west, east, south, north]                                    # and then merged together into one item in the dictionary (e.g. a list or tuple)
+    LiCSBAS_settings['frame_level'] = config.getboolean('LiCSBAS', 'frame_level', fallback = False)          # optional, if True LiCSBAS is run once for all the volcanoes in the frame
+    
+    for downsample in ['downsample_run', 'downsample_plot']:                                    # 3 LiCSAlert settings
+        value = config.get('LiCSAlert', downsample)                                             # either a float, or 'auto' to choose it from max_memory_MB and max_time_s
+        LiCSAlert_settings[downsample] = 'auto' if value.strip() == 'auto' else float(value)
+    LiCSAlert_settings['baseline_end'] = str(config.get('LiCSAlert', 'baseline_end'))                 
+    LiCSAlert_settings['dtype'] = str(config.get('LiCSAlert', 'dtype', fallback = 'float64'))                # optional, float32 halves the memory used
+    memory_budget = config.get('LiCSAlert', 'memory_budget', fallback = None)                                  # optional, if set (in MB) the inversion works on blocks of pixels
+    LiCSAlert_settings['memory_budget'] = None if memory_budget is None else float(memory_budget)
+    LiCSAlert_settings['n_threads'] = int(config.get('LiCSAlert', 'n_threads', fallback = 1))                 # optional, number of threads the blocks are processed on
+    sketch_size = config.get('LiCSAlert', 'sketch_size', fallback = None)                                      # optional, if set the time courses are estimated from a sketch of this many pixels
+    LiCSAlert_settings['sketch_size'] = None if sketch_size is None else int(sketch_size)
+    LiCSAlert_settings['sketch_method'] = str(config.get('LiCSAlert', 'sketch_method', fallback = 'subset'))
+    cascade_fraction = config.get('LiCSAlert', 'cascade_fraction', fallback = None)                            # optional, if set each date is first checked at the resolution of the figures
+    LiCSAlert_settings['cascade_fraction'] = None if cascade_fraction is None else float(cascade_fraction)
+    LiCSAlert_settings['residual_maps'] = config.getboolean('LiCSAlert', 'residual_maps', fallback = False)            # optional, if True the maps of the residual of the latest date are saved
+    cache_size = config.get('LiCSAlert', 'cache_size', fallback = None)                                        # optional, if set (in MB) the results of each stage are cached in the volcano's stage_cache folder
+    LiCSAlert_settings['cache_size'] = None if cache_size is None else float(cache_size)
+    for budget in ['max_memory_MB', 'max_time_s']:                                                             # optional, if set the settings are chosen to fit within them (see preflight.py)
+        value = config.get('LiCSAlert', budget, fallback = None)
+        LiCSAlert_settings[budget] = None if value is None else float(value)
+    LiCSAlert_settings['cost_model'] = config.get('LiCSAlert', 'cost_model', fallback = None)                 # optional, .json of the benchmark results or a calibrated cost model (see preflight.load_cost_model)
+    
+    ICASAR_settings['n_comp'] = int(config.get('ICASAR', 'n_comp'))                             # 4: ICASAR settings
+    n_bootstrapped =  int(config.get('ICASAR', 'n_bootstrapped'))                 
+    n_not_bootstrapped =  int(config.get('ICASAR', 'n_not_bootstrapped'))                 
+    ICASAR_settings['bootstrapping_param'] = (n_bootstrapped, n_not_bootstrapped)
+    
+    HDBSCAN_min_cluster_size =  int(config.get('ICASAR', 'HDBSCAN_min_cluster_size'))                 
+    HDBSCAN_min_samples =  int(config.get('ICASAR', 'HDBSCAN_min_samples'))                 
+    ICASAR_settings['hdbscan_param'] = (HDBSCAN_min_cluster_size, HDBSCAN_min_samples)
+    
+    tsne_perplexity = int(config.get('ICASAR', 'tsne_perplexity'))                 
+    tsne_early_exaggeration = int(config.get('ICASAR', 'tsne_early_exaggeration'))                 
+    ICASAR_settings['tsne_param'] = (tsne_perplexity, tsne_early_exaggeration)
+    
+    ica_tolerance = float(config.get('ICASAR', 'ica_tolerance'))                 
+    ica_max_iterations = int(config.get('ICASAR', 'ica_max_iterations'))                 
+    ICASAR_settings['ica_param'] = (ica_tolerance, ica_max_iterations)
+    
+    return LiCSAR_settings, LiCSBAS_settings, LiCSAlert_settings, ICASAR_settings
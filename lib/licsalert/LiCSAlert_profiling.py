@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lightweight instrumentation of LiCSAlert runs.  Each stage of a run (e.g. LiCSBAS, ICASAR, the inversion, figures) is wrapped in a span that
+records its wall time, CPU time, its peak memory (sampled whilst it runs, or the peak of the process if that was reached during the span), and the sizes of any arrays of interest.  These are saved to a .json file, and can also be saved
+in the Prometheus text format (e.g. for the textfile collector of a node exporter) so that run times can be tracked across volcanoes.
+
+@author: Matthew Gaddes
+"""
+
+#%%
+
+class RunProfile(object):
+    """ A record of the stages (spans) of a LiCSAlert run.
+    e.g.:
+        profile = RunProfile('sierra_negra')
+        with profile.span('ICASAR'):
+            ...
+            profile.record_arrays(sources = sources)
+        profile.write_json('run_profile.json')
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Sample the memory of each span, rather than recording the peak of the process so far.  
+    """
+    def __init__(self, run_name, labels = None, sample_interval = 0.05):
+        """
+        Inputs:
+            run_name | string | 
+            labels | dict or None | e.g. the volcano, which are added to the Prometheus metrics.  
+            sample_interval | float | time (s) between samples of the memory used whilst spans are open.  
+        """
+        import datetime
+        import time
+        self.run_name = run_name
+        self.sample_interval = sample_interval
+        self._sampler = None                                                              # thread that samples the memory whilst any span is open
+        self.labels = {} if labels is None else dict(labels)                              # e.g. the volcano, which are added to the Prometheus metrics
+        self.start_date = datetime.datetime.now().strftime('%Y/%m/%d %H:%M:%S')
+        self.start_time = time.perf_counter()
+        self.spans = []                                                                   # dicts, in the order that they started
+        self._open_spans = []                                                             # stack of spans that haven't finished yet (as spans can be nested)
+
+    def span(self, stage, **labels):
+        """ Context manager to record a stage of a run.  Any keyword arguments are stored as labels of the span (e.g. date = '20201115').
+        """
+        import contextlib
+        import time
+
+        @contextlib.contextmanager
+        def _span():
+            record = {'stage'  : stage,
+                      'parent' : self._open_spans[-1]['stage'] if len(self._open_spans) > 0 else None,
+                      'labels' : labels,
+                      'arrays' : {}}
+            self.spans.append(record)
+            record['_span_peak'] = current_rss()
+            process_peak_start = peak_rss()[0]
+            self._open_spans.append(record)
+            self._start_sampler()
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            try:
+                yield record
+                record['status'] = 'ok'
+            except BaseException:
+                record['status'] = 'failed'
+                raise
+            finally:
+                record['wall_time_s'] = time.perf_counter() - wall_start
+                record['cpu_time_s'] = time.process_time() - cpu_start
+                self._sample()
+                span_peak = record.pop('_span_peak')
+                if (span_peak is not None) and (peak_rss()[0] > process_peak_start):
+                    span_peak = max(span_peak, peak_rss()[0])                                                    # the process reached a new peak during this span (which the samples could have missed)
+                record['span_peak_rss_MB'] = None if span_peak is None else float(span_peak)                     # the largest memory used whilst this span was open
+                record['process_peak_rss_MB'], record['process_peak_rss_children_MB'] = peak_rss()               # the largest memory used by the process so far (not just in this span)
+                self._open_spans.remove(record)
+                if len(self._open_spans) == 0:
+                    self._stop_sampler()
+        return _span()
+
+    def _sample(self):
+        """ Update the peak memory of the open spans with the memory used now.  
+        """
+        rss = current_rss()
+        if rss is None:
+            return
+        for record in list(self._open_spans):
+            if (record.get('_span_peak') is not None) and rss > record['_span_peak']:
+                record['_span_peak'] = rss
+
+    def _start_sampler(self):
+        """ Start the thread that samples the memory (if it's not already running).  
+        """
+        import threading
+        if (self._sampler is not None) or (current_rss() is None):
+            return
+        stop = threading.Event()
+        def sample_loop():
+            while not stop.wait(self.sample_interval):
+                self._sample()
+        thread = threading.Thread(target = sample_loop, name = 'RunProfile sampler', daemon = True)
+        self._sampler = (thread, stop)
+        thread.start()
+
+    def _stop_sampler(self):
+        if self._sampler is not None:
+            thread, stop = self._sampler
+            stop.set()
+            thread.join()
+            self._sampler = None
+
+    def add_span(self, stage, wall_time_s, status = 'ok', **labels):
+        """ Record a stage that was timed elsewhere (e.g. a LiCSBAS step that ran at the same time as others, so couldn't be in a span).  
+        """
+        self.spans.append({'stage'       : stage,
+                           'parent'      : self._open_spans[-1]['stage'] if len(self._open_spans) > 0 else None,
+                           'labels'      : labels,
+                           'arrays'      : {},
+                           'status'      : status,
+                           'wall_time_s' : wall_time_s,
+                           'cpu_time_s'  : 0.})
+
+    def record_arrays(self, **arrays):
+        """ Record the shapes and sizes of arrays in the current (innermost) span.
+        """
+        if len(self._open_spans) == 0:
+            return
+        for name, array in arrays.items():
+            if array is None:
+                continue
+            self._open_spans[-1]['arrays'][name] = {'shape' : [int(i) for i in array.shape],
+                                                    'dtype' : str(array.dtype),
+                                                    'MB'    : float(array.size * array.dtype.itemsize / 1e6)}
+
+    def extend(self, profile, **labels):
+        """ Add the spans of another profile (e.g. the one for a single date) to this one, with extra labels.
+        """
+        import copy
+        for span_record in profile.spans:
+            span_record = copy.deepcopy(span_record)
+            span_record['labels'].update(labels)
+            self.spans.append(span_record)
+
+    def summary(self):
+        """ Return the profile as a dict, which is what is saved to the .json file.
+        """
+        import time
+        peak_rss_MB, peak_rss_children_MB = peak_rss()
+        return {'run_name'                     : self.run_name,
+                'labels'                       : self.labels,
+                'start_date'                   : self.start_date,
+                'wall_time_s'                  : time.perf_counter() - self.start_time,
+                'process_peak_rss_MB'          : peak_rss_MB,
+                'process_peak_rss_children_MB' : peak_rss_children_MB,
+                'spans'                        : [{key : value for key, value in span_record.items() if key != '_span_peak'} for span_record in self.spans]}
+
+    def write_json(self, out_file):
+        """ Save the profile to a .json file (usually run_profile.json)
+        """
+        import json
+        with open(out_file, 'w') as f:
+            json.dump(self.summary(), f, indent = 2)
+
+    def write_prometheus(self, out_file):
+        """ Save the total time of each stage in the Prometheus text format.  The file is written to a temporary file and then
+        renamed, as is required by the textfile collector of the node exporter.
+        """
+        import os
+
+        stage_totals = {}                                                                              # stages can happen more than once (e.g. once per date), so sum them
+        for span_record in self.spans:
+            totals = stage_totals.setdefault(span_record['stage'], {'wall' : 0., 'cpu' : 0., 'count' : 0, 'failed' : 0})
+            totals['wall'] += span_record.get('wall_time_s', 0.)
+            totals['cpu'] += span_record.get('cpu_time_s', 0.)
+            totals['count'] += 1
+            totals['failed'] += int(span_record.get('status') == 'failed')
+
+        run_labels = ",".join([f'{key}="{prometheus_escape(value)}"' for key, value in self.labels.items()])
+        lines = ['# HELP licsalert_stage_wall_seconds Wall time of each stage of the last LiCSAlert run.',
+                 '# TYPE licsalert_stage_wall_seconds gauge']
+        lines += [f'licsalert_stage_wall_seconds{{{run_labels},stage="{prometheus_escape(stage)}"}} {totals["wall"]:.6f}' for stage, totals in stage_totals.items()]
+        lines += ['# HELP licsalert_stage_cpu_seconds CPU time of each stage of the last LiCSAlert run.',
+                  '# TYPE licsalert_stage_cpu_seconds gauge']
+        lines += [f'licsalert_stage_cpu_seconds{{{run_labels},stage="{prometheus_escape(stage)}"}} {totals["cpu"]:.6f}' for stage, totals in stage_totals.items()]
+        lines += ['# HELP licsalert_stage_failures Number of times each stage of the last LiCSAlert run failed.',
+                  '# TYPE licsalert_stage_failures gauge']
+        lines += [f'licsalert_stage_failures{{{run_labels},stage="{prometheus_escape(stage)}"}} {totals["failed"]}' for stage, totals in stage_totals.items()]
+        summary = self.summary()
+        lines += ['# HELP licsalert_run_wall_seconds Wall time of the last LiCSAlert run.',
+                  '# TYPE licsalert_run_wall_seconds gauge',
+                  f'licsalert_run_wall_seconds{{{run_labels}}} {summary["wall_time_s"]:.6f}',
+                  '# HELP licsalert_run_peak_rss_bytes Peak resident memory of the last LiCSAlert run (including child processes such as LiCSBAS).',
+                  '# TYPE licsalert_run_peak_rss_bytes gauge',
+                  f'licsalert_run_peak_rss_bytes{{{run_labels}}} {int(1e6 * max(summary["process_peak_rss_MB"], summary["process_peak_rss_children_MB"]))}']
+
+        with open(f"{out_file}.tmp", 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(f"{out_file}.tmp", out_file)
+
+
+#%%
+
+def profile_span(profile, stage, **labels):
+    """ Return profile.span(stage), or a context manager that does nothing if profile is None.  Used so that functions can
+    take an optional profile argument.
+    """
+    import contextlib
+    if profile is None:
+        return contextlib.nullcontext()
+    else:
+        return profile.span(stage, **labels)
+
+
+def prometheus_escape(value):
+    """ Escape a label value for the Prometheus text format (backslashes, double quotes, and new lines).  
+    """
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def current_rss():
+    """ Return the resident set size (MB) of this process now, or None if it can't be found (it is read from /proc, so only on linux).  
+    """
+    import os
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            n_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return n_pages * os.sysconf('SC_PAGE_SIZE') / 1e6
+
+
+def peak_rss():
+    """ Return the peak resident set size (MB) of this process and of its (finished) child processes (e.g. LiCSBAS), over the whole life of the process.
+    """
+    import resource
+    import sys
+
+    if sys.platform == 'darwin':                                                     # bytes on mac, kilobytes (1024 bytes) on linux
+        scale = 1e-6
+    else:
+        scale = 1024 / 1e6
+    peak_rss_self = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    peak_rss_children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return peak_rss_self, peak_rss_children
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Replay monitoring mode over an existing LiCSBAS time series (cum.h5), to see what LiCSAlert would have reported on each past date, without
+making GEOC folders or running LiCSBAS for each date.
+
+For each acquisition after baseline_end, the time series is cut at that date, mean centred and downsampled (LiCSAlert_preprocessing_run), combined with
+the mask of the sources (as per update_mask_sources_ifgs), and the results that monitoring mode would save for that date (LiCSAlert_results.json and .csv)
+are made.  By default, the mask of the pixels is those that are nan in any acquisition up to the last date that is replayed, which is the mask that
+monitoring mode uses when it catches up on several dates (as it reads the whole of cum.h5, see LiCSBAS_to_LiCSAlert), so the results of each date are
+those of LiCSAlert with the ifgs up to it.  With mask_per_date, the mask of each date is those that are nan in any acquisition up to it (as if
+monitoring mode had been run on every date), so pixels that became incoherent later are still used for the earlier dates, and the distances can
+differ from those of a run that caught up on the dates.  Rather than
+re-running LiCSAlert with all the interferograms for each date, the projection of each interferogram onto the sources and the cumulative residual
+are kept (ReplayState), so each date only adds one interferogram.  This is only rebuilt when the mask changes (e.g. a pixel became incoherent).
+The time courses for each date are made from this as per parameter_sweep.py (i.e. with the baseline and monitoring ifgs mean centred separately,
+as bss_components_inversion does), and then passed to tcs_baseline and tcs_monitoring as per LiCSAlert.
+
+The replay uses the cum.h5 of the latest run of LiCSBAS, so the displacements of past dates may differ slightly from those that LiCSBAS made at the
+time.  No figures are made, and memory_budget, sketch_size and cascade_fraction (which don't change the alerts) are not used.
+
+e.g. for several volcanoes at once:
+    python -m licsalert.LiCSAlert_replay volcano_1 volcano_2 --LiCSAlert_volcs_dir ... --out_dir replays --n_processes 8
+
+@author: Matthew Gaddes
+"""
+
+#%%
+
+class ReplayState(object):
+    """ The projection of each interferogram (with the combined mask) onto the sources, and the squared norm of the cumulative residual (and its dot
+    product with the reconstruction of a constant), in the form used by sweep_time_courses.  Interferograms are added one (or more) at a time.
+
+    History:
+        2026/10/18 | MEG | Written
+    """
+    def __init__(self, sources):
+        """
+        Inputs:
+            sources | r2 array | sources as row vectors, with the combined mask.
+        """
+        import numpy as np
+        self.sources = np.asarray(sources, dtype = 'float64')
+        gtg_inv = np.linalg.inv(self.sources @ self.sources.T)
+        self.pinv = gtg_inv @ self.sources                                                                   # n_sources x n_pixels, so that the time courses are pinv @ d
+        self.tcs_constant = gtg_inv @ np.sum(self.sources, axis = 1)
+        self.reconstruction_constant = self.tcs_constant @ self.sources
+        self.residual_c = np.zeros(self.sources.shape[1])                                                   # the cumulative residual of each pixel (of the ifgs so far)
+        self.tcs_raw = np.zeros((0, self.sources.shape[0]))
+        self.ifg_sums = np.zeros(0)
+        self.residual_norms = np.zeros(0)
+        self.residual_constant_dots = np.zeros(0)
+
+    def add_ifgs(self, ifgs):
+        """ Add some interferograms (as row vectors, with the combined mask) to the end of the time series.
+        """
+        import numpy as np
+        ifgs = np.asarray(ifgs, dtype = 'float64')
+        tcs_raw = ifgs @ self.pinv.T
+        residual_c = self.residual_c + np.cumsum(ifgs - (tcs_raw @ self.sources), axis = 0)
+        self.residual_c = residual_c[-1]
+        self.tcs_raw = np.vstack((self.tcs_raw, tcs_raw))
+        self.ifg_sums = np.concatenate((self.ifg_sums, np.sum(ifgs, axis = 1)))
+        self.residual_norms = np.concatenate((self.residual_norms, np.sum(residual_c**2, axis = 1)))
+        self.residual_constant_dots = np.concatenate((self.residual_constant_dots, residual_c @ self.reconstruction_constant))
+
+    def projection(self):
+        """ The state in the form returned by sweep_projection.
+        """
+        import numpy as np
+        return {'tcs_raw'                : self.tcs_raw,
+                'tcs_constant'           : self.tcs_constant,
+                'ifg_sums'               : self.ifg_sums,
+                'residual_norms'         : self.residual_norms,
+                'residual_constant_dots' : self.residual_constant_dots,
+                'constant_norm'          : float(np.sum(self.reconstruction_constant**2)),
+                'n_pixels'               : self.sources.shape[1]}
+
+
+#%%
+
+def LiCSAlert_replay(cum_file, sources, mask_sources, baseline_end, out_dir, crop_pixels = None, downsample_run = 1.0, dtype = 'float64',
+                     alert_sigma = 3., t_recalculate = 10, end_date = None, save_dates = True, mask_per_date = False):
+    """ Replay monitoring mode for one volcano, date by date, over an existing LiCSBAS time series.
+    Inputs:
+        cum_file | string | cum.h5 made by LiCSBAS.
+        sources | r2 array | sources (from ICASAR) as row vectors.
+        mask_sources | r2 boolean | the mask of the sources.
+        baseline_end | string | YYYYMMDD.  LiCSAlert is replayed for each acquisition after this.
+        out_dir | string or Path | a folder (YYYYMMDD) of results is made in this for each date, as per monitoring mode, and replay_summary.csv.
+        crop_pixels | tuple or None | as per LiCSBAS_to_LiCSAlert (e.g. from frame_crop_pixels for frame level LiCSBAS).
+        downsample_run | float | as per monitoring mode.
+        dtype | string | precision of the interferograms (the time courses are always calculated in float64).
+        alert_sigma | float | as per monitoring mode.
+        t_recalculate | int | as per LiCSAlert (monitoring mode uses 10).
+        end_date | string or None | YYYYMMDD.  If not None, the replay stops at this date.
+        save_dates | boolean | if False, only replay_summary.csv is saved.
+        mask_per_date | boolean | if False, the pixels that are nan in any acquisition up to the last date are masked for every date (as per monitoring 
+                                  mode when it catches up on several dates).  If True, only those that are nan up to each date (see above).  
+    Returns:
+        summary | list of dicts | one per date: date, n_ifgs, n_pixels, mask_changed, alert, max_distance, and max_distance_tc (e.g. 'IC1' or 'residual').
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Use the mask of the last date for every date (as per monitoring mode), unless mask_per_date.  
+    """
+    import os
+    import datetime
+    import numpy as np
+    import h5py as h5
+    from licsalert.LiCSAlert_functions import LiCSAlert_preprocessing_run, tcs_baseline, tcs_monitoring, save_LiCSAlert_results
+    from licsalert.LiCSAlert_aux_functions import compare_two_dates, get_baseline_end_ifg_n
+    from licsalert.parameter_sweep import sweep_time_courses
+
+    # 0: Read the (cropped) time series once, as each date only needs the acquisitions up to it.
+    with h5.File(cum_file, 'r') as cumh5:
+        imdates = cumh5['imdates'][()].astype(str).tolist()
+        if crop_pixels is None:
+            cumulative = cumh5['cum'][()]
+        else:
+            cumulative = cumh5['cum'][:, crop_pixels[2]:crop_pixels[3], crop_pixels[0]:crop_pixels[1]]
+    acq_datetimes = [datetime.datetime.strptime(imdate, '%Y%m%d') for imdate in imdates]
+    time_values = np.cumsum([(acq_datetimes[acq_n+1] - acq_datetimes[acq_n]).days for acq_n in range(len(imdates) - 1)])     # cumulative temporal baselines, as per LiCSBAS_to_LiCSAlert
+    n_baseline_end = get_baseline_end_ifg_n(imdates, baseline_end) + 1
+    n_sources = sources.shape[0]
+    replay_dates = [imdate for imdate in imdates if compare_two_dates(baseline_end, imdate) and ((end_date is None) or (int(imdate) <= int(end_date)))]
+    os.makedirs(out_dir, exist_ok = True)
+    print(f"Replaying {len(replay_dates)} dates, from {replay_dates[0] if len(replay_dates) > 0 else None} to {replay_dates[-1] if len(replay_dates) > 0 else None}.  ")
+
+    def preprocessed_ifgs(acq_start, acq_end, mask):
+        """ The incremental ifgs between two acquisitions, mean centred and downsampled with the mask of the time series (as per LiCSBAS_to_LiCSAlert
+        and LiCSAlert_preprocessing_run).  Returns the ifgs and the mask after downsampling.
+        """
+        incremental = np.diff(cumulative[acq_start:acq_end+1], axis = 0)[:, ~mask].astype(dtype)
+        displacement_r2 = LiCSAlert_preprocessing_run({'incremental' : incremental, 'mask' : mask}, downsample_run, dtype)
+        return displacement_r2['incremental'], displacement_r2['mask']
+
+    # 1: Work through each date, adding its ifg to the state (or rebuilding the state if the mask has changed)
+    if len(replay_dates) == 0:
+        mask_nan = None
+    elif mask_per_date:
+        mask_nan = np.any(np.isnan(cumulative[:imdates.index(replay_dates[0])]), axis = 0)
+    else:
+        mask_nan = np.any(np.isnan(cumulative[:imdates.index(replay_dates[-1])+1]), axis = 0)                  # as per monitoring mode, when it catches up on these dates
+    mask_ifgs = None
+    state = None
+    summary = []
+    for replay_date in replay_dates:
+        acq_n = imdates.index(replay_date)                                                                    # the time series on this date has acq_n ifgs
+        mask_nan_date = np.logical_or(mask_nan, np.isnan(cumulative[acq_n])) if mask_per_date else mask_nan
+        mask_changed = (state is None) or (not np.array_equal(mask_nan_date, mask_nan))
+        mask_nan = mask_nan_date
+        if mask_changed:                                                                                      # the pixels have changed, so all the ifgs are needed again
+            ifgs, mask_ifgs = preprocessed_ifgs(0, acq_n, mask_nan)
+            mask_combined = ~np.logical_and(~mask_sources, ~mask_ifgs)                                        # as per update_mask_sources_ifgs
+            pixels_ifgs = (~mask_combined)[~mask_ifgs]                                                        # the pixels of the ifgs (and sources) that are in the combined mask
+            pixels_sources = (~mask_combined)[~mask_sources]
+            state = ReplayState(sources[:, pixels_sources])
+            state.add_ifgs(ifgs[:, pixels_ifgs])
+        else:
+            ifg, _ = preprocessed_ifgs(acq_n - 1, acq_n, mask_nan)                                            # only the ifg that ends on this date
+            state.add_ifgs(ifg[:, pixels_ifgs])
+
+        # 2: The time courses, as LiCSAlert would make them with the ifgs up to this date
+        tcs_c = sweep_time_courses(state.projection(), n_baseline_end)
+        sources_tcs = tcs_baseline(tcs_c[:n_baseline_end, :n_sources], time_values[:n_baseline_end], t_recalculate)
+        residual_tcs = tcs_baseline(tcs_c[:n_baseline_end, n_sources:], time_values[:n_baseline_end], t_recalculate)
+        if acq_n > n_baseline_end:
+            sources_tcs = tcs_monitoring(tcs_c[n_baseline_end:, :n_sources] - tcs_c[n_baseline_end-1, :n_sources], sources_tcs, time_values)     # tcs_monitoring continues these from the end of the baseline
+            residual_tcs = tcs_monitoring(tcs_c[:, n_sources:], residual_tcs, time_values, residual = True)
+
+        # 3: The results, as saved by monitoring mode for this date
+        if save_dates:
+            os.makedirs(f"{out_dir}/{replay_date}", exist_ok = True)
+            results = save_LiCSAlert_results(sources_tcs, residual_tcs, n_baseline_end, time_values[:acq_n], f"{out_dir}/{replay_date}/LiCSAlert_results",
+                                             imdates, alert_sigma)
+            alert = results['alert']
+        distances = np.array([np.ravel(tc['distances'])[-1] for tc in sources_tcs + residual_tcs])
+        if not save_dates:
+            alert = bool((acq_n > n_baseline_end) and (np.max(distances) > alert_sigma))
+        summary.append({'date'            : replay_date,
+                        'n_ifgs'          : acq_n,
+                        'n_pixels'        : int(np.sum(pixels_sources)),
+                        'mask_changed'    : bool(mask_changed),
+                        'alert'           : bool(alert),
+                        'max_distance'    : float(np.max(distances)),
+                        'max_distance_tc' : f"IC{np.argmax(distances)}" if np.argmax(distances) < n_sources else 'residual'})
+
+    header = ['date', 'n_ifgs', 'n_pixels', 'mask_changed', 'alert', 'max_distance', 'max_distance_tc']
+    with open(f"{out_dir}/replay_summary.csv", 'w') as f:
+        f.write(",".join(header) + "\n")
+        for row in summary:
+            f.write(",".join([f"{row[key]:.4f}" if key == 'max_distance' else str(row[key]) for key in header]) + "\n")
+    return summary
+
+
+#%%
+
+def replay_volcano(volcano, LiCSAlert_volcs_dir, out_dir, alert_sigma = 3., end_date = None, save_dates = True, mask_per_date = False):
+    """ Replay monitoring mode for a volcano, using its config file, its ICASAR results, and its LiCSBAS time series (or that of its frame).
+    Inputs:
+        volcano | string | name of the volcano's folder in LiCSAlert_volcs_dir.
+        LiCSAlert_volcs_dir | string | as per monitoring mode.  Needs trailing /
+        out_dir | string | the results are saved in out_dir/volcano/, with a log (replay_log.txt)
+        others | as per LiCSAlert_replay.
+    Returns:
+        summary | list of dicts | from LiCSAlert_replay.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    from licsalert.LiCSAlert_monitoring_functions import read_config_file, load_ICASAR_results, frame_LiCSBAS_dir, frame_crop_pixels
+    from licsalert.run_logging import log_run
+    import os
+
+    volcano_dir = f"{LiCSAlert_volcs_dir}{volcano}/"
+    os.makedirs(f"{out_dir}/{volcano}", exist_ok = True)
+    with log_run(f"{out_dir}/{volcano}/replay_log.txt", mode = 'w', echo = False, labels = {'volcano' : volcano}):
+        LiCSAR_settings, LiCSBAS_settings, LiCSAlert_settings, ICASAR_settings = read_config_file(f"{volcano_dir}LiCSAlert_settings.txt")
+        sources, mask_sources, _, _, _, _ = load_ICASAR_results(f"{volcano_dir}ICASAR_results/ICASAR_results.pkl")
+        if LiCSBAS_settings['frame_level']:
+            cum_file = f"{frame_LiCSBAS_dir(LiCSAlert_volcs_dir, LiCSAR_settings['frame'])}TS_GEOCmldir/cum.h5"
+            crop_pixels = frame_crop_pixels(cum_file, LiCSBAS_settings['lon_lat'])
+        else:
+            cum_file = f"{volcano_dir}LiCSBAS/TS_GEOCmldir/cum.h5"
+            crop_pixels = None
+        if LiCSAlert_settings['downsample_run'] == 'auto':
+            raise Exception(f"downsample_run is 'auto' in the config file, so the replay can't be sure of the resolution that was used.  Exiting...")
+        return LiCSAlert_replay(cum_file, sources, mask_sources, LiCSAlert_settings['baseline_end'], f"{out_dir}/{volcano}", crop_pixels = crop_pixels,
+                                downsample_run = LiCSAlert_settings['downsample_run'], dtype = LiCSAlert_settings['dtype'], alert_sigma = alert_sigma,
+                                end_date = end_date, save_dates = save_dates, mask_per_date = mask_per_date)
+
+
+def _replay_job(job):
+    """ Run replay_volcano in a pool process, returning any exception as a message so that the other volcanoes carry on.
+    """
+    volcano = job['volcano']
+    try:
+        return volcano, replay_volcano(**job), None
+    except Exception as e:
+        return volcano, None, f"{type(e).__name__}: {e}"
+
+
+def replay_volcanoes(volcanoes, LiCSAlert_volcs_dir, out_dir, n_processes = 1, alert_sigma = 3., end_date = None, save_dates = True, mask_per_date = False):
+    """ Replay monitoring mode for several volcanoes, on a pool of processes.
+    Inputs:
+        volcanoes | list of strings | names of the volcanoes' folders in LiCSAlert_volcs_dir.
+        n_processes | int | number of volcanoes that are replayed at once.
+        others | as per replay_volcano
+    Returns:
+        summaries | dict | the summary of each volcano (from LiCSAlert_replay), or {'error' : message} if it failed.
+        out_dir/replay_alerts.csv | the first alert of each volcano.
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Always stop the pool's processes (even if a job raises), and add mask_per_date argument.  
+    """
+    import multiprocessing
+    import contextlib
+    import time
+
+    jobs = [{'volcano' : volcano, 'LiCSAlert_volcs_dir' : LiCSAlert_volcs_dir, 'out_dir' : out_dir, 'alert_sigma' : alert_sigma,
+             'end_date' : end_date, 'save_dates' : save_dates, 'mask_per_date' : mask_per_date} for volcano in volcanoes]
+    t_start = time.perf_counter()
+    summaries = {}
+    with (multiprocessing.Pool(n_processes) if n_processes != 1 else contextlib.nullcontext()) as pool:            # the processes are stopped when this exits
+        results = map(_replay_job, jobs) if pool is None else pool.imap_unordered(_replay_job, jobs)
+        for volcano, summary, error in results:
+            if error is None:
+                summaries[volcano] = summary
+                alert_dates = [row['date'] for row in summary if row['alert']]
+                print(f"{volcano}: replayed {len(summary)} dates, {len(alert_dates)} with an alert (first: {alert_dates[0] if len(alert_dates) > 0 else None}).  ")
+            else:
+                summaries[volcano] = {'error' : error}
+                print(f"{volcano}: failed ({error})")
+    print(f"Replayed {len(volcanoes)} volcanoes in {time.perf_counter() - t_start:.1f}s.  ")
+
+    with open(f"{out_dir}/replay_alerts.csv", 'w') as f:
+        f.write("volcano,n_dates,n_alerts,first_alert,error\n")
+        for volcano in volcanoes:
+            summary = summaries[volcano]
+            if isinstance(summary, dict):
+                f.write(f"{volcano},,,,{summary['error'].replace(',', ';')}\n")
+            else:
+                alert_dates = [row['date'] for row in summary if row['alert']]
+                f.write(f"{volcano},{len(summary)},{len(alert_dates)},{alert_dates[0] if len(alert_dates) > 0 else ''},\n")
+    return summaries
+
+
+#%%
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description = 'Replay monitoring mode over the existing LiCSBAS time series of some volcanoes.  ')
+    parser.add_argument('volcanoes', nargs = '+')
+    parser.add_argument('--LiCSAlert_volcs_dir', required = True)
+    parser.add_argument('--out_dir', required = True)
+    parser.add_argument('--n_processes', type = int, default = 1)
+    parser.add_argument('--alert_sigma', type = float, default = 3.)
+    parser.add_argument('--end_date', default = None, help = 'YYYYMMDD')
+    parser.add_argument('--summary_only', action = 'store_true', help = "don't save the results of each date")
+    parser.add_argument('--mask_per_date', action = 'store_true', help = 'mask each date with only the pixels that were nan up to it')
+    args = parser.parse_args()
+
+    replay_volcanoes(args.volcanoes, args.LiCSAlert_volcs_dir if args.LiCSAlert_volcs_dir.endswith('/') else f"{args.LiCSAlert_volcs_dir}/",
+                     args.out_dir, args.n_processes, args.alert_sigma, args.end_date, not args.summary_only, args.mask_per_date)
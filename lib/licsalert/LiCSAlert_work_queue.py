@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A work queue for monitoring mode that only needs a shared filesystem (e.g. NFS or Lustre), so that the volcanoes can be run by workers on several
+nodes without a database or message broker.  Each job is a volcano, or all the volcanoes in a frame (if they use frame level LiCSBAS, so that LiCSBAS
+is only run once for the frame).
+
+The queue is a folder:
+    pending/<job_id>.json                 jobs waiting to be run.
+    leases/<job_id>@<worker_id>.json      jobs being run.  A worker claims a job by renaming it from pending/ to here (which is atomic, so only one
+                                          worker can get it), and keeps touching it (a heartbeat) whilst the job runs.
+    committing/<job_id>@<worker_id>.json  jobs being committed.  A worker commits a job by first renaming its lease to here, which fails if its lease
+                                          was reclaimed (e.g. its node stalled), in which case its result is thrown away.  Once the rename has
+                                          succeeded, only that worker has the job, so it saves the result and then renames the job to:
+    done/<job_id>.json                    jobs that have finished (or back to pending/ if the job failed).
+    results/<job_id>.json                 the result of each job (written to a temporary file and renamed).
+    failed/<job_id>.json                  jobs that failed max_attempts times.
+A lease (or a commit) that hasn't been touched for lease_timeout seconds (measured with the clock of the shared filesystem, so the clocks of the nodes
+don't need to agree) is reclaimed by any worker: it is renamed to reclaimed/ (so only one worker can do this), and put back in pending/.  Only renames
+are used to move a job between the folders, so a worker never writes to a path that another worker may have taken the job from.  
+
+e.g.:
+    python -m licsalert.LiCSAlert_work_queue enqueue --queue_dir /shared/queue --LiCSAlert_volcs_dir ... --LiCSAR_frames_dir ...
+    python -m licsalert.LiCSAlert_work_queue work --queue_dir /shared/queue --LiCSBAS_bin ... --LiCSAlert_bin ... --ICASAR_bin ... --LiCSAR_frames_dir ... --LiCSAlert_volcs_dir ...
+    python -m licsalert.LiCSAlert_work_queue status --queue_dir /shared/queue
+
+@author: Matthew Gaddes
+"""
+
+queue_folders = ['pending', 'leases', 'committing', 'done', 'results', 'failed', 'reclaimed', 'logs']
+
+
+#%%
+
+def _queue_paths(queue_dir):
+    """ Make the folders of a queue (if they don't exist), and return their paths (with trailing /).
+    """
+    import os
+    paths = {folder : f"{queue_dir}/{folder}/" for folder in queue_folders}
+    for path in paths.values():
+        os.makedirs(path, exist_ok = True)
+    return paths
+
+
+def _write_json_tmp(path, data):
+    """ Write json to a temporary file in the same folder as path (so that it can be renamed to it), and return the temporary file.
+    """
+    import os
+    import json
+    import socket
+    import threading
+    tmp_path = f"{os.path.dirname(path)}/.{os.path.basename(path)}.{socket.gethostname()}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent = 1)
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp_path
+
+
+def _write_json_atomic(path, data):
+    """ Write json to a temporary file in the same folder, and rename it to path, so that other workers never see a partly written file.
+    """
+    import os
+    os.replace(_write_json_tmp(path, data), path)
+
+
+def _write_json_exclusive(path, data):
+    """ As _write_json_atomic, but only if path doesn't exist.  The file is linked to path (rather than renamed), as a hard link fails if path
+    exists, and is atomic on NFS too (unlike O_EXCL on old versions of NFS).
+    Returns:
+        written | boolean | False if path already existed.
+    """
+    import os
+    tmp_path = _write_json_tmp(path, data)
+    try:
+        os.link(tmp_path, path)
+        return True
+    except FileExistsError:
+        return False
+    finally:
+        os.remove(tmp_path)
+
+
+def _read_json(path):
+    import json
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def filesystem_now(queue_dir):
+    """ The current time of the shared filesystem (the mtime of a file that has just been touched), which the ages of the leases are measured with.
+    """
+    import os
+    clock_file = f"{queue_dir}/logs/.clock.{os.getpid()}"
+    with open(clock_file, 'a'):
+        os.utime(clock_file, None)
+    now = os.stat(clock_file).st_mtime
+    os.remove(clock_file)
+    return now
+
+
+def default_worker_id():
+    """ A name for this worker that is unique across the nodes (host and process id).
+    """
+    import os
+    import socket
+    return f"{socket.gethostname().split('.')[0]}.{os.getpid()}"
+
+
+#%%
+
+def enqueue_job(queue_dir, job_id, volcanoes, frame = None):
+    """ Add a job to the queue, unless it is already pending or being run.
+    Inputs:
+        queue_dir | string | the folder of the queue.
+        job_id | string | e.g. the volcano, or the frame.  Can't contain @ or /.
+        volcanoes | list of strings | the volcanoes that are run (in order) by the job.
+        frame | string or None | the frame of the volcanoes, if they are run together.
+    Returns:
+        enqueued | boolean | False if the job was already in the queue.
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Add the job with a hard link, so that if two workers enqueue it at the same time only one succeeds.  
+    """
+    import os
+    import time
+    paths = _queue_paths(queue_dir)
+    if ('@' in job_id) or ('/' in job_id):
+        raise Exception(f"The job id ({job_id}) can't contain @ or /.  Exiting...")
+    if any([f.startswith(f"{job_id}@") for folder in ['leases', 'committing'] for f in os.listdir(paths[folder])]):
+        return False
+    return _write_json_exclusive(f"{paths['pending']}{job_id}.json", {'job_id' : job_id, 'volcanoes' : list(volcanoes), 'frame' : frame, 'attempts' : 0,
+                                                                      'enqueued' : time.time()})
+
+
+def enqueue_monitoring_jobs(queue_dir, LiCSAlert_volcs_dir, LiCSAR_frames_dir, volcanoes = None, figures = True):
+    """ Add a job for each volcano that has pending dates (or dates with missing products), as found by run_LiCSAlert_status.  Volcanoes that use frame
+    level LiCSBAS are grouped into one job for their frame.  The status of each volcano is logged in the queue's logs/enqueue_log.txt (rather than in
+    the volcano's history, as LiCSAlert isn't being run yet).
+    Inputs:
+        queue_dir | string | the folder of the queue.
+        LiCSAlert_volcs_dir | string | as per monitoring mode.  Needs trailing /
+        LiCSAR_frames_dir | string | as per monitoring mode.  Needs trailing /
+        volcanoes | list or None | if None, all the volcanoes (folders with a LiCSAlert_settings.txt) in LiCSAlert_volcs_dir.
+        figures | boolean | as per monitoring mode (the products that are expected for each date depend on it).
+    Returns:
+        enqueued | list of strings | the ids of the jobs that were added.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import os
+    from licsalert.LiCSAlert_monitoring_functions import read_config_file, run_LiCSAlert_status
+
+    paths = _queue_paths(queue_dir)
+    if volcanoes is None:
+        volcanoes = sorted([f.name for f in os.scandir(LiCSAlert_volcs_dir) if f.is_dir() and os.path.exists(f"{f.path}/LiCSAlert_settings.txt")])
+
+    jobs = {}                                                                                           # job_id : (volcanoes, frame)
+    for volcano in volcanoes:
+        volcano_dir = f"{LiCSAlert_volcs_dir}{volcano}/"
+        LiCSAR_settings, LiCSBAS_settings, LiCSAlert_settings, _ = read_config_file(f"{volcano_dir}LiCSAlert_settings.txt")
+        LiCSAlert_status = run_LiCSAlert_status(f"{LiCSAR_frames_dir}{LiCSAR_settings['frame']}/GEOC/", volcano_dir, LiCSAlert_settings['baseline_end'],
+                                                f"{paths['logs']}enqueue_log.txt", figures = figures)
+        if not isinstance(LiCSAlert_status, dict) or not LiCSAlert_status['run_LiCSAlert']:             # e.g. no LiCSAR ifgs, or still in the baseline stage
+            continue
+        if LiCSBAS_settings['frame_level']:
+            job_id = f"frame_{LiCSAR_settings['frame']}"
+            jobs.setdefault(job_id, ([], LiCSAR_settings['frame']))[0].append(volcano)
+        else:
+            jobs[volcano] = ([volcano], None)
+
+    enqueued = []
+    for job_id, (job_volcanoes, frame) in jobs.items():
+        if enqueue_job(queue_dir, job_id, job_volcanoes, frame):
+            enqueued.append(job_id)
+    print(f"Added {len(enqueued)} jobs to the queue ({len(jobs) - len(enqueued)} were already in it).  ")
+    return enqueued
+
+
+#%%
+
+def claim_job(queue_dir, worker_id):
+    """ Claim the oldest pending job by renaming it to a lease (which only one worker can do).
+    Returns:
+        lease_path | string or None | None if there are no pending jobs.
+        job | dict or None |
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import os
+    paths = _queue_paths(queue_dir)
+    pending = []
+    for pending_file in os.scandir(paths['pending']):
+        if pending_file.name.endswith('.json') and not pending_file.name.startswith('.'):
+            try:
+                pending.append((pending_file.stat().st_mtime, pending_file.name, pending_file))
+            except FileNotFoundError:                                                                    # claimed by another worker whilst looking
+                continue
+    for _, _, pending_file in sorted(pending):
+        lease_path = f"{paths['leases']}{pending_file.name[:-5]}@{worker_id}.json"
+        try:
+            os.rename(pending_file.path, lease_path)
+        except FileNotFoundError:                                                                        # another worker claimed it first
+            continue
+        os.utime(lease_path, None)                                                                       # the first heartbeat
+        return lease_path, _read_json(lease_path)
+    return None, None
+
+
+def reclaim_expired_leases(queue_dir, lease_timeout, max_attempts = 3):
+    """ Put jobs whose lease hasn't been touched for lease_timeout seconds back in pending/ (or in failed/ if they've been tried max_attempts times).
+    Jobs that a worker started to commit but didn't finish (e.g. it crashed) are reclaimed in the same way.
+    Returns:
+        reclaimed | list of strings | ids of the jobs that were reclaimed.
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Also reclaim unfinished commits.  
+    """
+    import os
+    paths = _queue_paths(queue_dir)
+    now = filesystem_now(queue_dir)
+    reclaimed = []
+    leases = [lease for folder in ['leases', 'committing'] for lease in os.scandir(paths[folder])]
+    for lease in leases:
+        if lease.name.startswith('.') or not lease.name.endswith('.json'):
+            continue
+        try:
+            expired = (now - lease.stat().st_mtime) > lease_timeout
+        except FileNotFoundError:                                                                        # committed or reclaimed whilst looking
+            continue
+        if not expired:
+            continue
+        reclaimed_path = f"{paths['reclaimed']}{lease.name}"
+        try:
+            os.rename(lease.path, reclaimed_path)                                                        # only one worker can do this
+        except FileNotFoundError:
+            continue
+        job = _read_json(reclaimed_path)
+        job['attempts'] += 1
+        job.setdefault('lost_leases', []).append(lease.name[:-5].split('@', 1)[1])
+        destination = 'pending' if job['attempts'] < max_attempts else 'failed'
+        _write_json_atomic(f"{paths[destination]}{job['job_id']}.json", job)
+        os.remove(reclaimed_path)
+        print(f"The lease of {lease.name[:-5]} expired, so the job has been put in {destination}/.  ")
+        reclaimed.append(job['job_id'])
+    return reclaimed
+
+
+def commit_job(queue_dir, lease_path, job, result, max_attempts = 3):
+    """ Finish a job by renaming its lease to committing/ (which fails if it has been reclaimed, i.e. another worker may now be running the job, 
+    in which case nothing is saved), saving its result, and then renaming it to done/ (or back to pending/ or to failed/, if it failed).
+    Returns:
+        committed | boolean | False if the lease had been lost.
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Take the job (by renaming the lease) before anything is written, so that the lease is never recreated.  
+    """
+    import os
+    paths = _queue_paths(queue_dir)
+    job_id = job['job_id']
+    commit_path = f"{paths['committing']}{os.path.basename(lease_path)}"
+    try:
+        os.rename(lease_path, commit_path)                                                               # only this worker can now have the job
+    except FileNotFoundError:
+        print(f"The lease of {job_id} was lost (it was reclaimed by another worker), so its result has been discarded.  ")
+        return False
+    try:
+        os.utime(commit_path, None)                                                                      # so it isn't reclaimed whilst it's committed
+    except FileNotFoundError:                                                                            # the lease had already expired, and was reclaimed from committing/
+        print(f"The lease of {job_id} had expired (it was reclaimed by another worker), so its result has been discarded.  ")
+        return False
+    _write_json_atomic(f"{paths['results']}{job_id}.json", result)
+    if result['status'] == 'ok':
+        os.rename(commit_path, f"{paths['done']}{job_id}.json")
+    else:
+        job['attempts'] += 1
+        job['last_error'] = result.get('message', None)
+        _write_json_atomic(f"{paths['pending' if job['attempts'] < max_attempts else 'failed']}{job_id}.json", job)      # with the number of attempts
+        os.remove(commit_path)
+    return True
+
+
+#%%
+
+def run_monitoring_job(job, LiCSBAS_bin, LiCSAlert_bin, ICASAR_bin, LiCSAR_frames_dir, LiCSAlert_volcs_dir, n_para = 1, prometheus_dir = None,
+                       figures = True, alert_sigma = 3., resident = None):
+    """ Run monitoring mode for each of the volcanoes in a job.
+    Returns:
+        result | dict | 'status' is 'ok' if all the volcanoes ran, or 'error' (with a 'message').  'volcanoes' has the status of each one.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import sys
+    for bin_dir in [LiCSAlert_bin, ICASAR_bin]:
+        if bin_dir not in sys.path:
+            sys.path.append(bin_dir)
+    from licsalert.LiCSAlert_monitoring_functions import LiCSAlert_monitoring_mode
+    if figures:
+        import matplotlib
+        matplotlib.use('Agg')                                                                              # no display, as the workers run in the background
+        import matplotlib.pyplot as plt
+
+    result = {'status' : 'ok', 'volcanoes' : {}}
+    for volcano in job['volcanoes']:
+        try:
+            LiCSAlert_monitoring_mode(volcano, LiCSBAS_bin, LiCSAlert_bin, ICASAR_bin, LiCSAR_frames_dir, LiCSAlert_volcs_dir, n_para = n_para,
+                                      prometheus_dir = prometheus_dir, figures = figures, alert_sigma = alert_sigma, resident = resident)
+            result['volcanoes'][volcano] = 'ok'
+        except Exception as e:
+            result['volcanoes'][volcano] = f"{type(e).__name__}: {e}"
+            result['status'] = 'error'
+            result['message'] = f"{volcano}: {type(e).__name__}: {e}"
+        finally:
+            if figures:
+                plt.close('all')                                                                           # figures would otherwise build up between jobs
+    return result
+
+
+def LiCSAlert_queue_worker(queue_dir, run_job, worker_id = None, lease_timeout = 900., heartbeat_interval = 60., max_attempts = 3, poll_interval = 30.,
+                           exit_when_empty = True, max_jobs = None):
+    """ Claim jobs from the queue and run them until it is empty (or forever), touching the lease of the job that is running every heartbeat_interval.
+    Inputs:
+        queue_dir | string | the folder of the queue (on the filesystem shared by the nodes).
+        run_job | function | called with the job (a dict with its volcanoes), and returns a result dict with 'status' ('ok' or 'error').
+                             e.g. functools.partial(run_monitoring_job, LiCSBAS_bin = ..., ...).
+        worker_id | string or None | if None, the host and process id.
+        lease_timeout | float | seconds without a heartbeat after which a lease is reclaimed.  Should be several times heartbeat_interval.
+        heartbeat_interval | float | seconds between the heartbeats.
+        max_attempts | int | times a job is tried (including lost leases) before it is put in failed/.
+        poll_interval | float | seconds to wait before looking again if there are no pending jobs.
+        exit_when_empty | boolean | if True, the worker stops when there are no pending jobs and no leases.
+        max_jobs | int or None | if not None, the worker stops after this many jobs.
+    Returns:
+        n_jobs | int | number of jobs run.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import os
+    import time
+    import threading
+
+    if worker_id is None:
+        worker_id = default_worker_id()
+    paths = _queue_paths(queue_dir)
+    n_jobs = 0
+
+    def heartbeat(lease_path, stop, lost):
+        while not stop.wait(heartbeat_interval):
+            try:
+                os.utime(lease_path, None)
+            except FileNotFoundError:                                                                    # the lease was reclaimed
+                lost.set()
+                return
+
+    while (max_jobs is None) or (n_jobs < max_jobs):
+        reclaim_expired_leases(queue_dir, lease_timeout, max_attempts)
+        lease_path, job = claim_job(queue_dir, worker_id)
+        if lease_path is None:
+            if exit_when_empty and len(os.listdir(paths['leases']) + os.listdir(paths['committing'])) == 0:
+                break
+            time.sleep(poll_interval)                                                                    # other workers may still fail, or their leases expire
+            continue
+
+        print(f"{worker_id}: running {job['job_id']} ({', '.join(job['volcanoes'])})")
+        stop, lost = threading.Event(), threading.Event()
+        heartbeat_thread = threading.Thread(target = heartbeat, args = (lease_path, stop, lost), daemon = True)
+        heartbeat_thread.start()
+        t_start = time.perf_counter()
+        try:
+            result = run_job(job)
+        except Exception as e:
+            result = {'status' : 'error', 'message' : f"{type(e).__name__}: {e}"}
+        finally:
+            stop.set()
+            heartbeat_thread.join()
+        result.update({'job_id' : job['job_id'], 'worker_id' : worker_id, 'duration_s' : time.perf_counter() - t_start})
+        if lost.is_set():
+            print(f"{worker_id}: the lease of {job['job_id']} was lost whilst it was running.  ")
+        if commit_job(queue_dir, lease_path, job, result, max_attempts):
+            print(f"{worker_id}: {job['job_id']} finished ({result['status']}) in {result['duration_s']:.1f}s")
+        n_jobs += 1
+    return n_jobs
+
+
+def queue_status(queue_dir):
+    """ The number of jobs in each state, and the age of each lease (in seconds since its last heartbeat).
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import os
+    paths = _queue_paths(queue_dir)
+    now = filesystem_now(queue_dir)
+    status = {folder : len([f for f in os.listdir(paths[folder]) if f.endswith('.json') and not f.startswith('.')])
+              for folder in ['pending', 'leases', 'committing', 'done', 'failed']}
+    status['leases_age_s'] = {}
+    for lease in os.scandir(paths['leases']):
+        try:
+            status['leases_age_s'][lease.name[:-5]] = now - lease.stat().st_mtime
+        except FileNotFoundError:
+            pass
+    return status
+
+
+#%%
+
+if __name__ == "__main__":
+    import argparse
+    import functools
+    import json
+
+    parser = argparse.ArgumentParser(description = 'A work queue for monitoring mode on a shared filesystem (enqueue the volcanoes with pending dates, '
+                                                   'run a worker, or show the status of the queue).  ')
+    parser.add_argument('command', choices = ['enqueue', 'work', 'status'])
+    parser.add_argument('--queue_dir', required = True)
+    parser.add_argument('--volcanoes', nargs = '+', default = None, help = 'enqueue only: default all the volcanoes in LiCSAlert_volcs_dir')
+    parser.add_argument('--LiCSBAS_bin')
+    parser.add_argument('--LiCSAlert_bin')
+    parser.add_argument('--ICASAR_bin')
+    parser.add_argument('--LiCSAR_frames_dir')
+    parser.add_argument('--LiCSAlert_volcs_dir')
+    parser.add_argument('--n_para', type = int, default = 1)
+    parser.add_argument('--prometheus_dir', default = None)
+    parser.add_argument('--no_figures', action = 'store_true')
+    parser.add_argument('--alert_sigma', type = float, default = 3.)
+    parser.add_argument('--lease_timeout', type = float, default = 900.)
+    parser.add_argument('--heartbeat_interval', type = float, default = 60.)
+    parser.add_argument('--keep_running', action = 'store_true', help = "work only: wait for new jobs, rather than stopping when the queue is empty")
+    args = parser.parse_args()
+    for path_arg in ['LiCSAlert_volcs_dir', 'LiCSAR_frames_dir']:                                    # the functions expect trailing /
+        path = getattr(args, path_arg)
+        if (path is not None) and (not path.endswith('/')):
+            setattr(args, path_arg, f"{path}/")
+
+    if args.command == 'enqueue':
+        enqueue_monitoring_jobs(args.queue_dir, args.LiCSAlert_volcs_dir, args.LiCSAR_frames_dir, args.volcanoes, figures = not args.no_figures)
+    elif args.command == 'work':
+        run_job = functools.partial(run_monitoring_job, LiCSBAS_bin = args.LiCSBAS_bin, LiCSAlert_bin = args.LiCSAlert_bin, ICASAR_bin = args.ICASAR_bin,
+                                    LiCSAR_frames_dir = args.LiCSAR_frames_dir, LiCSAlert_volcs_dir = args.LiCSAlert_volcs_dir, n_para = args.n_para,
+                                    prometheus_dir = args.prometheus_dir, figures = not args.no_figures, alert_sigma = args.alert_sigma, resident = {})
+        LiCSAlert_queue_worker(args.queue_dir, run_job, lease_timeout = args.lease_timeout, heartbeat_interval = args.heartbeat_interval,
+                               exit_when_empty = not args.keep_running)
+    else:
+        print(json.dumps(queue_status(args.queue_dir), indent = 1))
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A long running LiCSAlert worker, so that monitoring mode doesn't have to start python, import numpy/h5py/skimage/matplotlib/ICASAR, and re-read the
+config file and the ICASAR results of a volcano every time that it is run (e.g. by cron).  The worker listens on a local Unix socket, and runs the
+jobs it is sent one at a time.  The config file and ICASAR results of each volcano are kept in memory between jobs, and are only re-read if the
+files change, as is what only depends on them and the mask of the ifgs (the sources with the combined mask, the projector, the sketch, etc., see 
+volcano_state), which is only made again if they change.
+
+Start the worker:
+    python -m licsalert.LiCSAlert_worker serve --socket /tmp/LiCSAlert.sock --LiCSBAS_bin ... --LiCSAlert_bin ... --ICASAR_bin ... --LiCSAR_frames_dir ... --LiCSAlert_volcs_dir ...
+Then run a volcano (e.g. from cron), which returns once the run has finished:
+    python -m licsalert.LiCSAlert_worker run --socket /tmp/LiCSAlert.sock campi_flegrei
+
+The client only uses the standard library, so it starts quickly.
+
+@author: Matthew Gaddes
+"""
+
+#%%
+
+def LiCSAlert_worker(socket_path, LiCSBAS_bin, LiCSAlert_bin, ICASAR_bin, LiCSAR_frames_dir, LiCSAlert_volcs_dir, n_para = 1, prometheus_dir = None,
+                     figures = True, alert_sigma = 3.):
+    """ Start a worker that runs LiCSAlert_monitoring_mode for the volcanoes it is sent through a Unix socket, until it is sent the shutdown command.
+    Inputs:
+        socket_path | string | path of the Unix socket to listen on (deleted when the worker stops).
+        LiCSBAS_bin ... alert_sigma | see LiCSAlert_monitoring_mode.  figures and alert_sigma can also be set for each job.
+    Returns:
+        The results of each job are as per LiCSAlert_monitoring_mode.  Each request and its reply is one line of json (see LiCSAlert_worker_request).
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import sys
+    import os
+    import json
+    import socket
+    import time
+    import datetime
+    import importlib
+
+    for bin_dir in [LiCSAlert_bin, ICASAR_bin]:
+        if bin_dir not in sys.path:
+            sys.path.append(bin_dir)
+
+    # 0: Import the modules that the jobs use now.  The jobs import them again when they need them (so nothing here is used directly), but as they take 
+    #    several seconds to import, this means the time is spent once when the worker starts rather than in the first job.  A module that can't be imported 
+    #    (e.g. ICASAR, which is only needed for a volcano that has no ICASAR results yet) doesn't stop the worker, and only the jobs that need it fail.  
+    t_start = time.perf_counter()
+    plt = None
+    if figures:
+        try:
+            import matplotlib
+            matplotlib.use('Agg')                                                                          # no display, as the worker runs in the background
+            import matplotlib.pyplot as plt
+        except ImportError as e:
+            print(f"LiCSAlert worker: unable to import matplotlib ({e}), so any job that makes figures will fail.  ")
+    for module in ['numpy', 'h5py', 'skimage.transform', 'licsalert.LiCSAlert_functions', 'ICASAR_functions']:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            print(f"LiCSAlert worker: unable to import {module} ({e}), so any job that needs it will fail.  ")
+    from licsalert.LiCSAlert_monitoring_functions import LiCSAlert_monitoring_mode
+    print(f"LiCSAlert worker: imports took {time.perf_counter() - t_start:.1f}s.  ")
+
+    resident = {}                                                                                          # config files, ICASAR results, and state (see volcano_state) of each volcano, kept between jobs
+    n_jobs = 0
+    t_up = datetime.datetime.now()
+
+    if os.path.exists(socket_path):                                                                        # e.g. from a worker that wasn't stopped cleanly
+        os.remove(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen()
+    print(f"LiCSAlert worker: listening on {socket_path}")
+
+    try:
+        while True:
+            connection, _ = server.accept()
+            with connection:
+                try:
+                    request = json.loads(_read_line(connection))
+                except Exception as e:
+                    _send_reply(connection, {'status' : 'error', 'message' : f"Unable to read the request ({e})"})
+                    continue
+                command = request.get('command', 'run')
+
+                if command == 'shutdown':
+                    _send_reply(connection, {'status' : 'ok', 'message' : 'shutting down'})
+                    break
+
+                elif command == 'status':
+                    _send_reply(connection, {'status' : 'ok', 'pid' : os.getpid(), 'n_jobs' : n_jobs, 'up_since' : t_up.strftime('%Y/%m/%d %H:%M:%S'),
+                                             'n_resident_files' : len(resident)})
+
+                elif command == 'run':
+                    volcano = request.get('volcano', None)
+                    if volcano is None:
+                        _send_reply(connection, {'status' : 'error', 'message' : 'A run request needs a volcano.'})
+                        continue
+                    print(f"LiCSAlert worker: running {volcano}")
+                    t_job = time.perf_counter()
+                    try:
+                        LiCSAlert_monitoring_mode(volcano, LiCSBAS_bin, LiCSAlert_bin, ICASAR_bin, LiCSAR_frames_dir, LiCSAlert_volcs_dir, n_para = n_para,
+                                                  prometheus_dir = prometheus_dir, figures = request.get('figures', figures),
+                                                  alert_sigma = request.get('alert_sigma', alert_sigma), resident = resident)
+                        reply = {'status' : 'ok', 'volcano' : volcano}
+                    except Exception as e:
+                        reply = {'status' : 'error', 'volcano' : volcano, 'message' : f"{type(e).__name__}: {e}"}
+                    finally:
+                        if plt is not None:
+                            plt.close('all')                                                                   # figures would otherwise build up between jobs
+                    reply['duration_s'] = time.perf_counter() - t_job
+                    n_jobs += 1
+                    print(f"LiCSAlert worker: {volcano} finished ({reply['status']}) in {reply['duration_s']:.1f}s")
+                    _send_reply(connection, reply)
+
+                else:
+                    _send_reply(connection, {'status' : 'error', 'message' : f"Unknown command ({command})"})
+    finally:
+        server.close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        print(f"LiCSAlert worker: stopped after {n_jobs} jobs.  ")
+
+
+def _read_line(connection):
+    """ Read from a socket until a newline (or the other end closes it).
+    """
+    data = b''
+    while not data.endswith(b'\n'):
+        chunk = connection.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+    return data.decode()
+
+
+def _send_reply(connection, reply):
+    """ Send one line of json.  The client may have gone (e.g. a timeout), in which case the reply is dropped.
+    """
+    import json
+    try:
+        connection.sendall((json.dumps(reply) + '\n').encode())
+    except OSError:
+        pass
+
+
+#%%
+
+def LiCSAlert_worker_request(socket_path, request, timeout = None):
+    """ Send a request to a LiCSAlert worker, and wait for its reply.
+    Inputs:
+        socket_path | string | the socket that the worker is listening on.
+        request | dict | e.g. {'command' : 'run', 'volcano' : 'campi_flegrei'}, {'command' : 'status'}, or {'command' : 'shutdown'}.
+                         Run requests can also set 'figures' and 'alert_sigma'.
+        timeout | float or None | seconds to wait for the reply.  None waits until the job has finished.
+    Returns:
+        reply | dict | 'status' is 'ok' or 'error' (with a 'message').  Run requests also return 'volcano' and 'duration_s'.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import json
+    import socket
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        try:
+            client.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            raise Exception(f"Unable to connect to a LiCSAlert worker on {socket_path}.  Is it running?  Exiting...")
+        client.sendall((json.dumps(request) + '\n').encode())
+        reply = _read_line(client)
+    if reply == '':
+        raise Exception("The LiCSAlert worker closed the connection without replying.  Exiting...")
+    return json.loads(reply)
+
+
+#%%
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import sys
+
+    parser = argparse.ArgumentParser(description = 'A long running LiCSAlert worker (serve), and the client that sends it jobs (run, status, shutdown).  ')
+    parser.add_argument('command', choices = ['serve', 'run', 'status', 'shutdown'])
+    parser.add_argument('volcanoes', nargs = '*', help = 'volcanoes to run (run only)')
+    parser.add_argument('--socket', default = '/tmp/LiCSAlert_worker.sock', help = 'the Unix socket the worker listens on')
+    parser.add_argument('--LiCSBAS_bin')
+    parser.add_argument('--LiCSAlert_bin')
+    parser.add_argument('--ICASAR_bin')
+    parser.add_argument('--LiCSAR_frames_dir')
+    parser.add_argument('--LiCSAlert_volcs_dir')
+    parser.add_argument('--n_para', type = int, default = 1)
+    parser.add_argument('--prometheus_dir', default = None)
+    parser.add_argument('--no_figures', action = 'store_true', help = 'run headless (see LiCSAlert_monitoring_mode)')
+    parser.add_argument('--alert_sigma', type = float, default = 3.)
+    parser.add_argument('--timeout', type = float, default = None, help = 'seconds to wait for each reply')
+    args = parser.parse_intermixed_args()
+
+    if args.command == 'serve':
+        LiCSAlert_worker(args.socket, args.LiCSBAS_bin, args.LiCSAlert_bin, args.ICASAR_bin, args.LiCSAR_frames_dir, args.LiCSAlert_volcs_dir,
+                         n_para = args.n_para, prometheus_dir = args.prometheus_dir, figures = not args.no_figures, alert_sigma = args.alert_sigma)
+    elif args.command == 'run':
+        failed = False
+        for volcano in args.volcanoes:
+            reply = LiCSAlert_worker_request(args.socket, {'command' : 'run', 'volcano' : volcano}, args.timeout)
+            print(json.dumps(reply))
+            failed = failed or (reply['status'] != 'ok')
+        sys.exit(1 if failed else 0)                                                                          # so cron (or a wrapper) can tell if a volcano failed
+    else:
+        print(json.dumps(LiCSAlert_worker_request(args.socket, {'command' : args.command}, args.timeout)))
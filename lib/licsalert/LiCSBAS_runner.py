@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Run the LiCSBAS steps used by LiCSAlert (02, 05, 11, 12, and 13) with asyncio, so that the chains of steps for several frames can run at the same time.
+Each step is started without a shell, its stdout and stderr are streamed (line by line) to the log file of that frame (and to the terminal), its exit code
+is checked, and the time it took is recorded.  The number of frames that are processed at once is limited by a semaphore, and the total number of
+parallel processes (n_para) is shared between them.
+
+run_LiCSBAS_frames_async can be awaited from code that is already running an event loop, and run_LiCSBAS_frames is the same for code that isn't (e.g.
+LiCSBAS_for_LiCSAlert for one frame, and LiCSBAS_for_frames in LiCSAlert_monitoring_functions.py for all the frames of some volcanoes).  tests/stub_LiCSBAS
+has stand-ins for the LiCSBAS scripts, so that this can be tested without LiCSBAS.
+
+@author: Matthew Gaddes
+"""
+
+#%%
+
+def LiCSBAS_step_commands(GEOCdir, LiCSBAS_out_dir, lon_lat = None, downsampling = 1, n_para = 1):
+    """ Return the commands for the LiCSBAS steps used by LiCSAlert, in the order that they must be run.
+    Inputs:
+        GEOCdir | string | GEOC dir, where the LiCSAR ifgs are stored.
+        LiCSBAS_out_dir | string | path to where LiCSBAS products will be stored.  Needs trailing /
+        lon_lat | list | west east south north to be clipped to, or None.
+        downsampling | int | >=1, sets the downsampling used in LiCSBAS
+        n_para | int | number of parallel processes used by each LiCSBAS step.
+    Returns:
+        steps | list of tuples | (step name, list of arguments), e.g. ('LiCSBAS02', ['LiCSBAS02_ml_prep.py', '-i', ...])
+    History:
+        2026/10/18 | MEG | Written, from LiCSBAS_for_LiCSAlert
+    """
+    # Inputs args - probably a better way to change these (rather than hard-coding)
+    p11_unw_thre = 0.5
+    p11_coh_thre = 0.1
+    p12_loop_thre = 1.5                 # in rads
+
+    #Rarely changed
+    p13_inv_alg = "LS"              	# LS (default) or WLS
+    p13_mem_size = 4000	                # default: 4000 (MB)
+    p13_gamma = 0.0001              	# default: 0.0001
+    p13_n_unw_r_thre = 1	            # default: 1
+    p13_keep_incfile = "n"	            # y/n. default: n
+
+    # make directory names in the style used by LiCSBAS.
+    GEOCmldir = f"{LiCSBAS_out_dir}GEOCml{downsampling}"                     # multilooked directory, where LiCSBAS products are stored
+    TSdir = f"{LiCSBAS_out_dir}TS_GEOCmldir"                                 # time series directory, where LiCSBAS products are stored
+    GEOCmldirclip = f"{LiCSBAS_out_dir}GEOCmldirclip"                        # clipped products, produced by step_05
+
+    steps = []
+    steps.append(('LiCSBAS02', ['LiCSBAS02_ml_prep.py', '-i', GEOCdir, '-o', GEOCmldir, '-n', str(downsampling), '--n_para', str(n_para)]))      # Convert format.  NB: This will automatically skip files that have already been converted.
+    # LiCSBAS03 - GACOS
+    # LiCSBAS04 - mask
+    if lon_lat is not None:                                                                                                                        # LiCSBAS05 - clip to region of interest (using lat and long, but can also use pixels)
+        LiCSBAS_lon_lat_string = f"{lon_lat[0]}/{lon_lat[1]}/{lon_lat[2]}/{lon_lat[3]}"                                                           # of form west/east/south/north
+        steps.append(('LiCSBAS05', ['LiCSBAS05op_clip_unw.py', '-i', GEOCmldir, '-o', GEOCmldirclip, '-g', LiCSBAS_lon_lat_string, '--n_para', str(n_para)]))
+        GEOCmldir = GEOCmldirclip                                                                                                                  # update so now using the clipped products
+    steps.append(('LiCSBAS11', ['LiCSBAS11_check_unw.py', '-d', GEOCmldir, '-t', TSdir, '-c', str(p11_coh_thre), '-u', str(p11_unw_thre)]))          # check unwrapping, based on coherence
+    steps.append(('LiCSBAS12', ['LiCSBAS12_loop_closure.py', '-d', GEOCmldir, '-t', TSdir, '-l', str(p12_loop_thre), '--n_para', str(n_para)]))      # check unwrapping, based on loop closure
+    steps.append(('LiCSBAS13', ['LiCSBAS13_sb_inv.py', '-d', GEOCmldir, '-t', TSdir, '--inv_alg', p13_inv_alg, '--mem_size', str(p13_mem_size),      # SB inversion
+                                '--gamma', str(p13_gamma), '--n_para', str(n_para), '--n_unw_r_thre', str(p13_n_unw_r_thre), '--keep_incfile', p13_keep_incfile]))
+    # LiCSBAS 14 - velocity standard dev
+    # LiCSBAS 15 - mask using noise indicies
+    # LiCSBAS 16 - fiter
+    return steps
+
+
+#%%
+
+async def run_LiCSBAS_step(step_name, args, log_file, echo = True, label = None):
+    """ Run one LiCSBAS step (without a shell), and stream its stdout and stderr to a log file (and possibly the terminal) as it runs.
+    Inputs:
+        step_name | string | e.g. LiCSBAS11
+        args | list of strings | the command and its arguments.
+        log_file | string | the output is appended to this file.
+        echo | boolean | if True, the output is also printed (with label at the start of each line if there is one).
+        label | string or None | e.g. the frame, so that the output of frames running at the same time can be told apart.
+    Returns:
+        step_record | dict | step, label, args, returncode, start (date), duration_s
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import asyncio
+    import datetime
+    import time
+
+    prefix = '' if label is None else f"[{label}] "
+    step_record = {'step'  : step_name,
+                   'label' : label,
+                   'args'  : args,
+                   'start' : datetime.datetime.now().strftime('%Y/%m/%d %H:%M:%S')}
+    t_start = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(*args, stdout = asyncio.subprocess.PIPE, stderr = asyncio.subprocess.STDOUT)
+    with open(log_file, 'a') as f_log:
+        while True:
+            line = await process.stdout.readline()
+            if not line:
+                break
+            line = line.decode(errors = 'replace')
+            f_log.write(line)
+            f_log.flush()                                                                           # so the log can be followed whilst the step is running
+            if echo:
+                print(f"{prefix}{line}", end = '')
+    step_record['returncode'] = await process.wait()
+    step_record['duration_s'] = time.perf_counter() - t_start
+    return step_record
+
+
+async def run_LiCSBAS_chain(steps, log_file, semaphore, echo = True, label = None):
+    """ Run the steps for one frame in order (once the semaphore allows), stopping at the first step that fails.
+    Inputs:
+        steps | list of tuples | from LiCSBAS_step_commands
+        log_file | string | the output of all the steps is appended to this file.
+        semaphore | asyncio.Semaphore | limits the number of chains that run at once.
+        echo | boolean | see run_LiCSBAS_step
+        label | string or None | see run_LiCSBAS_step
+    Returns:
+        step_records | list of dicts | from run_LiCSBAS_step, for each step that was run.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    step_records = []
+    async with semaphore:
+        for step_name, args in steps:
+            step_record = await run_LiCSBAS_step(step_name, args, log_file, echo, label)
+            step_records.append(step_record)
+            if step_record['returncode'] != 0:                                                      # the later steps need the products of this one, so stop
+                break
+    return step_records
+
+
+async def run_LiCSBAS_frames_async(jobs, n_para = 1, max_concurrent = 1, echo = True):
+    """ Run the LiCSBAS steps for several frames at once.  This is a coroutine, so can be awaited from code that is already running an event loop 
+    (e.g. a notebook, or an asyncio server).  Use run_LiCSBAS_frames from code that isn't.  
+    Inputs:
+        jobs | list of dicts | one for each frame, with keys:  label (e.g. the frame or volcano), GEOCdir, LiCSBAS_out_dir, log_file, and (optionally) lon_lat and downsampling.
+        n_para | int | total number of parallel processes, which is split between the frames that run at once.
+        max_concurrent | int | maximum number of frames that run at once.
+        echo | boolean | if True, the output of the steps is also printed.
+    Returns:
+        step_records | list of lists of dicts | for each job, the steps that were run (see run_LiCSBAS_step).
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import asyncio
+
+    max_concurrent = max(1, min(max_concurrent, len(jobs)))
+    n_para_job = max(1, n_para // max_concurrent)                                                   # so the total number of processes stays within n_para
+    semaphore = asyncio.Semaphore(max_concurrent)
+    chains = []
+    for job in jobs:
+        steps = LiCSBAS_step_commands(job['GEOCdir'], job['LiCSBAS_out_dir'], job.get('lon_lat', None), job.get('downsampling', 1), n_para_job)
+        chains.append(run_LiCSBAS_chain(steps, job['log_file'], semaphore, echo, job.get('label', None)))
+    return list(await asyncio.gather(*chains))
+
+
+def run_LiCSBAS_frames(jobs, n_para = 1, max_concurrent = 1, echo = True):
+    """ Run the LiCSBAS steps for several frames at once, and wait for them to finish.  If this is called from a thread that is already running an 
+    event loop (where asyncio.run can't be used), the steps are run on their own event loop in another thread.  
+    Inputs:
+        As per run_LiCSBAS_frames_async.  
+    Returns:
+        step_records | list of lists of dicts | as per run_LiCSBAS_frames_async.
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Also work when an event loop is already running.  
+    """
+    import asyncio
+    import concurrent.futures
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:                                                                            # no event loop in this thread, so one can be started
+        return asyncio.run(run_LiCSBAS_frames_async(jobs, n_para, max_concurrent, echo))
+    with concurrent.futures.ThreadPoolExecutor(max_workers = 1) as executor:
+        return executor.submit(asyncio.run, run_LiCSBAS_frames_async(jobs, n_para, max_concurrent, echo)).result()
+
+
+def check_LiCSBAS_path(LiCSBAS_bin):
+    """ Raise an exception if the LiCSBAS scripts aren't on the user's PATH (as they are run as commands, the path can't be updated from within Python).  
+    Inputs:
+        LiCSBAS_bin | string | the folder of the LiCSBAS scripts.  
+    History:
+        2026/10/18 | MEG | Written, from LiCSBAS_for_LiCSAlert
+    """
+    import os
+    user_path = os.environ['PATH'].split(':')
+    if LiCSBAS_bin.rstrip('/') not in [path.rstrip('/') for path in user_path]:
+        raise Exception(f"Error - the LiCSBAS scripts don't appear to be on your path.  As these functions are called from the command line, "
+                        f"the path can't be updated from within Python.  This can usually be rectified by adding a line such as this to your ~/.bashrc file: "
+                        f"source <your_LiCSBAS_path>/LiCSBAS/bashrc_LiCSBAS.sh \n The LiCSBAS documentation may also be useful: "
+                        f"https://github.com/yumorishita/LiCSBAS/wiki/1_Installation Exiting.  ")
+
+
+def check_LiCSBAS_steps(step_records, log_file = None):
+    """ Raise an exception if any of the LiCSBAS steps failed.
+    Inputs:
+        step_records | list of dicts | from run_LiCSBAS_chain
+        log_file | string or None | mentioned in the exception, as it contains the output of the step.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    for step_record in step_records:
+        if step_record['returncode'] != 0:
+            label = '' if step_record['label'] is None else f" for {step_record['label']}"
+            log_info = '' if log_file is None else f"See {log_file} for its output.  "
+            raise Exception(f"{step_record['step']}{label} failed with exit code {step_record['returncode']}.  {log_info}Exiting...")
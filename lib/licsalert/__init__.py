@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LiCSAlert: detect new deformation in time series of Sentinel-1 interferograms.
+
+Nothing is imported here, so that the licsalert command only imports the modules it uses (e.g. licsalert status doesn't import numpy).  Import
+the functions from their modules, e.g.:
+    from licsalert.LiCSAlert_functions import LiCSAlert_batch_mode
+    from licsalert.LiCSAlert_monitoring_functions import LiCSAlert_monitoring_mode
+
+@author: Matthew Gaddes
+"""
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Versions of bss_components_inversion and residual_for_pixels that work on blocks of pixels, so that the whole n_ifgs x n_pixels stack (and its
+transpose, and its reconstruction) never has to be held in memory at once.  The blocks are processed on a pool of threads (numpy releases the GIL
+whilst doing the matrix multiplications), and the size of the blocks is set from a memory budget.
+
+@author: Matthew Gaddes
+"""
+
+#%%
+
+def pixel_block_size(n_rows, n_sources, memory_budget, dtype = 'float64', n_threads = 1, n_copies = 4):
+    """ Determine how many pixels can be in each block so that the blocks being worked on (one per thread) fit within a memory budget.
+    Inputs:
+        n_rows | int | number of interferograms (i.e. rows) in each block
+        n_sources | int | number of sources
+        memory_budget | float | memory (MB) that the blocks can use.
+        dtype | string | precision of the blocks.
+        n_threads | int | number of blocks being worked on at once.
+        n_copies | int | number of n_rows x block size arrays made whilst working on a block (e.g. the ifgs, the reconstruction, and the residual)
+    Returns:
+        block_size | int | number of pixels in each block.  Always at least 1.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import numpy as np
+
+    bytes_per_pixel = np.dtype(dtype).itemsize * ((n_copies * n_rows) + n_sources) * n_threads                  # for each pixel in a block, the ifgs (and copies of them) and the sources
+    block_size = int((memory_budget * 1e6) / bytes_per_pixel)
+    return max(block_size, 1)
+
+
+def pixel_blocks(n_pixs, block_size):
+    """ Return a list of slices that split the pixels into blocks.
+    """
+    return [slice(start, min(start + block_size, n_pixs)) for start in range(0, n_pixs, block_size)]
+
+
+def _rows_block(ifgs_list, pixels, dtype):
+    """ Return the pixels in a block for all the ifgs in a list of arrays (i.e. as if the arrays had been stacked vertically), at the required precision.
+    """
+    import numpy as np
+    if len(ifgs_list) == 1:
+        return np.asarray(ifgs_list[0][:, pixels], dtype = dtype)
+    else:
+        return np.concatenate([np.asarray(ifgs[:, pixels], dtype = dtype) for ifgs in ifgs_list], axis = 0)
+
+
+def dtype_scalar(value, dtype):
+    """ Return a python float as a numpy scalar of the required precision (so that float32 arrays are not upcast when it is subtracted).
+    """
+    import numpy as np
+    return np.dtype(dtype).type(value)
+
+
+def _map_blocks(function, blocks, n_threads):
+    """ Apply a function to each block, possibly using a pool of threads.  The results are returned in the same order as the blocks, so that summing
+    them gives the same answer regardless of the number of threads.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    if n_threads == 1:
+        return [function(block) for block in blocks]
+    else:
+        with ThreadPoolExecutor(max_workers = n_threads) as executor:
+            return list(executor.map(function, blocks))
+
+
+#%%
+
+def blocked_components_inversion(sources, interferograms, cumulative = True, dtype = 'float64', memory_budget = 1000., n_threads = 1):
+    """ As per bss_components_inversion, but working on blocks of pixels.  The first pass through the blocks accumulates G^T G, G^T d, and the
+    sum of the interferograms (for mean centering), and the second pass computes the residual between each interferogram and its reconstruction.
+    If the interferograms are a LazyIfgs whose row means aren't known yet, the first pass also finds them (so they're not read an extra time).  
+
+    Inputs:
+        sources | n_sources x pixels | ie architecture I.  Mean centered
+        interferograms | n_ifgs x pixels | Doesn't have to be mean centered, ifgs are rows
+        cumulative | Boolean | if true, m and residual (mean_l2_norm) are returned as cumulative sums.
+        dtype | string | 'float64' or 'float32'.  Precision used for the inversion.
+        memory_budget | float | memory (MB) that the blocks of pixels can use (in total, across all the threads)
+        n_threads | int | number of threads that blocks are processed on.
+    Outputs:
+        m | r2 array | the strengths with which to use each source to reconstruct each ifg (n_ifgs x n_sources)
+        residual | r2 array | the misfit between each ifg and the ifg reconstructed from sources, as a column vector.
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Find the row means of a LazyIfgs in the first pass.  
+    """
+    import numpy as np
+    from licsalert.lazy_ifgs import LazyIfgs
+
+    sources = np.asarray(sources, dtype = dtype)
+    (n_sources, n_pixels) = sources.shape
+    n_ifgs = interferograms.shape[0]
+    blocks = pixel_blocks(n_pixels, pixel_block_size(n_ifgs, n_sources, memory_budget, dtype, n_threads))
+    find_row_means = isinstance(interferograms, LazyIfgs) and not interferograms.row_means_known()
+
+    # 1: First pass, G^T G and G^T d are sums over pixels, so can be built from the blocks
+    def first_pass(pixels):
+        g_block = sources[:, pixels]                                                                    # n_sources x block
+        if find_row_means:
+            d_block = interferograms.read_uncentred(0, n_ifgs, pixels)                                  # not mean centred, as the row means aren't known yet
+        else:
+            d_block = np.asarray(interferograms[:, pixels], dtype = dtype)                              # n_ifgs x block
+        return g_block @ g_block.T, g_block @ d_block.T, np.sum(d_block, axis = 1, dtype = 'float64')   # sum in float64 so the mean is accurate for float32 data
+
+    gtg = np.zeros((n_sources, n_sources), dtype = dtype)
+    gtd = np.zeros((n_sources, n_ifgs), dtype = dtype)
+    row_sums = np.zeros(n_ifgs)
+    for gtg_block, gtd_block, row_sums_block in _map_blocks(first_pass, blocks, n_threads):
+        gtg += gtg_block
+        gtd += gtd_block
+        row_sums += row_sums_block
+    if find_row_means:
+        interferograms._set_row_means(0, row_sums / n_pixels)                                           # so the blocks are mean centred when they're read from now on
+        row_means = interferograms.row_means[interferograms.row_start : interferograms.row_stop]
+        gtd -= np.outer(np.sum(sources, axis = 1, dtype = 'float64'), row_means).astype(dtype)          # G^T (d - row mean) = G^T d - G^T 1 * row mean
+        row_sums = row_sums - (n_pixels * row_means)                                                    # the sums of the mean centred rows
+    ifgs_mean = np.sum(row_sums) / (n_ifgs * n_pixels)                                                  # mean of all the ifgs, as bss_components_inversion mean centres with a single value
+    gtd -= (ifgs_mean * np.sum(sources, axis = 1, dtype = 'float64'))[:, np.newaxis].astype(dtype)      # G^T (d - mean) = G^T d - mean * G^T 1
+    m = np.linalg.solve(gtg, gtd)                                                                       # n_sources x n_ifgs
+
+    # 2: Second pass to get the residual between each ifg and its reconstruction
+    def second_pass(pixels):
+        d_block = np.asarray(interferograms[:, pixels], dtype = dtype) - dtype_scalar(ifgs_mean, dtype)
+        d_resid = d_block - (m.T @ sources[:, pixels])
+        return np.sum(d_resid**2, axis = 1)
+
+    residual_squared = np.zeros(n_ifgs, dtype = dtype)
+    for residual_squared_block in _map_blocks(second_pass, blocks, n_threads):
+        residual_squared += residual_squared_block
+    residual = (np.sqrt(residual_squared) / n_pixels)[:, np.newaxis]                                     # the mean l2 norm for each ifg, as a column vector
+
+    m = m.T                                                                                             # make these column vectors
+    if cumulative:
+        m = np.cumsum(m, axis=0)
+        residual = np.cumsum(residual, axis=0)
+    return m, residual
+
+
+#%%
+
+def blocked_residual_for_pixels(sources, tcs, ifgs_list, dtype = 'float64', memory_budget = 1000., n_threads = 1, map_pixels = None):
+    """ As per residual_for_pixels, but working on blocks of pixels.  The interferograms can be given as a list of arrays
+    (e.g. the baseline and monitoring interferograms), which are treated as if they had been stacked vertically, but without making the stacked copy.
+
+    Inputs:
+        sources | r2 array | sources as row vectors
+        tcs | r2 array | incremental time courses as column vectors (n_ifgs x n_sources)
+        ifgs_list | list of r2 arrays | interferograms as row vectors.  The total number of rows must be the same as the length of the time courses.
+        dtype | string | 'float64' or 'float32'.
+        memory_budget | float | memory (MB) that the blocks of pixels can use (in total, across all the threads)
+        n_threads | int | number of threads that blocks are processed on.
+        map_pixels | None or r1 int array | as per residual_for_pixels.  The residual of these pixels is copied out of each block as it is made.  
+    Outputs:
+        residual_ts | r2 array | Column vector of the RMS residual between that ifg, and its reconstruction
+        residual_cs | r2 array | Column vector of the RMS residual between an ifg and the cumulative residual (for each pixel)
+        residual_maps | dict | Only if map_pixels is not None, as per residual_for_pixels.  
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Add map_pixels argument.  
+    """
+    import numpy as np
+
+    sources = np.asarray(sources, dtype = dtype)
+    tcs = np.asarray(tcs, dtype = dtype)
+    (n_sources, n_pixs) = sources.shape
+    n_ifgs = sum([ifgs.shape[0] for ifgs in ifgs_list])
+    if n_ifgs != tcs.shape[0]:
+        raise Exception(f"There are {n_ifgs} interferograms, but the time courses are of length {tcs.shape[0]}.  Exiting...")
+    blocks = pixel_blocks(n_pixs, pixel_block_size(n_ifgs, n_sources, memory_budget, dtype, n_threads))
+    if map_pixels is not None:
+        map_pixels = np.asarray(map_pixels)
+        residual_maps = {'incremental' : np.zeros((map_pixels.size, n_ifgs), dtype = dtype),                   # pixel-major, and each block fills different rows, so the threads don't overlap
+                         'cumulative'  : np.zeros((map_pixels.size, n_ifgs), dtype = dtype)}
+
+    def residual_block(pixels):
+        data_model_residual = _rows_block(ifgs_list, pixels, dtype) - (tcs @ sources[:, pixels])                # residual for each pixel in the block at each time
+        data_model_residual_cs = np.cumsum(data_model_residual, axis = 0)                                       # the cumulative sum is along time, so each block can be done separately
+        if map_pixels is not None:
+            in_block = np.nonzero((map_pixels >= pixels.start) & (map_pixels < pixels.stop))[0]                 # the map pixels that are in this block
+            residual_maps['incremental'][in_block] = data_model_residual[:, map_pixels[in_block] - pixels.start].T
+            residual_maps['cumulative'][in_block] = data_model_residual_cs[:, map_pixels[in_block] - pixels.start].T
+        return np.sum(data_model_residual**2, axis = 1), np.sum(data_model_residual_cs**2, axis = 1)
+
+    residual_ts_squared = np.zeros(n_ifgs, dtype = dtype)
+    residual_cs_squared = np.zeros(n_ifgs, dtype = dtype)
+    for residual_ts_block, residual_cs_block in _map_blocks(residual_block, blocks, n_threads):
+        residual_ts_squared += residual_ts_block
+        residual_cs_squared += residual_cs_block
+    residual_ts = np.sqrt(residual_ts_squared / n_pixs)[:, np.newaxis]                                          # RMS of residual for each ifg
+    residual_cs = np.sqrt(residual_cs_squared / n_pixs)[:, np.newaxis]                                          # RMS of residual for cumulative
+    if map_pixels is None:
+        return residual_ts, residual_cs
+    else:
+        return residual_ts, residual_cs, residual_maps
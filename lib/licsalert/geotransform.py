@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The lons and lats of the pixels of a regular (LiCSBAS) grid, stored as just the corner and the spacing (an affine geotransform with no rotation),
+rather than as two meshgrids that are the size of the interferograms.  The 1D axes, the coordinates of only the unmasked pixels, or the full
+meshgrids are made only when they are needed.
+
+@author: Matthew Gaddes
+"""
+
+#%%
+
+class Geotransform(object):
+    """ The lon and lat of each pixel of an ny x nx grid, from the lon and lat of the top left pixel and the spacing between pixels (post_lat is
+    usually negative, as the first row is the top of the image).
+
+    For compatibility with the dictionary that was used before (geocode_info), geotransform['lons_mg'] and geotransform['lats_mg'] return the full
+    meshgrids, but geotransform.lons and geotransform.lats (the 1D axes) are usually all that are needed.
+
+    History:
+        2026/10/18 | MEG | Written
+    """
+    def __init__(self, corner_lon, corner_lat, post_lon, post_lat, ny, nx):
+        """
+        Inputs:
+            corner_lon | float | lon of the top left pixel.
+            corner_lat | float | lat of the top left pixel.
+            post_lon | float | spacing between pixels in lon.
+            post_lat | float | spacing between pixels in lat (negative if the first row is the top of the image).
+            ny | int | number of rows of pixels.
+            nx | int | number of columns of pixels.
+        """
+        self.corner_lon = float(corner_lon)
+        self.corner_lat = float(corner_lat)
+        self.post_lon = float(post_lon)
+        self.post_lat = float(post_lat)
+        self.ny = int(ny)
+        self.nx = int(nx)
+
+    @classmethod
+    def from_meshgrids(cls, lons_mg, lats_mg):
+        """ Make a Geotransform from meshgrids of lons and lats (e.g. from an older pickle file).  The grid is assumed to be regular.
+        """
+        ny, nx = lons_mg.shape
+        post_lon = (lons_mg[0, -1] - lons_mg[0, 0]) / (nx - 1) if nx > 1 else 0.
+        post_lat = (lats_mg[-1, 0] - lats_mg[0, 0]) / (ny - 1) if ny > 1 else 0.
+        return cls(lons_mg[0, 0], lats_mg[0, 0], post_lon, post_lat, ny, nx)
+
+    @classmethod
+    def from_dict(cls, geotransform_dict):
+        """ Make a Geotransform from the dict made by to_dict.
+        """
+        return cls(**geotransform_dict)
+
+    def to_dict(self):
+        """ The six numbers that define the grid, e.g. for saving with the results.
+        """
+        return {'corner_lon' : self.corner_lon, 'corner_lat' : self.corner_lat, 'post_lon' : self.post_lon, 'post_lat' : self.post_lat,
+                'ny' : self.ny, 'nx' : self.nx}
+
+    @property
+    def shape(self):
+        return (self.ny, self.nx)
+
+    @property
+    def lons(self):
+        """ lon of each column of pixels (rank 1).
+        """
+        import numpy as np
+        return self.corner_lon + (self.post_lon * np.arange(self.nx))
+
+    @property
+    def lats(self):
+        """ lat of each row of pixels (rank 1), starting with the first row (usually the top of the image).
+        """
+        import numpy as np
+        return self.corner_lat + (self.post_lat * np.arange(self.ny))
+
+    def meshgrids(self):
+        """ Return the lon and lat of every pixel as two ny x nx arrays.  Only use if they're really needed, as they're the size of an interferogram.
+        """
+        import numpy as np
+        return np.meshgrid(self.lons, self.lats)
+
+    def pixel_coords(self, mask = None):
+        """ Return the lon and lat of each unmasked pixel, in the same order as the pixels in the row vectors used by LiCSAlert.
+        Inputs:
+            mask | r2 boolean array or None | True where pixels are masked.  If None, all the pixels are returned.
+        Returns:
+            lons | r1 array |
+            lats | r1 array |
+        """
+        import numpy as np
+        if mask is None:
+            mask = np.zeros(self.shape, dtype = bool)
+        if mask.shape != self.shape:
+            raise Exception(f"The mask is of shape {mask.shape}, but the geotransform is for a grid of shape {self.shape}.  Exiting...")
+        rows, cols = np.nonzero(~mask)                                                                          # in row major order, as per ma.compressed
+        return self.corner_lon + (self.post_lon * cols), self.corner_lat + (self.post_lat * rows)
+
+    def crop(self, x_start, x_stop, y_start, y_stop):
+        """ Return the Geotransform of a cropped region, with the same convention as crop_pixels in LiCSBAS_to_LiCSAlert (x then y, 00 is top left).
+        """
+        x_start, x_stop, _ = slice(x_start, x_stop).indices(self.nx)
+        y_start, y_stop, _ = slice(y_start, y_stop).indices(self.ny)
+        return Geotransform(self.corner_lon + (self.post_lon * x_start), self.corner_lat + (self.post_lat * y_start), self.post_lon, self.post_lat,
+                            max(y_stop - y_start, 0), max(x_stop - x_start, 0))
+
+    def lon_lat_to_pixels(self, lon_lat):
+        """ Return the pixels of a region, in the form used by crop_pixels in LiCSBAS_to_LiCSAlert.
+        Inputs:
+            lon_lat | list | west east south north, as per the LiCSBAS section of the config file.
+        Returns:
+            crop_pixels | tuple | x_start, x_stop, y_start, y_stop, for the pixels whose centres are in the region (and within the grid).
+        """
+        import numpy as np
+        x_edges = (np.array(lon_lat[0:2], dtype = float) - self.corner_lon) / self.post_lon                 # column (as a float) of the west and east edges
+        y_edges = (np.array(lon_lat[2:4], dtype = float) - self.corner_lat) / self.post_lat                 # row of the south and north edges (north is usually the lower row)
+        x_start = int(np.clip(np.ceil(np.min(x_edges) - 1e-6), 0, self.nx))
+        x_stop = int(np.clip(np.floor(np.max(x_edges) + 1e-6) + 1, 0, self.nx))
+        y_start = int(np.clip(np.ceil(np.min(y_edges) - 1e-6), 0, self.ny))
+        y_stop = int(np.clip(np.floor(np.max(y_edges) + 1e-6) + 1, 0, self.ny))
+        return (x_start, x_stop, y_start, y_stop)
+
+    def downsample(self, scale):
+        """ Return the Geotransform of the grid after it has been downsampled (by downsample_ifgs, which uses skimage.transform.rescale).
+        The edges of the grid stay in the same place, so the centre of the top left pixel moves.
+        """
+        import numpy as np
+        if scale == 1.0:
+            return self
+        ny_ds = int(np.round(self.ny * scale))                                                                  # as per skimage.transform.rescale
+        nx_ds = int(np.round(self.nx * scale))
+        post_lon_ds = self.post_lon * self.nx / nx_ds
+        post_lat_ds = self.post_lat * self.ny / ny_ds
+        return Geotransform(self.corner_lon + 0.5 * (post_lon_ds - self.post_lon), self.corner_lat + 0.5 * (post_lat_ds - self.post_lat),
+                            post_lon_ds, post_lat_ds, ny_ds, nx_ds)
+
+    def keys(self):
+        return ['lons_mg', 'lats_mg']
+
+    def __getitem__(self, key):
+        if key == 'lons_mg':
+            return self.meshgrids()[0]
+        elif key == 'lats_mg':
+            return self.meshgrids()[1]
+        else:
+            raise KeyError(key)
+
+    def __repr__(self):
+        return (f"Geotransform(corner_lon={self.corner_lon}, corner_lat={self.corner_lat}, post_lon={self.post_lon}, post_lat={self.post_lat}, "
+                f"ny={self.ny}, nx={self.nx})")
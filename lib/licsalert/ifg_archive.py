@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A compressed archive of a time series of interferograms (displacement_r2), for keeping the time series of each volcano without the size (and load time)
+of a pickle of float64 row vectors.  Each interferogram (epoch) is quantised to int16 with its own scale and offset (unwrapped phase or displacement
+only needs a few thousand levels), its bytes are shuffled (so the high bytes, which are similar, are together), and it is compressed on its own, so any
+epoch can be read without the others.  Each epoch is also split into chunks of pixels, so that a block of pixels (e.g. with memory_budget) only
+decompresses the chunks it is in, and the chunks that have been decompressed are kept (up to cache_MB) so a chunk is only decompressed once when
+the blocks don't line up with the chunks.  The archive is a zip file, with:
+    metadata.json                              the shape, codec, chunk size, dates, and the quantisation error of each epoch.
+    ifg_00000_0000_lo.npy, _hi.npy, ...        the low and high bytes of each chunk of the quantised epochs (deflate codec, the default if numcodecs
+                                               isn't installed).  Each is only compressed if that makes it at least min_saving smaller, as the low
+                                               bytes are mostly noise, and reading a stored array is much faster than inflating it.  The archive is
+                                               also a .npz file that np.load can read (although the epochs are quantised and split).
+    ifg_00000_0000.blosc, ...                  each chunk of the quantised epochs (blosc codec).
+    mask.npy, scales.npy, offsets.npy, ...     the mask, the quantisation of each epoch, and any other arrays (e.g. lons, lats, cumulative_baselines).
+If numcodecs is installed (pip install .[blosc]), codec = 'blosc' compresses the epochs with zstd (via blosc), which is smaller and faster to read 
+than deflate.  Archives made before the epochs were chunked (version 1, one ifg_00000.npy or .blosc per epoch) are read as epochs of one chunk.
+
+e.g.:
+    report = save_ifg_archive('volcano_ifgs.zip', displacement_r2, acq_dates, extras = {'cumulative_baselines' : cumulative_baselines})
+    displacement_r2, acq_dates, extras = load_ifg_archive('volcano_ifgs.zip')          # the ifgs are read only when needed (as per lazy_ifgs.py)
+
+@author: Matthew Gaddes
+"""
+
+archive_version = 2
+quantisation_levels = 32767                                                                             # int16 codes are -32767 to 32767, and -32768 is nan
+
+#%%
+
+def _blosc_codec(level = 5):
+    """ The blosc (zstd, with byte shuffling) codec of numcodecs, or None if numcodecs isn't installed.
+    """
+    try:
+        from numcodecs import Blosc
+    except ImportError:
+        return None
+    return Blosc(cname = 'zstd', clevel = level, shuffle = Blosc.SHUFFLE)
+
+
+def quantise_ifg(ifg):
+    """ Quantise an interferogram (a row vector) to int16, with a scale and offset chosen so its range uses all the levels.
+    Inputs:
+        ifg | r1 array |
+    Returns:
+        codes | r1 int16 array | the quantised ifg (nans are -32768)
+        scale | float | ifg = (codes * scale) + offset
+        offset | float |
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import numpy as np
+    ifg = np.asarray(ifg, dtype = 'float64')
+    finite = np.isfinite(ifg)
+    if np.any(finite):
+        ifg_min, ifg_max = np.min(ifg[finite]), np.max(ifg[finite])
+    else:
+        ifg_min, ifg_max = 0., 0.
+    offset = (ifg_max + ifg_min) / 2
+    scale = (ifg_max - ifg_min) / (2 * quantisation_levels)
+    if scale == 0:                                                                                      # e.g. a constant ifg
+        scale = 1.
+    codes = np.full(ifg.shape, -quantisation_levels - 1, dtype = 'int16')
+    codes[finite] = np.clip(np.round((ifg[finite] - offset) / scale), -quantisation_levels, quantisation_levels).astype('int16')
+    return codes, scale, offset
+
+
+def dequantise_ifg(codes, scale, offset, dtype = 'float64', out = None):
+    """ The inverse of quantise_ifg.  If out is given (an array of dtype the same shape as codes), the ifg is written into it.
+    """
+    import numpy as np
+    if out is None:
+        out = np.empty(codes.shape, dtype = dtype)
+    np.multiply(codes, out.dtype.type(scale), out = out, casting = 'unsafe')
+    out += out.dtype.type(offset)
+    out[codes == (-quantisation_levels - 1)] = np.nan
+    return out
+
+
+def _shuffle(codes):
+    """ The low bytes and the high bytes of int16 codes (two uint8 arrays).
+    """
+    import numpy as np
+    code_bytes = codes.astype('<i2').view('uint8')
+    return np.ascontiguousarray(code_bytes[0::2]), np.ascontiguousarray(code_bytes[1::2])
+
+
+def _npy_bytes_array(data):
+    """ The uint8 array in the bytes of a .npy file that was written by save_ifg_archive.  np.load parses the header of the file with the python tokenizer,
+    which takes longer than reading a chunk, so the header is skipped.
+    """
+    import numpy as np
+    if data[:6] != b'\x93NUMPY':
+        raise Exception("A chunk of the archive isn't a .npy file.  Exiting...")
+    if data[6] == 1:
+        header_end = 10 + int.from_bytes(data[8:10], 'little')
+    else:
+        header_end = 12 + int.from_bytes(data[8:12], 'little')
+    return np.frombuffer(data, dtype = 'uint8', offset = header_end)
+
+
+def _unshuffle(low, high):
+    """ The inverse of _shuffle.
+    """
+    import numpy as np
+    codes = np.empty(low.shape[0], dtype = '<i2')
+    code_bytes = codes.view('uint8')
+    code_bytes[0::2] = low                                                                              # much faster than transposing the bytes
+    code_bytes[1::2] = high
+    return codes
+
+
+#%%
+
+def save_ifg_archive(archive_file, displacement_r2, acq_dates = None, extras = None, codec = 'auto', level = 5, chunk_pixels = 65536, 
+                     min_saving = 0.2):
+    """ Save a time series of interferograms as a quantised, compressed archive (one epoch at a time, so the ifgs can be an array that isn't in memory).
+    Inputs:
+        archive_file | string or Path | e.g. volcano_ifgs.zip
+        displacement_r2 | dict | the ifgs as row vectors ('incremental'), and their 'mask'.  'lons' and 'lats' are also saved if they are in it.
+        acq_dates | list of strings or None | YYYYMMDD.
+        extras | dict or None | other arrays to save (e.g. 'cumulative_baselines').
+        codec | string | 'blosc' (needs numcodecs), 'deflate', or 'auto' (blosc if numcodecs is installed).
+        level | int | compression level (1-9).
+        chunk_pixels | int | number of pixels in each chunk of an epoch (the least that is decompressed to read any of them).
+        min_saving | float | deflate codec only.  The low or high bytes of a chunk are only compressed if it makes them at least this fraction smaller.
+    Returns:
+        report | dict | size_MB, the compression ratio (compared to float64), and the max and RMS quantisation error (over all the epochs, and as a
+                        fraction of the standard deviation of the epoch with the largest relative error).
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Split the epochs into chunks of pixels, and only deflate the bytes that it makes smaller.  
+    """
+    import os
+    import io
+    import json
+    import zlib
+    import zipfile
+    import numpy as np
+
+    if codec == 'auto':
+        codec = 'blosc' if _blosc_codec() is not None else 'deflate'
+    if codec == 'blosc':
+        blosc = _blosc_codec(level)
+        if blosc is None:
+            raise Exception("The blosc codec needs numcodecs, which can't be imported.  Use codec = 'deflate' instead.  Exiting...")
+    elif codec != 'deflate':
+        raise Exception(f"codec must be 'blosc', 'deflate', or 'auto', but is {codec}.  Exiting...")
+
+    def npy_bytes(array):
+        f = io.BytesIO()
+        np.save(f, array, allow_pickle = False)
+        return f.getvalue()
+
+    def write_deflated(name, array):
+        saving = 1 - (len(zlib.compress(array.tobytes(), level)) / max(array.nbytes, 1))             # of the bytes (the header of the .npy compresses well)
+        archive.writestr(name, npy_bytes(array), compress_type = zipfile.ZIP_DEFLATED if saving >= min_saving else zipfile.ZIP_STORED)
+
+    ifgs = displacement_r2['incremental']
+    n_ifgs, n_pixels = ifgs.shape
+    chunk_pixels = int(max(1, min(chunk_pixels, n_pixels)))
+    scales, offsets, row_means, max_errors, rms_errors, stds = [np.zeros(n_ifgs) for _ in range(6)]
+    archive_tmp = f"{archive_file}.tmp"
+    with zipfile.ZipFile(archive_tmp, 'w', compression = zipfile.ZIP_DEFLATED, compresslevel = level) as archive:
+        for ifg_n in range(n_ifgs):                                                                    # one epoch at a time
+            ifg = np.asarray(ifgs[ifg_n], dtype = 'float64')
+            codes, scales[ifg_n], offsets[ifg_n] = quantise_ifg(ifg)
+            ifg_quantised = dequantise_ifg(codes, scales[ifg_n], offsets[ifg_n])
+            errors = (ifg_quantised - ifg)[np.isfinite(ifg)]
+            max_errors[ifg_n] = np.max(np.abs(errors)) if errors.size > 0 else 0.
+            rms_errors[ifg_n] = np.sqrt(np.mean(errors**2)) if errors.size > 0 else 0.
+            stds[ifg_n] = np.nanstd(ifg) if errors.size > 0 else 0.
+            row_means[ifg_n] = np.nanmean(ifg_quantised) if errors.size > 0 else 0.                   # of what will be read, for LazyIfgs
+            for chunk_n, chunk_start in enumerate(range(0, n_pixels, chunk_pixels)):
+                chunk_codes = codes[chunk_start : chunk_start + chunk_pixels]
+                if codec == 'blosc':
+                    archive.writestr(f"ifg_{ifg_n:05d}_{chunk_n:04d}.blosc", bytes(blosc.encode(chunk_codes)), compress_type = zipfile.ZIP_STORED)
+                else:
+                    low, high = _shuffle(chunk_codes)
+                    write_deflated(f"ifg_{ifg_n:05d}_{chunk_n:04d}_lo.npy", low)
+                    write_deflated(f"ifg_{ifg_n:05d}_{chunk_n:04d}_hi.npy", high)
+
+        arrays = {'mask' : np.asarray(displacement_r2['mask']), 'scales' : scales, 'offsets' : offsets, 'row_means' : row_means,
+                  'max_errors' : max_errors, 'rms_errors' : rms_errors}
+        for key in ['lons', 'lats']:
+            if displacement_r2.get(key, None) is not None:
+                arrays[key] = np.asarray(displacement_r2[key])
+        if extras is not None:
+            for key, array in extras.items():
+                if key in arrays or key.startswith('ifg_'):
+                    raise Exception(f"{key} can't be used as the name of an extra array, as it's used by the archive.  Exiting...")
+                arrays[key] = np.asarray(array)
+        for key, array in arrays.items():
+            archive.writestr(f"{key}.npy", npy_bytes(array))
+
+        relative_errors = rms_errors / np.where(stds > 0, stds, 1.)
+        metadata = {'version'          : archive_version,
+                    'codec'            : codec,
+                    'n_ifgs'           : int(n_ifgs),
+                    'n_pixels'         : int(n_pixels),
+                    'chunk_pixels'     : chunk_pixels,
+                    'acq_dates'        : None if acq_dates is None else [str(acq_date) for acq_date in acq_dates],
+                    'arrays'           : sorted(arrays.keys()),
+                    'max_error'        : float(np.max(max_errors)) if n_ifgs > 0 else 0.,
+                    'rms_error'        : float(np.sqrt(np.mean(rms_errors**2))) if n_ifgs > 0 else 0.,
+                    'max_relative_rms' : float(np.max(relative_errors)) if n_ifgs > 0 else 0.}
+        archive.writestr('metadata.json', json.dumps(metadata, indent = 1))
+    os.replace(archive_tmp, archive_file)                                                               # so a partly written archive is never read
+
+    size_MB = os.path.getsize(archive_file) / 1e6
+    report = {'size_MB'          : size_MB,
+              'ratio'            : (n_ifgs * n_pixels * 8 / 1e6) / size_MB,
+              'max_error'        : metadata['max_error'],
+              'rms_error'        : metadata['rms_error'],
+              'max_relative_rms' : metadata['max_relative_rms']}
+    print(f"Saved {n_ifgs} ifgs ({n_pixels} pixels) to {archive_file} ({codec}): {size_MB:.1f}MB ({report['ratio']:.1f}x smaller than float64), "
+          f"with a max quantisation error of {report['max_error']:.3g} (RMS {report['rms_error']:.3g}, at most {100*report['max_relative_rms']:.3g}% of an ifg's std).  ")
+    return report
+
+
+#%%
+
+class IfgArchive(object):
+    """ The interferograms in an archive (made by save_ifg_archive), as an array (n_ifgs x n_pixels) that only reads the epochs that are indexed.
+    Rows can be an int or a slice, and pixels anything that indexes a numpy array, e.g. archive[5], archive[10:20], archive[:, 0:1000].  Only the
+    chunks of each epoch that the pixels are in are decompressed, and the last cache_MB of them are kept (as int16), so reading blocks of pixels 
+    (e.g. with memory_budget) decompresses each chunk once.  The quantisation error of each epoch is in max_errors and rms_errors.
+
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Read only the chunks of the epochs that are needed, and keep those that have been decompressed.  
+    """
+    def __init__(self, archive_file, dtype = 'float64', cache_MB = 256.):
+        import json
+        import zipfile
+        import threading
+        import collections
+        import numpy as np
+        self.archive_file = str(archive_file)
+        self.dtype = np.dtype(dtype)
+        self.cache_MB = cache_MB
+        self._zip = zipfile.ZipFile(self.archive_file, 'r')
+        self.metadata = json.loads(self._zip.read('metadata.json'))
+        if self.metadata['version'] > archive_version:
+            raise Exception(f"{archive_file} was made by a newer version of LiCSAlert (archive version {self.metadata['version']}).  Exiting...")
+        self.chunk_pixels = self.metadata.get('chunk_pixels', max(self.metadata['n_pixels'], 1))     # version 1 archives have one chunk per epoch
+        if self.metadata['codec'] == 'blosc':
+            self._blosc = _blosc_codec()
+            if self._blosc is None:
+                raise Exception(f"{archive_file} was compressed with blosc, which needs numcodecs to be installed (pip install .[blosc]).  Exiting...")
+        for key in ['scales', 'offsets', 'row_means', 'max_errors', 'rms_errors']:
+            setattr(self, key, self.read_array(key))
+        self._cache = collections.OrderedDict()                                                         # (ifg_n, chunk_n) : int16 codes, least recently used first
+        self._cache_bytes = 0
+        self._cache_lock = threading.Lock()                                                             # the blocks may be read by several threads
+        self.n_decoded = 0                                                                              # number of chunks that have been decompressed
+
+    def __getstate__(self):                                                                             # so it can be sent to other processes (which re-open the file)
+        return {'archive_file' : self.archive_file, 'dtype' : self.dtype.str, 'cache_MB' : self.cache_MB}
+
+    def __setstate__(self, state):
+        self.__init__(state['archive_file'], state['dtype'], state.get('cache_MB', 256.))
+
+    def read_array(self, key):
+        """ One of the arrays saved with the ifgs (e.g. 'mask', 'lons', or an extra array).
+        """
+        import io
+        import numpy as np
+        return np.load(io.BytesIO(self._zip.read(f"{key}.npy")), allow_pickle = False)
+
+    @property
+    def shape(self):
+        return (self.metadata['n_ifgs'], self.metadata['n_pixels'])
+
+    @property
+    def ndim(self):
+        return 2
+
+    def __len__(self):
+        return self.shape[0]
+
+    def _decode_chunk(self, ifg_n, chunk_n):
+        """ Decompress the quantised codes of one chunk of an epoch.
+        """
+        import numpy as np
+        name = f"ifg_{ifg_n:05d}" if self.metadata['version'] == 1 else f"ifg_{ifg_n:05d}_{chunk_n:04d}"
+        if self.metadata['codec'] == 'blosc':
+            codes = np.frombuffer(self._blosc.decode(self._zip.read(f"{name}.blosc")), dtype = 'int16')
+        elif self.metadata['version'] == 1:
+            shuffled = self.read_array(name)
+            codes = _unshuffle(shuffled[0], shuffled[1])
+        else:
+            codes = _unshuffle(_npy_bytes_array(self._zip.read(f"{name}_lo.npy")), _npy_bytes_array(self._zip.read(f"{name}_hi.npy")))
+        return codes
+
+    def chunk_codes(self, ifg_n, chunk_n):
+        """ The quantised codes of one chunk of an epoch, from the cache if it has been decompressed recently.
+        """
+        key = (ifg_n, chunk_n)
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        codes = self._decode_chunk(ifg_n, chunk_n)
+        codes.flags.writeable = False                                                                   # as it's shared by the reads that use the cache
+        with self._cache_lock:
+            self.n_decoded += 1
+            if (key not in self._cache) and (codes.nbytes <= self.cache_MB * 1e6):
+                self._cache[key] = codes
+                self._cache_bytes += codes.nbytes
+                while self._cache_bytes > self.cache_MB * 1e6:
+                    _, old_codes = self._cache.popitem(last = False)
+                    self._cache_bytes -= old_codes.nbytes
+        return codes
+
+    def _pixel_chunks(self, pixels):
+        """ Which chunks some pixels are in.
+        Returns:
+            n_pixels | int | number of pixels.
+            parts | list of tuples | for each chunk: its number, the pixels in it (relative to its start), and where they go in the output.  These are 
+                                     slices if pixels is a slice (with a step of 1), so that the epochs can be written straight into the output.  
+        """
+        import numpy as np
+        if isinstance(pixels, slice) and pixels.step in [None, 1]:
+            start, stop, _ = pixels.indices(self.shape[1])
+            stop = max(start, stop)
+            parts = []
+            for chunk_n in range(start // self.chunk_pixels, (stop + self.chunk_pixels - 1) // self.chunk_pixels):
+                chunk_start = chunk_n * self.chunk_pixels
+                part_start, part_stop = max(start, chunk_start), min(stop, chunk_start + self.chunk_pixels)
+                parts.append((chunk_n, slice(part_start - chunk_start, part_stop - chunk_start), slice(part_start - start, part_stop - start)))
+            return stop - start, parts
+        else:
+            pixel_ns = np.atleast_1d(np.arange(self.shape[1])[pixels])                                 # e.g. a boolean mask, or the numbers of the pixels
+            chunk_ns = pixel_ns // self.chunk_pixels
+            parts = []
+            for chunk_n in np.unique(chunk_ns):
+                positions = np.nonzero(chunk_ns == chunk_n)[0]
+                parts.append((int(chunk_n), pixel_ns[positions] - (chunk_n * self.chunk_pixels), positions))
+            return pixel_ns.size, parts
+
+    def read_epoch(self, ifg_n, pixels = slice(None), out = None):
+        """ Decompress and dequantise some pixels of one interferogram (a row vector), optionally into out.
+        """
+        import numpy as np
+        n_pixels, parts = self._pixel_chunks(pixels)
+        if out is None:
+            out = np.empty(n_pixels, dtype = self.dtype)
+        for chunk_n, in_chunk, in_out in parts:
+            codes = self.chunk_codes(ifg_n, chunk_n)[in_chunk]
+            if isinstance(in_out, slice):
+                dequantise_ifg(codes, self.scales[ifg_n], self.offsets[ifg_n], out = out[in_out])
+            else:
+                out[in_out] = dequantise_ifg(codes, self.scales[ifg_n], self.offsets[ifg_n], self.dtype)
+        return out
+
+    def __getitem__(self, key):
+        import numpy as np
+        rows, pixels = key if isinstance(key, tuple) else (key, slice(None))
+        one_pixel = isinstance(pixels, (int, np.integer))
+        if one_pixel:
+            pixels = slice(pixels % self.shape[1], (pixels % self.shape[1]) + 1)
+        if isinstance(rows, (int, np.integer)):
+            if rows < 0:
+                rows += len(self)
+            data = self.read_epoch(int(rows), pixels)
+            return data[0] if one_pixel else data
+        elif isinstance(rows, slice):
+            row_ns = range(*rows.indices(len(self)))
+            n_pixels, _ = self._pixel_chunks(pixels)
+            data = np.empty((len(row_ns), n_pixels), dtype = self.dtype)
+            for row_i, row_n in enumerate(row_ns):
+                self.read_epoch(row_n, pixels, out = data[row_i])
+            return data[:, 0] if one_pixel else data
+        else:
+            raise Exception(f"IfgArchive can only be indexed with an int or a slice for the rows, but got {rows}.  ")
+
+    def __array__(self, dtype = None):
+        data = self[:]
+        return data if dtype is None else data.astype(dtype, copy = False)
+
+    def close(self):
+        self._zip.close()
+
+
+def load_ifg_archive(archive_file, lazy = True, dtype = 'float64', cache_MB = 256.):
+    """ Open an archive made by save_ifg_archive.
+    Inputs:
+        archive_file | string or Path |
+        lazy | boolean | If True, the ifgs are a LazyIfgs (as per lazy_ifgs.py), so are only read when they are needed (e.g. by batch mode).
+                         If False, they are all read into memory.
+        dtype | string | precision of the ifgs that are returned.
+        cache_MB | float | size of the cache of decompressed chunks (see IfgArchive).  
+    Returns:
+        displacement_r2 | dict | 'incremental', 'mask', and 'lons' and 'lats' if they were saved.
+        acq_dates | list of strings or None |
+        extras | dict | the other arrays that were saved.
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Add cache_MB argument.  
+    """
+    import numpy as np
+    from licsalert.lazy_ifgs import LazyIfgs
+
+    archive = IfgArchive(archive_file, dtype, cache_MB)
+    if lazy:
+        incremental = LazyIfgs(archive, dtype = dtype, row_means = archive.row_means)                  # the row means were saved, so nothing is read yet
+    else:
+        incremental = np.asarray(archive)
+    displacement_r2 = {'incremental' : incremental, 'mask' : archive.read_array('mask')}
+    extras = {}
+    for key in archive.metadata['arrays']:
+        if key in ['lons', 'lats']:
+            displacement_r2[key] = archive.read_array(key)
+        elif key not in ['mask', 'scales', 'offsets', 'row_means', 'max_errors', 'rms_errors']:
+            extras[key] = archive.read_array(key)
+    return displacement_r2, archive.metadata['acq_dates'], extras
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A wrapper so that LiCSAlert can use interferograms (as row vectors) that are not in memory, such as a np.memmap, an h5py dataset, or a dask array.
+Only the parts that are needed (e.g. the baseline interferograms for ICASAR, or a block of pixels for the inversion) are read, and they are
+mean centred as they are read (rather than making a mean centred copy of the whole time series).  The mean of each row is found from the first
+read of the whole row (or by the first pass of the blocked inversion), so the time series isn't read just to find them.  The interferograms
+for the figures are also only downsampled when they are used (see DownsampledIfgs).
+
+@author: Matthew Gaddes
+"""
+
+#%%
+
+def is_lazy(ifgs):
+    """ Return True if ifgs is not an in memory numpy array (e.g. a np.memmap, h5py dataset, dask array, or LazyIfgs), in which case
+    only the parts that are needed should be read.
+    """
+    import numpy as np
+    if ifgs is None:
+        return False
+    return isinstance(ifgs, np.memmap) or not isinstance(ifgs, np.ndarray)
+
+
+#%%
+
+class LazyIfgs(object):
+    """ Interferograms as row vectors (n_ifgs x n_pixels) that are read from an array-like object (anything with .shape and that can be
+    indexed with [rows, columns]) only when they are needed, and are mean centred (along rows) as they are read.
+
+    Slicing just the rows (e.g. ifgs[:n_baseline_end]) returns another LazyIfgs, so doesn't read anything.  Indexing the pixels
+    (e.g. ifgs[:, 0:1000] or ifgs[:10, :]), indexing a single row, or using np.asarray(ifgs) reads the data and returns a numpy array.
+
+    The mean of a row is unknown (nan in row_means) until the whole row is read, or until the first pass of blocked_components_inversion
+    (which reads every pixel of the rows anyway) sets it.  Reading some of the pixels of a row whose mean isn't known yet (e.g. for a sketch)
+    reads the whole row first.  The row means are shared by the LazyIfgs that are made by slicing the rows, so each is only found once.
+
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Find the row means when the rows are first read, rather than reading every row when made.  
+    """
+    def __init__(self, ifgs, dtype = 'float64', row_means = None, row_start = 0, row_stop = None):
+        """
+        Inputs:
+            ifgs | array-like | interferograms as row vectors, e.g. a np.memmap, h5py dataset, or dask array.
+            dtype | string | precision of the arrays that are returned.
+            row_means | r1 array or None | mean of each row (for mean centering), or nan for a row whose mean isn't known yet.  If None, 
+                                           they are all found when the rows are first read.  
+            row_start | int | first row of ifgs that is used.
+            row_stop | int or None | row of ifgs to stop at.  If None, all the rows are used.
+        """
+        import numpy as np
+        self.ifgs = ifgs
+        self.dtype = np.dtype(dtype)
+        self.row_start = row_start
+        self.row_stop = ifgs.shape[0] if row_stop is None else row_stop
+        if row_means is None:
+            row_means = np.full(ifgs.shape[0], np.nan)                                   # nothing is read yet
+        self.row_means = np.asarray(row_means, dtype = 'float64')                       # no copy if it's already an array, so slices share it
+
+    @property
+    def shape(self):
+        return (self.row_stop - self.row_start, self.ifgs.shape[1])
+
+    @property
+    def ndim(self):
+        return 2
+
+    @property
+    def size(self):
+        return self.shape[0] * self.shape[1]
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __iter__(self):
+        for row_n in range(len(self)):                                           # one row at a time (e.g. for downsample_ifgs)
+            yield self[row_n]
+
+    def __getitem__(self, key):
+        import numpy as np
+        if isinstance(key, tuple) and len(key) == 1:                                   # e.g. ifgs[n_start:n_end,]
+            key = key[0]
+        if isinstance(key, tuple):
+            rows, pixels = key
+        else:
+            rows, pixels = key, slice(None)
+
+        # 1: Only the rows are being selected, so return a new LazyIfgs.
+        if (not isinstance(key, tuple)) and isinstance(rows, slice) and rows.step in [None, 1]:
+            row_start, row_stop, _ = rows.indices(len(self))
+            row_stop = max(row_start, row_stop)
+            return LazyIfgs(self.ifgs, self.dtype, self.row_means, self.row_start + row_start, self.row_start + row_stop)
+
+        # 2: Otherwise, read the data and mean centre it
+        if isinstance(rows, (int, np.integer)):
+            if rows < 0:
+                rows += len(self)
+            row_start, row_stop = rows, rows + 1
+        elif isinstance(rows, slice) and rows.step in [None, 1]:
+            row_start, row_stop, _ = rows.indices(len(self))
+            row_stop = max(row_start, row_stop)
+        else:
+            raise Exception(f"LazyIfgs can only be indexed with an int or a slice (with a step of 1) for the rows, but got {rows}.  ")
+        all_pixels = isinstance(pixels, slice) and (pixels.indices(self.shape[1]) == (0, self.shape[1], 1))
+        if not all_pixels:
+            self._find_row_means(row_start, row_stop)                                   # only some of the pixels are read, so the means have to be found from the whole rows
+        data = self.read_uncentred(row_start, row_stop, pixels)
+        if all_pixels:
+            self._set_row_means(row_start, np.mean(data, axis = 1, dtype = 'float64'))  # no-op if they're already known
+        data = data - self.row_means[self.row_start + row_start : self.row_start + row_stop, np.newaxis].astype(self.dtype)
+        if isinstance(rows, (int, np.integer)):
+            return data[0]
+        else:
+            return data
+
+    def read_uncentred(self, row_start, row_stop, pixels):
+        """ Read some of the rows (row_start and row_stop are relative to this LazyIfgs) and pixels, without mean centering them.
+        """
+        import numpy as np
+        return np.asarray(self.ifgs[self.row_start + row_start : self.row_start + row_stop, pixels], dtype = self.dtype)
+
+    def row_means_known(self):
+        """ Return True if the means of all the rows of this LazyIfgs are known (so that blocks of pixels can be mean centred as they're read).
+        """
+        import numpy as np
+        return not np.any(np.isnan(self.row_means[self.row_start : self.row_stop]))
+
+    def _set_row_means(self, row_start, row_means):
+        """ Set the means of the rows from row_start (relative to this LazyIfgs) on, unless they are already known.
+        """
+        import numpy as np
+        row_means_current = self.row_means[self.row_start + row_start : self.row_start + row_start + len(row_means)]
+        unknown = np.isnan(row_means_current)
+        row_means_current[unknown] = np.asarray(row_means)[unknown]                       # in place, so the LazyIfgs that share them also have them
+
+    def _find_row_means(self, row_start, row_stop):
+        """ Find any of the means of the rows from row_start to row_stop that aren't known, by reading those rows one at a time.
+        """
+        import numpy as np
+        for row_n in range(row_start, row_stop):
+            if np.isnan(self.row_means[self.row_start + row_n]):
+                self._set_row_means(row_n, [np.mean(self.read_uncentred(row_n, row_n + 1, slice(None)), dtype = 'float64')])
+
+    def __array__(self, dtype = None):
+        import numpy as np
+        data = self[0:len(self), :]
+        if dtype is not None:
+            data = data.astype(dtype, copy = False)
+        return data
+
+    def astype(self, dtype, copy = True):
+        """ Return the interferograms as a numpy array (i.e. they are read).
+        """
+        import numpy as np
+        return np.asarray(self, dtype = dtype)
+
+
+#%%
+
+class DownsampledIfgs(object):
+    """ Interferograms as row vectors (e.g. a LazyIfgs) that are downsampled for the figures (as per downsample_ifgs), but only when each row is
+    first used, and are then kept.  E.g. no rows are read if no figures are made, and making the figure of each date only downsamples the new ifg.
+
+    Slicing just the rows returns another DownsampledIfgs (that shares the rows that have been downsampled), and indexing a single row, indexing
+    the pixels, or using np.asarray(ifgs) returns a numpy array.
+
+    History:
+        2026/10/18 | MEG | Written
+    """
+    def __init__(self, ifgs, mask, scale, dtype = 'float64', mask_downsampled = None, rows_downsampled = None):
+        """
+        Inputs:
+            ifgs | array-like | interferograms as row vectors (e.g. a LazyIfgs), which are read one row at a time.
+            mask | rank 2 boolean | to convert a row of ifgs into a rank 2 masked array.
+            scale | float | as per downsample_ifgs.
+            dtype | string | precision of the downsampled ifgs.
+            mask_downsampled | None or rank 2 boolean | the downsampled mask.  If None, it is made from mask.
+            rows_downsampled | None or dict | the rows of ifgs that have already been downsampled (so that they can be shared).
+        """
+        import numpy as np
+        from licsalert.downsample_ifgs import downsample_mask
+        self.ifgs = ifgs
+        self.mask = mask
+        self.scale = scale
+        self.dtype = np.dtype(dtype)
+        self.mask_downsampled = downsample_mask(mask, scale) if mask_downsampled is None else mask_downsampled
+        self.rows_downsampled = {} if rows_downsampled is None else rows_downsampled
+
+    @property
+    def shape(self):
+        return (self.ifgs.shape[0], int(self.mask_downsampled.size - self.mask_downsampled.sum()))
+
+    @property
+    def ndim(self):
+        return 2
+
+    @property
+    def size(self):
+        return self.shape[0] * self.shape[1]
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __iter__(self):
+        for row_n in range(len(self)):
+            yield self[row_n]
+
+    def _row(self, row_n):
+        """ Return one row, downsampling it if it hasn't been already.
+        """
+        import numpy as np
+        from licsalert.downsample_ifgs import downsample_ifg
+        if row_n not in self.rows_downsampled:
+            self.rows_downsampled[row_n] = np.asarray(downsample_ifg(np.asarray(self.ifgs[row_n]), self.mask, self.mask_downsampled, self.scale), dtype = self.dtype)
+        return self.rows_downsampled[row_n]
+
+    def __getitem__(self, key):
+        import numpy as np
+        if isinstance(key, tuple) and len(key) == 1:                                   # e.g. ifgs[n_start:n_end,]
+            key = key[0]
+        if isinstance(key, tuple):
+            rows, pixels = key
+        else:
+            rows, pixels = key, slice(None)
+
+        # 1: Only the rows are being selected, so return a new DownsampledIfgs (which shares the downsampled rows, as they have the same numbers if they start at 0)
+        if (not isinstance(key, tuple)) and isinstance(rows, slice) and rows.step in [None, 1]:
+            row_start, row_stop, _ = rows.indices(len(self))
+            return DownsampledIfgs(self.ifgs[row_start : max(row_start, row_stop)], self.mask, self.scale, self.dtype, self.mask_downsampled,
+                                   self.rows_downsampled if row_start == 0 else None)
+
+        # 2: Otherwise, downsample the rows that haven't been yet
+        if isinstance(rows, (int, np.integer)):
+            return self._row(int(rows) % len(self))[pixels]
+        else:
+            row_ns = range(len(self))[rows]
+            data = np.zeros((len(row_ns), self.shape[1]), dtype = self.dtype)
+            for data_row_n, row_n in enumerate(row_ns):
+                data[data_row_n] = self._row(row_n)
+            return data[:, pixels]
+
+    def __array__(self, dtype = None):
+        data = self[0:len(self), :]
+        if dtype is not None:
+            data = data.astype(dtype, copy = False)
+        return data
+
+    def astype(self, dtype, copy = True):
+        """ Return the downsampled interferograms as a numpy array (i.e. they are all downsampled).
+        """
+        import numpy as np
+        return np.asarray(self, dtype = dtype)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sweep the settings of LiCSAlert (the length of the baseline stage, t_recalculate, and the alert threshold) without re-running it for each variant.
+
+The interferograms are projected onto the sources once (sweep_projection), which keeps everything that the time courses and the cumulative residual
+of any baseline length can be made from:
+    - the projection of each ifg onto the sources (and of a constant, as bss_components_inversion mean centres the baseline and monitoring ifgs
+      separately, which shifts the time courses by a different amount for each baseline length),
+    - the sum of each ifg (to find these means),
+    - the squared norm of the cumulative residual of each ifg, and its dot product with the reconstruction of a constant (so the RMS of the cumulative
+      residual can be found for any baseline length without the pixels).
+Each variant then only needs the lines of best fit and the rolling means of the time courses, which are vectorised across the values of t_recalculate,
+so a sweep of many variants costs little more than a single run of LiCSAlert.  The distances are those of a run of LiCSAlert with all of the
+interferograms (as per the results saved by LiCSAlert_batch_mode), and the sources are the same for each variant (i.e. ICASAR is not re-run for each
+baseline length).
+
+e.g.:
+    table = LiCSAlert_sweep(sources, cumulative_baselines, ifgs, n_baseline_ends = [30, 35, 40], t_recalculates = [5, 10, 15, 20],
+                            alert_sigmas = [2.5, 3., 3.5], acq_dates = acq_dates, out_file = 'LiCSAlert_sweep.csv')
+
+@author: Matthew Gaddes
+"""
+
+#%%
+
+def sweep_projection(sources, ifgs, dtype = 'float64', memory_budget = None, n_threads = 1):
+    """ Project the interferograms onto the sources once, keeping what is needed to make the time courses and the cumulative residual for any
+    baseline length.  Works on blocks of pixels if memory_budget is set (see blocked_inversion.py), so the ifgs can also be an array that isn't in memory.
+    Inputs:
+        sources | r2 array | sources as row vectors.
+        ifgs | r2 array | all the interferograms (baseline and monitoring) as row vectors.
+        dtype | string | 'float64' or 'float32'.  Precision used for the blocks of pixels (the sums are kept as float64).
+        memory_budget | None or float | If a float, the pixels are worked through in blocks that use at most this much memory (MB).
+        n_threads | int | number of threads the blocks of pixels are processed on.
+    Returns:
+        projection | dict | tcs_raw: the projection of each ifg onto the sources (n_ifgs x n_sources, not mean centred).  tcs_constant: the projection
+                            of a constant of 1 (n_sources).  ifg_sums: the sum of each ifg.  residual_norms: the squared norm of the cumulative residual
+                            (of tcs_raw).  residual_constant_dots: its dot product with the reconstruction of the constant.  constant_norm: the squared
+                            norm of the reconstruction of the constant.  n_pixels.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import numpy as np
+    from licsalert.blocked_inversion import pixel_block_size, pixel_blocks, _rows_block, _map_blocks
+
+    sources = np.asarray(sources, dtype = dtype)
+    (n_sources, n_pixels) = sources.shape
+    n_ifgs = ifgs.shape[0]
+    if memory_budget is None:
+        blocks = [slice(0, n_pixels)]
+    else:
+        blocks = pixel_blocks(n_pixels, pixel_block_size(n_ifgs, n_sources, memory_budget, dtype, n_threads))
+
+    # 1: the normal equations (and the sum of each ifg), which need one pass through the pixels
+    def first_pass(pixels):
+        g_block = sources[:, pixels]
+        d_block = _rows_block([ifgs], pixels, dtype)
+        return (g_block.astype('float64') @ g_block.T.astype('float64'), g_block.astype('float64') @ d_block.T.astype('float64'),
+                np.sum(d_block, axis = 1, dtype = 'float64'), np.sum(g_block, axis = 1, dtype = 'float64'))
+
+    gtg = np.zeros((n_sources, n_sources))
+    gtd = np.zeros((n_sources, n_ifgs))
+    ifg_sums = np.zeros(n_ifgs)
+    gt1 = np.zeros(n_sources)
+    for gtg_block, gtd_block, ifg_sums_block, gt1_block in _map_blocks(first_pass, blocks, n_threads):
+        gtg += gtg_block
+        gtd += gtd_block
+        ifg_sums += ifg_sums_block
+        gt1 += gt1_block
+    gtg_inv = np.linalg.inv(gtg)
+    tcs_raw = (gtg_inv @ gtd).T                                                                           # n_ifgs x n_sources
+    tcs_constant = gtg_inv @ gt1                                                                          # the time course of an ifg that is 1 everywhere
+
+    # 2: the cumulative residual, split into the part that doesn't depend on the baseline length, and the reconstruction of the constant that does
+    tcs_raw_dtype = tcs_raw.astype(dtype)
+    reconstruction_constant = (tcs_constant @ sources.astype('float64'))                                  # n_pixels
+    def second_pass(pixels):
+        residual_cs = np.cumsum(_rows_block([ifgs], pixels, dtype) - (tcs_raw_dtype @ sources[:, pixels]), axis = 0).astype('float64')
+        return np.sum(residual_cs**2, axis = 1), residual_cs @ reconstruction_constant[pixels]
+
+    residual_norms = np.zeros(n_ifgs)
+    residual_constant_dots = np.zeros(n_ifgs)
+    for residual_norms_block, residual_constant_dots_block in _map_blocks(second_pass, blocks, n_threads):
+        residual_norms += residual_norms_block
+        residual_constant_dots += residual_constant_dots_block
+
+    projection = {'tcs_raw'                : tcs_raw,
+                  'tcs_constant'           : tcs_constant,
+                  'ifg_sums'               : ifg_sums,
+                  'residual_norms'         : residual_norms,
+                  'residual_constant_dots' : residual_constant_dots,
+                  'constant_norm'          : float(np.sum(reconstruction_constant**2)),
+                  'n_pixels'               : n_pixels}
+    return projection
+
+
+def sweep_time_courses(projection, n_baseline_end):
+    """ Make the cumulative time courses of the sources and the cumulative residual for one baseline length, as they would be from LiCSAlert
+    with all of the ifgs (i.e. the baseline and monitoring ifgs are mean centred separately).
+    Inputs:
+        projection | dict | from sweep_projection
+        n_baseline_end | int | number of ifgs in the baseline stage.
+    Returns:
+        tcs_c | r2 array | n_ifgs x (n_sources + 1).  The cumulative time course of each source, and the cumulative residual as the last column.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import numpy as np
+
+    n_ifgs = projection['tcs_raw'].shape[0]
+    ifg_means = np.zeros(n_ifgs)
+    ifg_means[:n_baseline_end] = np.sum(projection['ifg_sums'][:n_baseline_end]) / (n_baseline_end * projection['n_pixels'])
+    if n_baseline_end < n_ifgs:
+        ifg_means[n_baseline_end:] = np.sum(projection['ifg_sums'][n_baseline_end:]) / ((n_ifgs - n_baseline_end) * projection['n_pixels'])
+    tcs_c = np.cumsum(projection['tcs_raw'] - ifg_means[:, np.newaxis] * projection['tcs_constant'][np.newaxis, :], axis = 0)
+
+    means_c = np.cumsum(ifg_means)                                                                        # the cumulative residual is (that of tcs_raw) + means_c * (reconstruction of the constant)
+    residual_squared = (projection['residual_norms'] + (2 * means_c * projection['residual_constant_dots']) +
+                        (means_c**2 * projection['constant_norm']))
+    residual_c = np.sqrt(np.maximum(residual_squared, 0) / projection['n_pixels'])
+    return np.hstack((tcs_c, residual_c[:, np.newaxis]))
+
+
+def sweep_distances(tcs_c, time_values, n_baseline_end, t_recalculates):
+    """ Calculate the line-to-point distances (in sigmas) of the monitoring ifgs for several values of t_recalculate at once, as per tcs_baseline
+    and tcs_monitoring.
+    Inputs:
+        tcs_c | r2 array | cumulative time courses as column vectors (e.g. from sweep_time_courses).
+        time_values | r1 array | cumulative temporal baselines.
+        n_baseline_end | int | number of ifgs in the baseline stage.
+        t_recalculates | list of ints | each must be at most n_baseline_end.
+    Returns:
+        distances | r3 array | n_t_recalculates x n_ifgs x n_time_courses.  The baseline ifgs are 0 (as they can't alert).
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import numpy as np
+
+    n_ifgs = tcs_c.shape[0]
+    time_values = np.asarray(time_values[:n_ifgs], dtype = 'float64')
+    t_recalculates = np.asarray(t_recalculates)
+
+    # 1: the line of best fit to the baseline (which gives the gradient and sigma), for all the time courses at once
+    gradients, y_intercepts = np.polyfit(time_values[:n_baseline_end], tcs_c[:n_baseline_end], 1)
+    sigmas = np.std(tcs_c[:n_baseline_end] - (np.outer(time_values[:n_baseline_end], gradients) + y_intercepts), axis = 0)
+
+    # 2: the rolling means of the t_recalculate points before each monitoring ifg, from cumulative sums
+    monitoring = np.arange(n_baseline_end, n_ifgs)
+    tcs_cs = np.vstack((np.zeros((1, tcs_c.shape[1])), np.cumsum(tcs_c, axis = 0)))
+    times_cs = np.concatenate(([0.], np.cumsum(time_values)))
+    starts = monitoring[np.newaxis, :] - t_recalculates[:, np.newaxis]                                   # n_t_recalculates x n_monitoring
+    tcs_means = (tcs_cs[monitoring][np.newaxis, :, :] - tcs_cs[starts]) / t_recalculates[:, np.newaxis, np.newaxis]
+    times_means = (times_cs[monitoring][np.newaxis, :] - times_cs[starts]) / t_recalculates[:, np.newaxis]
+
+    # 3: the distance of each monitoring ifg from the line through these means (with the baseline gradient)
+    line_yvals = tcs_means + gradients * (time_values[monitoring][np.newaxis, :] - times_means)[:, :, np.newaxis]
+    distances = np.zeros((len(t_recalculates), n_ifgs, tcs_c.shape[1]))
+    distances[:, n_baseline_end:, :] = np.abs(tcs_c[monitoring][np.newaxis, :, :] - line_yvals) / sigmas
+    return distances
+
+
+#%%
+
+def LiCSAlert_sweep(sources, time_values, ifgs, n_baseline_ends, t_recalculates, alert_sigmas, acq_dates = None, out_file = None,
+                    dtype = 'float64', memory_budget = None, n_threads = 1):
+    """ Find when LiCSAlert would alert for each combination of baseline length, t_recalculate, and alert threshold, with one projection of the
+    interferograms onto the sources.
+    Inputs:
+        sources | r2 array | sources (from ICASAR) as row vectors.
+        time_values | r1 array | cumulative temporal baselines of the ifgs.
+        ifgs | r2 array | all the interferograms (baseline and monitoring) as row vectors, mean centred and downsampled as per LiCSAlert_preprocessing_run.
+        n_baseline_ends | list of ints | numbers of ifgs in the baseline stage.
+        t_recalculates | list of ints | as per LiCSAlert.  Combinations where t_recalculate is more than n_baseline_end are skipped.
+        alert_sigmas | list of floats | alert thresholds (in sigmas).
+        acq_dates | list of strings or None | acquisition dates (YYYYMMDD), so that the date of the first alert can be given.
+        out_file | string or Path or None | if not None, the table is saved to this .csv file.
+        dtype, memory_budget, n_threads | as per LiCSAlert.
+    Returns:
+        table | list of dicts | one per variant: n_baseline_end, t_recalculate, alert_sigma, first_alert_n (the ifg number, or None), first_alert_date,
+                                first_alert_distance (the largest distance at the first alert), n_alerts, and alert (i.e. for the most recent ifg).
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import numpy as np
+
+    n_ifgs = ifgs.shape[0]
+    if sources.shape[1] != ifgs.shape[1]:
+        raise Exception(f"The sources don't have the same number of pixels ({sources.shape[1]}) as the interferograms ({ifgs.shape[1]}).  Exiting...")
+    projection = sweep_projection(sources, ifgs, dtype, memory_budget, n_threads)
+
+    table = []
+    for n_baseline_end in n_baseline_ends:
+        if not (2 <= n_baseline_end < n_ifgs):
+            print(f"n_baseline_end of {n_baseline_end} leaves no baseline or no monitoring ifgs ({n_ifgs} ifgs), so is being skipped.  ")
+            continue
+        t_recalculates_valid = [t_recalculate for t_recalculate in t_recalculates if t_recalculate <= n_baseline_end]
+        if len(t_recalculates_valid) < len(t_recalculates):
+            print(f"t_recalculate can't be more than n_baseline_end ({n_baseline_end}), so {sorted(set(t_recalculates) - set(t_recalculates_valid))} are being skipped.  ")
+        if len(t_recalculates_valid) == 0:
+            continue
+        tcs_c = sweep_time_courses(projection, n_baseline_end)
+        max_distances = np.max(sweep_distances(tcs_c, time_values, n_baseline_end, t_recalculates_valid), axis = 2)       # n_t_recalculates x n_ifgs, largest of the sources and the residual
+        for t_n, t_recalculate in enumerate(t_recalculates_valid):
+            for alert_sigma in alert_sigmas:
+                alerts = max_distances[t_n] > alert_sigma
+                alert_ns = np.flatnonzero(alerts)
+                first_alert_n = int(alert_ns[0]) if len(alert_ns) > 0 else None
+                table.append({'n_baseline_end'       : int(n_baseline_end),
+                              't_recalculate'        : int(t_recalculate),
+                              'alert_sigma'          : float(alert_sigma),
+                              'first_alert_n'        : first_alert_n,
+                              'first_alert_date'     : None if (first_alert_n is None or acq_dates is None) else str(acq_dates[first_alert_n + 1]),    # the date the ifg ends on
+                              'first_alert_distance' : None if first_alert_n is None else float(max_distances[t_n, first_alert_n]),
+                              'n_alerts'             : int(len(alert_ns)),
+                              'alert'                : bool(alerts[-1])})
+
+    if out_file is not None:
+        header = ['n_baseline_end', 't_recalculate', 'alert_sigma', 'first_alert_n', 'first_alert_date', 'first_alert_distance', 'n_alerts', 'alert']
+        with open(out_file, 'w') as f:
+            f.write(",".join(header) + "\n")
+            for row in table:
+                f.write(",".join(['' if row[key] is None else str(row[key]) for key in header]) + "\n")
+        print(f"Saved the alert timings of {len(table)} variants to {out_file}")
+    return table
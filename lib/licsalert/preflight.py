@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Checks that are made before LiCSAlert is run, so that a bad choice of settings fails (or is corrected) before LiCSBAS or ICASAR have been run:
+    - validate_settings: raise an exception if any settings are invalid (e.g. baseline_end before the first acquisition).
+    - estimate_costs: predict the run time and peak memory of each stage (preprocessing, the inversion, the residuals, and the figures) from only the
+                      size of the time series, using a cost model that can be calibrated with the results of benchmarks/LiCSAlert_benchmarks.py.
+    - autotune_settings: choose downsample_run, downsample_plot, memory_budget (the size of the blocks of pixels used by the inversion), and
+                         intermediate_figures so that the estimate fits within a memory and time budget.
+    - load_cost_model: the cost model that these use, from the results of the benchmarks or a model saved by save_cost_model (the cost_model
+                       argument of LiCSAlert_batch_mode, and setting of monitoring mode).
+ICASAR is not included in the estimates, as its cost depends mostly on its own settings (e.g. the number of bootstrapped runs).
+
+@author: Matthew Gaddes
+"""
+
+# Default cost model.  For each stage, the time (s) and memory (bytes) per pixel per interferogram, and a constant time and memory (MB).
+# The time of preprocessing is per pixel at full resolution, and the figures are per pixel at the resolution of the figures (i.e. after downsample_plot).  These can be replaced by calibrate_cost_model.
+default_cost_model = {'preprocessing' : {'time_per_pixel_ifg' : 2e-8, 'bytes_per_pixel_ifg' : 8.,  'time_constant' : 0.,  'memory_constant_MB' : 0.},
+                      'inversion'     : {'time_per_pixel_ifg' : 5e-9, 'bytes_per_pixel_ifg' : 16., 'time_constant' : 0.,  'memory_constant_MB' : 0.},
+                      'residuals'     : {'time_per_pixel_ifg' : 1e-8, 'bytes_per_pixel_ifg' : 24., 'time_constant' : 0.,  'memory_constant_MB' : 0.},
+                      'figures'       : {'time_per_pixel_ifg' : 1e-7, 'bytes_per_pixel_ifg' : 16., 'time_constant' : 2.,  'memory_constant_MB' : 100.}}
+
+# The benchmarked function that is used to calibrate each stage, and the downsampling of the pixels that the benchmark used for it.
+benchmark_stages = {'preprocessing' : ('downsample_ifgs', 1.0),
+                    'inversion'     : ('bss_components_inversion', 1.0),
+                    'residuals'     : ('residual_for_pixels', 1.0),
+                    'figures'       : ('LiCSAlert_figure', 0.5)}
+
+
+#%%
+
+def validate_settings(n_ifgs = None, n_baseline_end = None, acq_dates = None, baseline_end = None, downsample_run = 1.0, downsample_plot = 0.5,
+                      dtype = 'float64', alert_sigma = 3., cascade_fraction = None, sketch_size = None, sketch_method = 'subset', memory_budget = None,
+                      n_threads = 1):
+    """ Check the settings of LiCSAlert, and raise an exception (that lists all the problems) if any are invalid.  Settings that aren't known yet
+    (e.g. the number of ifgs before LiCSBAS has been run) can be None.
+    Inputs:
+        n_ifgs | int or None | number of incremental interferograms.
+        n_baseline_end | int or None | number of interferograms in the baseline stage (batch mode).
+        acq_dates | list of strings or None | acquisition dates (YYYYMMDD), e.g. of the LiCSAR interferograms.
+        baseline_end | string or None | date the baseline stage ends (YYYYMMDD, monitoring mode).
+        others | as per LiCSAlert_batch_mode.  downsample_run and downsample_plot can also be 'auto'.
+    Returns:
+        problems | list | empty (as otherwise an exception is raised).
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import datetime
+
+    problems = []
+    for name, value in [('downsample_run', downsample_run), ('downsample_plot', downsample_plot)]:
+        if value != 'auto' and not (0 < float(value) <= 1):
+            problems.append(f"{name} must be more than 0 and at most 1 (or 'auto'), but is {value}.")
+    if dtype not in ['float32', 'float64']:
+        problems.append(f"dtype must be 'float32' or 'float64', but is {dtype}.")
+    if not alert_sigma > 0:
+        problems.append(f"alert_sigma must be positive, but is {alert_sigma}.")
+    if (cascade_fraction is not None) and not (0 < cascade_fraction <= 1):
+        problems.append(f"cascade_fraction must be more than 0 and at most 1, but is {cascade_fraction}.")
+    if (sketch_size is not None) and not (int(sketch_size) > 0):
+        problems.append(f"sketch_size must be positive, but is {sketch_size}.")
+    if sketch_method not in ['subset', 'countsketch']:
+        problems.append(f"sketch_method must be 'subset' or 'countsketch', but is {sketch_method}.")
+    if (memory_budget is not None) and (memory_budget != 'auto') and not (memory_budget > 0):
+        problems.append(f"memory_budget must be positive, but is {memory_budget}.")
+    if not (int(n_threads) >= 1):
+        problems.append(f"n_threads must be at least 1, but is {n_threads}.")
+
+    if n_baseline_end is not None:
+        if n_baseline_end < 2:
+            problems.append(f"n_baseline_end must be at least 2, but is {n_baseline_end}.")
+        if (n_ifgs is not None) and (n_baseline_end > n_ifgs):
+            problems.append(f"n_baseline_end ({n_baseline_end}) is more than the number of interferograms ({n_ifgs}).")
+    if (acq_dates is not None) and (n_ifgs is not None) and (len(acq_dates) != n_ifgs + 1):
+        problems.append(f"There should be one more acquisition date ({len(acq_dates)}) than interferograms ({n_ifgs}).")
+
+    if baseline_end is not None:
+        try:
+            baseline_end_dt = datetime.datetime.strptime(str(baseline_end), '%Y%m%d')
+        except ValueError:
+            problems.append(f"baseline_end must be a date in the form YYYYMMDD, but is {baseline_end}.")
+            baseline_end_dt = None
+        if (baseline_end_dt is not None) and (acq_dates is not None) and (len(acq_dates) > 0):
+            if baseline_end_dt < datetime.datetime.strptime(str(min(acq_dates)), '%Y%m%d'):
+                problems.append(f"baseline_end ({baseline_end}) is before the first acquisition ({min(acq_dates)}).")
+
+    if len(problems) > 0:
+        raise Exception("The LiCSAlert settings are invalid:\n    " + "\n    ".join(problems) + "\nExiting...")
+    return problems
+
+
+#%%
+
+def estimate_costs(n_pixels, n_ifgs, downsample_run = 1.0, downsample_plot = 0.5, run_lengths = None, figures = True, dtype = 'float64',
+                   memory_budget = None, model = None):
+    """ Predict the run time and peak memory of each stage of LiCSAlert, from the size of the time series.
+    Inputs:
+        n_pixels | int | number of unmasked pixels at full resolution.
+        n_ifgs | int | number of incremental interferograms.
+        downsample_run | float | as per LiCSAlert_batch_mode
+        downsample_plot | float | as per LiCSAlert_batch_mode
+        run_lengths | list of ints or None | the number of interferograms used each time that LiCSAlert is run (and a figure is made), e.g. one for each
+                                             monitoring interferogram if intermediate_figures is True.  If None, LiCSAlert is run once, with all of them.
+        figures | boolean | if False, the cost of the figures is not included.
+        dtype | string | 'float32' or 'float64'
+        memory_budget | float or None | if set, the inversion and residuals are calculated on blocks of pixels that use at most this much memory (MB).
+        model | dict or None | cost model (see default_cost_model and calibrate_cost_model).
+    Returns:
+        estimate | dict | stages: time_s and memory_MB for each stage.  time_s: total.  peak_memory_MB: the largest of the stages.  n_pixels_run, n_pixels_plot.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    if model is None:
+        model = default_cost_model
+    if run_lengths is None:
+        run_lengths = [n_ifgs]
+    itemsize = 4 if dtype == 'float32' else 8
+
+    n_pixels_run = int(n_pixels * downsample_run ** 2)                                                           # downsampling is applied to both axes
+    n_pixels_plot = int(n_pixels_run * downsample_plot ** 2)
+    data_MB = (n_pixels_run + n_pixels_plot) * n_ifgs * itemsize / 1e6                                          # the ifgs at both resolutions are kept once they've been made
+    pixel_ifgs_run = n_pixels_run * sum(run_lengths)                                                             # summed over each time LiCSAlert is run
+    dtype_scale = itemsize / 8                                                                                   # the model is for float64
+
+    def stage_cost(stage, n_pixel_ifgs, n_pixel_ifgs_memory, n_calls = 1):
+        coefficients = model[stage]
+        time_s = (coefficients['time_per_pixel_ifg'] * n_pixel_ifgs) + (coefficients['time_constant'] * n_calls)
+        working_MB = (coefficients['bytes_per_pixel_ifg'] * dtype_scale * n_pixel_ifgs_memory / 1e6) + coefficients['memory_constant_MB']
+        return time_s, working_MB
+
+    stages = {}
+    input_MB = n_pixels * n_ifgs * itemsize / 1e6                                                              # the ifgs at full resolution, which are only needed until they've been downsampled
+    time_s, working_MB = stage_cost('preprocessing', n_pixels * n_ifgs, n_pixels_run * n_ifgs)
+    stages['preprocessing'] = {'time_s' : time_s, 'memory_MB' : working_MB + input_MB + data_MB}
+    for stage in ['inversion', 'residuals']:
+        time_s, working_MB = stage_cost(stage, pixel_ifgs_run, n_pixels_run * max(run_lengths))
+        if memory_budget is not None:
+            working_MB = min(working_MB, memory_budget)                                                          # as the blocks of pixels are sized to fit
+        stages[stage] = {'time_s' : time_s, 'memory_MB' : working_MB + data_MB}
+    if figures:
+        time_s, working_MB = stage_cost('figures', int(n_pixels_plot * sum(run_lengths)), n_pixels_plot * max(run_lengths), n_calls = len(run_lengths))
+        stages['figures'] = {'time_s' : time_s, 'memory_MB' : working_MB + data_MB}
+
+    estimate = {'stages'         : stages,
+                'time_s'         : sum([stages[stage]['time_s'] for stage in stages]),
+                'peak_memory_MB' : max([stages[stage]['memory_MB'] for stage in stages]),
+                'n_pixels_run'   : n_pixels_run,
+                'n_pixels_plot'  : n_pixels_plot}
+    return estimate
+
+
+def print_cost_estimate(estimate):
+    """ Print the estimate from estimate_costs as a table.
+    """
+    print(f"{'stage':<16}{'time (s)':>12}{'memory (MB)':>14}")
+    for stage, cost in estimate['stages'].items():
+        print(f"{stage:<16}{cost['time_s']:>12.1f}{cost['memory_MB']:>14.0f}")
+    print(f"{'total / peak':<16}{estimate['time_s']:>12.1f}{estimate['peak_memory_MB']:>14.0f}")
+
+
+#%%
+
+def autotune_settings(n_pixels, n_ifgs, n_baseline_end, max_memory_MB = None, max_time_s = None, downsample_run = 'auto', downsample_plot = 'auto',
+                      intermediate_figures = False, figures = True, dtype = 'float64', memory_budget = None, model = None, n_runs = 1,
+                      downsample_candidates = (1.0, 0.75, 0.5, 0.35, 0.25, 0.15, 0.1), max_pixels_plot = 250000):
+    """ Choose the settings of LiCSAlert that keep its estimated peak memory and run time within a budget.  Settings that are not 'auto' are kept.
+    The largest downsample_run (i.e. the highest resolution) that fits is used, and if the inversion doesn't fit in memory, it is done on blocks of pixels
+    (memory_budget).  If intermediate figures don't fit within the time, only the final figure is made.
+    Inputs:
+        n_pixels | int | number of unmasked pixels at full resolution.
+        n_ifgs | int | number of incremental interferograms.
+        n_baseline_end | int | number of interferograms in the baseline stage.
+        max_memory_MB | float or None | memory budget.  None for no limit.
+        max_time_s | float or None | time budget.  None for no limit.
+        downsample_run | float or 'auto' |
+        downsample_plot | float or 'auto' | if 'auto', the figures use at most max_pixels_plot pixels (more can't be seen).
+        intermediate_figures | boolean | as per LiCSAlert_batch_mode
+        n_runs | int | if intermediate_figures is False, the number of times that LiCSAlert is run (and a figure made), e.g. one for each new date in monitoring mode.  
+        others | as per estimate_costs
+    Returns:
+        settings | dict | downsample_run, downsample_plot, memory_budget, intermediate_figures, and estimate (from estimate_costs).
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import numpy as np
+
+    def fits(estimate):
+        return (((max_memory_MB is None) or (estimate['peak_memory_MB'] <= max_memory_MB)) and
+                ((max_time_s is None) or (estimate['time_s'] <= max_time_s)))
+
+    if downsample_run == 'auto':
+        run_candidates = list(downsample_candidates)
+    else:
+        run_candidates = [float(downsample_run)]
+    figure_options = [intermediate_figures, False] if intermediate_figures else [False]
+
+    best = None
+    for downsample_run_candidate in run_candidates:
+        if downsample_plot == 'auto':
+            n_pixels_run = n_pixels * downsample_run_candidate ** 2
+            downsample_plot_candidate = float(min(1.0, np.round(np.sqrt(max_pixels_plot / max(n_pixels_run, 1)), 2)))
+        else:
+            downsample_plot_candidate = float(downsample_plot)
+        for intermediate_figures_candidate in figure_options:
+            if intermediate_figures_candidate:
+                run_lengths = list(range(n_baseline_end + 1, n_ifgs + 1))                                   # LiCSAlert (and a figure) for each monitoring ifg
+            else:
+                run_lengths = [n_ifgs] * n_runs
+            for memory_budget_candidate in [memory_budget, 'blocks']:
+                if memory_budget_candidate == 'blocks':
+                    if (max_memory_MB is None) or (memory_budget is not None):
+                        continue
+                    resident_MB = estimate_costs(n_pixels, n_ifgs, downsample_run_candidate, downsample_plot_candidate, run_lengths, figures, dtype,
+                                                 0., model)['stages']['inversion']['memory_MB']                                # the ifgs, which can't be split into blocks
+                    memory_budget_candidate = float(round(max(0.1 * max_memory_MB, max_memory_MB - resident_MB)))
+                estimate = estimate_costs(n_pixels, n_ifgs, downsample_run_candidate, downsample_plot_candidate, run_lengths, figures, dtype,
+                                          memory_budget_candidate, model)
+                settings = {'downsample_run'       : downsample_run_candidate,
+                            'downsample_plot'      : downsample_plot_candidate,
+                            'memory_budget'        : memory_budget_candidate,
+                            'intermediate_figures' : intermediate_figures_candidate,
+                            'estimate'             : estimate}
+                if best is None or estimate['peak_memory_MB'] < best['estimate']['peak_memory_MB']:
+                    best = settings                                                                          # the smallest, in case nothing fits
+                if fits(estimate):
+                    return settings
+
+    raise Exception(f"No settings could be found that fit within the budget (memory: {max_memory_MB} MB, time: {max_time_s} s).  "
+                    f"The smallest (downsample_run = {best['downsample_run']}) needs {best['estimate']['peak_memory_MB']:.0f} MB "
+                    f"and {best['estimate']['time_s']:.0f} s.  Exiting...")
+
+
+#%%
+
+def calibrate_cost_model(benchmark_file, model = None):
+    """ Fit the cost model to the results of benchmarks/LiCSAlert_benchmarks.py (e.g. on the machine that LiCSAlert will be run on).
+    For each stage, the time and the peak memory of the function that was benchmarked for it (see benchmark_stages) are fit with a straight line
+    against the number of pixels x the number of interferograms.  Stages that weren't benchmarked keep the values of model.
+    Inputs:
+        benchmark_file | string or Path | .json file made by LiCSAlert_benchmarks.py
+        model | dict or None | cost model to start from.  If None, default_cost_model.
+    Returns:
+        model | dict | the calibrated cost model.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import copy
+    import json
+    import numpy as np
+
+    model = copy.deepcopy(default_cost_model if model is None else model)
+    with open(benchmark_file, 'r') as f:
+        benchmark_results = json.load(f)['results']
+
+    for stage, (function_name, pixel_scale) in benchmark_stages.items():
+        results = [result for result in benchmark_results if result['function'] == function_name]
+        if len(results) == 0:
+            continue
+        pixel_ifgs = np.array([result['n_pixels'] * (pixel_scale ** 2) * (result['size']['n_epochs'] - 1) for result in results])
+        times = np.array([result['time_min'] for result in results])
+        memories = np.array([result['peak_memory_MB'] for result in results])
+        if len(np.unique(pixel_ifgs)) > 1:
+            time_slope, time_constant = np.polyfit(pixel_ifgs, times, 1)
+            memory_slope, memory_constant = np.polyfit(pixel_ifgs, memories, 1)
+        else:                                                                                   # one size, so a line through the origin
+            time_slope, time_constant = np.mean(times / pixel_ifgs), 0.
+            memory_slope, memory_constant = np.mean(memories / pixel_ifgs), 0.
+        model[stage] = {'time_per_pixel_ifg'  : float(max(time_slope, np.min(times / pixel_ifgs) * 0.1)),     # don't allow a fit that is negative or too small
+                        'bytes_per_pixel_ifg' : float(max(memory_slope * 1e6, 0.)),
+                        'time_constant'       : float(max(time_constant, 0.)),
+                        'memory_constant_MB'  : float(max(memory_constant, 0.))}
+    return model
+
+
+def save_cost_model(model, out_file):
+    """ Save a cost model (e.g. from calibrate_cost_model) as .json, so that it can be used as the cost_model of LiCSAlert (see load_cost_model).
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import json
+    with open(out_file, 'w') as f:
+        json.dump({'cost_model' : model}, f, indent = 2)
+
+
+def load_cost_model(cost_model = None):
+    """ The cost model used by estimate_costs and autotune_settings.
+    Inputs:
+        cost_model | None, dict, or string or Path | None for default_cost_model, a cost model, or a .json file that is either the results of 
+                                                     benchmarks/LiCSAlert_benchmarks.py (which are calibrated with calibrate_cost_model), or a model
+                                                     saved by save_cost_model.  Stages that are missing keep the values of default_cost_model.  
+    Returns:
+        model | dict | 
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import copy
+    import json
+
+    if cost_model is None:
+        return default_cost_model
+    if not isinstance(cost_model, dict):
+        with open(cost_model, 'r') as f:
+            contents = json.load(f)
+        if 'results' in contents:                                                               # the results of the benchmarks
+            return calibrate_cost_model(cost_model)
+        elif 'cost_model' in contents:
+            cost_model = contents['cost_model']
+        else:
+            raise Exception(f"{cost_model} is neither the results of the benchmarks, nor a cost model saved by save_cost_model.  Exiting...")
+    model = copy.deepcopy(default_cost_model)
+    for stage, coefficients in cost_model.items():
+        if stage not in model:
+            raise Exception(f"The cost model has a stage ({stage}) that isn't one of {list(model.keys())}.  Exiting...")
+        model[stage].update(coefficients)
+    return model
+
+
+#%%
+
+def cum_h5_size(cum_file, crop_pixels = None):
+    """ Find the size of a LiCSBAS time series without reading it.  Only the dates and the last cumulative displacement (to find the masked pixels,
+    which LiCSBAS sets to nan) are read.
+    Inputs:
+        cum_file | string | cum.h5 made by LiCSBAS
+        crop_pixels | tuple or None | as per LiCSBAS_to_LiCSAlert
+    Returns:
+        n_pixels | int | number of unmasked pixels (an upper bound, as pixels that are nan at other times are also masked by LiCSBAS_to_LiCSAlert).
+        n_ifgs | int | number of incremental interferograms.
+        imdates | list of strings | acquisition dates (YYYYMMDD)
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import h5py as h5
+    import numpy as np
+
+    with h5.File(cum_file, 'r') as cumh5:
+        imdates = [str(imdate) for imdate in cumh5['imdates'][()].astype(str).tolist()]
+        if crop_pixels is None:
+            last_cum = cumh5['cum'][-1]
+        else:
+            last_cum = cumh5['cum'][-1, crop_pixels[2]:crop_pixels[3], crop_pixels[0]:crop_pixels[1]]
+    n_pixels = int(np.sum(np.isfinite(last_cum)))
+    return n_pixels, len(imdates) - 1, imdates
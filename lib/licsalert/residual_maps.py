@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Maps of the residual (the part of each interferogram that the sources can't fit) at the resolution of the figures, so that when the residual alerts
+where the unexplained signal is can be seen without running the inversion again.  The maps are made in the same pass over the pixels as the RMS of the
+residual (see residual_for_pixels and blocked_residual_for_pixels), by keeping the residual of one pixel at the run resolution for each pixel at the
+resolution of the figures (the nearest one).
+
+The maps are stored pixel-major (n_pixels x n_ifgs, i.e. the whole time series of a pixel is contiguous), as .npy files that are read as memory maps,
+so that the history of one pixel or of a region is a contiguous read rather than one read from every interferogram:
+    <out_file>_incremental.npy     residual of each interferogram
+    <out_file>_cumulative.npy      cumulative residual
+    <out_file>_mask.npy            mask at the resolution of the figures (to convert a column of the maps back to an image)
+
+As the maps of a date include the residual of every earlier ifg, monitoring mode only keeps those of the latest date of each volcano (in its
+LiCSAlert_residual_maps folder, see save_latest_residual_maps), so that they don't grow with the square of the number of dates.
+
+e.g.:
+    history = residual_history('LiCSAlert_residual_maps', (40, 52))                    # the cumulative residual of the pixel in row 40, column 52
+    image = residual_map('LiCSAlert_residual_maps', -1)                                # the cumulative residual of the last ifg, as a masked array
+    history = residual_history(latest_residual_maps(f"{volcano_dir}LiCSAlert_residual_maps"), (40, 52))        # from monitoring mode
+
+@author: Matthew Gaddes
+"""
+
+#%%
+
+def residual_map_pixels(mask, mask_downsampled, chunk_size = 1000):
+    """ For each pixel that isn't masked at the resolution of the figures, find the nearest pixel that isn't masked at the resolution that LiCSAlert is run at.
+    Inputs:
+        mask | r2 boolean | mask of the ifgs that LiCSAlert is run on (True is masked)
+        mask_downsampled | r2 boolean | mask of the ifgs at the resolution of the figures.
+        chunk_size | int | number of pixels that are searched at once if the nearest pixel is masked (which limits the memory used).
+    Returns:
+        map_pixels | r1 int array | for each pixel at the resolution of the figures, the column (i.e. pixel number) of the ifgs as row vectors.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import numpy as np
+
+    mask = np.asarray(mask, dtype = bool)
+    mask_downsampled = np.asarray(mask_downsampled, dtype = bool)
+    if np.all(mask):
+        raise Exception("All the pixels are masked, so the residual can't be mapped.  Exiting...")
+    pixel_numbers = np.full(mask.shape, -1, dtype = 'int64')                                                    # the column of each pixel when the ifgs are row vectors, or -1 if it is masked
+    pixel_numbers[~mask] = np.arange(np.sum(~mask))
+
+    rows_ds, cols_ds = np.nonzero(~mask_downsampled)                                                            # in the same order as the columns of the downsampled ifgs
+    scale_rows = mask.shape[0] / mask_downsampled.shape[0]
+    scale_cols = mask.shape[1] / mask_downsampled.shape[1]
+    rows = np.clip(np.round((rows_ds + 0.5) * scale_rows - 0.5).astype(int), 0, mask.shape[0] - 1)              # the pixel at the centre of each downsampled pixel
+    cols = np.clip(np.round((cols_ds + 0.5) * scale_cols - 0.5).astype(int), 0, mask.shape[1] - 1)
+    map_pixels = pixel_numbers[rows, cols]
+
+    missing = np.nonzero(map_pixels == -1)[0]                                                                   # the centre is masked, so find the nearest pixel that isn't
+    if missing.size > 0:
+        rows_unmasked, cols_unmasked = np.nonzero(~mask)
+        for start in range(0, missing.size, chunk_size):
+            chunk = missing[start : start + chunk_size]
+            distances = (rows[chunk, np.newaxis] - rows_unmasked[np.newaxis, :])**2 + (cols[chunk, np.newaxis] - cols_unmasked[np.newaxis, :])**2
+            nearest = np.argmin(distances, axis = 1)
+            map_pixels[chunk] = pixel_numbers[rows_unmasked[nearest], cols_unmasked[nearest]]
+    return map_pixels
+
+
+#%%
+
+def save_residual_maps(out_file, residual_maps, mask_downsampled):
+    """ Save the residual maps (from LiCSAlert, in residual_tcs[0]['residual_maps']) as pixel-major .npy files.
+    Inputs:
+        out_file | string or Path | start of the names of the files (e.g. 'LiCSAlert_residual_maps_20230105'), which have _incremental.npy etc. added.
+        residual_maps | dict | 'incremental' and 'cumulative', both n_pixels x n_ifgs.
+        mask_downsampled | r2 boolean | mask at the resolution of the figures.
+    Returns:
+        .npy files
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Write each file to a temporary file that is renamed, and the mask last (so a set of maps is only complete once it exists).  
+    """
+    import numpy as np
+    for key in ['incremental', 'cumulative']:
+        if residual_maps[key].shape[0] != np.sum(~mask_downsampled):
+            raise Exception(f"The {key} residual maps have {residual_maps[key].shape[0]} pixels, but the mask has {np.sum(~mask_downsampled)}.  Exiting...")
+    for key in ['incremental', 'cumulative']:
+        _save_npy_atomic(f"{out_file}_{key}.npy", np.ascontiguousarray(residual_maps[key]))                    # no copy if already pixel-major
+    _save_npy_atomic(f"{out_file}_mask.npy", np.asarray(mask_downsampled, dtype = bool))
+
+
+def _save_npy_atomic(path, array):
+    import os
+    import numpy as np
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def save_latest_residual_maps(maps_dir, date, residual_maps, mask_downsampled):
+    """ Save the residual maps of a date in a folder that only keeps those of the latest date (as the maps of a date include the residual of every
+    earlier ifg, keeping those of every date would need space that grows with the square of the number of dates).  The maps of the date are 
+    written before those of any earlier dates are removed, so there is always a complete set.  
+    Inputs:
+        maps_dir | string or Path | e.g. volcano_dir/LiCSAlert_residual_maps (made if it doesn't exist).
+        date | string | YYYYMMDD
+        residual_maps, mask_downsampled | as per save_residual_maps.
+    Returns:
+        maps_file | string | as per out_file in save_residual_maps (e.g. for residual_history).
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import os
+    os.makedirs(maps_dir, exist_ok = True)
+    maps_file = f"{maps_dir}/{date}"
+    save_residual_maps(maps_file, residual_maps, mask_downsampled)
+    for f in os.listdir(maps_dir):
+        if f[:8].isdigit() and (f[:8] < date):                                                                  # not later dates (e.g. if an earlier date is processed again)
+            os.remove(f"{maps_dir}/{f}")
+    return maps_file
+
+
+def latest_residual_maps(maps_dir):
+    """ The maps of the latest date in a folder made by save_latest_residual_maps (e.g. for residual_history or residual_map).  
+    Returns:
+        maps_file | string or None | as per out_file in save_residual_maps, or None if there are no complete maps.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import os
+    if not os.path.isdir(maps_dir):
+        return None
+    dates = sorted([f[:8] for f in os.listdir(maps_dir) if f.endswith('_mask.npy')])                        # the mask is written last
+    return None if len(dates) == 0 else f"{maps_dir}/{dates[-1]}"
+
+
+def _map_columns(mask_downsampled, pixels):
+    """ The rows of the maps for some pixels, which are either a (row, column) tuple, a boolean region the same shape as the mask, or the numbers of the pixels.
+    """
+    import numpy as np
+    pixel_numbers = np.full(mask_downsampled.shape, -1, dtype = 'int64')
+    pixel_numbers[~mask_downsampled] = np.arange(np.sum(~mask_downsampled))
+    if isinstance(pixels, tuple):
+        numbers = pixel_numbers[pixels]
+    elif np.asarray(pixels).dtype == bool:
+        numbers = pixel_numbers[np.asarray(pixels)]
+    else:
+        numbers = np.asarray(pixels)
+    numbers = np.atleast_1d(numbers)
+    if np.any(numbers == -1):
+        raise Exception(f"Some of the pixels are masked, so there are no residuals for them.  Exiting...")
+    return numbers
+
+
+def residual_history(maps_file, pixels, cumulative = True):
+    """ The residual through time of some pixels, which only reads their rows of the maps.
+    Inputs:
+        maps_file | string or Path | as per out_file in save_residual_maps.
+        pixels | tuple or r2 boolean or r1 int | a (row, column) of one pixel, a region (True for the pixels in it), or the numbers of the pixels (i.e. columns of the ifgs as row vectors).
+        cumulative | boolean | if True, the cumulative residual, if False the residual of each ifg.
+    Returns:
+        history | r2 array | n_pixels x n_ifgs.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import numpy as np
+    mask_downsampled = np.load(f"{maps_file}_mask.npy")
+    numbers = _map_columns(mask_downsampled, pixels)
+    maps = np.load(f"{maps_file}_{'cumulative' if cumulative else 'incremental'}.npy", mmap_mode = 'r')
+    order = np.argsort(numbers)                                                                                 # read the rows in order (which are contiguous for a region)
+    history = np.empty((numbers.size, maps.shape[1]), dtype = maps.dtype)
+    history[order] = maps[numbers[order]]
+    return history
+
+
+def residual_map(maps_file, ifg_n, cumulative = True):
+    """ The residual map of one ifg, as a masked array.  This reads one value from the row of every pixel, so use residual_history for the history of pixels.
+    Inputs:
+        maps_file | string or Path | as per out_file in save_residual_maps.
+        ifg_n | int | number of the ifg (can be negative, e.g. -1 for the last ifg).
+        cumulative | boolean | as per residual_history.
+    Returns:
+        map_ma | r2 masked array |
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import numpy as np
+    from licsalert.LiCSAlert_aux_functions import col_to_ma
+    mask_downsampled = np.load(f"{maps_file}_mask.npy")
+    maps = np.load(f"{maps_file}_{'cumulative' if cumulative else 'incremental'}.npy", mmap_mode = 'r')
+    return col_to_ma(np.asarray(maps[:, ifg_n]), mask_downsampled)
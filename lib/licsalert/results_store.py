@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A store of the numerical results of LiCSAlert for each volcano (the LiCSAlert_results folder in the volcano's folder), so that the figure of any date
+can be re-made without the interferograms being processed again, and the results of all the volcanoes can be searched quickly.  The store is only
+added to, and every file in it is written to a temporary file and renamed, so a run that is killed can't leave a partly written store, and a date
+that is processed again (e.g. as it didn't have all its products) replaces its file rather than leaving the space of the old one in the store:
+    dates/YYYYMMDD.h5        one file for each date that is processed.  The time courses, distances, gradients, and sigmas of the sources and the
+                             residual (and the lines of best fit, as only the parts near the diagonal aren't nan), with the alert, largest distance, and
+                             resolution ('coarse' if only the coarse pass of LiCSAlert_cascade was run) as attributes.
+    index.json               the attributes of every date (which is all that query_results reads).  Dates that are missing from it, or whose file has
+                             changed since it was written (e.g. if two runs added a date at the same time), are read from their files.
+    plot/<hash>/plot.h5      what LiCSAlert_figure plots: the mask, the sources, and (in ifg_00000.npy etc.) the ifgs at the resolution of the figures.
+                             A new folder is only made when the mask (or the sources) change, and each date only adds its new ifgs.
+
+e.g.:
+    replot_date(f"{volcano_dir}LiCSAlert_results", '20230105', out_folder = 'figures/')
+    query_results(LiCSAlert_volcs_dir, min_sigma = 3., last_days = 30)             # which volcanoes were more than 3 sigma from their lines in the last 30 days
+
+@author: Matthew Gaddes
+"""
+
+results_store_version = 2
+index_attrs = ['alert', 'max_distance', 'max_distance_tc', 'resolution', 'n_ifgs']           # the attributes of each date that are in index.json
+
+#%%
+
+def _tmp_path(path):
+    """ A temporary file in the same folder as path (so that it can be renamed to it), which is unique to this process and thread.
+    """
+    import os
+    import socket
+    import threading
+    return f"{os.path.dirname(path)}/.{os.path.basename(path)}.{socket.gethostname()}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _write_h5_atomic(path, write):
+    """ Make an hdf5 file by calling write with it (open for writing), as a temporary file that is then renamed to path.
+    """
+    import os
+    import h5py as h5
+    tmp_path = _tmp_path(path)
+    try:
+        with h5.File(tmp_path, 'w') as f:
+            f.attrs['version'] = results_store_version
+            write(f)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _write_npy_atomic(path, array):
+    import os
+    import numpy as np
+    tmp_path = _tmp_path(path)
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def _write_json_atomic(path, data):
+    import os
+    import json
+    tmp_path = _tmp_path(path)
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent = 1)
+    os.replace(tmp_path, path)
+
+
+#%%
+
+def _tcs_to_arrays(tcs):
+    """ The time course dicts of LiCSAlert (e.g. sources_tcs + residual_tcs) as arrays.  The lines of best fit are stored as the indices and values of
+    their entries that aren't nan.
+    """
+    import numpy as np
+    arrays = {'cumulative_tcs' : np.hstack([np.reshape(tc['cumulative_tc'], (-1, 1)) for tc in tcs]),                  # n_times x n_tcs
+              'distances'      : np.hstack([np.reshape(tc['distances'], (-1, 1)) for tc in tcs]),
+              'gradients'      : np.array([float(tc['gradient']) for tc in tcs]),
+              'sigmas'         : np.array([float(tc['sigma']) for tc in tcs])}
+    lines_tc, lines_row, lines_col, lines_value = [], [], [], []
+    for tc_n, tc in enumerate(tcs):
+        rows, cols = np.nonzero(np.isfinite(tc['lines']))
+        lines_tc.append(np.full(rows.shape, tc_n))
+        lines_row.append(rows)
+        lines_col.append(cols)
+        lines_value.append(tc['lines'][rows, cols])
+    arrays['lines_index'] = np.vstack((np.concatenate(lines_tc), np.concatenate(lines_row), np.concatenate(lines_col))).astype('int32')   # 3 x n_entries
+    arrays['lines_value'] = np.concatenate(lines_value)
+    return arrays
+
+
+def _arrays_to_tcs(arrays, t_recalculate):
+    """ The inverse of _tcs_to_arrays.
+    """
+    import numpy as np
+    n_times, n_tcs = arrays['cumulative_tcs'].shape
+    tcs = []
+    for tc_n in range(n_tcs):
+        lines = np.nan * np.ones((n_times, n_times))
+        entries = arrays['lines_index'][0] == tc_n
+        lines[arrays['lines_index'][1, entries], arrays['lines_index'][2, entries]] = arrays['lines_value'][entries]
+        tcs.append({'cumulative_tc' : arrays['cumulative_tcs'][:, tc_n:tc_n+1],
+                    'gradient'      : arrays['gradients'][tc_n],
+                    'lines'         : lines,
+                    'sigma'         : arrays['sigmas'][tc_n],
+                    'distances'     : arrays['distances'][:, tc_n:tc_n+1],
+                    't_recalculate' : t_recalculate})
+    return tcs
+
+
+#%%
+
+def add_plot_data(store_dir, mask, mask_downsampled, sources, incremental_downsampled, sources_downsampled = False):
+    """ Add what LiCSAlert_figure needs (other than the time courses) to a store.  If the same mask and sources are already in the store, only the ifgs
+    that aren't already in it are added.
+    Inputs:
+        store_dir | string or Path | e.g. volcano_dir/LiCSAlert_results (made if it doesn't exist).
+        mask | r2 boolean | the mask of the sources (e.g. the combined mask in monitoring mode).
+        mask_downsampled | r2 boolean | the mask of the ifgs at the resolution of the figures.
+        sources | r2 array | sources as row vectors, as passed to LiCSAlert_figure.
+        incremental_downsampled | r2 array | the ifgs (up to the date) at the resolution of the figures.
+        sources_downsampled | boolean | as passed to LiCSAlert_figure.
+    Returns:
+        plot_key | string | name of the folder in plot/.
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Write each file atomically, in a folder rather than one hdf5 file.  
+    """
+    import os
+    import numpy as np
+    from licsalert.stage_cache import content_hash
+
+    plot_key = content_hash(np.asarray(mask), np.asarray(mask_downsampled), np.asarray(sources), bool(sources_downsampled))[:16]
+    plot_dir = f"{store_dir}/plot/{plot_key}"
+    os.makedirs(plot_dir, exist_ok = True)
+    if not os.path.exists(f"{plot_dir}/plot.h5"):
+        def write_plot(f):
+            f.create_dataset('mask', data = np.asarray(mask), compression = 'gzip')
+            f.create_dataset('mask_downsampled', data = np.asarray(mask_downsampled), compression = 'gzip')
+            f.create_dataset('sources', data = np.asarray(sources), compression = 'gzip')
+            f.attrs['sources_downsampled'] = bool(sources_downsampled)
+        _write_h5_atomic(f"{plot_dir}/plot.h5", write_plot)
+    stored = set(os.listdir(plot_dir))
+    for ifg_n in range(np.shape(incremental_downsampled)[0]):                                           # only the new ifgs are added
+        if f"ifg_{ifg_n:05d}.npy" not in stored:
+            _write_npy_atomic(f"{plot_dir}/ifg_{ifg_n:05d}.npy", np.asarray(incremental_downsampled[ifg_n]))
+    return plot_key
+
+
+def read_plot_data(store_dir, plot_key, n_ifgs):
+    """ Read what add_plot_data added, with the first n_ifgs ifgs.
+    Returns:
+        plot_data | dict | mask, mask_downsampled, sources, sources_downsampled, and incremental_downsampled.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import numpy as np
+    import h5py as h5
+    plot_dir = f"{store_dir}/plot/{plot_key}"
+    with h5.File(f"{plot_dir}/plot.h5", 'r') as f:
+        plot_data = {key : f[key][()] for key in ['mask', 'mask_downsampled', 'sources']}
+        plot_data['sources_downsampled'] = bool(f.attrs['sources_downsampled'])
+    plot_data['incremental_downsampled'] = np.vstack([np.load(f"{plot_dir}/ifg_{ifg_n:05d}.npy") for ifg_n in range(n_ifgs)])
+    return plot_data
+
+
+def add_date(store_dir, date, sources_tcs, residual_tcs, n_baseline_end, time_values, acq_dates = None, alert_sigma = 3., plot_key = None,
+             figure_settings = None):
+    """ Add the results of LiCSAlert for a date to a store (replacing them if the date is already in it).
+    Inputs:
+        store_dir | string or Path | e.g. volcano_dir/LiCSAlert_results
+        date | string | YYYYMMDD
+        sources_tcs, residual_tcs, n_baseline_end, time_values, acq_dates, alert_sigma | as per save_LiCSAlert_results.
+        plot_key | string or None | from add_plot_data, if the figure can be re-made.
+        figure_settings | dict or None | the other arguments of LiCSAlert_figure (n_baseline_end, day0_date, time_value_end)
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Store the resolution of the results.  
+        2026/10/18 | MEG | Write each date to its own file (atomically), and add it to index.json.  
+    """
+    import os
+    import json
+    import numpy as np
+
+    tcs = list(sources_tcs) + list(residual_tcs)
+    arrays = _tcs_to_arrays(tcs)
+    n_times = arrays['cumulative_tcs'].shape[0]
+    latest_distances = arrays['distances'][-1]
+    alert = bool((n_times > n_baseline_end) and (np.max(latest_distances) > alert_sigma))                   # as per save_LiCSAlert_results
+    attrs = {'n_sources'       : len(sources_tcs),
+             'n_baseline_end'  : int(n_baseline_end),
+             't_recalculate'   : int(sources_tcs[0]['t_recalculate']),
+             'alert_sigma'     : float(alert_sigma),
+             'alert'           : alert,
+             'resolution'      : str(sources_tcs[0].get('resolution', 'full')),                                # 'coarse' if from the coarse pass of LiCSAlert_cascade
+             'max_distance'    : float(np.max(latest_distances)),
+             'max_distance_tc' : f"IC{np.argmax(latest_distances)}" if np.argmax(latest_distances) < len(sources_tcs) else 'residual',
+             'plot_key'        : '' if plot_key is None else plot_key,
+             'figure_settings' : json.dumps({} if figure_settings is None else figure_settings)}
+
+    def write_date(f):
+        for key, array in arrays.items():
+            f.create_dataset(key, data = array, compression = 'gzip' if array.size > 1000 else None)
+        f.create_dataset('time_values', data = np.asarray(time_values[:n_times], dtype = 'float64'))
+        if acq_dates is not None:
+            f.create_dataset('acq_dates', data = np.array([str(acq_date) for acq_date in acq_dates[:n_times+1]], dtype = 'S8'))
+        for key, value in attrs.items():
+            f.attrs[key] = value
+
+    os.makedirs(f"{store_dir}/dates", exist_ok = True)
+    _write_h5_atomic(f"{store_dir}/dates/{date}.h5", write_date)                                           # replaces the date (if it was processed before)
+    index = _read_index(store_dir)
+    index[date] = {key : value for key, value in attrs.items() if key in index_attrs}
+    index[date]['n_ifgs'] = int(n_times)
+    index[date]['mtime_ns'] = os.stat(f"{store_dir}/dates/{date}.h5").st_mtime_ns                          # so an entry for an older file of the date isn't used
+    _write_json_atomic(f"{store_dir}/index.json", {'version' : results_store_version, 'dates' : index})
+
+
+def _read_index(store_dir):
+    """ The attributes of each date in index.json (or an empty dict if there isn't one yet).
+    """
+    import os
+    import json
+    if not os.path.exists(f"{store_dir}/index.json"):
+        return {}
+    with open(f"{store_dir}/index.json", 'r') as f:
+        return json.load(f)['dates']
+
+
+def _date_index_attrs(store_dir, date):
+    """ The attributes of a date that are in index.json, read from the date's file.
+    """
+    import h5py as h5
+    with h5.File(f"{store_dir}/dates/{date}.h5", 'r') as f:
+        attrs = {key : f.attrs[key] for key in index_attrs if key != 'n_ifgs'}
+        attrs['n_ifgs'] = int(f['time_values'].shape[0])
+    return attrs
+
+
+def store_dates(store_dir):
+    """ The dates (YYYYMMDD) in a store, oldest first.
+    """
+    import os
+    if not os.path.isdir(f"{store_dir}/dates"):
+        return []
+    return sorted([f[:-3] for f in os.listdir(f"{store_dir}/dates") if f.endswith('.h5') and not f.startswith('.')])
+
+
+def read_date(store_dir, date):
+    """ Read the results of a date from a store.
+    Returns:
+        results | dict | sources_tcs and residual_tcs (as made by LiCSAlert), time_values, acq_dates, and the attributes of the date.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import os
+    import json
+    import h5py as h5
+    if not os.path.exists(f"{store_dir}/dates/{date}.h5"):
+        raise Exception(f"There are no results for {date} in {store_dir}.  Exiting...")
+    with h5.File(f"{store_dir}/dates/{date}.h5", 'r') as group:
+        arrays = {key : group[key][()] for key in ['cumulative_tcs', 'distances', 'gradients', 'sigmas', 'lines_index', 'lines_value']}
+        results = {key : value for key, value in group.attrs.items() if key != 'version'}
+        results['figure_settings'] = json.loads(results['figure_settings'])
+        results['time_values'] = group['time_values'][()]
+        results['acq_dates'] = group['acq_dates'][()].astype(str).tolist() if 'acq_dates' in group else None
+    tcs = _arrays_to_tcs(arrays, int(results['t_recalculate']))
+    results['sources_tcs'] = tcs[:int(results['n_sources'])]
+    results['residual_tcs'] = tcs[int(results['n_sources']):]
+    return results
+
+
+def replot_date(store_dir, date, out_folder = None):
+    """ Re-make the LiCSAlert figure of a date from a store (without the interferograms being read or processed again).
+    Inputs:
+        store_dir | string or Path |
+        date | string | YYYYMMDD
+        out_folder | string or None | where the figure is saved.  If None, it is shown.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    from licsalert.LiCSAlert_functions import LiCSAlert_figure
+
+    results = read_date(store_dir, date)
+    if results['plot_key'] == '':
+        raise Exception(f"The figure of {date} can't be re-made, as the ifgs it uses weren't stored.  Exiting...")
+    plot_data = read_plot_data(store_dir, results['plot_key'], results['time_values'].shape[0])
+    displacement_r2 = {'incremental'             : plot_data['incremental_downsampled'],                                 # LiCSAlert_figure only needs the number of ifgs from this
+                       'incremental_downsampled' : plot_data['incremental_downsampled'],
+                       'mask'                    : plot_data['mask'],
+                       'mask_downsampled'        : plot_data['mask_downsampled']}
+    sources = plot_data['sources']
+    sources_downsampled = plot_data['sources_downsampled']
+    figure_settings = results['figure_settings']
+    LiCSAlert_figure(results['sources_tcs'], results['residual_tcs'], sources, displacement_r2, figure_settings.get('n_baseline_end', results['n_baseline_end']),
+                     results['time_values'], day0_date = figure_settings.get('day0_date', None), time_value_end = figure_settings.get('time_value_end', None),
+                     out_folder = out_folder, sources_downsampled = sources_downsampled)
+
+
+#%%
+
+def query_results(LiCSAlert_volcs_dir, min_sigma = None, last_days = None, end_date = None, volcanoes = None, latest_only = False):
+    """ Search the results stores of all the volcanoes, reading only the attributes of each date (so the time courses aren't read).
+    Inputs:
+        LiCSAlert_volcs_dir | string | folder of the volcanoes.  Needs trailing /
+        min_sigma | float or None | only dates where a time course (or the residual) was at least this many sigmas from its line.
+        last_days | int or None | only dates in the last_days days before end_date.
+        end_date | string or None | YYYYMMDD.  If None, today.
+        volcanoes | list or None | if None, all the volcanoes with a store.
+        latest_only | boolean | if True, only the latest date of each volcano is used.
+    Returns:
+        rows | list of dicts | volcano, date, alert, max_distance, max_distance_tc, resolution, and n_ifgs, newest first.  Volcanoes whose store
+                               couldn't be read (e.g. as it is being written) have a row with an 'error'.
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Read the index of each store (and only the files of dates that aren't in it).  
+    """
+    import os
+    import datetime
+
+    if end_date is None:
+        end_date = datetime.date.today().strftime('%Y%m%d')
+    start_date = None
+    if last_days is not None:
+        start_date = (datetime.datetime.strptime(end_date, '%Y%m%d') - datetime.timedelta(days = last_days)).strftime('%Y%m%d')
+    if volcanoes is None:
+        volcanoes = sorted([f.name for f in os.scandir(LiCSAlert_volcs_dir) if f.is_dir() and os.path.isdir(f"{f.path}/LiCSAlert_results")])
+
+    rows = []
+    for volcano in volcanoes:
+        store_dir = f"{LiCSAlert_volcs_dir}{volcano}/LiCSAlert_results"
+        try:
+            index = _read_index(store_dir)
+            dates = [date for date in store_dates(store_dir) if int(date) <= int(end_date)]
+            if latest_only:
+                dates = dates[-1:]
+            for date in dates:
+                if (start_date is not None) and (int(date) < int(start_date)):
+                    continue
+                if (date in index) and (index[date].get('mtime_ns', None) == os.stat(f"{store_dir}/dates/{date}.h5").st_mtime_ns):
+                    attrs = index[date]
+                else:
+                    attrs = _date_index_attrs(store_dir, date)                                                   # e.g. two runs wrote the index at once
+                if (min_sigma is not None) and (attrs['max_distance'] < min_sigma):
+                    continue
+                rows.append({'volcano'         : volcano,
+                             'date'            : date,
+                             'alert'           : bool(attrs['alert']),
+                             'max_distance'    : float(attrs['max_distance']),
+                             'max_distance_tc' : str(attrs['max_distance_tc']),
+                             'resolution'      : str(attrs.get('resolution', 'full')),
+                             'n_ifgs'          : int(attrs['n_ifgs'])})
+        except Exception as e:
+            rows.append({'volcano' : volcano, 'error' : f"{type(e).__name__}: {e}"})
+    return sorted(rows, key = lambda row: row.get('date', ''), reverse = True)
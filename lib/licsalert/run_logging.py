@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Logging for each run of LiCSAlert (e.g. each volcano in monitoring mode), that replaces swapping sys.stdout for a Tee.
+
+The logger of the current run is held in a contextvar, and whilst any run is being logged, sys.stdout is replaced by a router that sends what is printed
+to the logger of the current context (or to the terminal if there isn't one).  The router is installed when the first run starts, and sys.stdout is put
+back when the last one ends (rather than each run swapping it, which mixes up the logs of runs that overlap).  As each thread and asyncio task has its own context, several volcanoes
+can be run at the same time in one process without their logs being mixed up, and the functions that print (e.g. LiCSAlert or ICASAR) don't need to
+be changed.  Writes to the log files are buffered, and are flushed in batches (or when the run ends).  Each line is also kept as a structured record
+(time, labels such as the volcano, and the message), which can be saved as .jsonl.
+
+e.g.:
+    with log_run(f"{volcano_dir}LiCSAlert_log.txt", mode = 'w', labels = {'volcano' : volcano}):
+        print("Running LiCSAlert")                          # goes to the terminal, and to LiCSAlert_log.txt
+
+@author: Matthew Gaddes
+"""
+
+import contextvars
+import threading
+
+current_run_logger = contextvars.ContextVar('current_run_logger', default = None)
+_router_lock = threading.Lock()
+_router_users = 0                                                                           # the number of runs that are being logged (in any thread)
+
+
+#%%
+
+class RunLogger(object):
+    """ The log of a run.  Text is written to a buffer, which is written to the log file when it is larger than buffer_size, when flush_interval
+    has passed since it was last written, or when the logger is closed.  Text is also passed on to the parent logger (e.g. the log of the whole
+    run, when this is the log of one stage), or to the terminal if there isn't a parent and echo is True.
+
+    History:
+        2026/10/18 | MEG | Written
+    """
+    def __init__(self, log_file, mode = 'a', echo = True, parent = None, labels = None, records_file = None, buffer_size = 65536, flush_interval = 5.):
+        """
+        Inputs:
+            log_file | string or Path or None | text file that the log is written to.  If None, nothing is written (but records are still kept).
+            mode | string | 'a' to append to the log file, or 'w' to overwrite it.
+            echo | boolean | if True (and there's no parent), the text is also printed to the terminal.
+            parent | RunLogger or None | the text is also passed to this logger.
+            labels | dict or None | added to each record, e.g. {'volcano' : 'campi_flegrei'}.  The labels of the parent are included.
+            records_file | string or Path or None | if not None, the records are also written to this file as json lines.
+            buffer_size | int | number of characters that are buffered before they are written.
+            flush_interval | float | seconds after which the buffer is written, even if it isn't full.
+        """
+        import threading
+        import time
+        self.log_file = log_file
+        self.echo = echo
+        self.parent = parent
+        self.labels = dict(parent.labels) if parent is not None else {}
+        self.labels.update(labels if labels is not None else {})
+        self.records = []
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._buffer = []
+        self._buffer_len = 0
+        self._records_buffer = []
+        self._partial_line = ''
+        self._pending_fields = None
+        self._t_flush = time.monotonic()
+        self._f_log = open(log_file, mode) if log_file is not None else None
+        self._f_records = open(records_file, mode) if records_file is not None else None
+        self.closed = False
+
+    def write(self, text):
+        """ Add some text to the log (as per print, so may not be a complete line).
+        """
+        import time
+        if self.closed:                                                                     # e.g. a thread that is still printing after the run has ended
+            _terminal_write(text)
+            return len(text)
+        with self._lock:
+            self._buffer.append(text)
+            self._buffer_len += len(text)
+            lines = (self._partial_line + text).split('\n')
+            self._partial_line = lines.pop()                                                # the end of the text, after the last newline
+            for line in lines:
+                self._add_record(line)
+            if (self._buffer_len > self.buffer_size) or ((time.monotonic() - self._t_flush) > self.flush_interval):
+                self._write_buffers()
+        if self.parent is not None:
+            self.parent.write(text)
+        elif self.echo:
+            _terminal_write(text)
+        return len(text)
+
+    def log(self, message, **fields):
+        """ Add a line to the log, with extra fields (e.g. stage = 'LiCSBAS', duration_s = 12.3) that are kept in its record (and written as key=value).
+        """
+        import json
+        field_text = ''.join([f"  {key}={json.dumps(value, default = str)}" for key, value in fields.items()])
+        with self._lock:
+            self._pending_fields = fields
+            self.write(f"{message}{field_text}\n")
+
+    def _add_record(self, line):
+        """ Keep a record of a complete line of the log.
+        """
+        import datetime
+        import json
+        record = {'time' : datetime.datetime.now().isoformat(timespec = 'milliseconds'), **self.labels, 'message' : line}
+        if self._pending_fields:
+            record.update(self._pending_fields)
+            self._pending_fields = None
+        self.records.append(record)
+        if self._f_records is not None:
+            self._records_buffer.append(json.dumps(record, default = str) + '\n')
+
+    def _write_buffers(self):
+        """ Write the buffered text (and records) to the files.
+        """
+        import time
+        if self._f_log is not None and len(self._buffer) > 0:
+            self._f_log.write(''.join(self._buffer))
+            self._f_log.flush()
+        if self._f_records is not None and len(self._records_buffer) > 0:
+            self._f_records.write(''.join(self._records_buffer))
+            self._f_records.flush()
+        self._buffer = []
+        self._buffer_len = 0
+        self._records_buffer = []
+        self._t_flush = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            if not self.closed:
+                self._write_buffers()
+
+    def close(self):
+        """ Write anything that is buffered (including a last line without a newline), and close the files.
+        """
+        with self._lock:
+            if self.closed:
+                return
+            if self._partial_line != '':
+                self._add_record(self._partial_line)
+                self._partial_line = ''
+            self._write_buffers()
+            for f in [self._f_log, self._f_records]:
+                if f is not None:
+                    f.close()
+            self.closed = True
+
+
+#%%
+
+class _StdoutRouter(object):
+    """ Replaces sys.stdout, and sends what is printed to the logger of the current context, or to the terminal if there isn't one.
+    """
+    def __init__(self, terminal):
+        self.terminal = terminal
+
+    def write(self, text):
+        logger = current_run_logger.get()
+        if logger is None:
+            return self.terminal.write(text)
+        return logger.write(text)
+
+    def flush(self):
+        logger = current_run_logger.get()
+        if logger is not None:
+            logger.flush()
+        self.terminal.flush()
+
+    def __getattr__(self, name):                                                            # e.g. encoding, isatty, fileno
+        return getattr(self.terminal, name)
+
+
+def install_stdout_router():
+    """ Replace sys.stdout with the router, if it hasn't been already.  Each call should be matched by a call to uninstall_stdout_router.
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Count the runs that use it, so that uninstall_stdout_router can put sys.stdout back.  
+    """
+    import sys
+    global _router_users
+    with _router_lock:
+        _router_users += 1
+        if not isinstance(sys.stdout, _StdoutRouter):
+            sys.stdout = _StdoutRouter(sys.stdout)
+
+
+def uninstall_stdout_router():
+    """ Put back the sys.stdout that the router replaced, once no runs are using it.  
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import sys
+    global _router_users
+    with _router_lock:
+        _router_users = max(_router_users - 1, 0)
+        if (_router_users == 0) and isinstance(sys.stdout, _StdoutRouter):
+            sys.stdout = sys.stdout.terminal
+
+
+def _terminal_write(text):
+    """ Write to the terminal (i.e. the stdout that was replaced by the router).
+    """
+    import sys
+    stdout = sys.stdout.terminal if isinstance(sys.stdout, _StdoutRouter) else sys.stdout
+    stdout.write(text)
+
+
+def log_run(log_file, mode = 'a', echo = True, labels = None, records_file = None, **kwargs):
+    """ A context manager that makes a RunLogger the logger of the current context (so that anything printed in it goes to log_file), and closes it
+    at the end (even if there's an exception).  If there's already a logger in this context (e.g. the log of the whole run), it becomes the parent,
+    so the text goes to both log files.
+    Inputs:
+        As per RunLogger.
+    Returns:
+        logger | RunLogger |
+    History:
+        2026/10/18 | MEG | Written
+        2026/10/18 | MEG | Put sys.stdout back when the last run that is being logged ends.  
+    """
+    import contextlib
+
+    @contextlib.contextmanager
+    def _log_run():
+        logger = RunLogger(log_file, mode = mode, echo = echo, parent = current_run_logger.get(), labels = labels, records_file = records_file, **kwargs)
+        install_stdout_router()
+        token = current_run_logger.set(logger)
+        try:
+            yield logger
+        finally:
+            current_run_logger.reset(token)
+            logger.close()
+            uninstall_stdout_router()
+    return _log_run()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Arrays that are put in shared memory (multiprocessing.shared_memory) once per run, so that the processes of a pool can use them as numpy views (without
+copying) by name, rather than each task being sent a pickled copy of e.g. the interferograms and the sources (which can be hundreds of MB for a
+full resolution frame).
+
+e.g.:
+    results = map_shared(make_figure, jobs, {'sources' : sources, 'mask' : mask}, n_processes = 8)
+where make_figure gets the arrays with shared_array('sources') etc.
+
+This is used for the intermediate figures of batch mode (n_processes), which is where the same arrays are needed by several processes.  The 
+processes of a replay (see LiCSAlert_replay.py) each have a different volcano, and monitoring mode runs the dates of a volcano in one process 
+(with the projector kept between runs by the LiCSAlert worker), so they have no arrays to share.  The figures don't invert the ifgs, so the 
+projector isn't published.  
+
+@author: Matthew Gaddes
+"""
+
+_attached = {}                                                                                          # name : (SharedMemory or None, read only view), the arrays this process has attached to
+
+#%%
+
+def _unlink_segments(segments):
+    """ Close and unlink shared memory segments.  Used by SharedArrayRegistry.close, and when the registry is garbage collected or python exits.
+    """
+    for segment in list(segments.values()):
+        try:
+            segment.close()
+        except BufferError:                                                                             # a view of it still exists, but the segment can still be unlinked
+            pass
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+    segments.clear()
+
+
+class SharedArrayRegistry(object):
+    """ Arrays published in shared memory, which other processes can attach to (as read only numpy views) using the descriptors.  The segments are
+    unlinked when the registry is closed, which happens when the with block exits (including if there was an exception), or if it is garbage collected
+    or python exits.  If the process is killed, the resource tracker of multiprocessing unlinks them.
+    e.g.:
+        with SharedArrayRegistry() as registry:
+            registry.publish('sources', sources)
+            pool = multiprocessing.Pool(4, initializer = attach_shared_arrays, initargs = (registry.descriptors(),))
+
+    History:
+        2026/10/18 | MEG | Written
+    """
+    def __init__(self, prefix = 'licsalert'):
+        """
+        Inputs:
+            prefix | string | start of the names of the segments (which also have the process id, so leaked ones can be found in /dev/shm).
+        """
+        import weakref
+        self.prefix = prefix
+        self.segments = {}                                                                              # name : SharedMemory
+        self.arrays = {}                                                                                # name : read only view
+        self._finalizer = weakref.finalize(self, _unlink_segments, self.segments)
+
+    def publish(self, name, array):
+        """ Copy an array into a new shared memory segment, and return a read only view of it.
+        """
+        import os
+        import uuid
+        import numpy as np
+        from multiprocessing.shared_memory import SharedMemory
+        if name in self.segments:
+            raise Exception(f"An array called {name} has already been published.  Exiting...")
+        array = np.ascontiguousarray(array)
+        segment = SharedMemory(create = True, size = max(array.nbytes, 1), name = f"{self.prefix}_{os.getpid()}_{uuid.uuid4().hex[:12]}")
+        self.segments[name] = segment
+        view = np.ndarray(array.shape, dtype = array.dtype, buffer = segment.buf)
+        view[...] = array
+        view.flags.writeable = False
+        self.arrays[name] = view
+        return view
+
+    def descriptors(self):
+        """ What other processes need to attach to the arrays (name : (segment name, shape, dtype)), which is small enough to send to each of them.
+        """
+        return {name : (self.segments[name].name, self.arrays[name].shape, self.arrays[name].dtype.str) for name in self.segments}
+
+    def close(self):
+        self.arrays = {}
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+#%%
+
+def attach_shared_arrays(descriptors):
+    """ Attach to the arrays published by a SharedArrayRegistry (e.g. as the initializer of a pool), so they can be got with shared_array.
+    Inputs:
+        descriptors | dict | from SharedArrayRegistry.descriptors.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import sys
+    import numpy as np
+    from multiprocessing.shared_memory import SharedMemory
+    detach_shared_arrays()
+    for name, (segment_name, shape, dtype) in descriptors.items():
+        if sys.version_info >= (3, 13):
+            segment = SharedMemory(name = segment_name, track = False)                                  # only the process that made it should unlink it
+        else:
+            segment = SharedMemory(name = segment_name)                                                 # processes started by multiprocessing share the resource tracker, so this doesn't unlink it
+        view = np.ndarray(shape, dtype = dtype, buffer = segment.buf)
+        view.flags.writeable = False
+        _attached[name] = (segment, view)
+
+
+def detach_shared_arrays():
+    """ Forget the arrays this process has attached to (without unlinking them).
+    """
+    for name in list(_attached.keys()):
+        segment, view = _attached.pop(name)
+        del view
+        if segment is not None:
+            try:
+                segment.close()
+            except BufferError:                                                                         # the caller still has a view of it
+                pass
+
+
+def shared_array(name):
+    """ A read only view of an array that this process has attached to.
+    """
+    try:
+        return _attached[name][1]
+    except KeyError:
+        raise Exception(f"There is no shared array called {name} (arrays: {list(_attached.keys())}).  Exiting...")
+
+
+#%%
+
+def map_shared(function, jobs, arrays, n_processes = 1):
+    """ Run function(job) for each job on a pool of processes, with arrays put in shared memory once (rather than being sent with each job).
+    Inputs:
+        function | function | must be importable (i.e. not a lambda or nested function), and gets the arrays with shared_array(name).
+        jobs | list | each is passed to function, so should be small (e.g. the time courses and the number of ifgs).
+        arrays | dict | name : numpy array.
+        n_processes | int | if 1, the jobs are run in this process (without shared memory).
+    Returns:
+        results | list | of function(job), in the order of jobs.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import multiprocessing
+    import numpy as np
+    if n_processes == 1:
+        try:
+            for name, array in arrays.items():
+                view = np.asarray(array).view()
+                view.flags.writeable = False                                                           # as per the shared arrays, so function behaves the same
+                _attached[name] = (None, view)
+            return [function(job) for job in jobs]
+        finally:
+            detach_shared_arrays()
+    with SharedArrayRegistry() as registry:
+        for name, array in arrays.items():
+            registry.publish(name, array)
+        with multiprocessing.Pool(min(n_processes, max(len(jobs), 1)), initializer = attach_shared_arrays, initargs = (registry.descriptors(),)) as pool:
+            return pool.map(function, jobs)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A fast (approximate) version of bss_components_inversion for very large interferograms.  As there are only a few sources, the strength of each in an
+interferogram can be estimated well from a small number of pixels, so the least squares problem is "sketched":  either a stratified random subset of the
+pixels is used, or the pixels are combined into a smaller number of rows with a sparse random projection (a count sketch, which is a sparse
+Johnson-Lindenstrauss transform).  The sketch is made once for each mask, and reused.
+
+The RMS of the residual (and of the cumulative residual) is also estimated from the sketch (sketched_residual_for_pixels), so only the pixels in the
+sketch are read from the monitoring interferograms, and the cost of each new interferogram doesn't grow with the number of pixels.  The baseline stage
+is always solved exactly.
+
+LiCSAlert uses the baseline interferograms to estimate how much the sketch changes the line-to-point distances, and if any distance in the monitoring
+stage is within this of the alert threshold, the monitoring stage is recalculated without the sketch.  This estimate is a heuristic (it assumes the
+errors of the monitoring interferograms are like those of the baseline ones), not a guaranteed bound, so an alert could very occasionally differ from
+the one without the sketch.
+
+@author: Matthew Gaddes
+"""
+
+_sketch_cache = {}                                                                  # sketches that have been made, so that they are reused for the same mask
+
+
+#%%
+
+def pixel_sketch(mask, sketch_size, method = 'subset', seed = 0):
+    """ Make a sketch for the unmasked pixels of a mask.  The same sketch is returned each time this is called with the same mask and settings.
+    Inputs:
+        mask | r2 boolean array | True where pixels are masked, as per the rest of LiCSAlert.
+        sketch_size | int | the number of pixels (subset) or rows (countsketch) in the sketch.
+        method | string | 'subset' (a stratified random subset of the pixels, so they are spread across the image) or
+                          'countsketch' (each pixel is added, with a random sign, to one of sketch_size rows)
+        seed | int | for the random number generator.
+    Returns:
+        sketch | dict | method, n_pixs, sketch_size, and either 'pixels' (the pixels used, in increasing order) or 'rows' and 'signs' (for each pixel)
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import hashlib
+    import numpy as np
+
+    mask = np.asarray(mask, dtype = bool)
+    mask_hash = hashlib.sha1(np.packbits(mask).tobytes() + str(mask.shape).encode()).hexdigest()
+    cache_key = (mask_hash, int(sketch_size), method, seed)
+    if cache_key in _sketch_cache:
+        return _sketch_cache[cache_key]
+
+    n_pixs = int(np.count_nonzero(~mask))
+    sketch_size = int(min(sketch_size, n_pixs))
+    rng = np.random.default_rng(seed)
+    sketch = {'method'      : method,
+              'n_pixs'      : n_pixs,
+              'sketch_size' : sketch_size,
+              'mask_hash'   : mask_hash}
+    if method == 'subset':
+        strata = np.linspace(0, n_pixs, sketch_size + 1).astype(int)                                    # the pixels are in raster order, so strata spread the subset across the image
+        sketch['pixels'] = strata[:-1] + (rng.random(sketch_size) * (strata[1:] - strata[:-1])).astype(int)
+    elif method == 'countsketch':
+        sketch['rows'] = rng.integers(0, sketch_size, n_pixs)
+        sketch['signs'] = rng.choice(np.array([-1., 1.]), n_pixs)
+    else:
+        raise Exception(f"The sketch method must be either 'subset' or 'countsketch', but is {method}.  Exiting...")
+    _sketch_cache[cache_key] = sketch
+    return sketch
+
+
+def apply_sketch(sketch, data, dtype = 'float64'):
+    """ Apply a sketch to data with pixels as columns (e.g. interferograms or sources as row vectors).
+    Inputs:
+        sketch | dict | from pixel_sketch
+        data | r2 array (or an array that is not in memory, see lazy_ifgs.py) | n_rows x n_pixs
+        dtype | string | precision of the sketched data.
+    Returns:
+        data_sketch | r2 array | n_rows x sketch_size
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import numpy as np
+
+    if data.shape[1] != sketch['n_pixs']:
+        raise Exception(f"The sketch was made for {sketch['n_pixs']} pixels, but the data has {data.shape[1]}.  Exiting...")
+    if sketch['method'] == 'subset':
+        return np.asarray(data[:, sketch['pixels']], dtype = dtype)                                     # only these pixels are read
+    else:
+        data_sketch = np.zeros((data.shape[0], sketch['sketch_size']), dtype = dtype)
+        for row_n in range(data.shape[0]):                                                              # one row at a time, so the whole of data isn't needed at once
+            data_sketch[row_n, :] = np.bincount(sketch['rows'], weights = sketch['signs'] * np.asarray(data[row_n, :], dtype = 'float64'),
+                                                minlength = sketch['sketch_size'])
+        return data_sketch
+
+
+#%%
+
+def sketched_components_inversion(sources, interferograms, sketch, cumulative = True, dtype = 'float64'):
+    """ As per bss_components_inversion, but the least squares problem is solved for the sketch of the pixels.  The interferograms are mean centred
+    with the mean of the sketched pixels (subset) or all the pixels (countsketch, which reads all the pixels anyway).
+    Inputs:
+        sources | n_sources x pixels | ie architecture I.  Mean centered
+        interferograms | n_ifgs x pixels | Doesn't have to be mean centered, ifgs are rows
+        sketch | dict | from pixel_sketch
+        cumulative | Boolean | if true, m and residual are returned as cumulative sums.
+        dtype | string | 'float64' or 'float32'.
+    Outputs:
+        m | r2 array | the strengths with which to use each source to reconstruct each ifg (n_ifgs x n_sources)
+        residual | r2 array | the misfit between each (sketched) ifg and its reconstruction, as a column vector.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import numpy as np
+
+    g_sketch = apply_sketch(sketch, sources, dtype).T                                                   # sketch_size x n_sources
+    if sketch['method'] == 'subset':
+        d_sketch = apply_sketch(sketch, interferograms, dtype)
+        d_sketch = d_sketch - np.mean(d_sketch)                                                         # mean centre (with the mean of the subset)
+    else:
+        ifgs_mean = np.mean([np.mean(np.asarray(interferograms[row_n, :], dtype = 'float64')) for row_n in range(interferograms.shape[0])])
+        ones_sketch = np.bincount(sketch['rows'], weights = sketch['signs'], minlength = sketch['sketch_size'])          # the sketch of a row of 1s
+        d_sketch = apply_sketch(sketch, interferograms, dtype) - (ifgs_mean * ones_sketch)[np.newaxis, :].astype(dtype)  # S(d - mean) = Sd - mean * S1
+    d_sketch = d_sketch.T                                                                               # ifgs as column vectors
+
+    m = np.linalg.solve(g_sketch.T @ g_sketch, g_sketch.T @ d_sketch)                                   # n_sources x n_ifgs
+    d_resid = d_sketch - (g_sketch @ m)
+    residual = (np.sqrt(np.sum(d_resid**2, axis = 0)) / g_sketch.shape[0])[:, np.newaxis]
+
+    m = m.T
+    if cumulative:
+        m = np.cumsum(m, axis=0)
+        residual = np.cumsum(residual, axis=0)
+    return m, residual
+
+
+def sketched_residual_for_pixels(sources, sources_tcs, ifgs_list, sketch, dtype = 'float64', map_pixels = None):
+    """ As per residual_for_pixels, but the RMS of the residual (and of the cumulative residual) is estimated from the sketch of the pixels:  
+    the mean of the squares of the subset of the pixels, or the sum of the squares of the count sketch divided by the number of pixels (which 
+    is the same on average, as a count sketch approximately preserves the sum of squares).  The sketch is linear, so the sketch of the cumulative 
+    residual is the cumulative sum of the sketches of the residual.  
+    Inputs:
+        sources | r2 array | sources as row vectors
+        sources_tcs | list of dicts | as per residual_for_pixels.  
+        ifgs_list | list of r2 arrays | interferograms as row vectors, treated as if they had been stacked vertically.  Only the pixels in the sketch 
+                                        (subset) are read.  
+        sketch | dict | from pixel_sketch
+        dtype | string | 'float64' or 'float32'.
+        map_pixels | None or r1 int array | as per residual_for_pixels.  The residual of these pixels is exact (only they are read).  
+    Returns:
+        residual_ts | r2 array | column vector of the (estimated) RMS of the residual of each ifg.  
+        residual_cs | r2 array | column vector of the (estimated) RMS of the cumulative residual.  
+        residual_maps | dict | Only if map_pixels is not None, as per residual_for_pixels.  
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import numpy as np
+
+    tcs = np.hstack([np.diff(np.ravel(tc['cumulative_tc']), prepend = 0)[:, np.newaxis] for tc in sources_tcs]).astype(dtype)      # incremental, n_ifgs x n_sources
+    n_ifgs = sum([ifgs.shape[0] for ifgs in ifgs_list])
+    if n_ifgs != tcs.shape[0]:
+        raise Exception(f"There are {n_ifgs} interferograms, but the time courses are of length {tcs.shape[0]}.  Exiting...")
+
+    residual_sketch = np.vstack([apply_sketch(sketch, ifgs, dtype) for ifgs in ifgs_list]) - (tcs @ apply_sketch(sketch, sources, dtype))     # n_ifgs x sketch_size
+    residual_sketch_cs = np.cumsum(residual_sketch, axis = 0)
+    if sketch['method'] == 'subset':
+        n_squares = sketch['sketch_size']                                                               # mean of the squares of the subset
+    else:
+        n_squares = sketch['n_pixs']                                                                    # sum of the squares is preserved, so divide by all the pixels
+    residual_ts = np.sqrt(np.sum(residual_sketch**2, axis = 1) / n_squares)[:, np.newaxis]
+    residual_cs = np.sqrt(np.sum(residual_sketch_cs**2, axis = 1) / n_squares)[:, np.newaxis]
+    if map_pixels is None:
+        return residual_ts, residual_cs
+
+    pixels, map_index = np.unique(map_pixels, return_inverse = True)                                   # in increasing order, as arrays that aren't in memory (e.g. h5py) need this
+    residual_pixels = np.vstack([np.asarray(ifgs[:, pixels], dtype = dtype) for ifgs in ifgs_list]) - (tcs @ np.asarray(sources[:, pixels], dtype = dtype))
+    residual_maps = {'incremental' : np.ascontiguousarray(residual_pixels[:, map_index].T),
+                     'cumulative'  : np.ascontiguousarray(np.cumsum(residual_pixels, axis = 0)[:, map_index].T)}
+    return residual_ts, residual_cs, residual_maps
+
+
+#%%
+
+def sketch_distance_bounds(tcs_c_exact, tcs_c_sketch, sigmas, n_times_baseline, n_times_monitoring, safety_factor = 3.):
+    """ Estimate how much using the sketch could change the line-to-point distances (in sigmas) of each time course in the monitoring stage,
+    by comparing the exact and sketched time courses of the baseline stage.  The errors in the incremental time courses are assumed to be independent 
+    between interferograms (as they're mostly due to the atmosphere), with the same RMS as in the baseline stage, so the error of the cumulative time 
+    course grows with the square root of the number of sketched interferograms.  The lines of best fit are made from the previous points, so could 
+    have a similar error, hence the factor of two.  
+    N.b. this is a heuristic (safety_factor standard deviations of an error model), not a guaranteed bound:  a monitoring interferogram that is 
+    unlike the baseline ones (e.g. a new deformation signal that isn't in the sources) could have a larger error.  
+
+    Inputs:
+        tcs_c_exact | r2 array | cumulative time courses as column vectors (baseline stage), from the exact inversion.
+        tcs_c_sketch | r2 array | as above, but from the sketched inversion.
+        sigmas | r1 array | the sigma of each time course (from the baseline stage).
+        n_times_baseline | int | number of baseline interferograms.
+        n_times_monitoring | int | number of monitoring interferograms.
+        safety_factor | float | the error bounds are this many standard deviations of the error.
+    Returns:
+        distance_bounds | r2 array | n_times x n_tcs, the estimated error of each distance.  0 for the baseline stage (which is always solved exactly).
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import numpy as np
+
+    tcs_exact = np.diff(tcs_c_exact, axis = 0, prepend = 0)                                             # incremental time courses
+    tcs_sketch = np.diff(tcs_c_sketch, axis = 0, prepend = 0)
+    rms_error = np.sqrt(np.mean((tcs_exact - tcs_sketch)**2, axis = 0))                                 # for each time course
+    n_monitoring = np.arange(1, n_times_monitoring + 1)[:, np.newaxis]                                  # number of sketched increments in each cumulative value
+    distance_bounds = np.zeros((n_times_baseline + n_times_monitoring, tcs_c_exact.shape[1]))
+    distance_bounds[n_times_baseline:, :] = 2 * safety_factor * np.sqrt(n_monitoring) * rms_error[np.newaxis, :] / np.asarray(sigmas)[np.newaxis, :]
+    return distance_bounds
+
+
+def near_alert_threshold(tcs, distance_bounds, n_times_baseline, alert_sigma):
+    """ Return True if any of the line-to-point distances in the monitoring stage are close enough to the alert threshold (i.e. within their estimated 
+    error) that the sketch could have changed whether they are above or below it.
+    Inputs:
+        tcs | list of dicts | from LiCSAlert (i.e. containing 'distances')
+        distance_bounds | r2 array | from sketch_distance_bounds, a column for each item in tcs.
+        n_times_baseline | int | number of baseline interferograms.
+        alert_sigma | float | the alert threshold, in sigmas.
+    Returns:
+        near | boolean
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import numpy as np
+    for tc_n, tc in enumerate(tcs):
+        distances = np.ravel(tc['distances'])[n_times_baseline:]
+        if np.any(np.abs(distances - alert_sigma) <= distance_bounds[n_times_baseline:, tc_n]):
+            return True
+    return False
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A cache of the results of each stage of LiCSAlert (e.g. the preprocessing, ICASAR, the combination of the masks, the inversion, and the figures).
+The key of each result is made from a hash of the contents of the stage's inputs and its settings, so a stage is only run again if something
+that it uses has changed (e.g. changing only downsample_plot re-makes the figures, but not ICASAR or the inversion).  The cache is limited in size,
+and the results that were used least recently are deleted first.
+
+@author: Matthew Gaddes
+"""
+
+#%%
+
+def content_hash(*items):
+    """ Return a hash (sha1, as a hex string) of the contents of some items, which can be numpy arrays (including masked arrays and memmaps),
+    arrays that aren't in memory (e.g. LazyIfgs or h5py datasets, which are read one row at a time), dicts, lists, tuples, strings, numbers,
+    None, and anything with a to_dict method (e.g. a Geotransform).
+    History:
+        2026/10/18 | MEG | Written
+    """
+    import hashlib
+    hash_object = hashlib.sha1()
+    for item in items:
+        _update_hash(hash_object, item)
+    return hash_object.hexdigest()
+
+
+def _update_hash(hash_object, item):
+    """ Add the contents of one item to a hash (see content_hash).
+    """
+    import numpy as np
+    import numpy.ma as ma
+
+    if isinstance(item, ma.MaskedArray):
+        hash_object.update(b'masked_array')
+        _update_hash(hash_object, ma.getdata(item))
+        _update_hash(hash_object, ma.getmaskarray(item))
+    elif isinstance(item, np.ndarray):
+        hash_object.update(f"ndarray{item.shape}{item.dtype}".encode())
+        hash_object.update(np.ascontiguousarray(item).data)                                          # no copy if it's already contiguous
+    elif isinstance(item, dict):
+        hash_object.update(b'dict')
+        for key in sorted(item.keys(), key = str):
+            _update_hash(hash_object, str(key))
+            _update_hash(hash_object, item[key])
+    elif isinstance(item, (list, tuple)):
+        hash_object.update(f"{type(item).__name__}{len(item)}".encode())
+        for sub_item in item:
+            _update_hash(hash_object, sub_item)
+    elif isinstance(item, (str, bytes, bool, int, float, complex, np.generic)) or item is None:
+        hash_object.update(f"{type(item).__name__}:{item!r}".encode())
+    elif hasattr(item, 'to_dict'):
+        hash_object.update(type(item).__name__.encode())
+        _update_hash(hash_object, item.to_dict())
+    elif hasattr(item, 'shape') and len(item.shape) > 0:                                             # an array that isn't in memory, so read it one row at a time
+        hash_object.update(f"rows{tuple(item.shape)}".encode())
+        for row_n in range(item.shape[0]):
+            _update_hash(hash_object, np.asarray(item[row_n]))
+    else:
+        hash_object.update(f"{type(item).__name__}:{item!r}".encode())
+
+
+def row_hashes(ifgs):
+    """ Return the hash of each row of a rank 2 array (e.g. each interferogram), so that the hash of the first n rows can be made without
+    hashing them all again (e.g. when LiCSAlert is run for each monitoring interferogram in turn).
+    History:
+        2026/10/18 | MEG | Written
+    """
+    return [content_hash(ifgs[row_n]) for row_n in range(ifgs.shape[0])]
+
+
+#%%
+
+class StageCache(object):
+    """ A cache of the results of stages, stored as files in a folder.  Results that are python objects (e.g. the sources from ICASAR) are pickled, and
+    stages that make files (e.g. figures) have their files copied into a folder in the cache.  When the cache is larger than max_size_MB,
+    the results that were used least recently are deleted.
+    e.g.:
+        cache = StageCache('volcano/stage_cache/', max_size_MB = 2000)
+        sources = cached_stage(cache, 'ICASAR', run_ICASAR, [baseline_ifgs, ICASAR_settings])
+    History:
+        2026/10/18 | MEG | Written
+    """
+    def __init__(self, cache_dir, max_size_MB = 1000., verbose = True):
+        """
+        Inputs:
+            cache_dir | string or Path | folder for the cache (made if it doesn't exist)
+            max_size_MB | float | the maximum size of the cache.  The result that was used most recently is always kept, even if it is larger than this.
+            verbose | boolean | if True, print when a result is loaded from the cache.
+        """
+        import os
+        from pathlib import Path
+        self.cache_dir = Path(cache_dir)
+        self.max_size_MB = max_size_MB
+        self.verbose = verbose
+        os.makedirs(self.cache_dir, exist_ok = True)
+
+    def key(self, stage, inputs):
+        """ The key of a stage, from its name and a hash of the contents of its inputs (which should include its settings).
+        """
+        return f"{stage}_{content_hash(stage, inputs)}"
+
+    def _touch(self, path):
+        """ Update the modification time of a result, which is used to find the least recently used results.
+        """
+        import os
+        os.utime(path, None)
+
+    def load(self, key):
+        """ Return (True, result) if the result for key is in the cache, or (False, None) if it isn't.
+        """
+        import pickle
+        path = self.cache_dir / f"{key}.pkl"
+        if not path.exists():
+            return False, None
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+        except Exception:                                                                               # e.g. a partly written file, so treat as not in the cache
+            return False, None
+        self._touch(path)
+        return True, result
+
+    def save(self, key, result):
+        """ Pickle a result to the cache, and then delete the least recently used results if the cache is too big.
+        """
+        import os
+        import pickle
+        path = self.cache_dir / f"{key}.pkl"
+        with open(f"{path}.tmp", 'wb') as f:
+            pickle.dump(result, f, protocol = pickle.HIGHEST_PROTOCOL)
+        os.replace(f"{path}.tmp", path)                                                                 # so a partly written result is never loaded
+        self.evict()
+
+    def load_files(self, key, out_folder):
+        """ If the files made by a stage are in the cache, copy them to out_folder and return True.  Otherwise return False.
+        """
+        import shutil
+        folder = self.cache_dir / key
+        if not folder.is_dir():
+            return False
+        for cached_file in sorted(folder.iterdir()):
+            shutil.copy2(cached_file, out_folder)
+        self._touch(folder)
+        return True
+
+    def save_files(self, key, files):
+        """ Copy the files made by a stage to the cache.
+        """
+        import os
+        import shutil
+        folder = self.cache_dir / key
+        folder_tmp = self.cache_dir / f"{key}.tmp"
+        shutil.rmtree(folder_tmp, ignore_errors = True)
+        os.mkdir(folder_tmp)
+        for stage_file in files:
+            shutil.copy2(stage_file, folder_tmp)
+        shutil.rmtree(folder, ignore_errors = True)
+        os.replace(folder_tmp, folder)
+        self._touch(folder)
+        self.evict()
+
+    def entries(self):
+        """ Return a list of (modification time, size in bytes, path) for each result in the cache, oldest first.
+        """
+        entries = []
+        for path in self.cache_dir.iterdir():
+            if path.name.endswith('.tmp'):
+                continue
+            if path.is_dir():
+                size = sum([sub_path.stat().st_size for sub_path in path.iterdir()])
+            else:
+                size = path.stat().st_size
+            entries.append((path.stat().st_mtime, size, path))
+        return sorted(entries, key = lambda entry: entry[0])
+
+    def size_MB(self):
+        return sum([entry[1] for entry in self.entries()]) / 1e6
+
+    def evict(self):
+        """ Delete the least recently used results until the cache is smaller than max_size_MB (but always keep the most recent).
+        """
+        import shutil
+        entries = self.entries()
+        total_size = sum([entry[1] for entry in entries])
+        for _, size, path in entries[:-1]:
+            if total_size <= (self.max_size_MB * 1e6):
+                break
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors = True)
+            else:
+                path.unlink()
+            total_size -= size
+
+
+#%%
+
+def cached_stage(cache, stage, function, inputs):
+    """ Return the result of function() from the cache, or run it (and save the result to the cache).
+    Inputs:
+        cache | StageCache or None | if None, function is always run.
+        stage | string | name of the stage, e.g. 'ICASAR'
+        function | function | called with no arguments to make the result.
+        inputs | list | everything that the result depends on (the data, and the settings), which are hashed to make the key.
+    Returns:
+        result | anything that can be pickled | the result of function()
+    History:
+        2026/10/18 | MEG | Written
+    """
+    if cache is None:
+        return function()
+    key = cache.key(stage, inputs)
+    in_cache, result = cache.load(key)
+    if in_cache:
+        if cache.verbose:
+            print(f"Loaded the results of {stage} from the cache (as its inputs and settings haven't changed).  ")
+        return result
+    result = function()
+    cache.save(key, result)
+    return result
+
+
+def cached_files_stage(cache, stage, function, inputs, out_folder):
+    """ As per cached_stage, but for a stage that makes files in out_folder (e.g. a figure).  The files that function makes (or changes) are saved
+    to the cache, and are copied back to out_folder if the stage's inputs are the same next time.
+    History:
+        2026/10/18 | MEG | Written
+    """
+    from pathlib import Path
+    if cache is None:
+        return function()
+    out_folder = Path(out_folder)
+    key = cache.key(stage, inputs)
+    if cache.load_files(key, out_folder):
+        if cache.verbose:
+            print(f"Copied the files of {stage} from the cache (as its inputs and settings haven't changed).  ")
+        return None
+    files_before = {path.name : path.stat().st_mtime_ns for path in out_folder.iterdir() if path.is_file()}
+    result = function()
+    files_new = [path for path in out_folder.iterdir() if path.is_file() and files_before.get(path.name, None) != path.stat().st_mtime_ns]
+    cache.save_files(key, files_new)
+    return result
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The licsalert package (lib/) and the synthetic time series (benchmarks/) are imported by name, as per the example scripts.  
+
+@author: Matthew Gaddes
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+repo_dir = Path(__file__).resolve().parent.parent
+for folder in [repo_dir / "lib", repo_dir / "benchmarks"]:
+    if str(folder) not in sys.path:
+        sys.path.insert(0, str(folder))
+
+
+@pytest.fixture(scope = 'session')
+def synthetic_data():
+    """ A small synthetic time series (with an unrest event), shared by the tests that don't change it.  
+    """
+    from synthetic_time_series import synthetic_time_series
+    return synthetic_time_series(ny = 60, nx = 70, n_epochs = 40, n_sources = 3, n_baseline_end = 20, unrest_epoch = 32, seed = 1)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stand-ins for the LiCSBAS scripts that LiCSAlert runs (see LiCSBAS_runner.py), so that the runner can be tested without LiCSBAS.  Each script prints its 
+arguments, makes the folders (and for step 13 the cum.h5 file) that LiCSBAS would, and can be made to be slow or to fail with environment variables:
+    STUB_LICSBAS_SLEEP      seconds each step takes
+    STUB_LICSBAS_FAIL       the step that exits with an error (e.g. LiCSBAS12)
+    STUB_LICSBAS_TRACE      file that the start and end time of each step (and the folder it was run for) are appended to
+
+@author: Matthew Gaddes
+"""
+
+import os
+import sys
+import time
+
+
+def main():
+    step = os.path.basename(sys.argv[0]).split('_')[0]                                  # e.g. LiCSBAS13
+    args = sys.argv[1:]
+    t_start = time.time()
+    print(f"{step} {' '.join(args)}", flush = True)
+    time.sleep(float(os.environ.get('STUB_LICSBAS_SLEEP', 0)))
+    
+    for flag in ['-o', '-t']:                                                           # the output folder (02 and 05) or time series folder (11, 12, and 13)
+        if flag in args:
+            os.makedirs(args[args.index(flag) + 1], exist_ok = True)
+    if step == 'LiCSBAS13':
+        with open(f"{args[args.index('-t') + 1]}/cum.h5", 'w'):
+            pass
+    
+    if 'STUB_LICSBAS_TRACE' in os.environ:
+        folder = args[args.index('-o') + 1] if '-o' in args else args[args.index('-t') + 1]
+        with open(os.environ['STUB_LICSBAS_TRACE'], 'a') as f:
+            f.write(f"{step} {folder} {t_start} {time.time()}\n")
+    if os.environ.get('STUB_LICSBAS_FAIL', None) == step:
+        print(f"{step} failed", flush = True)
+        sys.exit(1)
+    print(f"{step} finished", flush = True)
+
+
+if __name__ == "__main__":
+    main()
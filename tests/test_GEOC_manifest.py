@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LiCSBAS is only skipped if neither the LiCSAR ifgs nor the region of the volcano have changed since it was last run, so a volcano whose region is
+changed in its config file doesn't crop the old time series.
+
+@author: Matthew Gaddes
+"""
+
+import os
+
+
+def make_GEOC(GEOC_dir, ifgs):
+    for ifg in ifgs:
+        os.makedirs(f"{GEOC_dir}{ifg}", exist_ok = True)
+        with open(f"{GEOC_dir}{ifg}/{ifg}.geo.unw.tif", 'w') as f:
+            f.write(ifg)
+
+
+def test_region_change_reruns_LiCSBAS(tmp_path):
+    from licsalert.LiCSAlert_monitoring_functions import run_LiCSAlert_status, GEOC_manifest_write
+    GEOC_dir, volcano_dir = f"{tmp_path}/GEOC/", f"{tmp_path}/volcano/"
+    make_GEOC(GEOC_dir, ['20200101_20200113', '20200113_20200125', '20200125_20200206'])
+    os.makedirs(f"{volcano_dir}LiCSBAS/TS_GEOCmldir")
+    region, new_region = [10.0, 10.5, 40.0, 40.5], [10.0, 10.8, 40.0, 40.5]
+
+    def status(lon_lat):
+        return run_LiCSAlert_status(GEOC_dir, volcano_dir, '20200110', f"{volcano_dir}LiCSAlert_history.txt", lon_lat = lon_lat, figures = False)
+
+    first = status(region)
+    assert first['run_LiCSBAS'] and first['run_LiCSAlert']                                        # never run
+    with open(f"{volcano_dir}LiCSBAS/TS_GEOCmldir/cum.h5", 'w'):                                  # as LiCSBAS would make
+        pass
+    GEOC_manifest_write(first['GEOC_manifest'], f"{volcano_dir}LiCSBAS/")
+
+    assert not status(region)['run_LiCSBAS']                                                     # nothing has changed, so the time series is reused
+    assert status(new_region)['run_LiCSBAS']                                                     # the region has changed
+    make_GEOC(GEOC_dir, ['20200206_20200218'])
+    assert status(region)['run_LiCSBAS']                                                         # a new ifg
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LiCSBAS_runner.py, with the stand-ins for the LiCSBAS scripts in tests/stub_LiCSBAS:  the steps of several frames run at the same time, a failed step 
+stops its frame, the runner works from code that is already running an event loop, and LiCSBAS_for_frames only runs the frames that have changed.  
+
+@author: Matthew Gaddes
+"""
+
+import asyncio
+import os
+from pathlib import Path
+import pytest
+
+stub_dir = str(Path(__file__).parent / "stub_LiCSBAS")
+
+
+@pytest.fixture
+def stub_LiCSBAS(monkeypatch, tmp_path):
+    monkeypatch.setenv('PATH', f"{stub_dir}:{os.environ['PATH']}")
+    monkeypatch.setenv('STUB_LICSBAS_TRACE', str(tmp_path / "trace.txt"))
+    monkeypatch.delenv('STUB_LICSBAS_FAIL', raising = False)
+    return tmp_path
+
+
+def frame_jobs(tmp_path, frames):
+    return [{'label'           : frame,
+             'GEOCdir'         : f"{tmp_path}/{frame}/GEOC",
+             'LiCSBAS_out_dir' : f"{tmp_path}/{frame}/",
+             'log_file'        : f"{tmp_path}/{frame}_log.txt",
+             'lon_lat'         : [0., 1., 0., 1.]} for frame in frames]
+
+
+def read_trace(tmp_path):
+    with open(tmp_path / "trace.txt") as f:
+        return [(line.split()[0], line.split()[1], float(line.split()[2]), float(line.split()[3])) for line in f]
+
+
+def test_frames_run_at_once(stub_LiCSBAS, monkeypatch):
+    from licsalert.LiCSBAS_runner import run_LiCSBAS_frames
+    monkeypatch.setenv('STUB_LICSBAS_SLEEP', '0.3')
+    step_records = run_LiCSBAS_frames(frame_jobs(stub_LiCSBAS, ['frame_a', 'frame_b']), n_para = 4, max_concurrent = 2, echo = False)
+    assert [[step_record['step'] for step_record in job_records] for job_records in step_records] == [['LiCSBAS02', 'LiCSBAS05', 'LiCSBAS11', 'LiCSBAS12', 'LiCSBAS13']] * 2
+    assert all([step_record['returncode'] == 0 for job_records in step_records for step_record in job_records])
+    assert '--n_para 2' in ' '.join(step_records[0][0]['args'])                                           # n_para is split between the frames
+    assert (stub_LiCSBAS / "frame_a" / "TS_GEOCmldir" / "cum.h5").exists()
+    with open(stub_LiCSBAS / "frame_b_log.txt") as f:
+        assert 'LiCSBAS13 finished' in f.read()
+    trace = read_trace(stub_LiCSBAS)
+    starts = {frame : min([t_start for _, folder, t_start, _ in trace if f"/{frame}/" in folder]) for frame in ['frame_a', 'frame_b']}
+    ends = {frame : max([t_end for _, folder, _, t_end in trace if f"/{frame}/" in folder]) for frame in ['frame_a', 'frame_b']}
+    assert max(starts.values()) < min(ends.values())                                                       # the two chains overlapped
+
+
+def test_failed_step_stops_frame(stub_LiCSBAS, monkeypatch):
+    from licsalert.LiCSBAS_runner import run_LiCSBAS_frames, check_LiCSBAS_steps
+    monkeypatch.setenv('STUB_LICSBAS_FAIL', 'LiCSBAS11')
+    step_records = run_LiCSBAS_frames(frame_jobs(stub_LiCSBAS, ['frame_a']), echo = False)[0]
+    assert [step_record['step'] for step_record in step_records] == ['LiCSBAS02', 'LiCSBAS05', 'LiCSBAS11']
+    assert step_records[-1]['returncode'] == 1
+    with pytest.raises(Exception, match = 'LiCSBAS11 for frame_a failed'):
+        check_LiCSBAS_steps(step_records)
+
+
+def test_inside_running_event_loop(stub_LiCSBAS):
+    from licsalert.LiCSBAS_runner import run_LiCSBAS_frames, run_LiCSBAS_frames_async
+    
+    async def caller():                                                                                     # e.g. a notebook, or an asyncio server
+        step_records_sync = run_LiCSBAS_frames(frame_jobs(stub_LiCSBAS, ['frame_a']), echo = False)
+        step_records_async = await run_LiCSBAS_frames_async(frame_jobs(stub_LiCSBAS, ['frame_b']), echo = False)
+        return step_records_sync, step_records_async
+    
+    step_records_sync, step_records_async = asyncio.run(caller())
+    assert len(step_records_sync[0]) == len(step_records_async[0]) == 5
+    assert all([step_record['returncode'] == 0 for step_record in step_records_sync[0] + step_records_async[0]])
+
+
+def write_volcano(LiCSAlert_volcs_dir, volcano, frame, lon_lat):
+    os.makedirs(f"{LiCSAlert_volcs_dir}{volcano}")
+    with open(f"{LiCSAlert_volcs_dir}{volcano}/LiCSAlert_settings.txt", 'w') as f:
+        f.write(f"[LiCSAR]\nframe = {frame}\n\n"
+                f"[LiCSBAS]\nwest = {lon_lat[0]}\neast = {lon_lat[1]}\nsouth = {lon_lat[2]}\nnorth = {lon_lat[3]}\nframe_level = True\n\n"
+                f"[LiCSAlert]\ndownsample_run = 1\ndownsample_plot = 0.5\nbaseline_end = 20200101\n\n"
+                f"[ICASAR]\nn_comp = 5\nn_bootstrapped = 10\nn_not_bootstrapped = 10\nHDBSCAN_min_cluster_size = 10\nHDBSCAN_min_samples = 5\n"
+                f"tsne_perplexity = 30\ntsne_early_exaggeration = 12\nica_tolerance = 1e-2\nica_max_iterations = 150\n")
+
+
+def test_LiCSBAS_for_frames(stub_LiCSBAS):
+    from licsalert.LiCSAlert_monitoring_functions import LiCSBAS_for_frames, frame_LiCSBAS_dir
+    LiCSAR_frames_dir = f"{stub_LiCSBAS}/LiCSAR_frames/"
+    LiCSAlert_volcs_dir = f"{stub_LiCSBAS}/volcanoes/"
+    for frame in ['frame_a', 'frame_b']:
+        os.makedirs(f"{LiCSAR_frames_dir}{frame}/GEOC/20200101_20200113")
+        Path(f"{LiCSAR_frames_dir}{frame}/GEOC/20200101_20200113/20200101_20200113.geo.unw.tif").touch()
+    write_volcano(LiCSAlert_volcs_dir, 'volcano_1', 'frame_a', [0., 1., 0., 1.])
+    write_volcano(LiCSAlert_volcs_dir, 'volcano_2', 'frame_a', [0.5, 2., 0.5, 2.])
+    write_volcano(LiCSAlert_volcs_dir, 'volcano_3', 'frame_b', [5., 6., 5., 6.])
+    
+    step_records = LiCSBAS_for_frames(['frame_a', 'frame_b', 'frame_a'], LiCSAR_frames_dir, LiCSAlert_volcs_dir, stub_dir, n_para = 2)
+    assert sorted(step_records.keys()) == ['frame_a', 'frame_b']
+    assert '0.0/2.0/0.0/2.0' in step_records['frame_a'][1]['args']                                         # clipped to the union of the regions of the frame's volcanoes
+    for frame in ['frame_a', 'frame_b']:
+        assert os.path.exists(f"{frame_LiCSBAS_dir(LiCSAlert_volcs_dir, frame)}GEOC_manifest.json")
+    
+    os.makedirs(f"{LiCSAR_frames_dir}frame_b/GEOC/20200113_20200125")                                      # a new ifg, so only frame_b is run again
+    Path(f"{LiCSAR_frames_dir}frame_b/GEOC/20200113_20200125/20200113_20200125.geo.unw.tif").touch()
+    assert list(LiCSBAS_for_frames(['frame_a', 'frame_b'], LiCSAR_frames_dir, LiCSAlert_volcs_dir, stub_dir).keys()) == ['frame_b']
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The blocked inversion and residual (blocked_inversion.py) give the same results as working on the whole stack at once, for any block size and
+number of threads, and when the ifgs are given as a list (as if they were stacked vertically) or are not in memory.  Ifgs that aren't in memory
+are only read in the passes of the inversion and the residual (and not to find their means or to downsample them for figures that aren't made).  
+
+@author: Matthew Gaddes
+"""
+
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize('memory_budget, n_threads', [(0.01, 1), (0.05, 4), (1000., 2)])
+def test_blocked_components_inversion(synthetic_data, memory_budget, n_threads):
+    from licsalert.LiCSAlert_functions import bss_components_inversion
+    ifgs = synthetic_data['displacement_r2']['incremental']
+    m, residual = bss_components_inversion(synthetic_data['sources'], ifgs)
+    m_blocked, residual_blocked = bss_components_inversion(synthetic_data['sources'], ifgs, memory_budget = memory_budget, n_threads = n_threads)
+    np.testing.assert_allclose(m_blocked, m, rtol = 1e-8, atol = 1e-8)
+    np.testing.assert_allclose(residual_blocked, residual, rtol = 1e-8, atol = 1e-10)
+
+
+@pytest.mark.parametrize('memory_budget, n_threads', [(0.01, 1), (0.05, 4)])
+def test_blocked_residual_for_pixels(synthetic_data, memory_budget, n_threads):
+    from licsalert.LiCSAlert_functions import bss_components_inversion, residual_for_pixels, tcs_baseline
+    ifgs = synthetic_data['displacement_r2']['incremental']
+    n_baseline_end = synthetic_data['n_baseline_end']
+    tcs_c, _ = bss_components_inversion(synthetic_data['sources'], ifgs)
+    sources_tcs = tcs_baseline(tcs_c, synthetic_data['cumulative_baselines'], 10)
+    residual_ts, residual_cs = residual_for_pixels(synthetic_data['sources'], sources_tcs, ifgs)
+    residual_ts_blocked, residual_cs_blocked = residual_for_pixels(synthetic_data['sources'], sources_tcs, [ifgs[:n_baseline_end], ifgs[n_baseline_end:]],
+                                                                   memory_budget = memory_budget, n_threads = n_threads)
+    np.testing.assert_allclose(residual_ts_blocked, residual_ts, rtol = 1e-10)
+    np.testing.assert_allclose(residual_cs_blocked, residual_cs, rtol = 1e-10)
+
+
+def test_blocked_float32(synthetic_data):
+    from licsalert.LiCSAlert_functions import bss_components_inversion
+    ifgs = synthetic_data['displacement_r2']['incremental']
+    m, _ = bss_components_inversion(synthetic_data['sources'], ifgs)
+    m_32, residual_32 = bss_components_inversion(synthetic_data['sources'], ifgs.astype('float32'), dtype = 'float32', memory_budget = 0.01, n_threads = 3)
+    assert m_32.dtype == np.float32 and residual_32.dtype == np.float32
+    np.testing.assert_allclose(m_32, m, rtol = 1e-3, atol = 1e-3)
+
+
+def test_LiCSAlert_lazy_ifgs(synthetic_data, tmp_path):
+    """ ifgs that aren't in memory (here a np.memmap) are worked through in blocks, and give the same distances.  
+    """
+    from licsalert.LiCSAlert_functions import LiCSAlert
+    ifgs = synthetic_data['displacement_r2']['incremental']
+    n_baseline_end = synthetic_data['n_baseline_end']
+    ifgs_memmap = np.lib.format.open_memmap(tmp_path / "ifgs.npy", mode = 'w+', dtype = ifgs.dtype, shape = ifgs.shape)
+    ifgs_memmap[:] = ifgs
+    ifgs_memmap.flush()
+    results = LiCSAlert(synthetic_data['sources'], synthetic_data['cumulative_baselines'], ifgs[:n_baseline_end], ifgs[n_baseline_end:])
+    with pytest.warns(UserWarning, match = 'memory_budget'):                                           # memory_budget is None, so it is set (but not silently)
+        results_lazy = LiCSAlert(synthetic_data['sources'], synthetic_data['cumulative_baselines'], ifgs_memmap[:n_baseline_end], ifgs_memmap[n_baseline_end:])
+    for tcs, tcs_lazy in zip(results, results_lazy):
+        for tc, tc_lazy in zip(tcs, tcs_lazy):
+            np.testing.assert_allclose(tc_lazy['distances'], tc['distances'], rtol = 1e-8, atol = 1e-8)
+
+
+class CountedReads(object):
+    """ An array of ifgs (as rows) that records how many pixels of each row are read.  
+    """
+    def __init__(self, ifgs):
+        self.ifgs = ifgs
+        self.shape = ifgs.shape
+        self.pixels_read = np.zeros(ifgs.shape[0], dtype = int)
+
+    def __getitem__(self, key):
+        data = np.asarray(self.ifgs[key])
+        self.pixels_read[range(self.shape[0])[key[0] if isinstance(key, tuple) else key]] += data.shape[-1]
+        return data
+
+
+def memmap_ifgs(ifgs, tmp_path):
+    ifgs_memmap = np.lib.format.open_memmap(tmp_path / "ifgs.npy", mode = 'w+', dtype = ifgs.dtype, shape = ifgs.shape)
+    ifgs_memmap[:] = ifgs
+    ifgs_memmap.flush()
+    return CountedReads(ifgs_memmap)
+
+
+def test_lazy_ifgs_rows_read(synthetic_data, tmp_path):
+    from licsalert.LiCSAlert_functions import LiCSAlert, LiCSAlert_preprocessing
+    ifgs, mask = synthetic_data['displacement_r2']['incremental'], synthetic_data['displacement_r2']['mask']
+    n_baseline_end, n_pixels = synthetic_data['n_baseline_end'], ifgs.shape[1]
+    ifgs_counted = memmap_ifgs(ifgs, tmp_path)
+    displacement_r2 = LiCSAlert_preprocessing({'incremental' : ifgs_counted, 'mask' : mask}, downsample_run = 1.0, downsample_plot = 1.0, verbose = False)
+    assert np.all(ifgs_counted.pixels_read == 0)                                                       # nothing is read until it's needed
+
+    results_lazy = LiCSAlert(synthetic_data['sources'], synthetic_data['cumulative_baselines'], displacement_r2['incremental'][:n_baseline_end],
+                             displacement_r2['incremental'][n_baseline_end:], memory_budget = 0.02)        # several blocks of pixels
+    rows_read = ifgs_counted.pixels_read / n_pixels
+    np.testing.assert_array_equal(rows_read[:n_baseline_end], 4)                                          # the 2 passes of the inversion, the baseline residual, and the residual of all the ifgs
+    np.testing.assert_array_equal(rows_read[n_baseline_end:], 3)                                          # the 2 passes of the inversion, and the residual of all the ifgs
+    ifgs_centred = ifgs - np.mean(ifgs, axis = 1)[:, np.newaxis]
+    results = LiCSAlert(synthetic_data['sources'], synthetic_data['cumulative_baselines'], ifgs_centred[:n_baseline_end], ifgs_centred[n_baseline_end:])
+    for tcs, tcs_lazy in zip(results, results_lazy):
+        for tc, tc_lazy in zip(tcs, tcs_lazy):
+            np.testing.assert_allclose(tc_lazy['distances'], tc['distances'], rtol = 1e-8, atol = 1e-8)
+
+
+def test_lazy_ifgs_downsampled_when_used(synthetic_data, tmp_path):
+    from licsalert.LiCSAlert_functions import LiCSAlert_preprocessing, shorten_LiCSAlert_data
+    from licsalert.downsample_ifgs import downsample_ifgs
+    pytest.importorskip('skimage')                                                                        # to downsample the ifgs
+    ifgs, mask = synthetic_data['displacement_r2']['incremental'], synthetic_data['displacement_r2']['mask']
+    ifgs_counted = memmap_ifgs(ifgs, tmp_path)
+    displacement_r2 = LiCSAlert_preprocessing({'incremental' : ifgs_counted, 'mask' : mask}, downsample_run = 1.0, downsample_plot = 0.5, verbose = False)
+    assert np.all(ifgs_counted.pixels_read == 0)
+    thumbnails = np.asarray(shorten_LiCSAlert_data(displacement_r2, n_end = 5, verbose = False)['incremental_downsampled'])     # e.g. the figure of the 5th ifg
+    assert np.all(ifgs_counted.pixels_read[5:] == 0)                                                      # only the rows that are plotted are read
+    ifgs_centred = ifgs - np.mean(ifgs, axis = 1)[:, np.newaxis]
+    np.testing.assert_allclose(thumbnails, downsample_ifgs(ifgs_centred[:5], mask, 0.5, verbose = False)[0], rtol = 1e-10, atol = 1e-10)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LiCSAlert_cascade labels its results with the resolution they are from, and the label is saved with the results and in the results store.  
+
+@author: Matthew Gaddes
+"""
+
+import json
+import numpy as np
+import pytest
+
+
+def stride_downsample(rows, mask):
+    """ Every other pixel of ifgs (or sources) as row vectors, which is all LiCSAlert_cascade needs (and doesn't need skimage, unlike downsample_ifgs).  
+    """
+    images = np.zeros((rows.shape[0],) + mask.shape)
+    images[:, ~mask] = rows
+    mask_downsampled = mask[::2, ::2]
+    return images[:, ::2, ::2][:, ~mask_downsampled], mask_downsampled
+
+
+@pytest.fixture(scope = 'module')
+def cascade_inputs(synthetic_data):
+    displacement_r2 = dict(synthetic_data['displacement_r2'])
+    displacement_r2['incremental_downsampled'], displacement_r2['mask_downsampled'] = stride_downsample(displacement_r2['incremental'], displacement_r2['mask'])
+    sources_downsampled, _ = stride_downsample(synthetic_data['sources'], displacement_r2['mask'])
+    return synthetic_data['sources'], sources_downsampled, synthetic_data['cumulative_baselines'], displacement_r2, synthetic_data['n_baseline_end']
+
+
+@pytest.mark.parametrize('cascade_fraction, resolution', [(1., 'coarse'), (1e-6, 'full')])
+def test_cascade_resolution_saved(cascade_inputs, tmp_path, cascade_fraction, resolution):
+    from licsalert.LiCSAlert_functions import LiCSAlert_cascade, save_LiCSAlert_results
+    from licsalert.results_store import add_date, read_date, query_results
+    sources, sources_downsampled, time_values, displacement_r2, n_baseline_end = cascade_inputs
+    n_ifgs = n_baseline_end + 1                                                                         # one monitoring ifg that doesn't show unrest
+    displacement_r2 = {key : value[:n_ifgs] if key.startswith('incremental') else value for key, value in displacement_r2.items()}
+    sources_tcs, residual_tcs, diagnostics = LiCSAlert_cascade(sources, sources_downsampled, time_values[:n_ifgs], displacement_r2, n_baseline_end, 
+                                                               cascade_fraction = cascade_fraction, alert_sigma = 1000.)
+    assert diagnostics['fine_required'] == (resolution == 'full')
+    assert all([tc['resolution'] == resolution for tc in sources_tcs + residual_tcs])
+    
+    results = save_LiCSAlert_results(sources_tcs, residual_tcs, n_baseline_end, time_values, tmp_path / "LiCSAlert_results", alert_sigma = 1000.)
+    assert results['resolution'] == resolution
+    with open(tmp_path / "LiCSAlert_results.json") as f:
+        assert json.load(f)['resolution'] == resolution
+    with open(tmp_path / "LiCSAlert_results.csv") as f:
+        assert f.readlines()[-1].strip().endswith(f",{resolution}")
+    
+    (tmp_path / "volcano").mkdir()
+    add_date(tmp_path / "volcano" / "LiCSAlert_results", '20200101', sources_tcs, residual_tcs, n_baseline_end, time_values, alert_sigma = 1000.)
+    assert read_date(tmp_path / "volcano" / "LiCSAlert_results", '20200101')['resolution'] == resolution
+    rows = query_results(f"{tmp_path}/", end_date = '20200101')
+    assert rows[0]['resolution'] == resolution
+
+
+def test_LiCSAlert_results_full_resolution(synthetic_data, tmp_path):
+    from licsalert.LiCSAlert_functions import LiCSAlert, save_LiCSAlert_results
+    ifgs = synthetic_data['displacement_r2']['incremental']
+    n_baseline_end = synthetic_data['n_baseline_end']
+    sources_tcs, residual_tcs = LiCSAlert(synthetic_data['sources'], synthetic_data['cumulative_baselines'], ifgs[:n_baseline_end], ifgs[n_baseline_end:])
+    results = save_LiCSAlert_results(sources_tcs, residual_tcs, n_baseline_end, synthetic_data['cumulative_baselines'], tmp_path / "LiCSAlert_results")
+    assert results['resolution'] == 'full'
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The parser of each of the seven subcommands of the licsalert command, the checks of its arguments, and the exit code of query (0 if it succeeded,
+whether or not any dates matched, and 1 if a results store couldn't be read).
+
+@author: Matthew Gaddes
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+
+def test_batch():
+    from licsalert.LiCSAlert_cli import parse_args
+    args = parse_args(['batch', 'data.pkl', '--n_baseline_end', '35', '--out_folder', 'volcano', '--downsample_run', 'auto', '--downsample_plot', '0.25',
+                       '--dtype', 'float32', '--no_figures', '--residual_maps'])
+    assert (args.subcommand, args.data_file, args.n_baseline_end, args.out_folder) == ('batch', 'data.pkl', 35, 'volcano')
+    assert (args.downsample_run, args.downsample_plot, args.dtype) == ('auto', 0.25, 'float32')
+    assert args.no_figures and args.residual_maps and not args.run_ICASAR and args.alert_sigma == 3.
+    with pytest.raises(SystemExit):
+        parse_args(['batch', 'data.pkl', '--n_baseline_end', '35', '--out_folder', 'volcano', '--downsample_run', 'half'])
+    with pytest.raises(SystemExit):
+        parse_args(['batch', 'data.pkl', '--out_folder', 'volcano'])                                     # --n_baseline_end is required
+
+
+def test_monitor():
+    from licsalert.LiCSAlert_cli import parse_args, monitor_path_args
+    args = parse_args(['monitor', 'volcano_a', 'volcano_b', '--socket', '/tmp/worker.sock', '--alert_sigma', '2.5'])
+    assert (args.volcanoes, args.socket, args.alert_sigma) == (['volcano_a', 'volcano_b'], '/tmp/worker.sock', 2.5)
+    with pytest.raises(SystemExit):
+        parse_args(['monitor', 'volcano_a'])                                                           # the paths are needed without --socket
+    paths = sum([[f'--{path_arg}', f'/data/{path_arg}'] for path_arg in monitor_path_args], [])
+    args = parse_args(['monitor', 'volcano_a'] + paths)
+    assert args.LiCSAlert_volcs_dir == '/data/LiCSAlert_volcs_dir/' and args.LiCSAR_frames_dir == '/data/LiCSAR_frames_dir/'     # trailing / added
+    assert args.LiCSBAS_bin == '/data/LiCSBAS_bin'
+
+
+def test_status_replay_archive_replot_query():
+    from licsalert.LiCSAlert_cli import parse_args
+    args = parse_args(['status', '--LiCSAlert_volcs_dir', 'volcs', '--LiCSAR_frames_dir', 'frames/', '--json'])
+    assert (args.volcanoes, args.LiCSAlert_volcs_dir, args.LiCSAR_frames_dir, args.json) == ([], 'volcs/', 'frames/', True)
+    args = parse_args(['replay', 'volcano_a', '--LiCSAlert_volcs_dir', 'volcs', '--out_dir', 'replays', '--n_processes', '4', '--mask_per_date'])
+    assert (args.volcanoes, args.out_dir, args.n_processes, args.mask_per_date, args.summary_only) == (['volcano_a'], 'replays', 4, True, False)
+    args = parse_args(['archive', 'data.pkl', 'data.zip'])
+    assert (args.data_file, args.archive_file, args.codec) == ('data.pkl', 'data.zip', 'auto')
+    with pytest.raises(SystemExit):
+        parse_args(['archive', 'data.pkl', 'data.zip', '--codec', 'zstd'])
+    args = parse_args(['replot', 'volcano_a', 'all', '--LiCSAlert_volcs_dir', 'volcs'])
+    assert (args.volcano, args.dates, args.out_folder) == ('volcano_a', ['all'], None)
+    args = parse_args(['query', '--LiCSAlert_volcs_dir', 'volcs', '--min_sigma', '3', '--last_days', '30', '--latest'])
+    assert (args.min_sigma, args.last_days, args.latest, args.end_date) == (3., 30, True, None)
+    with pytest.raises(SystemExit):
+        parse_args(['reticulate'])
+
+
+def test_query_exit_code(tmp_path, capsys):
+    from licsalert.LiCSAlert_cli import main
+    from licsalert.results_store import add_date
+    volcs_dir = f"{tmp_path}/volcs/"
+    tcs = [{'cumulative_tc' : np.zeros((4, 1)), 'gradient' : 0., 'lines' : np.zeros((4, 4)), 'sigma' : 1., 'distances' : np.array([[0.], [0.], [1.], [5.]]),
+            't_recalculate' : 10}]
+    add_date(f"{volcs_dir}volcano_a/LiCSAlert_results", '20230601', tcs, tcs, 2, np.arange(4) * 12., acq_dates = ['20230501', '20230513', '20230525', '20230606', '20230618'])
+    query = ['query', '--LiCSAlert_volcs_dir', volcs_dir, '--end_date', '20230630', '--json']
+    assert main(query + ['--min_sigma', '3']) == 0                                                     # a date matched
+    assert '20230601' in capsys.readouterr().out
+    assert main(query + ['--min_sigma', '10']) == 0                                                    # none matched, but the query worked
+    assert capsys.readouterr().out.strip() == '[]'
+    os.makedirs(f"{volcs_dir}volcano_b/LiCSAlert_results/dates")
+    with open(f"{volcs_dir}volcano_b/LiCSAlert_results/dates/20230601.h5", 'w') as f:                 # a store that can't be read
+        f.write('not hdf5')
+    assert main(query) == 1
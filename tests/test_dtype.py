@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Check that float32 gives the same LiCSAlert distances (in sigmas) as float64.  This replaces checking it at the start of every run, which needed
+LiCSAlert to be run twice and a float64 copy of the ifgs.  The Sierra Negra test uses the example data (sierra_negra_example_data.pkl, which is
+downloaded separately) and the ICASAR results of the example, and is skipped if they are not available.  
+
+@author: Matthew Gaddes
+"""
+
+from pathlib import Path
+
+import pytest
+
+repo_dir = Path(__file__).resolve().parent.parent
+
+
+def test_dtype_synthetic(synthetic_data):
+    from licsalert.LiCSAlert_functions import LiCSAlert_dtype_check
+    ifgs = synthetic_data['displacement_r2']['incremental']
+    n_baseline_end = synthetic_data['n_baseline_end']
+    dtype_ok, max_difference = LiCSAlert_dtype_check(synthetic_data['sources'], synthetic_data['cumulative_baselines'], ifgs[:n_baseline_end], 
+                                                     ifgs[n_baseline_end:], dtype = 'float32')
+    assert dtype_ok, f"float32 changes the distances by {max_difference} sigmas"
+
+
+def test_dtype_sierra_negra():
+    import pickle
+    data_file = repo_dir / "sierra_negra_example_data.pkl"
+    ICASAR_file = repo_dir / "LiCSAlert_01_Sierra_Negra_no_intermediate/ICASAR_outputs/ICASAR_results.pkl"
+    if not (data_file.exists() and ICASAR_file.exists()):
+        pytest.skip("The Sierra Negra example data has not been downloaded.  ")
+    pytest.importorskip('skimage')                                                                  # to downsample the ifgs as per the example
+    from licsalert.LiCSAlert_functions import LiCSAlert_preprocessing_run, LiCSAlert_dtype_check
+
+    displacement_r2 = {}
+    with open(data_file, 'rb') as f:
+        _ = pickle.load(f)
+        displacement_r2['incremental'] = pickle.load(f)
+        displacement_r2['mask'] = pickle.load(f)
+        cumulative_baselines = pickle.load(f)
+    with open(ICASAR_file, 'rb') as f:
+        sources = pickle.load(f)
+    displacement_r2 = LiCSAlert_preprocessing_run(displacement_r2, downsample_run = 0.5)             # as per the example (which the ICASAR results are from)
+    n_baseline_end = 35
+    dtype_ok, max_difference = LiCSAlert_dtype_check(sources, cumulative_baselines, displacement_r2['incremental'][:n_baseline_end], 
+                                                     displacement_r2['incremental'][n_baseline_end:], dtype = 'float32')
+    assert dtype_ok, f"float32 changes the distances by {max_difference} sigmas"
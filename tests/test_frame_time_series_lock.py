@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+frame_time_series_lock holds one shared lock on a frame's time series from finding a volcano's region in it until it has been read, so LiCSBAS can't 
+update the time series (which needs an exclusive lock) in between.  
+
+@author: Matthew Gaddes
+"""
+
+import fcntl
+import numpy as np
+import h5py as h5
+
+
+def exclusive_lock_available(lock_file):
+    """ As LiCSBAS_for_frame would need to update the time series.  
+    """
+    with open(lock_file, 'a') as f_lock:
+        try:
+            fcntl.flock(f_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        fcntl.flock(f_lock, fcntl.LOCK_UN)
+        return True
+
+
+def test_frame_time_series_lock(tmp_path):
+    from licsalert.LiCSAlert_monitoring_functions import frame_time_series_lock, frame_crop_pixels
+    cum_file = tmp_path / "cum.h5"
+    lock_file = tmp_path / "LiCSBAS.lock"
+    with h5.File(cum_file, 'w') as cumh5:
+        cumh5['cum'] = np.zeros((3, 50, 40), dtype = 'float32')
+        cumh5['corner_lon'], cumh5['corner_lat'], cumh5['post_lon'], cumh5['post_lat'] = 10., 20., 0.01, -0.01
+    lon_lat = [10.1, 10.2, 19.7, 19.8]
+    
+    assert exclusive_lock_available(lock_file)
+    with frame_time_series_lock(cum_file, lock_file, lon_lat) as crop_pixels:
+        assert not exclusive_lock_available(lock_file)                                       # held from the crop...
+        with h5.File(cum_file, 'r') as cumh5:                                                # ...through the read
+            cumh5['cum'][:, crop_pixels[2]:crop_pixels[3], crop_pixels[0]:crop_pixels[1]]
+        assert not exclusive_lock_available(lock_file)
+    assert exclusive_lock_available(lock_file)
+    assert crop_pixels == frame_crop_pixels(cum_file, lon_lat)
+    
+    with frame_time_series_lock(cum_file, None, lon_lat) as crop_pixels:                     # a volcano's own time series isn't cropped or locked
+        assert crop_pixels is None
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The pixels of a region (lon_lat_to_pixels) are those whose centres are in it: a region from the centres of some pixels gives back the same pixels
+(including those at the edges of the frame), and a region that is partly (or completely) outside the frame is cropped to it.
+
+@author: Matthew Gaddes
+"""
+
+import pytest
+
+
+@pytest.fixture
+def geotransform():
+    from licsalert.geotransform import Geotransform
+    return Geotransform(corner_lon = 14.0, corner_lat = 41.0, post_lon = 0.001, post_lat = -0.002, ny = 50, nx = 80)     # first row is the top (north)
+
+
+@pytest.mark.parametrize('crop_pixels', [(10, 20, 5, 15), (0, 80, 0, 50), (0, 1, 0, 1), (79, 80, 49, 50), (0, 30, 40, 50), (33, 34, 7, 8)])
+def test_round_trip(geotransform, crop_pixels):
+    x_start, x_stop, y_start, y_stop = crop_pixels
+    lons, lats = geotransform.lons, geotransform.lats
+    lon_lat = [lons[x_start], lons[x_stop - 1], lats[y_stop - 1], lats[y_start]]                            # west east south north, through the centres of the pixels at the edges
+    assert geotransform.lon_lat_to_pixels(lon_lat) == crop_pixels
+    post_lon, post_lat = geotransform.post_lon, abs(geotransform.post_lat)
+    lon_lat_wider = [lon_lat[0] - 0.4 * post_lon, lon_lat[1] + 0.4 * post_lon, lon_lat[2] - 0.4 * post_lat, lon_lat[3] + 0.4 * post_lat]
+    assert geotransform.lon_lat_to_pixels(lon_lat_wider) == crop_pixels                                    # but not as far as the centres of the next pixels
+    cropped = geotransform.crop(*crop_pixels)
+    assert cropped.shape == (y_stop - y_start, x_stop - x_start)
+    assert cropped.lons[0] == pytest.approx(lon_lat[0]) and cropped.lats[0] == pytest.approx(lon_lat[3])
+
+
+def test_partly_outside(geotransform):
+    lons, lats = geotransform.lons, geotransform.lats
+    assert geotransform.lon_lat_to_pixels([13.9, lons[9], lats[4], 41.5]) == (0, 10, 0, 5)                # off the west and north edges
+    assert geotransform.lon_lat_to_pixels([lons[70], 14.5, 40.0, lats[45]]) == (70, 80, 45, 50)            # off the east and south edges
+    assert geotransform.lon_lat_to_pixels([13.0, 15.0, 40.0, 42.0]) == (0, 80, 0, 50)                     # the whole frame
+    x_start, x_stop, y_start, y_stop = geotransform.lon_lat_to_pixels([12.0, 13.0, lats[10], lats[0]])     # completely west of the frame
+    assert x_start == x_stop == 0 and geotransform.crop(x_start, x_stop, y_start, y_stop).shape == (11, 0)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A date of monitoring mode is only complete if its results (LiCSAlert_results.json) were saved, both when LiCSAlert is run headless and when the
+figures are made, so a date that has the figures but not the results is processed again.  A headless date must also be in the results store, so that
+its figure can be made later.
+
+@author: Matthew Gaddes
+"""
+
+import os
+
+
+def make_date(folder_LiCSAlert, date, files):
+    os.makedirs(f"{folder_LiCSAlert}{date}")
+    for file in files:
+        with open(f"{folder_LiCSAlert}{date}/{file}", 'w') as f:
+            f.write(file)
+
+
+def test_dates_status(tmp_path):
+    from licsalert.LiCSAlert_monitoring_functions import LiCSAlert_dates_status
+    folder_LiCSAlert = f"{tmp_path}/"
+    figure_files = ['mask_changes_graph.png', 'mask_changes.png', 'LiCSAlert_figure_with_3_monitoring_interferograms.png']
+    make_date(folder_LiCSAlert, '20200101', ['LiCSAlert_results.json'] + figure_files)              # finished with the figures
+    make_date(folder_LiCSAlert, '20200113', ['LiCSAlert_results.json'])                             # finished headless
+    make_date(folder_LiCSAlert, '20200125', figure_files)                                           # killed after the figures, before the results were saved
+    make_date(folder_LiCSAlert, '20200206', [])
+    make_date(folder_LiCSAlert, '20200218', ['LiCSAlert_results.json'])                             # killed before it was added to the results store
+    make_date(folder_LiCSAlert, 'LiCSAlert_results/dates', ['20200101.h5', '20200113.h5', '20200125.h5', '.20200218.h5.host.1.1.tmp'])
+    required_dates = ['20200101', '20200113', '20200125', '20200206', '20200218', '20200302']
+    LiCSAlert_dates = required_dates[:5]
+
+    assert LiCSAlert_dates_status(required_dates, LiCSAlert_dates, folder_LiCSAlert, figures = False) == (['20200101', '20200113'], ['20200125', '20200206', '20200218'], ['20200302'])
+    assert LiCSAlert_dates_status(required_dates, LiCSAlert_dates, folder_LiCSAlert, figures = True) == (['20200101'], ['20200113', '20200125', '20200206', '20200218'], ['20200302'])
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Any pixels of an archive can be read (and match the quantised ifgs), reading it in blocks of pixels decompresses each chunk once, only the bytes that
+deflate makes smaller are compressed, and archives made before the epochs were chunked can still be read.
+
+@author: Matthew Gaddes
+"""
+
+import io
+import json
+import zipfile
+
+import numpy as np
+
+
+def smooth_ifgs(n_ifgs = 12, n_pixels = 10500, seed = 0):
+    """ ifgs that are smooth (so the high bytes compress) with noise (so the low bytes don't), and some nans.
+    """
+    rng = np.random.default_rng(seed)
+    ifgs = np.sin(np.linspace(0, 20, n_pixels) + rng.uniform(0, 6, size = (n_ifgs, 1))) + rng.normal(scale = 0.002, size = (n_ifgs, n_pixels))
+    ifgs[n_ifgs // 4, (n_pixels // 2) : (n_pixels // 2) + 20] = np.nan
+    return {'incremental' : ifgs, 'mask' : np.zeros((30, 35), dtype = bool)}
+
+
+def test_archive_pixels(tmp_path):
+    from licsalert.ifg_archive import save_ifg_archive, IfgArchive, quantise_ifg, dequantise_ifg
+    displacement_r2 = smooth_ifgs()
+    save_ifg_archive(tmp_path / "ifgs.zip", displacement_r2, codec = 'deflate', chunk_pixels = 1000)
+    archive = IfgArchive(tmp_path / "ifgs.zip")
+    quantised = np.array([dequantise_ifg(*quantise_ifg(ifg)) for ifg in displacement_r2['incremental']])
+
+    np.testing.assert_array_equal(archive[:], quantised)
+    np.testing.assert_array_equal(archive[:, 1300:4700], quantised[:, 1300:4700])
+    np.testing.assert_array_equal(archive[2:9, 9900:], quantised[2:9, 9900:])
+    np.testing.assert_array_equal(archive[3], quantised[3])
+    np.testing.assert_array_equal(archive[-1, 5], quantised[-1, 5])
+    region = np.zeros(10500, dtype = bool)
+    region[[3, 2500, 2501, 10499]] = True
+    np.testing.assert_array_equal(archive[:, region], quantised[:, region])
+    np.testing.assert_array_equal(archive[:, np.array([10000, 7, 4200])], quantised[:, [10000, 7, 4200]])
+    assert np.all(np.isnan(archive[3, 5250:5270]))
+
+    names = archive._zip.namelist()
+    lows = [info for info in archive._zip.infolist() if info.filename.endswith('_lo.npy')]
+    highs = [info for info in archive._zip.infolist() if info.filename.endswith('_hi.npy')]
+    assert len(lows) == len(highs) == 12 * 11
+    assert all([info.compress_type == zipfile.ZIP_STORED for info in lows])                     # noise, so deflate doesn't help
+    assert all([info.compress_type == zipfile.ZIP_DEFLATED for info in highs])
+    assert set(np.load(tmp_path / "ifgs.zip").files) >= {name[:-4] for name in names if name.startswith('ifg_')}       # still a .npz
+
+
+def test_blocks_decompress_once(tmp_path):
+    from licsalert.ifg_archive import save_ifg_archive, IfgArchive
+    from licsalert.lazy_ifgs import LazyIfgs
+    from licsalert.blocked_inversion import pixel_blocks
+    displacement_r2 = smooth_ifgs()
+    save_ifg_archive(tmp_path / "ifgs.zip", displacement_r2, codec = 'deflate', chunk_pixels = 1000)
+    archive = IfgArchive(tmp_path / "ifgs.zip")
+    ifgs = LazyIfgs(archive, row_means = archive.row_means)
+    blocks = [ifgs[:, block] for block in pixel_blocks(10500, 1500)]                                 # the blocks don't line up with the chunks
+    assert archive.n_decoded == 12 * 11
+    np.testing.assert_array_equal(np.concatenate(blocks, axis = 1), np.asarray(ifgs))
+    assert archive.n_decoded == 12 * 11                                                          # all from the cache
+
+    small = IfgArchive(tmp_path / "ifgs.zip", cache_MB = 0)                                      # nothing is kept
+    small[:, 0:1500], small[:, 1500:3000]
+    assert small.n_decoded == 12 * 4
+
+
+def test_version_1_archive(tmp_path):
+    """ An archive with one entry per epoch (the bytes shuffled as a 2 x n_pixels array), as made before the epochs were chunked.
+    """
+    from licsalert.ifg_archive import IfgArchive, quantise_ifg, dequantise_ifg
+    ifgs = smooth_ifgs(n_ifgs = 3, n_pixels = 50)['incremental']
+
+    def npy_bytes(array):
+        f = io.BytesIO()
+        np.save(f, array)
+        return f.getvalue()
+
+    arrays = {'scales' : np.zeros(3), 'offsets' : np.zeros(3), 'row_means' : np.zeros(3), 'max_errors' : np.zeros(3), 'rms_errors' : np.zeros(3),
+              'mask' : np.zeros((5, 10), dtype = bool)}
+    with zipfile.ZipFile(tmp_path / "old.zip", 'w', compression = zipfile.ZIP_DEFLATED) as f:
+        for ifg_n, ifg in enumerate(ifgs):
+            codes, arrays['scales'][ifg_n], arrays['offsets'][ifg_n] = quantise_ifg(ifg)
+            f.writestr(f"ifg_{ifg_n:05d}.npy", npy_bytes(np.ascontiguousarray(codes.astype('<i2').view('uint8').reshape(-1, 2).T)))
+        for key, array in arrays.items():
+            f.writestr(f"{key}.npy", npy_bytes(array))
+        f.writestr('metadata.json', json.dumps({'version' : 1, 'codec' : 'deflate', 'n_ifgs' : 3, 'n_pixels' : 50, 'acq_dates' : None,
+                                                'arrays' : sorted(arrays.keys())}))
+    archive = IfgArchive(tmp_path / "old.zip")
+    quantised = np.array([dequantise_ifg(*quantise_ifg(ifg)) for ifg in ifgs])
+    np.testing.assert_array_equal(archive[:], quantised)
+    np.testing.assert_array_equal(archive[1, 10:20], quantised[1, 10:20])
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The mask history store: masks are bit packed and read back unchanged (for any shape, including those that aren't a multiple of 8 pixels), the index
+has one entry per date (the newest if a date is processed again) in date order, and the mask_history.pkl files that were saved in each date folder
+before the store was used are imported once.
+
+@author: Matthew Gaddes
+"""
+
+import os
+import pickle
+
+import numpy as np
+
+
+def random_masks(shape, seed):
+    rng = np.random.default_rng(seed)
+    return rng.random(shape) > 0.7, rng.random(shape) > 0.5
+
+
+def test_packbits_round_trip(tmp_path):
+    from licsalert.LiCSAlert_monitoring_functions import mask_history_append, mask_history_index, mask_history_masks
+    store_dir = f"{tmp_path}/mask_history/"
+    masks = {'20230101' : random_masks((7, 11), 0),                                                # 77 pixels, so the last byte is padded
+             '20230113' : random_masks((8, 8), 1),
+             '20230125' : random_masks((1, 1), 2)}
+    for date, (mask_combined, mask_ifgs) in masks.items():
+        mask_history_append(store_dir, date, mask_combined, mask_ifgs)
+    for entry in mask_history_index(store_dir):
+        mask_combined, mask_ifgs = mask_history_masks(store_dir, entry)
+        np.testing.assert_array_equal(mask_combined, masks[entry['date']][0])
+        np.testing.assert_array_equal(mask_ifgs, masks[entry['date']][1])
+        assert mask_combined.dtype == bool and mask_combined.shape == entry['shape']
+        assert entry['n_pixs_combined'] == np.sum(~masks[entry['date']][0])
+        assert entry['n_pixs_combined'] + entry['n_masked_combined'] == mask_combined.size
+
+
+def test_date_index(tmp_path):
+    from licsalert.LiCSAlert_monitoring_functions import mask_history_append, mask_history_index, mask_history_masks
+    store_dir = f"{tmp_path}/mask_history/"
+    assert mask_history_index(store_dir) == []
+    for date, seed in [('20230125', 0), ('20230101', 1), ('20230113', 2), ('20230101', 3)]:        # out of order, and 20230101 is processed again
+        mask_history_append(store_dir, date, *random_masks((6, 9), seed))
+    with open(f"{store_dir}mask_history_index.txt", 'a') as f:
+        f.write("20230206 1234")                                                                   # a line that was only partly written
+    index = mask_history_index(store_dir)
+    assert [entry['date'] for entry in index] == ['20230101', '20230113', '20230125']
+    np.testing.assert_array_equal(mask_history_masks(store_dir, index[0])[0], random_masks((6, 9), 3)[0])       # the newest entry for the date
+
+
+def test_import_pkl(tmp_path):
+    from licsalert.LiCSAlert_monitoring_functions import mask_history_import_pkl, mask_history_append, mask_history_index, mask_history_masks
+    volcano_dir = f"{tmp_path}/volcano/"
+    store_dir = f"{volcano_dir}mask_history/"
+    dates = ['20230101', '20230113', '20230125']
+    masks = [random_masks((5, 7), seed) for seed in range(len(dates))]
+    for date_n, date in enumerate(dates):                                                          # as the old record_mask_changes saved them (the whole history in each date folder)
+        os.makedirs(f"{volcano_dir}{date}")
+        with open(f"{volcano_dir}{date}/mask_history.pkl", 'wb') as f:
+            pickle.dump(dates[:date_n+1], f)
+            pickle.dump([mask[0] for mask in masks[:date_n+1]], f)
+            pickle.dump([mask[1] for mask in masks[:date_n+1]], f)
+    with open(f"{volcano_dir}{dates[-1]}/mask_history.pkl", 'r+b') as f:                           # the latest can't be read
+        f.truncate(10)
+    mask_history_append(store_dir, '20230206', *random_masks((5, 7), 10))                         # a date processed since the store was used
+
+    assert mask_history_import_pkl(volcano_dir, store_dir) == 2
+    index = mask_history_index(store_dir)
+    assert [entry['date'] for entry in index] == ['20230101', '20230113', '20230206']
+    for entry, (mask_combined, mask_ifgs) in zip(index[:2], masks):
+        np.testing.assert_array_equal(mask_history_masks(store_dir, entry)[0], mask_combined)
+        np.testing.assert_array_equal(mask_history_masks(store_dir, entry)[1], mask_ifgs)
+    assert mask_history_import_pkl(volcano_dir, store_dir) == 0                                   # only done once
+    assert len(mask_history_index(store_dir)) == 3
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The parameter sweep gives the same time courses, distances, and alerts as running LiCSAlert for each baseline length and t_recalculate.
+
+@author: Matthew Gaddes
+"""
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope = 'module')
+def sweep_inputs(synthetic_data):
+    ifgs = synthetic_data['displacement_r2']['incremental']
+    ifgs = ifgs - np.mean(ifgs, axis = 1)[:, np.newaxis]                                                  # as per LiCSAlert_preprocessing_run
+    return synthetic_data['sources'], synthetic_data['cumulative_baselines'], ifgs
+
+
+@pytest.mark.parametrize('n_baseline_end', [12, 20, 28])
+@pytest.mark.parametrize('t_recalculate', [5, 10])
+def test_sweep_matches_LiCSAlert(sweep_inputs, n_baseline_end, t_recalculate):
+    from licsalert.LiCSAlert_functions import LiCSAlert
+    from licsalert.parameter_sweep import sweep_projection, sweep_time_courses, sweep_distances, LiCSAlert_sweep
+    sources, time_values, ifgs = sweep_inputs
+    n_ifgs = ifgs.shape[0]
+    sources_tcs, residual_tcs = LiCSAlert(sources, time_values, ifgs[:n_baseline_end], ifgs[n_baseline_end:], t_recalculate = t_recalculate)
+    tcs = sources_tcs + residual_tcs
+
+    tcs_c = sweep_time_courses(sweep_projection(sources, ifgs), n_baseline_end)
+    np.testing.assert_allclose(tcs_c, np.hstack([tc['cumulative_tc'] for tc in tcs]), rtol = 1e-8, atol = 1e-8)
+    distances = sweep_distances(tcs_c, time_values, n_baseline_end, [t_recalculate])[0]
+    distances_LiCSAlert = np.hstack([np.reshape(tc['distances'], (n_ifgs, 1)) for tc in tcs])
+    np.testing.assert_allclose(distances[n_baseline_end:], distances_LiCSAlert[n_baseline_end:], rtol = 1e-6, atol = 1e-6)
+
+    max_distances = np.max(distances_LiCSAlert[n_baseline_end:], axis = 1)
+    for alert_sigma in [2., 3., 5.]:
+        row, = LiCSAlert_sweep(sources, time_values, ifgs, [n_baseline_end], [t_recalculate], [alert_sigma])
+        alert_ns = n_baseline_end + np.flatnonzero(max_distances > alert_sigma)
+        assert row['n_alerts'] == len(alert_ns)
+        assert row['first_alert_n'] == (int(alert_ns[0]) if len(alert_ns) > 0 else None)
+        if len(alert_ns) > 0:
+            assert abs(row['first_alert_distance'] - max_distances[alert_ns[0] - n_baseline_end]) < 1e-6
+        assert row['alert'] == bool(max_distances[-1] > alert_sigma)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The cost model of the pre-flight check can be loaded from the results of the benchmarks or a saved model, and is the one the settings are chosen with.
+
+@author: Matthew Gaddes
+"""
+
+import json
+
+
+def write_benchmark_results(benchmark_file, time_per_pixel_ifg):
+    """ Results in the format of LiCSAlert_benchmarks.py, for an inversion that takes time_per_pixel_ifg.
+    """
+    results = []
+    for n_pixels, n_epochs in [(1000, 21), (4000, 41)]:
+        pixel_ifgs = n_pixels * (n_epochs - 1)
+        results.append({'function' : 'bss_components_inversion', 'size' : {'n_epochs' : n_epochs}, 'n_pixels' : n_pixels,
+                        'time_min' : time_per_pixel_ifg * pixel_ifgs, 'peak_memory_MB' : 16e-6 * pixel_ifgs})
+    with open(benchmark_file, 'w') as f:
+        json.dump({'metadata' : {}, 'results' : results}, f)
+
+
+def test_load_cost_model(tmp_path):
+    from licsalert.preflight import default_cost_model, calibrate_cost_model, save_cost_model, load_cost_model
+    assert load_cost_model(None) == default_cost_model
+
+    write_benchmark_results(tmp_path / "benchmarks.json", 1e-6)
+    model = load_cost_model(tmp_path / "benchmarks.json")                                       # the benchmark results are calibrated
+    assert model == calibrate_cost_model(tmp_path / "benchmarks.json")
+    assert abs(model['inversion']['time_per_pixel_ifg'] - 1e-6) < 1e-9
+    assert model['figures'] == default_cost_model['figures']                                    # not benchmarked
+
+    save_cost_model(model, tmp_path / "cost_model.json")
+    assert load_cost_model(tmp_path / "cost_model.json") == model
+
+    partial = load_cost_model({'inversion' : {'time_constant' : 5.}})                           # missing coefficients keep the defaults
+    assert partial['inversion']['time_constant'] == 5.
+    assert partial['inversion']['time_per_pixel_ifg'] == default_cost_model['inversion']['time_per_pixel_ifg']
+    assert default_cost_model['inversion']['time_constant'] == 0.                               # and the defaults aren't changed
+
+
+def test_calibrated_model_chooses_settings(tmp_path):
+    from licsalert.preflight import autotune_settings, load_cost_model
+    write_benchmark_results(tmp_path / "slow.json", 1e-5)                                       # a machine on which the inversion is slow
+    kwargs = {'n_pixels' : 100000, 'n_ifgs' : 50, 'n_baseline_end' : 20, 'max_time_s' : 30., 'downsample_plot' : 0.5, 'figures' : False}
+    default = autotune_settings(**kwargs)
+    slow = autotune_settings(**kwargs, model = load_cost_model(tmp_path / "slow.json"))
+    assert default['downsample_run'] == 1.0
+    assert slow['downsample_run'] < 1.0
+    assert slow['estimate']['time_s'] <= 30.
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The memory of each span is its own (not the peak of the process so far), and the Prometheus labels are escaped.  
+
+@author: Matthew Gaddes
+"""
+
+import sys
+
+import pytest
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason = "the memory of a span is read from /proc")
+def test_span_peak_rss():
+    import numpy as np
+    from licsalert.LiCSAlert_profiling import RunProfile
+    profile = RunProfile('test')
+    with profile.span('big'):
+        big = np.ones(int(200e6 / 8))                                                  # 200 MB
+        del big
+    with profile.span('small'):
+        small = np.ones(10)
+    big_span, small_span = profile.summary()['spans']
+    assert big_span['span_peak_rss_MB'] - small_span['span_peak_rss_MB'] > 150
+    assert small_span['process_peak_rss_MB'] >= big_span['span_peak_rss_MB'] - 1
+
+
+def test_prometheus_escape(tmp_path):
+    from licsalert.LiCSAlert_profiling import RunProfile
+    profile = RunProfile('test', labels = {'volcano' : 'a "b"\\c\nd'})
+    with profile.span('LiCSAlert'):
+        pass
+    profile.write_prometheus(tmp_path / "test.prom")
+    text = (tmp_path / "test.prom").read_text()
+    assert 'volcano="a \\"b\\"\\\\c\\nd"' in text
+    assert len([line for line in text.split("\n") if line.startswith('licsalert_run_wall_seconds')]) == 1
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The replay of monitoring mode gives the same results for each date as LiCSAlert run with the interferograms up to that date, both with the mask of
+the last date (as monitoring mode uses when it catches up on several dates) and with the mask of each date.  Volcanoes that fail don't stop the
+others, or leave the processes of the pool running.
+
+@author: Matthew Gaddes
+"""
+
+import json
+import multiprocessing
+
+import numpy as np
+import h5py as h5
+import pytest
+
+incoherent_acq = 36                                                                                     # a pixel is nan from this acquisition on
+
+
+@pytest.fixture(scope = 'module')
+def replay_inputs(synthetic_data, tmp_path_factory):
+    """ A cum.h5 (as made by LiCSBAS) of the synthetic time series, in which one pixel becomes incoherent late in the monitoring stage.
+    """
+    mask = synthetic_data['displacement_r2']['mask']
+    ifgs = synthetic_data['displacement_r2']['incremental']
+    cumulative = np.full((ifgs.shape[0] + 1,) + mask.shape, np.nan)
+    cumulative[:, ~mask] = np.vstack((np.zeros((1, ifgs.shape[1])), np.cumsum(ifgs, axis = 0)))
+    incoherent_pixel = np.argwhere(~mask)[100]
+    cumulative[incoherent_acq:, incoherent_pixel[0], incoherent_pixel[1]] = np.nan
+    cum_file = tmp_path_factory.mktemp('LiCSBAS') / "cum.h5"
+    with h5.File(cum_file, 'w') as cumh5:
+        cumh5['cum'] = cumulative
+        cumh5['imdates'] = np.array(synthetic_data['acq_dates'], dtype = 'S8')
+    return cum_file, cumulative, synthetic_data['sources'], mask, synthetic_data['acq_dates']
+
+
+def LiCSAlert_for_date(cumulative, sources, mask_sources, mask_nan, acq_n, n_baseline_end, time_values):
+    """ LiCSAlert with the ifgs up to acquisition acq_n, as monitoring mode runs it (mean centred, with the combined mask).
+    """
+    from licsalert.LiCSAlert_functions import LiCSAlert
+    ifgs = np.diff(cumulative[:acq_n+1], axis = 0)[:, ~mask_nan]
+    ifgs = ifgs - np.mean(ifgs, axis = 1)[:, np.newaxis]
+    sources_combined = sources[:, (~mask_nan)[~mask_sources]]                                            # mask_nan includes mask_sources
+    return LiCSAlert(sources_combined, time_values[:acq_n], ifgs[:n_baseline_end], ifgs[n_baseline_end:] if acq_n > n_baseline_end else None,
+                     t_recalculate = 10)
+
+
+@pytest.mark.parametrize('mask_per_date', [False, True])
+def test_replay_matches_LiCSAlert(replay_inputs, synthetic_data, tmp_path, mask_per_date):
+    from licsalert.LiCSAlert_replay import LiCSAlert_replay
+    from licsalert.LiCSAlert_aux_functions import get_baseline_end_ifg_n
+    cum_file, cumulative, sources, mask_sources, acq_dates = replay_inputs
+    baseline_end = acq_dates[synthetic_data['n_baseline_end']]
+    n_baseline_end = get_baseline_end_ifg_n(acq_dates, baseline_end) + 1
+    summary = LiCSAlert_replay(cum_file, sources, mask_sources, baseline_end, tmp_path, mask_per_date = mask_per_date)
+    assert [row['date'] for row in summary] == acq_dates[acq_dates.index(baseline_end)+1:]
+    assert [row['mask_changed'] for row in summary].count(True) == (2 if mask_per_date else 1)
+
+    for row in summary:
+        acq_n = acq_dates.index(row['date'])
+        last_acq_n = acq_n if mask_per_date else len(acq_dates) - 1
+        mask_nan = np.any(np.isnan(cumulative[:last_acq_n+1]), axis = 0)
+        sources_tcs, residual_tcs = LiCSAlert_for_date(cumulative, sources, mask_sources, mask_nan, acq_n, n_baseline_end, synthetic_data['cumulative_baselines'])
+        with open(tmp_path / row['date'] / "LiCSAlert_results.json") as f:
+            results = json.load(f)
+        for tc, tc_replay in zip(sources_tcs + residual_tcs, results['sources'] + [results['residual']]):
+            np.testing.assert_allclose(tc_replay['distances'], np.ravel(tc['distances']), rtol = 1e-6, atol = 1e-6)
+            np.testing.assert_allclose(tc_replay['cumulative_tc'], np.ravel(tc['cumulative_tc']), rtol = 1e-6, atol = 1e-6)
+        distances = np.array([np.ravel(tc['distances'])[-1] for tc in sources_tcs + residual_tcs])
+        assert abs(row['max_distance'] - np.max(distances)) < 1e-6
+        assert row['n_pixels'] == np.sum(~mask_nan)
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason = "the pool's processes are forked")
+def test_replay_volcanoes_failures(tmp_path):
+    from licsalert.LiCSAlert_replay import replay_volcanoes
+    (tmp_path / "volcs").mkdir()
+    summaries = replay_volcanoes(['volcano_a', 'volcano_b'], f"{tmp_path}/volcs/", str(tmp_path), n_processes = 2)        # neither has a config file
+    assert all(['error' in summary for summary in summaries.values()])
+    assert multiprocessing.active_children() == []
+    assert len(open(tmp_path / "replay_alerts.csv").readlines()) == 3
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+What the LiCSAlert worker keeps between runs:  resident_value is only made again when its inputs change, the state of a volcano (volcano_state) is the 
+same as monitoring mode made for each run, and the inversion gives the same time courses with a projector that is kept.  
+
+@author: Matthew Gaddes
+"""
+
+import numpy as np
+
+
+def test_resident_value():
+    from licsalert.LiCSAlert_aux_functions import resident_value
+    calls = []
+    def make():
+        calls.append(1)
+        return len(calls)
+    resident = {}
+    mask = np.zeros((5, 5), dtype = bool)
+    assert resident_value(resident, 'key', [mask, 1.], make) == 1
+    assert resident_value(resident, 'key', [mask.copy(), 1.], make) == 1                            # same contents, so not made again
+    mask[0, 0] = True
+    assert resident_value(resident, 'key', [mask, 1.], make) == 2
+    assert resident_value(None, 'key', [mask, 1.], make) == 3                                       # not kept
+
+
+def test_volcano_state(synthetic_data):
+    from licsalert.LiCSAlert_monitoring_functions import volcano_state, update_mask_sources_ifgs, apply_combined_mask
+    from licsalert.LiCSAlert_aux_functions import col_to_ma
+    sources, displacement_r2 = synthetic_data['sources'], synthetic_data['displacement_r2']
+    mask_ifgs = np.copy(displacement_r2['mask'])
+    mask_ifgs[10:15, 20:30] = True                                                                   # pixels that have become incoherent
+    ifgs = np.vstack([np.ma.compressed(np.ma.array(col_to_ma(ifg, displacement_r2['mask']), mask = mask_ifgs)) for ifg in displacement_r2['incremental']])
+    settings = {'downsample_plot' : 0.5, 'dtype' : 'float64', 'sketch_size' : None, 'sketch_method' : 'subset', 'cascade_fraction' : None, 'residual_maps' : False}
+    state = volcano_state(sources, displacement_r2['mask'], mask_ifgs, settings)
+    ifgs_combined, sources_combined, mask_combined = update_mask_sources_ifgs(displacement_r2['mask'], sources, mask_ifgs, ifgs)
+    np.testing.assert_array_equal(state['mask_combined'], mask_combined)
+    np.testing.assert_array_equal(state['sources_mask_combined'], sources_combined)
+    np.testing.assert_array_equal(apply_combined_mask(ifgs, mask_ifgs, state['mask_combined']), ifgs_combined)
+
+
+def test_projector(synthetic_data):
+    from licsalert.LiCSAlert_functions import LiCSAlert, components_projector
+    ifgs = synthetic_data['displacement_r2']['incremental']
+    n_baseline_end = synthetic_data['n_baseline_end']
+    args = [synthetic_data['sources'], synthetic_data['cumulative_baselines'], ifgs[:n_baseline_end], ifgs[n_baseline_end:]]
+    sources_tcs, residual_tcs = LiCSAlert(*args)
+    sources_tcs_projector, residual_tcs_projector = LiCSAlert(*args, projector = components_projector(synthetic_data['sources']))
+    for tc, tc_projector in zip(sources_tcs + residual_tcs, sources_tcs_projector + residual_tcs_projector):
+        np.testing.assert_allclose(tc_projector['distances'], tc['distances'])
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Monitoring mode only keeps the residual maps of the latest date of a volcano (so they don't grow with the square of the number of dates), a set of
+maps that wasn't finished is ignored, and the maps are only made if they are turned on in the config file.
+
+@author: Matthew Gaddes
+"""
+
+import os
+
+import numpy as np
+
+
+def fake_maps(n_pixels, n_ifgs, seed = 0):
+    incremental = np.random.default_rng(seed).normal(size = (n_pixels, n_ifgs))
+    return {'incremental' : incremental, 'cumulative' : np.cumsum(incremental, axis = 1)}
+
+
+def test_latest_residual_maps(tmp_path):
+    from licsalert.residual_maps import save_latest_residual_maps, latest_residual_maps, residual_history
+    maps_dir = str(tmp_path / "LiCSAlert_residual_maps")
+    mask_downsampled = np.zeros((6, 5), dtype = bool)
+    mask_downsampled[0, :2] = True
+    assert latest_residual_maps(maps_dir) is None
+
+    for date_n, date in enumerate(['20230101', '20230113', '20230125']):
+        maps = fake_maps(28, 10 + date_n, seed = date_n)
+        save_latest_residual_maps(maps_dir, date, maps, mask_downsampled)
+    assert sorted(os.listdir(maps_dir)) == [f"20230125_{key}.npy" for key in ['cumulative', 'incremental', 'mask']]     # only one copy
+    np.testing.assert_array_equal(residual_history(latest_residual_maps(maps_dir), (3, 4)), maps['cumulative'][17:18])                 # 3 + 5 + 5 + 4
+
+    np.save(f"{maps_dir}/20230206_incremental.npy", np.zeros((28, 13)))                                  # from a run that was killed before the mask was written
+    assert latest_residual_maps(maps_dir) == f"{maps_dir}/20230125"
+
+    save_latest_residual_maps(maps_dir, '20230113', fake_maps(28, 11), mask_downsampled)                 # an earlier date that is processed again
+    assert latest_residual_maps(maps_dir) == f"{maps_dir}/20230125"
+    assert os.path.exists(f"{maps_dir}/20230113_mask.npy")
+
+
+def test_residual_maps_off_by_default(tmp_path):
+    from licsalert.LiCSAlert_monitoring_functions import read_config_file
+    config = ("[LiCSAR]\nframe = 001A_00001_000000\n"
+              "[LiCSBAS]\nwest = 10.0\neast = 11.0\nsouth = 40.0\nnorth = 41.0\n"
+              "[LiCSAlert]\ndownsample_run = 1.0\ndownsample_plot = 0.5\nbaseline_end = 20200101\n"
+              "[ICASAR]\nn_comp = 5\nn_bootstrapped = 100\nn_not_bootstrapped = 0\nHDBSCAN_min_cluster_size = 100\nHDBSCAN_min_samples = 10\n"
+              "tsne_perplexity = 30\ntsne_early_exaggeration = 12\nica_tolerance = 1e-4\nica_max_iterations = 150\n")
+    with open(tmp_path / "config.txt", 'w') as f:
+        f.write(config)
+    assert read_config_file(tmp_path / "config.txt")[2]['residual_maps'] is False
+    with open(tmp_path / "config.txt", 'w') as f:
+        f.write(config.replace("[ICASAR]", "residual_maps = True\n[ICASAR]"))
+    assert read_config_file(tmp_path / "config.txt")[2]['residual_maps'] is True
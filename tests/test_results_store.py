@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A date that is added to a results store twice replaces its file (so the store doesn't grow), the store can be queried from its index or (if the index
+is missing or out of date) from the files of the dates, the temporary files of a run that was killed are ignored, and only the new ifgs are added
+for the figures.
+
+@author: Matthew Gaddes
+"""
+
+import os
+
+import numpy as np
+
+
+def fake_tcs(n_times, n_tcs, scale, seed = 0):
+    """ Time courses in the format of LiCSAlert, with lines of best fit that are only finite near the diagonal.
+    """
+    rng = np.random.default_rng(seed)
+    tcs = []
+    for tc_n in range(n_tcs):
+        lines = np.nan * np.ones((n_times, n_times))
+        for row in range(n_times):
+            lines[row, max(0, row - 2) : row + 1] = rng.normal(size = min(row, 2) + 1)
+        tcs.append({'cumulative_tc' : np.cumsum(rng.normal(size = (n_times, 1)), axis = 0),
+                    'gradient'      : rng.normal(),
+                    'lines'         : lines,
+                    'sigma'         : abs(rng.normal()),
+                    'distances'     : scale * np.abs(rng.normal(size = (n_times, 1))),
+                    't_recalculate' : 10})
+    return tcs
+
+
+def add_fake_date(store_dir, date, n_times, scale, seed = 0):
+    from licsalert.results_store import add_date
+    tcs = fake_tcs(n_times, 3, scale, seed)
+    add_date(store_dir, date, tcs[:2], tcs[2:], 4, np.arange(n_times) * 12., acq_dates = [f"2023{i+1:02d}01" for i in range(n_times + 1)])
+    return tcs
+
+
+def test_date_replaced(tmp_path):
+    from licsalert.results_store import read_date, store_dates
+    store_dir = str(tmp_path / "LiCSAlert_results")
+    add_fake_date(store_dir, '20230601', 8, 1., seed = 0)
+    size = os.path.getsize(f"{store_dir}/dates/20230601.h5")
+    tcs = add_fake_date(store_dir, '20230601', 8, 5., seed = 1)                                  # the date is processed again
+
+    assert os.listdir(f"{store_dir}/dates") == ['20230601.h5']                                  # no temporary files were left
+    assert os.path.getsize(f"{store_dir}/dates/20230601.h5") == size                            # the old results didn't stay in the store
+    assert store_dates(store_dir) == ['20230601']
+    results = read_date(store_dir, '20230601')
+    for tc, tc_read in zip(tcs, results['sources_tcs'] + results['residual_tcs']):
+        np.testing.assert_array_equal(tc_read['cumulative_tc'], tc['cumulative_tc'])
+        np.testing.assert_array_equal(tc_read['lines'], tc['lines'])
+    assert results['acq_dates'][-1] == '20230901'
+
+
+def test_query(tmp_path):
+    from licsalert.results_store import query_results, _read_index, _write_json_atomic
+    volcs_dir = f"{tmp_path}/"
+    add_fake_date(f"{volcs_dir}volcano_a/LiCSAlert_results", '20230501', 6, 1., seed = 0)
+    add_fake_date(f"{volcs_dir}volcano_a/LiCSAlert_results", '20230601', 8, 10., seed = 1)
+    add_fake_date(f"{volcs_dir}volcano_b/LiCSAlert_results", '20230601', 8, 0.1, seed = 2)
+    with open(f"{volcs_dir}volcano_b/LiCSAlert_results/dates/.20230701.h5.host.1.1.tmp", 'w') as f:        # from a run that was killed
+        f.write('partial')
+
+    rows = query_results(volcs_dir, min_sigma = 3., end_date = '20230630')
+    assert [(row['volcano'], row['date'], row['alert'], row['n_ifgs']) for row in rows] == [('volcano_a', '20230601', True, 8)]
+    all_rows = query_results(volcs_dir, end_date = '20230630')
+    assert len(all_rows) == 3 and all(['error' not in row for row in all_rows])
+
+    os.remove(f"{volcs_dir}volcano_a/LiCSAlert_results/index.json")                              # the dates are read from their files
+    assert query_results(volcs_dir, end_date = '20230630') == all_rows
+
+    index = _read_index(f"{volcs_dir}volcano_b/LiCSAlert_results")                              # an entry from before the date was replaced
+    add_fake_date(f"{volcs_dir}volcano_b/LiCSAlert_results", '20230601', 8, 10., seed = 3)
+    os.utime(f"{volcs_dir}volcano_b/LiCSAlert_results/dates/20230601.h5", ns = (1, 1))
+    _write_json_atomic(f"{volcs_dir}volcano_b/LiCSAlert_results/index.json", {'version' : 2, 'dates' : index})
+    assert [row['volcano'] for row in query_results(volcs_dir, min_sigma = 3., end_date = '20230630')] == ['volcano_a', 'volcano_b']
+
+
+def test_plot_data(tmp_path):
+    from licsalert.results_store import add_plot_data, read_plot_data
+    store_dir = str(tmp_path / "LiCSAlert_results")
+    rng = np.random.default_rng(0)
+    mask, mask_downsampled = np.zeros((10, 12), dtype = bool), np.zeros((5, 6), dtype = bool)
+    sources, ifgs = rng.normal(size = (2, 120)), rng.normal(size = (9, 30))
+    key = add_plot_data(store_dir, mask, mask_downsampled, sources, ifgs[:7])
+    mtimes = {f : os.stat(f"{store_dir}/plot/{key}/{f}").st_mtime_ns for f in os.listdir(f"{store_dir}/plot/{key}")}
+    assert add_plot_data(store_dir, mask, mask_downsampled, sources, ifgs) == key                # the next date
+    files = sorted(os.listdir(f"{store_dir}/plot/{key}"))
+    assert files == [f"ifg_{ifg_n:05d}.npy" for ifg_n in range(9)] + ['plot.h5']
+    assert all([os.stat(f"{store_dir}/plot/{key}/{f}").st_mtime_ns == mtime for f, mtime in mtimes.items()])      # only the new ifgs were written
+
+    plot_data = read_plot_data(store_dir, key, 8)
+    np.testing.assert_array_equal(plot_data['incremental_downsampled'], ifgs[:8])
+    np.testing.assert_array_equal(plot_data['sources'], sources)
+    assert plot_data['sources_downsampled'] is False
+    assert add_plot_data(store_dir, ~mask, mask_downsampled, sources, ifgs) != key               # a new mask gets a new folder
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Runs that are logged at the same time (in threads, or asyncio tasks) each only have their own lines in their log file, a nested run's lines
+also go to the log of the run it's in, and sys.stdout is put back once the runs have ended.
+
+@author: Matthew Gaddes
+"""
+
+import asyncio
+import sys
+import threading
+
+
+def log_lines(log_file):
+    with open(log_file) as f:
+        return f.read().splitlines()
+
+
+def test_threads(tmp_path):
+    from licsalert.run_logging import log_run
+    stdout = sys.stdout
+    barrier = threading.Barrier(2)
+
+    def run(name):
+        with log_run(tmp_path / f"{name}.txt", mode = 'w', echo = False, labels = {'volcano' : name}, flush_interval = 0.):
+            for line_n in range(50):
+                barrier.wait()                                                                     # so the lines of the two runs are printed in turn
+                print(f"{name} {line_n}")
+
+    threads = [threading.Thread(target = run, args = (name,)) for name in ['volcano_a', 'volcano_b']]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for name in ['volcano_a', 'volcano_b']:
+        assert log_lines(tmp_path / f"{name}.txt") == [f"{name} {line_n}" for line_n in range(50)]
+    assert sys.stdout is stdout
+
+
+def test_asyncio_tasks(tmp_path):
+    from licsalert.run_logging import log_run
+
+    async def run(name):
+        with log_run(tmp_path / f"{name}.txt", mode = 'w', echo = False):
+            for line_n in range(20):
+                print(f"{name} {line_n}")
+                await asyncio.sleep(0)                                                             # let the other task print
+
+    async def main():
+        await asyncio.gather(run('volcano_a'), run('volcano_b'))
+
+    asyncio.run(main())
+    for name in ['volcano_a', 'volcano_b']:
+        assert log_lines(tmp_path / f"{name}.txt") == [f"{name} {line_n}" for line_n in range(20)]
+
+
+def test_nested_runs(tmp_path, capsys):
+    from licsalert.run_logging import log_run, current_run_logger
+    stdout = sys.stdout
+    with log_run(tmp_path / "run.txt", mode = 'w', echo = False) as run_logger:
+        print("start")
+        with log_run(tmp_path / "volcano.txt", mode = 'w', labels = {'volcano' : 'volcano_a'}) as volcano_logger:
+            print("volcano")
+            assert volcano_logger.parent is run_logger
+        assert sys.stdout is not stdout
+        print("end")
+    assert sys.stdout is stdout
+    assert current_run_logger.get() is None
+    print("after")
+    assert log_lines(tmp_path / "run.txt") == ['start', 'volcano', 'end']
+    assert log_lines(tmp_path / "volcano.txt") == ['volcano']
+    assert capsys.readouterr().out == "after\n"                                                  # the run's logger doesn't echo, so only this reached the terminal
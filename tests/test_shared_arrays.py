@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The processes of map_shared get the arrays as read only views of shared memory (and give the same results as running the jobs in this process), and
+the shared memory is unlinked even if a job raises an exception.
+
+@author: Matthew Gaddes
+"""
+
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+import pytest
+
+
+def sum_rows(job):
+    from licsalert.shared_arrays import shared_array
+    ifgs = shared_array('ifgs')
+    if job == 'write':
+        ifgs[0, 0] = 1.                                                                         # raises, as the views are read only
+    return float(np.sum(ifgs[job]) * shared_array('scale')[0])
+
+
+def segments_left():
+    return [segment for segment in os.listdir('/dev/shm') if segment.startswith(f"licsalert_{os.getpid()}_")]
+
+
+@pytest.mark.parametrize('n_processes', [1, 2])
+def test_map_shared(n_processes):
+    from licsalert.shared_arrays import map_shared
+    ifgs = np.random.default_rng(0).normal(size = (6, 50))
+    results = map_shared(sum_rows, [0, 3, 5], {'ifgs' : ifgs, 'scale' : np.array([2.])}, n_processes)
+    np.testing.assert_allclose(results, [2 * np.sum(ifgs[row_n]) for row_n in [0, 3, 5]])
+
+
+@pytest.mark.skipif((not sys.platform.startswith('linux')) or ('fork' not in multiprocessing.get_all_start_methods()),
+                    reason = "the segments are found in /dev/shm, and the jobs are run in forked processes")
+def test_map_shared_exception_unlinks():
+    from licsalert.shared_arrays import map_shared
+    ifgs = np.random.default_rng(0).normal(size = (6, 50))
+    with pytest.raises(ValueError, match = 'read-only'):
+        map_shared(sum_rows, [0, 'write', 5], {'ifgs' : ifgs, 'scale' : np.array([2.])}, n_processes = 2)
+    assert segments_left() == []
+    assert multiprocessing.active_children() == []
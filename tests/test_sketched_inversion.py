@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The sketched inversion and residual (sketched_inversion.py):  a sketch of every pixel is exact, the estimated errors of the distances cover the 
+actual differences (on synthetic data, as they are a heuristic), and LiCSAlert uses the exact monitoring stage when a distance is near the threshold.  
+
+@author: Matthew Gaddes
+"""
+
+import numpy as np
+import pytest
+
+
+def baseline_tcs(synthetic_data):
+    from licsalert.LiCSAlert_functions import bss_components_inversion, tcs_baseline
+    tcs_c, _ = bss_components_inversion(synthetic_data['sources'], synthetic_data['displacement_r2']['incremental'])
+    return tcs_baseline(tcs_c, synthetic_data['cumulative_baselines'], 10)
+
+
+def test_sketch_of_all_pixels_is_exact(synthetic_data):
+    from licsalert.LiCSAlert_functions import residual_for_pixels
+    from licsalert.sketched_inversion import pixel_sketch, sketched_residual_for_pixels
+    ifgs = synthetic_data['displacement_r2']['incremental']
+    sources_tcs = baseline_tcs(synthetic_data)
+    sketch = pixel_sketch(synthetic_data['displacement_r2']['mask'], ifgs.shape[1], 'subset')
+    map_pixels = np.arange(0, ifgs.shape[1], 7)[::-1]                                                # not in order
+    exact = residual_for_pixels(synthetic_data['sources'], sources_tcs, ifgs, map_pixels = map_pixels)
+    sketched = sketched_residual_for_pixels(synthetic_data['sources'], sources_tcs, [ifgs[:10], ifgs[10:]], sketch, map_pixels = map_pixels)
+    np.testing.assert_allclose(sketched[0], exact[0], rtol = 1e-10)
+    np.testing.assert_allclose(sketched[1], exact[1], rtol = 1e-10)
+    for key in ['incremental', 'cumulative']:
+        np.testing.assert_allclose(sketched[2][key], exact[2][key], rtol = 1e-10, atol = 1e-12)
+
+
+@pytest.mark.parametrize('method', ['subset', 'countsketch'])
+def test_sketched_residual_estimate(synthetic_data, method):
+    from licsalert.LiCSAlert_functions import residual_for_pixels
+    from licsalert.sketched_inversion import pixel_sketch, sketched_residual_for_pixels
+    ifgs = synthetic_data['displacement_r2']['incremental']
+    sources_tcs = baseline_tcs(synthetic_data)
+    sketch = pixel_sketch(synthetic_data['displacement_r2']['mask'], 1000, method)
+    _, residual_cs = residual_for_pixels(synthetic_data['sources'], sources_tcs, ifgs)
+    _, residual_cs_sketch = sketched_residual_for_pixels(synthetic_data['sources'], sources_tcs, [ifgs], sketch)
+    np.testing.assert_allclose(residual_cs_sketch, residual_cs, rtol = 0.15)
+
+
+@pytest.mark.parametrize('method', ['subset', 'countsketch'])
+def test_LiCSAlert_sketch_errors(synthetic_data, method):
+    """ With a threshold that nothing is near, the sketch is used, and the differences from the exact distances are within their estimated errors.  
+    """
+    from licsalert.LiCSAlert_functions import LiCSAlert
+    from licsalert.sketched_inversion import pixel_sketch
+    ifgs = synthetic_data['displacement_r2']['incremental']
+    n_baseline_end = synthetic_data['n_baseline_end']
+    sketch = pixel_sketch(synthetic_data['displacement_r2']['mask'], 800, method)
+    exact = LiCSAlert(synthetic_data['sources'], synthetic_data['cumulative_baselines'], ifgs[:n_baseline_end], ifgs[n_baseline_end:])
+    sketched = LiCSAlert(synthetic_data['sources'], synthetic_data['cumulative_baselines'], ifgs[:n_baseline_end], ifgs[n_baseline_end:], 
+                         sketch = sketch, alert_sigma = 1000.)
+    for tc, tc_sketch in zip(exact[0] + exact[1], sketched[0] + sketched[1]):
+        assert np.all(np.abs(tc_sketch['distances'] - tc['distances']) <= tc_sketch['distance_bounds'] + 1e-10)
+
+
+def test_LiCSAlert_sketch_near_threshold(synthetic_data):
+    """ If a distance is near the threshold, the monitoring stage is done exactly, so the results are the same as without the sketch.  
+    """
+    from licsalert.LiCSAlert_functions import LiCSAlert
+    from licsalert.sketched_inversion import pixel_sketch
+    ifgs = synthetic_data['displacement_r2']['incremental']
+    n_baseline_end = synthetic_data['n_baseline_end']
+    sketch = pixel_sketch(synthetic_data['displacement_r2']['mask'], 800)
+    exact = LiCSAlert(synthetic_data['sources'], synthetic_data['cumulative_baselines'], ifgs[:n_baseline_end], ifgs[n_baseline_end:])
+    alert_sigma = float(np.ravel(exact[0][0]['distances'])[-1])                                       # a distance is exactly at the threshold
+    sketched = LiCSAlert(synthetic_data['sources'], synthetic_data['cumulative_baselines'], ifgs[:n_baseline_end], ifgs[n_baseline_end:], 
+                         sketch = sketch, alert_sigma = alert_sigma)
+    for tc, tc_sketch in zip(exact[0] + exact[1], sketched[0] + sketched[1]):
+        assert 'distance_bounds' not in tc_sketch
+        np.testing.assert_allclose(tc_sketch['distances'], tc['distances'])
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The stage cache: the hash of the inputs of a stage is the same for the same contents (and changes if any of them change), so a stage is loaded
+from the cache if its inputs haven't changed and run again if one has, the results that were used least recently are deleted first, and batch mode
+doesn't delete the outputs of a previous run when the cache is used.
+
+@author: Matthew Gaddes
+"""
+
+import os
+import pickle
+
+import numpy as np
+import numpy.ma as ma
+import pytest
+
+
+def test_content_hash():
+    from licsalert.stage_cache import content_hash
+    rng = np.random.default_rng(0)
+    ifgs, settings = rng.normal(size = (5, 20)), {'n_comp' : 5, 'tsne_perplexity' : 30}
+    key = content_hash(ifgs, settings, 'float64')
+    assert content_hash(ifgs, settings, 'float64') == key                                            # the same for each call
+    assert content_hash(ifgs.copy(), dict(reversed(list(settings.items()))), 'float64') == key      # and for copies (and the order of the keys of dicts)
+    assert content_hash(np.asfortranarray(ifgs), settings, 'float64') == key                         # and the memory layout
+    assert content_hash(ifgs.astype(np.float32), settings, 'float64') != key
+    ifgs_changed = ifgs.copy()
+    ifgs_changed[4, 19] += 1e-12
+    assert content_hash(ifgs_changed, settings, 'float64') != key
+    assert content_hash(ifgs, dict(settings, n_comp = 6), 'float64') != key
+    assert content_hash(ifgs, settings, 'float32') != key
+    assert content_hash(ma.array(ifgs, mask = ifgs > 0)) != content_hash(ma.array(ifgs, mask = ifgs > 1))
+
+
+def test_cached_stage_hit_and_miss(tmp_path):
+    from licsalert.stage_cache import StageCache, cached_stage
+    cache = StageCache(tmp_path / "cache", verbose = False)
+    n_runs = []
+    def stage(ifgs, dtype):
+        return lambda: (n_runs.append(1), np.mean(ifgs.astype(dtype), axis = 0))[1]
+
+    ifgs = np.random.default_rng(0).normal(size = (5, 20))
+    result = cached_stage(cache, 'mean', stage(ifgs, 'float64'), [ifgs, 'float64'])
+    np.testing.assert_array_equal(cached_stage(cache, 'mean', stage(ifgs.copy(), 'float64'), [ifgs.copy(), 'float64']), result)
+    assert len(n_runs) == 1                                                                         # the inputs haven't changed, so loaded
+    cached_stage(cache, 'mean', stage(ifgs, 'float32'), [ifgs, 'float32'])
+    assert len(n_runs) == 2                                                                         # one of the inputs has changed, so run again
+    cached_stage(cache, 'median', stage(ifgs, 'float64'), [ifgs, 'float64'])
+    assert len(n_runs) == 3                                                                         # a different stage with the same inputs
+
+
+def test_evict_least_recently_used(tmp_path):
+    from licsalert.stage_cache import StageCache
+    cache = StageCache(tmp_path / "cache", max_size_MB = 2.5e-3, verbose = False)                   # room for two of the results
+    result = np.zeros(100)                                                                          # about 1 kB when pickled
+    for time, key in enumerate(['a', 'b']):
+        cache.save(key, result)
+        os.utime(tmp_path / "cache" / f"{key}.pkl", (time, time))                                   # a was used before b
+    assert cache.load('a')[0]                                                                       # now b was used least recently
+    cache.save('c', result)
+    assert sorted(os.listdir(tmp_path / "cache")) == ['a.pkl', 'c.pkl']
+    assert cache.size_MB() <= 2.5e-3
+
+    cache.max_size_MB = 0.
+    cache.evict()
+    assert os.listdir(tmp_path / "cache") == ['c.pkl']                                              # the most recent is always kept
+
+
+def test_batch_mode_keeps_outputs(synthetic_data, tmp_path, monkeypatch):
+    from licsalert.LiCSAlert_functions import LiCSAlert_batch_mode
+    pytest.importorskip('skimage')                                                                  # to downsample the sources for the figures
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("LiCSAlert_volcano/ICASAR_outputs")
+    with open("LiCSAlert_volcano/ICASAR_outputs/ICASAR_results.pkl", 'wb') as f:                    # as if ICASAR had been run before
+        for ICASAR_product in [synthetic_data['sources'], synthetic_data['tcs'], None, None, None]:
+            pickle.dump(ICASAR_product, f)
+
+    def batch_mode(cache_dir):
+        LiCSAlert_batch_mode(dict(synthetic_data['displacement_r2']), synthetic_data['cumulative_baselines'], synthetic_data['acq_dates'],
+                             synthetic_data['n_baseline_end'], 'volcano', {}, run_ICASAR = False, downsample_plot = 1.0, figures = False,
+                             cache_dir = cache_dir)
+    results_file = f"LiCSAlert_volcano/LiCSAlert_results_{synthetic_data['acq_dates'][-1]}.json"
+    batch_mode(tmp_path / "cache")
+    with open("LiCSAlert_volcano/LiCSAlert_figure_previous.png", 'w') as f:                        # e.g. a figure from a previous run
+        f.write('figure')
+    batch_mode(tmp_path / "cache")
+    assert os.path.exists(results_file) and os.path.exists("LiCSAlert_volcano/LiCSAlert_figure_previous.png")
+    batch_mode(None)                                                                                 # without the cache, the outputs are all made again
+    assert os.path.exists(results_file) and not os.path.exists("LiCSAlert_volcano/LiCSAlert_figure_previous.png")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Several worker processes run a queue in which one worker stalls (so its lease is reclaimed, and its result must be discarded) and one crashes,
+and every job is still done exactly once.  A job that is enqueued by several processes at once is only added once.
+
+@author: Matthew Gaddes
+"""
+
+import os
+import time
+import multiprocessing
+
+import pytest
+
+lease_timeout = 1.0
+
+
+def trace_job(job, trace_dir):
+    """ The job of the test workers.  Each run is recorded, and the first run of the 'stall' job takes longer than a lease, and the first run of the
+    'crash' job kills its worker.
+    """
+    first_run = not os.path.exists(f"{trace_dir}/{job['job_id']}.first")
+    with open(f"{trace_dir}/{job['job_id']}.first", 'a'):
+        pass
+    with open(f"{trace_dir}/{job['job_id']}.runs", 'a') as f:
+        f.write(f"{os.getpid()}\n")
+    if first_run and job['job_id'] == 'crash':
+        os._exit(1)                                                                                  # no commit, and the lease is left behind
+    elif first_run and job['job_id'] == 'stall':
+        time.sleep(3 * lease_timeout)
+    else:
+        time.sleep(0.05)
+    return {'status' : 'ok'}
+
+
+def queue_worker(queue_dir, trace_dir, worker_id, heartbeat_interval, max_jobs):
+    import functools
+    from licsalert.LiCSAlert_work_queue import LiCSAlert_queue_worker
+    LiCSAlert_queue_worker(queue_dir, functools.partial(trace_job, trace_dir = trace_dir), worker_id = worker_id, lease_timeout = lease_timeout,
+                           heartbeat_interval = heartbeat_interval, poll_interval = 0.05, max_jobs = max_jobs)
+
+
+def enqueue_same_job(queue_dir):
+    from licsalert.LiCSAlert_work_queue import enqueue_job
+    return enqueue_job(queue_dir, 'volcano', ['volcano'])
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason = "the workers are forked")
+def test_queue_workers(tmp_path):
+    from licsalert.LiCSAlert_work_queue import enqueue_job, _read_json
+    queue_dir, trace_dir = str(tmp_path / "queue"), str(tmp_path / "trace")
+    os.makedirs(trace_dir)
+    context = multiprocessing.get_context('fork')
+
+    # the stalled worker (whose heartbeat is longer than the lease) claims its job before the others start
+    enqueue_job(queue_dir, 'stall', ['stall'])
+    stalled = context.Process(target = queue_worker, args = (queue_dir, trace_dir, 'stalled', 100., 1))
+    stalled.start()
+    t_start = time.time()
+    while not os.path.exists(f"{queue_dir}/leases/stall@stalled.json"):
+        assert time.time() - t_start < 10
+        time.sleep(0.01)
+
+    job_ids = ['crash'] + [f"volcano_{i}" for i in range(8)]
+    for job_id in job_ids:
+        enqueue_job(queue_dir, job_id, [job_id])
+    workers = [context.Process(target = queue_worker, args = (queue_dir, trace_dir, f"worker_{i}", 0.1, None)) for i in range(3)]
+    for worker in workers:
+        worker.start()
+    for process in [stalled] + workers:
+        process.join(timeout = 60)
+        assert not process.is_alive()
+
+    assert sorted(os.listdir(f"{queue_dir}/done")) == sorted([f"{job_id}.json" for job_id in job_ids + ['stall']])
+    for folder in ['pending', 'leases', 'committing', 'failed']:
+        assert [f for f in os.listdir(f"{queue_dir}/{folder}") if not f.startswith('.')] == []              # the stalled worker didn't recreate its lease
+
+    assert sorted([process.exitcode for process in workers]) == [0, 0, 1]                                       # the worker that got the 'crash' job
+    stall_result = _read_json(f"{queue_dir}/results/stall.json")
+    assert stall_result['worker_id'] != 'stalled'                                                               # its result was discarded
+    for job_id in ['stall', 'crash']:
+        assert _read_json(f"{queue_dir}/done/{job_id}.json")['attempts'] == 1                                   # the lost lease
+        assert len(open(f"{trace_dir}/{job_id}.runs").read().split()) == 2
+    for job_id in job_ids[1:]:
+        assert len(open(f"{trace_dir}/{job_id}.runs").read().split()) == 1
+        assert _read_json(f"{queue_dir}/results/{job_id}.json")['status'] == 'ok'
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason = "the processes are forked")
+def test_enqueue_once(tmp_path):
+    queue_dir = str(tmp_path / "queue")
+    with multiprocessing.get_context('fork').Pool(8) as pool:
+        enqueued = pool.map(enqueue_same_job, [queue_dir] * 32)
+    assert sum(enqueued) == 1
+    assert os.listdir(f"{queue_dir}/pending") == ['volcano.json']